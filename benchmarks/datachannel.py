@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional, cast
+
+from aiortc.rtcconfiguration import RTCSctpConfiguration
+from aiortc.rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
+from aiortc.rtcdtlstransport import RTCCertificate, RTCDtlsTransport
+from aiortc.rtcicetransport import RTCIceTransport
+from aiortc.rtcsctptransport import RTCSctpTransport
+
+DEFAULT_SIZES = [16, 256, 4096, 65536, 1024 * 1024, 16 * 1024 * 1024]
+MODES = {
+    "reliable-ordered": (True, False),
+    "reliable-unordered": (False, False),
+    "partial-ordered": (True, True),
+    "partial-unordered": (False, True),
+}
+TIMESTAMP = struct.Struct("!d")
+
+
+class LocalConnection:
+    """
+    One direction of an in-process link, with optional loss and delay.
+    """
+
+    def __init__(self, loss: float, delay: float, rng: random.Random) -> None:
+        self.closed = False
+        self.delay = delay
+        self.loss = 0.0
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self.rng = rng
+        self.target_loss = loss
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.queue.put_nowait(None)
+
+    def send(self, data: bytes) -> None:
+        if self.closed:
+            raise ConnectionError
+        if self.loss and self.rng.random() < self.loss:
+            return
+        if self.delay:
+            asyncio.get_running_loop().call_later(
+                self.delay, self.queue.put_nowait, data
+            )
+        else:
+            self.queue.put_nowait(data)
+
+
+class LocalIceTransport:
+    """
+    A stand-in for :class:`aiortc.RTCIceTransport` which exchanges datagrams
+    with its peer in the same process.
+    """
+
+    def __init__(self, role: str, rx: LocalConnection, tx: LocalConnection) -> None:
+        self.role = role
+        self._rx = rx
+        self._tx = tx
+
+    async def stop(self) -> None:
+        self._rx.close()
+        self._tx.close()
+
+    async def _recv(self) -> bytes:
+        data = await self._rx.queue.get()
+        if data is None:
+            raise ConnectionError
+        return data
+
+    async def _send(self, data: bytes) -> None:
+        self._tx.send(data)
+
+
+@dataclass
+class Result:
+    mode: str
+    size: int
+    sent: int
+    received: int
+    elapsed: float
+    latencies: list[float]
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.received / self.elapsed
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.received * self.size / self.elapsed / 1e6
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return float("nan")
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(p * len(values)))]
+
+
+async def run_case(
+    mode: str, size: int, count: int, args: argparse.Namespace
+) -> Result:
+    ordered, partial = MODES[mode]
+    rng = random.Random(args.seed)
+
+    # create the link
+    a_to_b = LocalConnection(loss=args.loss, delay=args.delay / 1000, rng=rng)
+    b_to_a = LocalConnection(loss=args.loss, delay=args.delay / 1000, rng=rng)
+    ice_a = LocalIceTransport("controlling", rx=b_to_a, tx=a_to_b)
+    ice_b = LocalIceTransport("controlled", rx=a_to_b, tx=b_to_a)
+
+    # establish DTLS without loss
+    dtls_a = RTCDtlsTransport(
+        cast(RTCIceTransport, ice_a), [RTCCertificate.generateCertificate()]
+    )
+    dtls_b = RTCDtlsTransport(
+        cast(RTCIceTransport, ice_b), [RTCCertificate.generateCertificate()]
+    )
+    await asyncio.gather(
+        dtls_b.start(dtls_a.getLocalParameters()),
+        dtls_a.start(dtls_b.getLocalParameters()),
+    )
+
+    configuration = RTCSctpConfiguration(
+        congestionControl=args.congestion_control,
+        receiveBufferSize=args.receive_buffer,
+    )
+    sender = RTCSctpTransport(dtls_a, configuration=configuration)
+    receiver = RTCSctpTransport(dtls_b, configuration=configuration)
+
+    received = 0
+    latencies: list[float] = []
+    timestamps: set[float] = set()
+    done = asyncio.Event()
+
+    @receiver.on("datachannel")
+    def on_datachannel(channel: RTCDataChannel) -> None:
+        channel.binaryType = "memoryview"
+
+        @channel.on("message")
+        def on_message(message: memoryview) -> None:
+            nonlocal received
+            timestamp = TIMESTAMP.unpack(message[:8])[0]
+            latencies.append(time.perf_counter() - timestamp)
+            timestamps.add(timestamp)
+            received += 1
+            if received == count:
+                done.set()
+
+    await receiver.start(sender.getCapabilities(), sender.port)
+    await sender.start(receiver.getCapabilities(), receiver.port)
+    opened = asyncio.Event()
+    channel = RTCDataChannel(
+        sender,
+        RTCDataChannelParameters(
+            label="benchmark",
+            maxRetransmits=args.max_retransmits if partial else None,
+            ordered=ordered,
+        ),
+    )
+    channel.on("open", opened.set)
+    await asyncio.wait_for(opened.wait(), timeout=10)
+
+    # inject loss once the association is up
+    a_to_b.loss = a_to_b.target_loss
+    b_to_a.loss = b_to_a.target_loss
+
+    # send messages, keeping the send buffer bounded
+    channel.bufferedAmountLowThreshold = args.buffer_low
+    drained = asyncio.Event()
+    channel.on("bufferedamountlow", drained.set)
+    start = time.perf_counter()
+    for _ in range(count):
+        while channel.bufferedAmount > args.buffer_high:
+            drained.clear()
+            await drained.wait()
+        # send() does not copy the payload, so each message needs its own
+        payload = bytearray(size)
+        TIMESTAMP.pack_into(payload, 0, time.perf_counter())
+        channel.send(payload)
+
+    # wait for delivery, giving up once the sender has nothing left in flight
+    deadline = time.perf_counter() + args.timeout
+    while not done.is_set() and time.perf_counter() < deadline:
+        if (
+            partial
+            and not channel.bufferedAmount
+            and not sender._outbound_queue
+            and not sender._sent_queue
+        ):
+            break
+        try:
+            await asyncio.wait_for(done.wait(), timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+    elapsed = time.perf_counter() - start
+
+    await sender.stop()
+    await receiver.stop()
+    await dtls_a.stop()
+    await dtls_b.stop()
+    await ice_a.stop()
+
+    # every message carries the time at which it was sent
+    if len(timestamps) != received:
+        raise RuntimeError(
+            f"Received {received} messages but only {len(timestamps)} timestamps"
+        )
+
+    return Result(
+        mode=mode,
+        size=size,
+        sent=count,
+        received=received,
+        elapsed=elapsed,
+        latencies=latencies,
+    )
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024 or unit == "MB":
+            return f"{size}{unit}"
+        size //= 1024
+    raise AssertionError
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(
+        f"{'mode':<20} {'size':>6} {'delivered':>13} {'msg/s':>10} "
+        f"{'MB/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}"
+    )
+    for mode in args.modes:
+        for size in args.sizes:
+            count = max(args.min_messages, min(args.max_messages, args.volume // size))
+            result = await run_case(mode, size, count, args)
+            print(
+                f"{result.mode:<20} {format_size(result.size):>6} "
+                f"{result.received:>6}/{result.sent:<6} "
+                f"{result.messages_per_second:>10.0f} "
+                f"{result.megabytes_per_second:>8.2f} "
+                f"{result.percentile(0.5) * 1000:>9.2f} "
+                f"{result.percentile(0.99) * 1000:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Data channel benchmark")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Message sizes in bytes (minimum 8)",
+    )
+    parser.add_argument(
+        "--modes", choices=MODES.keys(), nargs="+", default=list(MODES.keys())
+    )
+    parser.add_argument("--loss", type=float, default=0.0, help="Packet loss ratio")
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="One-way delay in milliseconds"
+    )
+    parser.add_argument(
+        "--max-retransmits",
+        type=int,
+        default=0,
+        help="Retransmissions for partially reliable channels",
+    )
+    parser.add_argument(
+        "--congestion-control", choices=["cubic", "reno"], default="reno"
+    )
+    parser.add_argument(
+        "--receive-buffer", type=int, default=RTCSctpConfiguration.receiveBufferSize
+    )
+    parser.add_argument("--buffer-high", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--buffer-low", type=int, default=1024 * 1024)
+    parser.add_argument(
+        "--volume",
+        type=int,
+        default=32 * 1024 * 1024,
+        help="Bytes to send for each case",
+    )
+    parser.add_argument("--min-messages", type=int, default=2)
+    parser.add_argument("--max-messages", type=int, default=20000)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for delivery after the last message is sent",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", "-v", action="count")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG)
+
+    asyncio.run(run(args))
@@ -0,0 +1,102 @@
+import argparse
+import fractions
+import os
+import time
+
+from aiortc.codecs.base import Encoder
+from aiortc.codecs.h264 import H264Encoder, H264PayloadDescriptor
+from aiortc.codecs.vpx import Vp8Encoder
+from av.packet import Packet
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "..", "tests")
+START_CODE = b"\x00\x00\x00\x01"
+
+
+def load_access_unit() -> tuple[bytes, bytes]:
+    """
+    Depayload the H.264 fixtures into an Annex B bitstream.
+
+    Returns the parameter sets and the whole bitstream.
+    """
+    data = []
+    for i in range(4):
+        with open(os.path.join(FIXTURES_PATH, f"h264_{i:04d}.bin"), "rb") as fp:
+            data.append(H264PayloadDescriptor.parse(fp.read())[1])
+    return data[0], b"".join(data)
+
+
+def create_keyframe(parameter_sets: bytes, bitstream: bytes, size: int) -> bytes:
+    """
+    Create an access unit with a single IDR slice of about `size` bytes, by
+    repeating the slice data of the fixtures.
+    """
+    slices = [
+        bytes(nal)
+        for nal in H264Encoder._split_bitstream(bitstream)
+        if nal[0] & 0x1F == 5
+    ]
+    body = slices[0][1:]
+    repeat = max(1, size // len(body))
+    return parameter_sets + START_CODE + slices[0][:1] + body * repeat
+
+
+def measure(encoder: Encoder, data: bytes, duration: float) -> tuple[float, int]:
+    """
+    Packetize `data` repeatedly, returning the throughput in MB/s and the
+    number of payloads produced each time.
+    """
+    packet = create_packet(data)
+    payloads, timestamp = encoder.pack(packet)
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        for _ in range(10):
+            encoder.pack(packet)
+        count += 10
+        elapsed = time.perf_counter() - start
+    return count * len(data) / elapsed / 1e6, len(payloads)
+
+
+def create_packet(data: bytes) -> Packet:
+    packet = Packet(data)
+    packet.pts = 0
+    packet.time_base = fractions.Fraction(1, 90000)
+    return packet
+
+
+def run(args: argparse.Namespace) -> None:
+    parameter_sets, bitstream = load_access_unit()
+    cases = [("fixtures", bitstream)]
+    for size in args.sizes:
+        cases.append(
+            (
+                f"keyframe-{size // 1024}KB",
+                create_keyframe(parameter_sets, bitstream, size),
+            )
+        )
+
+    print(f"{'codec':<6} {'input':<16} {'bytes':>9} {'payloads':>9} {'MB/s':>9}")
+    for name, encoder in [("H264", H264Encoder()), ("VP8", Vp8Encoder())]:
+        for label, data in cases:
+            throughput, payloads = measure(encoder, data, args.duration)
+            print(
+                f"{name:<6} {label:<16} {len(data):>9} {payloads:>9} {throughput:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Video packetization benchmark")
+    parser.add_argument(
+        "--duration", type=float, default=1.0, help="Seconds to run each case"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[64 * 1024, 256 * 1024],
+        help="Sizes of the synthetic keyframes in bytes",
+    )
+    args = parser.parse_args()
+
+    run(args)
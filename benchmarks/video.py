@@ -0,0 +1,159 @@
+import argparse
+import fractions
+import time
+from dataclasses import dataclass
+
+import numpy
+from aiortc.codecs import depayload, get_decoder, get_encoder
+from aiortc.jitterbuffer import JitterFrame
+from aiortc.rtcrtpparameters import RTCRtpCodecParameters
+from av import VideoFrame
+
+CODECS = {
+    "AV1": RTCRtpCodecParameters(
+        mimeType="video/AV1", clockRate=90000, payloadType=105
+    ),
+    "H264": RTCRtpCodecParameters(
+        mimeType="video/H264", clockRate=90000, payloadType=102
+    ),
+    "VP8": RTCRtpCodecParameters(
+        mimeType="video/VP8", clockRate=90000, payloadType=100
+    ),
+    "VP9": RTCRtpCodecParameters(
+        mimeType="video/VP9", clockRate=90000, payloadType=103
+    ),
+}
+FRAME_RATE = 30
+RESOLUTIONS = {
+    "360p": (640, 360),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+TIME_BASE = fractions.Fraction(1, 90000)
+
+
+@dataclass
+class Result:
+    codec: str
+    resolution: str
+    frames: int
+    decoded: int
+    encode_time: float
+    decode_time: float
+    size: int
+
+    @property
+    def bitrate(self) -> float:
+        return self.size * 8 * FRAME_RATE / self.frames / 1000
+
+    @property
+    def decode_fps(self) -> float:
+        return self.frames / self.decode_time
+
+    @property
+    def encode_fps(self) -> float:
+        return self.frames / self.encode_time
+
+
+def create_frames(width: int, height: int, count: int, seed: int) -> list[VideoFrame]:
+    """
+    Create frames which pan across a textured image, so that the encoders
+    have some motion to compensate.
+    """
+    rng = numpy.random.default_rng(seed)
+    margin = count * 2
+    texture = rng.integers(0, 256, (height + margin, width + margin), numpy.uint8)
+    # smooth the noise so that it looks more like camera content
+    texture = (texture.astype(numpy.uint16) + numpy.roll(texture, 1, axis=1)) // 2
+    texture = texture.astype(numpy.uint8)
+
+    frames = []
+    for i in range(count):
+        luma = texture[i : i + height, 2 * i : 2 * i + width]
+        chroma = numpy.full((height // 2, width), 128, numpy.uint8)
+        frame = VideoFrame.from_ndarray(
+            numpy.ascontiguousarray(numpy.vstack([luma, chroma])), format="yuv420p"
+        )
+        frame.pts = i * 90000 // FRAME_RATE
+        frame.time_base = TIME_BASE
+        frames.append(frame)
+    return frames
+
+
+def run_case(
+    name: str, resolution: str, frames: list[VideoFrame], bitrate: int
+) -> Result:
+    codec = CODECS[name]
+    encoder = get_encoder(codec)
+    if bitrate:
+        encoder.target_bitrate = bitrate
+
+    # encode
+    encoded = []
+    size = 0
+    start = time.perf_counter()
+    for frame in frames:
+        payloads, timestamp = encoder.encode(frame)
+        encoded.append((payloads, timestamp))
+        size += sum(len(payload) for payload in payloads)
+    encode_time = time.perf_counter() - start
+
+    # depayload and decode
+    decoder = get_decoder(codec)
+    decoded = 0
+    start = time.perf_counter()
+    for payloads, timestamp in encoded:
+        data = b"".join(depayload(codec, payload) for payload in payloads)
+        decoded += len(decoder.decode(JitterFrame(data=data, timestamp=timestamp)))
+    decode_time = time.perf_counter() - start
+
+    return Result(
+        codec=name,
+        resolution=resolution,
+        frames=len(frames),
+        decoded=decoded,
+        encode_time=encode_time,
+        decode_time=decode_time,
+        size=size,
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    print(
+        f"{'codec':<6} {'resolution':>10} {'encode fps':>11} {'decode fps':>11} "
+        f"{'kbps':>8} {'decoded':>9}"
+    )
+    for resolution in args.resolutions:
+        width, height = RESOLUTIONS[resolution]
+        frames = create_frames(width, height, args.frames, args.seed)
+        for name in args.codecs:
+            result = run_case(name, resolution, frames, args.bitrate)
+            print(
+                f"{result.codec:<6} {result.resolution:>10} "
+                f"{result.encode_fps:>11.1f} {result.decode_fps:>11.1f} "
+                f"{result.bitrate:>8.0f} {result.decoded:>4}/{result.frames:<4}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Video codec benchmark")
+    parser.add_argument(
+        "--codecs", choices=CODECS.keys(), nargs="+", default=list(CODECS.keys())
+    )
+    parser.add_argument(
+        "--resolutions",
+        choices=RESOLUTIONS.keys(),
+        nargs="+",
+        default=list(RESOLUTIONS.keys()),
+    )
+    parser.add_argument(
+        "--bitrate",
+        type=int,
+        default=0,
+        help="Target bitrate in bits per second, within the encoder's limits",
+    )
+    parser.add_argument("--frames", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args)
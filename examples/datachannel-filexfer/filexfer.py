@@ -39,6 +39,9 @@ async def run_answer(pc, signaling, fp):
         start = time.time()
         octets = 0
 
+        # avoid copying received data
+        channel.binaryType = "memoryview"
+
         @channel.on("message")
         async def on_message(message):
             nonlocal octets
@@ -8,7 +8,12 @@ import uuid
 
 import cv2
 from aiohttp import web
-from aiortc import MediaStreamTrack, RTCPeerConnection, RTCSessionDescription
+from aiortc import (
+    MediaStreamTrack,
+    RTCPeerConnection,
+    RTCRtpDecoderParameters,
+    RTCSessionDescription,
+)
 from aiortc.contrib.media import MediaBlackhole, MediaPlayer, MediaRecorder, MediaRelay
 from av import VideoFrame
 
@@ -35,7 +40,7 @@ class VideoTransformTrack(MediaStreamTrack):
         frame = await self.track.recv()
 
         if self.transform == "cartoon":
-            img = frame.to_ndarray(format="bgr24")
+            img = frame.opaque
 
             # prepare color
             img_color = cv2.pyrDown(cv2.pyrDown(img))
@@ -65,7 +70,7 @@ class VideoTransformTrack(MediaStreamTrack):
             return new_frame
         elif self.transform == "edges":
             # perform edge detection
-            img = frame.to_ndarray(format="bgr24")
+            img = frame.opaque
             img = cv2.cvtColor(cv2.Canny(img, 100, 200), cv2.COLOR_GRAY2BGR)
 
             # rebuild a VideoFrame, preserving timing information
@@ -75,7 +80,7 @@ class VideoTransformTrack(MediaStreamTrack):
             return new_frame
         elif self.transform == "rotate":
             # rotate image
-            img = frame.to_ndarray(format="bgr24")
+            img = frame.opaque
             rows, cols, _ = img.shape
             M = cv2.getRotationMatrix2D((cols / 2, rows / 2), frame.time * 45, 1)
             img = cv2.warpAffine(img, M, (cols, rows))
@@ -141,6 +146,16 @@ async def offer(request):
             pc.addTrack(player.audio)
             recorder.addTrack(track)
         elif track.kind == "video":
+            if params["video_transform"] != "none":
+                # convert frames to BGR arrays in the decoder's thread
+                receiver = next(
+                    transceiver.receiver
+                    for transceiver in pc.getTransceivers()
+                    if transceiver.receiver.track is track
+                )
+                receiver.setDecoderParameters(
+                    RTCRtpDecoderParameters(format="bgr24", ndarray=True)
+                )
             pc.addTrack(
                 VideoTransformTrack(
                     relay.subscribe(track), transform=params["video_transform"]
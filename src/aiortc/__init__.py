@@ -8,8 +8,17 @@ from .mediastreams import (
     MediaStreamTrack,
     VideoStreamTrack,
 )
-from .rtcconfiguration import RTCBundlePolicy, RTCConfiguration, RTCIceServer
-from .rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
+from .rtcconfiguration import (
+    RTCBundlePolicy,
+    RTCConfiguration,
+    RTCIceServer,
+    RTCSctpConfiguration,
+)
+from .rtcdatachannel import (
+    RTCDataChannel,
+    RTCDataChannelMessageStream,
+    RTCDataChannelParameters,
+)
 from .rtcdtlstransport import (
     RTCCertificate,
     RTCDtlsFingerprint,
@@ -28,24 +37,34 @@ from .rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpDecoderParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
     RTCRtpHeaderExtensionCapability,
     RTCRtpHeaderExtensionParameters,
     RTCRtpParameters,
+    RTCRtpSendParameters,
 )
 from .rtcrtpreceiver import (
+    RTCEncodedFrame,
     RTCRtpContributingSource,
     RTCRtpReceiver,
     RTCRtpSynchronizationSource,
 )
 from .rtcrtpsender import RTCRtpSender
 from .rtcrtptransceiver import RTCRtpTransceiver
-from .rtcsctptransport import RTCSctpCapabilities, RTCSctpTransport
+from .rtcsctptransport import (
+    RTCSctpCapabilities,
+    RTCSctpTransport,
+    SctpCongestionControl,
+)
 from .rtcsessiondescription import RTCSessionDescription
 from .stats import (
     RTCInboundRtpStreamStats,
     RTCOutboundRtpStreamStats,
     RTCRemoteInboundRtpStreamStats,
     RTCRemoteOutboundRtpStreamStats,
+    RTCStageTimingStats,
     RTCStatsReport,
     RTCTransportStats,
 )
@@ -65,10 +84,12 @@ __all__ = [
     "RTCCertificate",
     "RTCConfiguration",
     "RTCDataChannel",
+    "RTCDataChannelMessageStream",
     "RTCDataChannelParameters",
     "RTCDtlsFingerprint",
     "RTCDtlsParameters",
     "RTCDtlsTransport",
+    "RTCEncodedFrame",
     "RTCIceCandidate",
     "RTCIceGatherer",
     "RTCIceParameters",
@@ -83,18 +104,25 @@ __all__ = [
     "RTCRtpCapabilities",
     "RTCRtpCodecCapability",
     "RTCRtpCodecParameters",
+    "RTCRtpDecoderParameters",
+    "RTCRtpEncoderParameters",
+    "RTCRtpEncodingParameters",
     "RTCRtpContributingSource",
     "RTCRtpHeaderExtensionCapability",
     "RTCRtpHeaderExtensionParameters",
     "RTCRtpParameters",
     "RTCRtpReceiver",
+    "RTCRtpSendParameters",
     "RTCRtpSender",
     "RTCRtpSynchronizationSource",
     "RTCRtpTransceiver",
     "RTCSctpCapabilities",
+    "RTCSctpConfiguration",
     "RTCSctpTransport",
     "RTCSessionDescription",
+    "RTCStageTimingStats",
     "RTCStatsReport",
     "RTCTransportStats",
+    "SctpCongestionControl",
     "VideoStreamTrack",
 ]
@@ -1,5 +1,6 @@
 from typing import Optional, Union
 
+from ..jitterbuffer import PacketDescription
 from ..rtcrtpparameters import (
     ParametersDict,
     RTCRtcpFeedback,
@@ -9,12 +10,30 @@ from ..rtcrtpparameters import (
     RTCRtpHeaderExtensionCapability,
     RTCRtpHeaderExtensionParameters,
 )
+from .av1 import (
+    Av1Decoder,
+    Av1Encoder,
+    av1_assemble,
+    av1_available,
+    av1_depayload,
+    av1_describe,
+)
 from .base import Decoder, Encoder
 from .g711 import PcmaDecoder, PcmaEncoder, PcmuDecoder, PcmuEncoder
 from .g722 import G722Decoder, G722Encoder
-from .h264 import H264Decoder, H264Encoder, h264_depayload
+from .h264 import H264Decoder, H264Encoder, h264_depayload, h264_describe
 from .opus import OpusDecoder, OpusEncoder
-from .vpx import Vp8Decoder, Vp8Encoder, vp8_depayload
+from .vpx import (
+    Vp8Decoder,
+    Vp8Encoder,
+    Vp9Decoder,
+    Vp9Encoder,
+    vp8_depayload,
+    vp8_describe,
+    vp9_available,
+    vp9_depayload,
+    vp9_describe,
+)
 
 # The clockrate for G.722 is 8kHz even though the sampling rate is 16kHz.
 # See https://datatracker.ietf.org/doc/html/rfc3551
@@ -28,11 +47,23 @@ PCMA_CODEC = RTCRtpCodecParameters(
     mimeType="audio/PCMA", clockRate=8000, channels=1, payloadType=8
 )
 
+# Redundant audio carrying Opus, see https://datatracker.ietf.org/doc/html/rfc2198
+# The payload type is outside the dynamic range used by video codecs to avoid
+# collisions when BUNDLE is negotiated, as other implementations do.
+RED_CODEC = RTCRtpCodecParameters(
+    mimeType="audio/red",
+    clockRate=48000,
+    channels=2,
+    payloadType=63,
+    parameters={"96/96": None},
+)
+
 CODECS: dict[str, list[RTCRtpCodecParameters]] = {
     "audio": [
         RTCRtpCodecParameters(
             mimeType="audio/opus", clockRate=48000, channels=2, payloadType=96
         ),
+        RED_CODEC,
         G722_CODEC,
         PCMU_CODEC,
         PCMA_CODEC,
@@ -58,6 +89,12 @@ HEADER_EXTENSIONS: dict[str, list[RTCRtpHeaderExtensionParameters]] = {
         RTCRtpHeaderExtensionParameters(
             id=3, uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time"
         ),
+        RTCRtpHeaderExtensionParameters(
+            id=4, uri="urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+        ),
+        RTCRtpHeaderExtensionParameters(
+            id=5, uri="urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id"
+        ),
     ],
 }
 
@@ -102,17 +139,56 @@ def init_codecs() -> None:
                 "profile-level-id": profile_level_id,
             },
         )
+    # only offer the codecs which FFmpeg was built with
+    if vp9_available():
+        add_video_codec("video/VP9", {"profile-id": "0"})
+    if av1_available():
+        add_video_codec("video/AV1", {"level-idx": "5", "profile": "0", "tier": "0"})
+
+
+def assemble(codec: RTCRtpCodecParameters, data: bytes) -> bytes:
+    """
+    Turn the concatenated depayloaded packets of a frame into the codec's
+    bitstream format.
+    """
+    if codec.name == "AV1":
+        return av1_assemble(data)
+    else:
+        return data
 
 
 def depayload(codec: RTCRtpCodecParameters, payload: bytes) -> bytes:
     if codec.name == "VP8":
         return vp8_depayload(payload)
+    elif codec.name == "VP9":
+        return vp9_depayload(payload)
     elif codec.name == "H264":
         return h264_depayload(payload)
+    elif codec.name == "AV1":
+        return av1_depayload(payload)
     else:
         return payload
 
 
+def describe(
+    codec: RTCRtpCodecParameters, payload: bytes
+) -> Optional[PacketDescription]:
+    """
+    Describe a video packet from its payload descriptor, or return `None` if
+    the codec has none.
+    """
+    if codec.name == "VP8":
+        return vp8_describe(payload)
+    elif codec.name == "VP9":
+        return vp9_describe(payload)
+    elif codec.name == "H264":
+        return h264_describe(payload)
+    elif codec.name == "AV1":
+        return av1_describe(payload)
+    else:
+        return None
+
+
 def get_capabilities(kind: str) -> RTCRtpCapabilities:
     if kind not in CODECS:
         raise ValueError(f"cannot get capabilities for unknown media {kind}")
@@ -160,6 +236,10 @@ def get_decoder(codec: RTCRtpCodecParameters) -> Decoder:
         return H264Decoder()
     elif mimeType == "video/vp8":
         return Vp8Decoder()
+    elif mimeType == "video/vp9":
+        return Vp9Decoder()
+    elif mimeType == "video/av1":
+        return Av1Decoder()
     else:
         raise ValueError(f"No decoder found for MIME type `{mimeType}`")
 
@@ -170,7 +250,10 @@ def get_encoder(codec: RTCRtpCodecParameters) -> Encoder:
     if mimeType == "audio/g722":
         return G722Encoder()
     elif mimeType == "audio/opus":
-        return OpusEncoder()
+        return OpusEncoder(
+            fec=codec.parameters.get("useinbandfec") == 1,
+            dtx=codec.parameters.get("usedtx") == 1,
+        )
     elif mimeType == "audio/pcma":
         return PcmaEncoder()
     elif mimeType == "audio/pcmu":
@@ -179,12 +262,35 @@ def get_encoder(codec: RTCRtpCodecParameters) -> Encoder:
         return H264Encoder()
     elif mimeType == "video/vp8":
         return Vp8Encoder()
+    elif mimeType == "video/vp9":
+        return Vp9Encoder()
+    elif mimeType == "video/av1":
+        return Av1Encoder()
     else:
         raise ValueError(f"No encoder found for MIME type `{mimeType}`")
 
 
+def is_red(codec: Union[RTCRtpCodecCapability, RTCRtpCodecParameters]) -> bool:
+    return codec.name.lower() == "red"
+
+
 def is_rtx(codec: Union[RTCRtpCodecCapability, RTCRtpCodecParameters]) -> bool:
     return codec.name.lower() == "rtx"
 
 
+def red_payload_types(codec: RTCRtpCodecParameters) -> list[int]:
+    """
+    Return the payload types of the blocks carried by a RED codec.
+
+    They are signaled as a format parameter such as `111/111`.
+    """
+    for param, value in codec.parameters.items():
+        if value is None:
+            try:
+                return [int(x) for x in param.split("/")]
+            except ValueError:
+                pass
+    return []
+
+
 init_codecs()
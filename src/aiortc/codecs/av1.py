@@ -0,0 +1,485 @@
+import dataclasses
+import fractions
+import logging
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional, Type, TypeVar, Union, cast
+
+import av
+from av import VideoFrame
+from av.frame import Frame
+from av.packet import Packet
+from av.video.codeccontext import VideoCodecContext
+
+from ..jitterbuffer import JitterFrame, PacketDescription
+from ..mediastreams import VIDEO_TIME_BASE, convert_timebase
+from ..rtcrtpparameters import RTCRtpEncoderParameters, RTCRtpEncodingParameters
+from .base import (
+    Encoder,
+    VideoDecoder,
+    bitrate_change_due,
+    clamp_bitrate,
+    codec_parameters_changed,
+    scale_video_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BITRATE = 500000  # 500 kbps
+MIN_BITRATE = 150000  # 150 kbps
+MAX_BITRATE = 1500000  # 1.5 Mbps
+
+MAX_FRAME_RATE = 30
+PACKET_MAX = 1300
+
+# FFmpeg codecs, in order of preference.
+DECODER_NAMES = ["libdav1d", "libaom-av1", "av1"]
+ENCODER_NAMES = ["libsvtav1", "libaom-av1"]
+
+AGGREGATION_HEADER_SIZE = 1
+
+OBU_SEQUENCE_HEADER = 1
+OBU_TEMPORAL_DELIMITER = 2
+OBU_TILE_LIST = 8
+OBU_PADDING = 15
+
+# OBUs which must not be transmitted over RTP.
+OBU_TYPES_DROPPED = (OBU_TEMPORAL_DELIMITER, OBU_TILE_LIST, OBU_PADDING)
+
+OBU_EXTENSION_FLAG = 0x04
+OBU_HAS_SIZE_FIELD = 0x02
+
+TEMPORAL_DELIMITER = bytes([OBU_TEMPORAL_DELIMITER << 3 | OBU_HAS_SIZE_FIELD, 0])
+
+DESCRIPTOR_T = TypeVar("DESCRIPTOR_T", bound="Av1PayloadDescriptor")
+
+
+def leb128_decode(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Read an unsigned LEB128 value, returning it and the position after it.
+    """
+    value = 0
+    for i in range(8):
+        if pos >= len(data):
+            raise ValueError("LEB128 value is truncated")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << (i * 7)
+        if not byte & 0x80:
+            return value, pos
+    raise ValueError("LEB128 value is too long")
+
+
+def leb128_encode(value: int) -> bytes:
+    """
+    Write an unsigned LEB128 value.
+    """
+    output = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            output.append(byte | 0x80)
+        else:
+            output.append(byte)
+            return bytes(output)
+
+
+@contextmanager
+def preserve_scheduling() -> Iterator[None]:
+    """
+    Restore the scheduling policy of the current thread on exit.
+
+    When running as root, SVT-AV1 switches the thread which creates an encoder
+    to real-time scheduling, which starves every other thread.
+    """
+    if not hasattr(os, "sched_getscheduler"):
+        yield
+        return
+
+    policy = os.sched_getscheduler(0)
+    param = os.sched_getparam(0)
+    try:
+        yield
+    finally:
+        if os.sched_getscheduler(0) != policy:
+            os.sched_setscheduler(0, policy, param)
+
+
+def find_codec_name(names: list[str]) -> Optional[str]:
+    """
+    Return the first of the given FFmpeg codecs which is available.
+    """
+    return next((name for name in names if name in av.codecs_available), None)
+
+
+def obu_header_size(obu: bytes) -> int:
+    return 2 if obu[0] & OBU_EXTENSION_FLAG else 1
+
+
+def obu_type(obu: bytes) -> int:
+    return (obu[0] >> 3) & 0x0F
+
+
+def split_obus(data: bytes) -> Iterator[bytes]:
+    """
+    Split a low overhead bitstream into OBUs, without their size fields.
+
+    OBUs which must not be transmitted over RTP are skipped.
+    """
+    pos = 0
+    while pos < len(data):
+        start = pos
+        header_size = obu_header_size(data[pos:])
+        pos += header_size
+        if data[start] & OBU_HAS_SIZE_FIELD:
+            size, pos = leb128_decode(data, pos)
+        else:
+            size = len(data) - pos
+        if pos + size > len(data):
+            raise ValueError("OBU is truncated")
+
+        if obu_type(data[start:]) not in OBU_TYPES_DROPPED:
+            yield (
+                bytes([data[start] & ~OBU_HAS_SIZE_FIELD])
+                + data[start + 1 : start + header_size]
+                + data[pos : pos + size]
+            )
+        pos += size
+
+
+def with_size_field(obu: bytes) -> bytes:
+    """
+    Add the size field to an OBU received over RTP.
+    """
+    if obu[0] & OBU_HAS_SIZE_FIELD:
+        return obu
+    header_size = obu_header_size(obu)
+    return (
+        bytes([obu[0] | OBU_HAS_SIZE_FIELD])
+        + obu[1:header_size]
+        + leb128_encode(len(obu) - header_size)
+        + obu[header_size:]
+    )
+
+
+class Av1PayloadDescriptor:
+    """
+    The aggregation header of an AV1 RTP payload.
+    """
+
+    def __init__(
+        self,
+        continuation: int,
+        fragmented: int,
+        obu_count: int,
+        new_sequence: int,
+    ) -> None:
+        self.continuation = continuation
+        self.fragmented = fragmented
+        self.obu_count = obu_count
+        self.new_sequence = new_sequence
+
+    def __bytes__(self) -> bytes:
+        return bytes(
+            [
+                (self.continuation << 7)
+                | (self.fragmented << 6)
+                | (self.obu_count << 4)
+                | (self.new_sequence << 3)
+            ]
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Av1PayloadDescriptor(Z={self.continuation}, Y={self.fragmented}, "
+            f"W={self.obu_count}, N={self.new_sequence})"
+        )
+
+    @classmethod
+    def parse(cls: Type[DESCRIPTOR_T], data: bytes) -> tuple[DESCRIPTOR_T, list[bytes]]:
+        """
+        Parse the aggregation header and split the OBU elements which follow.
+        """
+        if len(data) < 1:
+            raise ValueError("AV1 descriptor is too short")
+
+        obj = cls(
+            continuation=data[0] >> 7,
+            fragmented=(data[0] >> 6) & 1,
+            obu_count=(data[0] >> 4) & 3,
+            new_sequence=(data[0] >> 3) & 1,
+        )
+
+        elements: list[bytes] = []
+        pos = AGGREGATION_HEADER_SIZE
+        while pos < len(data):
+            # The last element has no length field if the count is given.
+            if len(elements) == obj.obu_count - 1:
+                size = len(data) - pos
+            else:
+                size, pos = leb128_decode(data, pos)
+                if pos + size > len(data):
+                    raise ValueError("AV1 descriptor has truncated OBU element")
+            elements.append(data[pos : pos + size])
+            pos += size
+
+        if obj.obu_count and len(elements) != obj.obu_count:
+            raise ValueError("AV1 descriptor has wrong OBU element count")
+
+        return obj, elements
+
+
+class Av1Decoder(VideoDecoder):
+    def __init__(self) -> None:
+        name = find_codec_name(DECODER_NAMES)
+        if name is None:
+            raise ValueError("No AV1 decoder is available in FFmpeg")
+        super().__init__(name)
+
+    def decode(self, encoded_frame: JitterFrame) -> list[Frame]:
+        try:
+            packet = av.Packet(av1_assemble(encoded_frame.data))
+            packet.pts = encoded_frame.timestamp
+            packet.time_base = VIDEO_TIME_BASE
+            return self._decode_packet(packet, encoded_frame.keyframe)
+        except (av.FFmpegError, ValueError) as e:
+            logger.warning("Av1Decoder() failed to decode, skipping package: " + str(e))
+            return []
+
+
+class Av1Encoder(Encoder):
+    def __init__(self) -> None:
+        name = find_codec_name(ENCODER_NAMES)
+        if name is None:
+            raise ValueError("No AV1 encoder is available in FFmpeg")
+        self.codec: Optional[VideoCodecContext] = None
+        self.codec_name = name
+        self.parameters = RTCRtpEncoderParameters()
+        self.encoding = RTCRtpEncodingParameters()
+        self.__codec_time = 0.0
+        self.__target_bitrate = DEFAULT_BITRATE
+
+    def encode(
+        self, frame: Frame, force_keyframe: bool = False
+    ) -> tuple[list[bytes], int]:
+        assert isinstance(frame, VideoFrame)
+        if frame.format.name != "yuv420p":
+            frame = frame.reformat(format="yuv420p")
+        frame = scale_video_frame(frame, self.encoding.scaleResolutionDownBy)
+
+        frame_time = float(frame.pts * frame.time_base)
+        if self.codec and (
+            frame.width != self.codec.width
+            or frame.height != self.codec.height
+            or bitrate_change_due(
+                self.target_bitrate,
+                self.codec.bit_rate,
+                frame_time - self.__codec_time,
+                force_keyframe,
+            )
+        ):
+            self.codec = None
+
+        if force_keyframe:
+            # force a complete image
+            frame.pict_type = av.video.frame.PictureType.I
+        else:
+            frame.pict_type = av.video.frame.PictureType.NONE
+
+        if self.codec is None:
+            self.__codec_time = frame_time
+            self.codec = self._create_codec(frame)
+
+        payloads = []
+        for package in self.codec.encode(frame):
+            payloads += self._packetize(bytes(package))
+        timestamp = convert_timebase(frame.pts, frame.time_base, VIDEO_TIME_BASE)
+        return payloads, timestamp
+
+    def pack(self, packet: Packet) -> tuple[list[bytes], int]:
+        assert isinstance(packet, av.Packet)
+        payloads = self._packetize(bytes(packet))
+        timestamp = convert_timebase(packet.pts, packet.time_base, VIDEO_TIME_BASE)
+        return payloads, timestamp
+
+    @property
+    def target_bitrate(self) -> int:
+        """
+        Target bitrate in bits per second.
+        """
+        return self.__target_bitrate
+
+    @target_bitrate.setter
+    def target_bitrate(self, bitrate: int) -> None:
+        bitrate = clamp_bitrate(
+            bitrate, self.parameters, self.encoding, MIN_BITRATE, MAX_BITRATE
+        )
+        self.__target_bitrate = bitrate
+
+    def configure(
+        self, parameters: RTCRtpEncoderParameters, encoding: RTCRtpEncodingParameters
+    ) -> None:
+        previous = self.parameters
+        previous_encoding = self.encoding
+        self.parameters = dataclasses.replace(parameters)
+        self.encoding = dataclasses.replace(encoding)
+        if (
+            parameters.startBitrate is not None
+            and parameters.startBitrate != previous.startBitrate
+        ):
+            # a new start bitrate is applied immediately
+            self.target_bitrate = parameters.startBitrate
+            self.codec = None
+        else:
+            # keep the current bitrate within the new limits
+            self.target_bitrate = self.target_bitrate
+        if codec_parameters_changed(previous, parameters, previous_encoding, encoding):
+            self.codec = None
+
+    def _create_codec(self, frame: VideoFrame) -> VideoCodecContext:
+        codec = cast(VideoCodecContext, av.CodecContext.create(self.codec_name, "w"))
+        codec.width = frame.width
+        codec.height = frame.height
+        codec.bit_rate = self.target_bitrate
+        codec.pix_fmt = "yuv420p"
+        codec.framerate = fractions.Fraction(
+            self.encoding.maxFramerate or MAX_FRAME_RATE
+        ).limit_denominator(1000)
+        codec.time_base = fractions.Fraction(1, MAX_FRAME_RATE)
+        codec.gop_size = self.parameters.keyFrameInterval or 3000
+        if self.parameters.threadCount is not None:
+            codec.thread_count = self.parameters.threadCount
+        if self.codec_name == "libsvtav1":
+            codec.options = {
+                "preset": self.parameters.preset or "11",
+                # Low delay prediction structure with constant bitrate.
+                "svtav1-params": "pred-struct=1:rc=2:rtc=1",
+            }
+            with preserve_scheduling():
+                codec.open()
+        else:
+            codec.options = {
+                "cpu-used": self.parameters.preset or "8",
+                "lag-in-frames": "0",
+                "row-mt": "1",
+                "usage": "realtime",
+            }
+        return codec
+
+    @staticmethod
+    def _packetize(data: bytes) -> list[bytes]:
+        """
+        Packetize a temporal unit, aggregating small OBUs and fragmenting
+        large ones.
+        """
+        obus = list(split_obus(data))
+        new_sequence = int(any(obu_type(obu) == OBU_SEQUENCE_HEADER for obu in obus))
+
+        payloads: list[bytes] = []
+        elements: list[memoryview] = []
+        continuation = 0
+        size = AGGREGATION_HEADER_SIZE
+
+        def flush(fragmented: int) -> None:
+            nonlocal continuation, size
+
+            # The length of the last element is omitted when the count fits.
+            obu_count = len(elements) if len(elements) <= 3 else 0
+            descr = Av1PayloadDescriptor(
+                continuation=continuation,
+                fragmented=fragmented,
+                obu_count=obu_count,
+                new_sequence=new_sequence if not payloads else 0,
+            )
+            parts: list[Union[bytes, memoryview]] = [bytes(descr)]
+            for i, element in enumerate(elements):
+                if not obu_count or i < obu_count - 1:
+                    parts.append(leb128_encode(len(element)))
+                parts.append(element)
+            payloads.append(b"".join(parts))
+
+            continuation = fragmented
+            elements.clear()
+            size = AGGREGATION_HEADER_SIZE
+
+        for obu_bytes in obus:
+            obu = memoryview(obu_bytes)
+            pos = 0
+            while pos < len(obu):
+                available = PACKET_MAX - size - len(leb128_encode(PACKET_MAX))
+                if available <= 0:
+                    flush(fragmented=0)
+                    continue
+
+                element = obu[pos : pos + available]
+                elements.append(element)
+                size += len(leb128_encode(len(element))) + len(element)
+                pos += len(element)
+                if pos < len(obu):
+                    flush(fragmented=1)
+
+        if elements:
+            flush(fragmented=0)
+
+        return payloads
+
+
+def av1_available() -> bool:
+    """
+    Whether FFmpeg can both decode and encode AV1.
+    """
+    return (
+        find_codec_name(DECODER_NAMES) is not None
+        and find_codec_name(ENCODER_NAMES) is not None
+    )
+
+
+def av1_assemble(data: bytes) -> bytes:
+    """
+    Rebuild a temporal unit from the concatenated output of `av1_depayload`.
+    """
+    output = [TEMPORAL_DELIMITER]
+    fragment: Optional[bytes] = None
+    pos = 0
+    while pos < len(data):
+        length, pos = leb128_decode(data, pos)
+        descr, elements = Av1PayloadDescriptor.parse(data[pos : pos + length])
+        pos += length
+
+        for i, element in enumerate(elements):
+            if i == 0 and descr.continuation:
+                if fragment is None:
+                    # the start of the OBU was lost
+                    continue
+                fragment += element
+            else:
+                fragment = element
+
+            if i < len(elements) - 1 or not descr.fragmented:
+                output.append(with_size_field(fragment))
+                fragment = None
+
+    return b"".join(output)
+
+
+def av1_describe(payload: bytes) -> PacketDescription:
+    """
+    Describe an AV1 packet. Only the first packet of a coded video sequence,
+    which starts with a keyframe, is recognised.
+    """
+    descr, elements = Av1PayloadDescriptor.parse(payload)
+    return PacketDescription(
+        keyframe=bool(descr.new_sequence and not descr.continuation)
+    )
+
+
+def av1_depayload(payload: bytes) -> bytes:
+    """
+    Frame an RTP payload so that the packets of a frame can be concatenated.
+
+    OBUs may be fragmented across packets, so they are reassembled when the
+    whole frame is decoded, see `av1_assemble`.
+    """
+    return leb128_encode(len(payload)) + payload
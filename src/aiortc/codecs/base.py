@@ -1,9 +1,26 @@
+import multiprocessing
 from abc import ABCMeta, abstractmethod
+from typing import Optional, cast
 
+import av
+from av import VideoFrame
 from av.frame import Frame
 from av.packet import Packet
+from av.video.codeccontext import VideoCodecContext
+from av.video.reformatter import VideoReformatter
 
 from ..jitterbuffer import JitterFrame
+from ..rtcrtpparameters import (
+    RTCRtpDecoderParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
+)
+
+# Encoder parameters which can only be applied by creating a new encoder.
+CODEC_PARAMETERS = ("keyFrameInterval", "preset", "threadCount")
+
+# The minimum interval between restarts of an encoder to apply a new bitrate.
+BITRATE_CHANGE_INTERVAL = 5  # seconds
 
 
 class Decoder(metaclass=ABCMeta):
@@ -11,6 +28,89 @@ class Decoder(metaclass=ABCMeta):
     def decode(self, encoded_frame: JitterFrame) -> list[Frame]:
         pass  # pragma: no cover
 
+    def configure(self, parameters: RTCRtpDecoderParameters) -> None:
+        """
+        Apply new decoder parameters.
+
+        Decoders ignore the parameters they do not support.
+        """
+        pass
+
+
+class VideoDecoder(Decoder):
+    """
+    Base class for video decoders using libavcodec.
+
+    Unless configured otherwise, the decoder gets as many threads as the
+    resolution of the video calls for. The resolution is only known once a
+    keyframe is decoded, so that keyframe is decoded again if the decoder
+    has to be re-created with a different number of threads.
+
+    The decoded frames are then converted to the requested format and size,
+    so that this work happens in the decoder's thread too.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.codec: Optional[VideoCodecContext] = None
+        self.codec_name = name
+        self.parameters = RTCRtpDecoderParameters()
+        self.__pixels = 0
+        self.__reformatter = VideoReformatter()
+        self.__threading: Optional[tuple[int, str]] = None
+
+    def configure(self, parameters: RTCRtpDecoderParameters) -> None:
+        """
+        Apply new decoder parameters.
+
+        The threading changes from the next keyframe.
+        """
+        self.parameters = parameters
+
+    def _decode_packet(self, packet: Packet, keyframe: bool) -> list[Frame]:
+        if self.codec is None:
+            self.__create_codec()
+        frames = cast(list[Frame], self.codec.decode(packet))
+
+        if keyframe and frames:
+            frame = cast(VideoFrame, frames[0])
+            self.__pixels = frame.width * frame.height
+            if self.__get_threading() != self.__threading:
+                self.__create_codec()
+                frames = cast(list[Frame], self.codec.decode(packet))
+        return [self.__convert(cast(VideoFrame, frame)) for frame in frames]
+
+    def __convert(self, frame: VideoFrame) -> VideoFrame:
+        parameters = self.parameters
+        if parameters.format or parameters.width or parameters.height:
+            # The reformatter keeps its scaler context from one frame to the next.
+            frame = self.__reformatter.reformat(
+                frame,
+                width=parameters.width,
+                height=parameters.height,
+                format=parameters.format,
+            )
+        if parameters.ndarray:
+            frame.opaque = frame.to_ndarray()
+        return frame
+
+    def __create_codec(self) -> None:
+        self.__threading = self.__get_threading()
+        self.codec = cast(
+            VideoCodecContext, av.CodecContext.create(self.codec_name, "r")
+        )
+        self.codec.thread_count = self.__threading[0]
+        self.codec.thread_type = self.__threading[1]
+
+    def __get_threading(self) -> tuple[int, str]:
+        """
+        Return the number of threads and the type of threading to use.
+        """
+        if self.parameters.threadCount is not None:
+            thread_count = self.parameters.threadCount
+        else:
+            thread_count = number_of_threads(self.__pixels, multiprocessing.cpu_count())
+        return thread_count, "SLICE" if self.parameters.lowDelay else "AUTO"
+
 
 class Encoder(metaclass=ABCMeta):
     @abstractmethod
@@ -22,3 +122,99 @@ class Encoder(metaclass=ABCMeta):
     @abstractmethod
     def pack(self, packet: Packet) -> tuple[list[bytes], int]:
         pass  # pragma: no cover
+
+    def configure(
+        self, parameters: RTCRtpEncoderParameters, encoding: RTCRtpEncodingParameters
+    ) -> None:
+        """
+        Apply new encoder parameters, along with the limits of the RTP stream
+        described by `encoding`.
+
+        Encoders ignore the parameters they do not support.
+        """
+        pass
+
+
+def number_of_threads(pixels: int, cpus: int) -> int:
+    if pixels >= 1920 * 1080 and cpus > 8:
+        return 8
+    elif pixels > 1280 * 960 and cpus >= 6:
+        return 3
+    elif pixels > 640 * 480 and cpus >= 3:
+        return 2
+    else:
+        return 1
+
+
+def clamp_bitrate(
+    bitrate: int,
+    parameters: RTCRtpEncoderParameters,
+    encoding: RTCRtpEncodingParameters,
+    minimum: int,
+    maximum: int,
+) -> int:
+    """
+    Clamp a bitrate to the range allowed by the parameters and the encoding,
+    or failing that by the codec.
+    """
+    if encoding.maxBitrate is not None:
+        maximum = encoding.maxBitrate
+    if parameters.minBitrate is not None:
+        minimum = min(parameters.minBitrate, maximum)
+    return max(minimum, min(bitrate, maximum))
+
+
+def bitrate_change_due(
+    target_bitrate: int, bitrate: int, elapsed: float, force_keyframe: bool
+) -> bool:
+    """
+    Determine whether an encoder running for `elapsed` seconds should be
+    recreated to apply a new target bitrate.
+
+    The encoders wrapped by FFmpeg do not apply bitrate changes once open, and
+    a new encoder starts with a keyframe. To avoid keyframe bursts under
+    fluctuating estimates, the change is applied along with a requested
+    keyframe, or at most every `BITRATE_CHANGE_INTERVAL` seconds.
+    """
+    # We only adjust bitrate if it changes by over 10%.
+    if abs(target_bitrate - bitrate) / bitrate <= 0.1:
+        return False
+    return force_keyframe or elapsed >= BITRATE_CHANGE_INTERVAL
+
+
+def codec_parameters_changed(
+    old: RTCRtpEncoderParameters,
+    new: RTCRtpEncoderParameters,
+    old_encoding: RTCRtpEncodingParameters,
+    new_encoding: RTCRtpEncodingParameters,
+) -> bool:
+    """
+    Determine whether the encoder must be recreated to apply new parameters.
+    """
+    return old_encoding.maxFramerate != new_encoding.maxFramerate or any(
+        getattr(old, name) != getattr(new, name) for name in CODEC_PARAMETERS
+    )
+
+
+def scale_video_frame(frame: VideoFrame, factor: Optional[float]) -> VideoFrame:
+    """
+    Scale down a frame by the given factor, keeping even dimensions as
+    required by 4:2:0 chroma subsampling.
+    """
+    if not factor or factor == 1:
+        return frame
+    width = max(2, int(frame.width / factor) & ~1)
+    height = max(2, int(frame.height / factor) & ~1)
+    return frame.reformat(width=width, height=height)
+
+
+def scale_video_frames(
+    frame: VideoFrame, factors: list[Optional[float]]
+) -> dict[Optional[float], VideoFrame]:
+    """
+    Scale down a frame by several factors, converting it to the encoders'
+    pixel format only once.
+    """
+    if frame.format.name != "yuv420p":
+        frame = frame.reformat(format="yuv420p")
+    return {factor: scale_video_frame(frame, factor) for factor in set(factors)}
@@ -1,19 +1,27 @@
+import dataclasses
 import fractions
 import logging
 import math
 from collections.abc import Iterable, Iterator, Sequence
 from itertools import tee
 from struct import pack, unpack_from
-from typing import Optional, Type, TypeVar, cast
+from typing import Optional, Type, TypeVar, Union
 
 import av
 from av.frame import Frame
 from av.packet import Packet
 from av.video.codeccontext import VideoCodecContext
 
-from ..jitterbuffer import JitterFrame
+from ..jitterbuffer import JitterFrame, PacketDescription
 from ..mediastreams import VIDEO_TIME_BASE, convert_timebase
-from .base import Decoder, Encoder
+from ..rtcrtpparameters import RTCRtpEncoderParameters, RTCRtpEncodingParameters
+from .base import (
+    Encoder,
+    VideoDecoder,
+    clamp_bitrate,
+    codec_parameters_changed,
+    scale_video_frame,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +33,8 @@ MAX_FRAME_RATE = 30
 PACKET_MAX = 1300
 
 NAL_TYPE_FU_A = 28
+NAL_TYPE_IDR = 5
+NAL_TYPE_SPS = 7
 NAL_TYPE_STAP_A = 24
 
 NAL_HEADER_SIZE = 1
@@ -104,16 +114,16 @@ class H264PayloadDescriptor:
         return obj, output
 
 
-class H264Decoder(Decoder):
+class H264Decoder(VideoDecoder):
     def __init__(self) -> None:
-        self.codec = av.CodecContext.create("h264", "r")
+        super().__init__("h264")
 
     def decode(self, encoded_frame: JitterFrame) -> list[Frame]:
         try:
             packet = av.Packet(encoded_frame.data)
             packet.pts = encoded_frame.timestamp
             packet.time_base = VIDEO_TIME_BASE
-            return cast(list[Frame], self.codec.decode(packet))
+            return self._decode_packet(packet, encoded_frame.keyframe)
         except av.FFmpegError as e:
             logger.warning(
                 "H264Decoder() failed to decode, skipping package: " + str(e)
@@ -126,10 +136,12 @@ class H264Encoder(Encoder):
         self.buffer_data = b""
         self.buffer_pts: Optional[int] = None
         self.codec: Optional[VideoCodecContext] = None
+        self.parameters = RTCRtpEncoderParameters()
+        self.encoding = RTCRtpEncodingParameters()
         self.__target_bitrate = DEFAULT_BITRATE
 
     @staticmethod
-    def _packetize_fu_a(data: bytes) -> list[bytes]:
+    def _packetize_fu_a(data: Union[bytes, memoryview]) -> list[bytes]:
         available_size = PACKET_MAX - FU_A_HEADER_SIZE
         payload_size = len(data) - NAL_HEADER_SIZE
         num_packets = math.ceil(payload_size / available_size)
@@ -169,14 +181,17 @@ class H264Encoder(Encoder):
 
     @staticmethod
     def _packetize_stap_a(
-        data: bytes, packages_iterator: Iterator[bytes]
-    ) -> tuple[bytes, bytes]:
+        data: Union[bytes, memoryview],
+        packages_iterator: Iterator[Union[bytes, memoryview]],
+    ) -> tuple[bytes, Optional[Union[bytes, memoryview]]]:
         counter = 0
         available_size = PACKET_MAX - STAP_A_HEADER_SIZE
 
         stap_header = NAL_TYPE_STAP_A | (data[0] & 0xE0)
 
-        payload = bytes()
+        # The payload is gathered as a list of buffers, and joined once.
+        parts: list[Union[bytes, memoryview]] = []
+        nalu: Optional[Union[bytes, memoryview]]
         try:
             nalu = data  # with header
             while len(nalu) <= available_size and counter < 9:
@@ -188,7 +203,7 @@ class H264Encoder(Encoder):
 
                 available_size -= LENGTH_FIELD_SIZE + len(nalu)
                 counter += 1
-                payload += pack("!H", len(nalu)) + nalu
+                parts += [pack("!H", len(nalu)), nalu]
                 nalu = next(packages_iterator)
 
             if counter == 0:
@@ -197,40 +212,39 @@ class H264Encoder(Encoder):
             nalu = None
 
         if counter <= 1:
-            return data, nalu
+            return bytes(data), nalu
         else:
-            return bytes([stap_header]) + payload, nalu
+            return b"".join([bytes([stap_header]), *parts]), nalu
 
     @staticmethod
-    def _split_bitstream(buf: bytes) -> Iterator[bytes]:
-        # Translated from: https://github.com/aizvorski/h264bitstream/blob/master/h264_nal.c#L134
-        i = 0
-        while True:
-            # Find the start of the NAL unit.
-            #
-            # NAL Units start with the 3-byte start code 0x000001 or
-            # the 4-byte start code 0x00000001.
-            i = buf.find(b"\x00\x00\x01", i)
-            if i == -1:
-                return
+    def _split_bitstream(buf: bytes) -> Iterator[memoryview]:
+        """
+        Split an Annex B bitstream into NAL units.
 
+        The NAL units are views into `buf`, so they are not copied.
+        """
+        # Each start code is searched for once, and ends the previous NAL unit.
+        #
+        # NAL Units start with the 3-byte start code 0x000001 or
+        # the 4-byte start code 0x00000001.
+        view = memoryview(buf)
+        i = buf.find(b"\x00\x00\x01")
+        while i != -1:
             # Jump past the start code
-            i += 3
-            nal_start = i
+            nal_start = i + 3
 
             # Find the end of the NAL unit (end of buffer OR next start code)
-            i = buf.find(b"\x00\x00\x01", i)
+            i = buf.find(b"\x00\x00\x01", nal_start)
             if i == -1:
-                yield buf[nal_start : len(buf)]
-                return
+                yield view[nal_start:]
             elif buf[i - 1] == 0:
                 # 4-byte start code case, jump back one byte
-                yield buf[nal_start : i - 1]
+                yield view[nal_start : i - 1]
             else:
-                yield buf[nal_start:i]
+                yield view[nal_start:i]
 
     @classmethod
-    def _packetize(cls, packages: Iterable[bytes]) -> list[bytes]:
+    def _packetize(cls, packages: Iterable[Union[bytes, memoryview]]) -> list[bytes]:
         packetized_packages = []
 
         packages_iterator = iter(packages)
@@ -247,13 +261,10 @@ class H264Encoder(Encoder):
 
     def _encode_frame(
         self, frame: av.VideoFrame, force_keyframe: bool
-    ) -> Iterator[bytes]:
+    ) -> Iterator[memoryview]:
+        frame = scale_video_frame(frame, self.encoding.scaleResolutionDownBy)
         if self.codec and (
-            frame.width != self.codec.width
-            or frame.height != self.codec.height
-            # we only adjust bitrate if it changes by over 10%
-            or abs(self.target_bitrate - self.codec.bit_rate) / self.codec.bit_rate
-            > 0.1
+            frame.width != self.codec.width or frame.height != self.codec.height
         ):
             self.buffer_data = b""
             self.buffer_pts = None
@@ -272,18 +283,27 @@ class H264Encoder(Encoder):
             self.codec.height = frame.height
             self.codec.bit_rate = self.target_bitrate
             self.codec.pix_fmt = "yuv420p"
-            self.codec.framerate = fractions.Fraction(MAX_FRAME_RATE, 1)
+            self.codec.framerate = fractions.Fraction(
+                self.encoding.maxFramerate or MAX_FRAME_RATE
+            ).limit_denominator(1000)
             self.codec.time_base = fractions.Fraction(1, MAX_FRAME_RATE)
             self.codec.options = {
                 "level": "31",
                 "tune": "zerolatency",
             }
+            if self.parameters.keyFrameInterval is not None:
+                self.codec.gop_size = self.parameters.keyFrameInterval
+            if self.parameters.preset is not None:
+                self.codec.options["preset"] = self.parameters.preset
+            if self.parameters.threadCount is not None:
+                self.codec.thread_count = self.parameters.threadCount
             self.codec.profile = "Baseline"
+        elif self.codec.bit_rate != self.target_bitrate:
+            # libx264 applies the new bitrate without restarting the stream
+            self.codec.bit_rate = self.target_bitrate
 
-        data_to_send = b""
-        for package in self.codec.encode(frame):
-            data_to_send += bytes(package)
-
+        # Copy the encoder output once, NAL units are views into it.
+        data_to_send = b"".join(self.codec.encode(frame))
         if data_to_send:
             yield from self._split_bitstream(data_to_send)
 
@@ -295,6 +315,26 @@ class H264Encoder(Encoder):
         timestamp = convert_timebase(frame.pts, frame.time_base, VIDEO_TIME_BASE)
         return self._packetize(packages), timestamp
 
+    def configure(
+        self, parameters: RTCRtpEncoderParameters, encoding: RTCRtpEncodingParameters
+    ) -> None:
+        previous = self.parameters
+        previous_encoding = self.encoding
+        self.parameters = dataclasses.replace(parameters)
+        self.encoding = dataclasses.replace(encoding)
+        if (
+            parameters.startBitrate is not None
+            and parameters.startBitrate != previous.startBitrate
+        ):
+            self.target_bitrate = parameters.startBitrate
+        else:
+            # keep the current bitrate within the new limits
+            self.target_bitrate = self.target_bitrate
+        if codec_parameters_changed(previous, parameters, previous_encoding, encoding):
+            self.buffer_data = b""
+            self.buffer_pts = None
+            self.codec = None
+
     def pack(self, packet: Packet) -> tuple[list[bytes], int]:
         assert isinstance(packet, av.Packet)
         packages = self._split_bitstream(bytes(packet))
@@ -310,10 +350,32 @@ class H264Encoder(Encoder):
 
     @target_bitrate.setter
     def target_bitrate(self, bitrate: int) -> None:
-        bitrate = max(MIN_BITRATE, min(bitrate, MAX_BITRATE))
+        bitrate = clamp_bitrate(
+            bitrate, self.parameters, self.encoding, MIN_BITRATE, MAX_BITRATE
+        )
         self.__target_bitrate = bitrate
 
 
 def h264_depayload(payload: bytes) -> bytes:
     descriptor, data = H264PayloadDescriptor.parse(payload)
     return data
+
+
+def h264_describe(payload: bytes) -> PacketDescription:
+    """
+    Describe an H.264 packet. The start of a frame cannot be told apart from
+    the start of another slice, so only keyframes are recognised, by their
+    leading sequence parameter set or IDR slice.
+    """
+    if len(payload) < 2:
+        raise ValueError("NAL unit is too short")
+    nal_type = payload[0] & 0x1F
+    if nal_type == NAL_TYPE_FU_A:
+        keyframe = bool(payload[1] & 0x80) and payload[1] & 0x1F == NAL_TYPE_IDR
+    else:
+        if nal_type == NAL_TYPE_STAP_A:
+            if len(payload) < STAP_A_HEADER_SIZE + 1:
+                raise ValueError("STAP-A length field is truncated")
+            nal_type = payload[STAP_A_HEADER_SIZE] & 0x1F
+        keyframe = nal_type in (NAL_TYPE_IDR, NAL_TYPE_SPS)
+    return PacketDescription(keyframe=keyframe)
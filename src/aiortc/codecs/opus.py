@@ -1,18 +1,38 @@
 import fractions
-from typing import Optional, cast
+from typing import Optional
 
 from av import AudioFrame, AudioResampler, CodecContext
+from av.filter import Graph
 from av.frame import Frame
 from av.packet import Packet
 
 from ..jitterbuffer import JitterFrame
 from ..mediastreams import convert_timebase
-from .base import Decoder, Encoder
+from ..rtcrtpparameters import RTCRtpEncoderParameters, RTCRtpEncodingParameters
+from ..rtp import compute_audio_level_dbov
+from ..utils import uint32_add
+from .base import Decoder, Encoder, clamp_bitrate
+
+DEFAULT_BITRATE = 96000  # 96 kbps
+MIN_BITRATE = 6000  # 6 kbps
+MAX_BITRATE = 510000  # 510 kbps
 
 SAMPLE_RATE = 48000
 SAMPLES_PER_FRAME = 960
 TIME_BASE = fractions.Fraction(1, SAMPLE_RATE)
 
+# Discontinuous transmission: after DTX_HANGOVER silent frames, only send one
+# frame every DTX_INTERVAL frames (400 ms) so the receiver keeps its state.
+DTX_HANGOVER = 5
+DTX_INTERVAL = 20
+DTX_SILENCE_LEVEL = -50  # dBov
+
+# The expected packet loss, in percent, for which in-band FEC is tuned.
+FEC_PACKET_LOSS = 10
+
+# Packet loss concealment fades out the last frame over this many frames.
+PLC_MAX_FRAMES = 5
+
 
 class OpusDecoder(Decoder):
     def __init__(self) -> None:
@@ -20,23 +40,100 @@ class OpusDecoder(Decoder):
         self.codec.format = "s16"
         self.codec.layout = "stereo"
         self.codec.sample_rate = SAMPLE_RATE
+        self.last_frame: Optional[AudioFrame] = None
+        # The RTP timestamp expected for the packet following the last one.
+        self.next_timestamp = 0
 
     def decode(self, encoded_frame: JitterFrame) -> list[Frame]:
+        frames: list[Frame] = []
+        if encoded_frame.lost and self.last_frame is not None:
+            frames += self._conceal(self.last_frame, encoded_frame.timestamp)
+
         packet = Packet(encoded_frame.data)
         packet.pts = encoded_frame.timestamp
         packet.time_base = TIME_BASE
-        return cast(list[Frame], self.codec.decode(packet))
+        decoded = self.codec.decode(packet)
+        if decoded:
+            self.last_frame = decoded[-1]
+            self.next_timestamp = uint32_add(
+                encoded_frame.timestamp, sum(frame.samples for frame in decoded)
+            )
+        return frames + decoded
+
+    def _conceal(self, last_frame: AudioFrame, timestamp: int) -> list[Frame]:
+        """
+        Conceal the audio missing before the packet with the given `timestamp`
+        by repeating the last decoded frame while fading it out.
+
+        FFmpeg does not expose libopus' own concealment, nor decoding of the
+        in-band FEC data.
+        """
+        # Packets may be lost during DTX, so the amount of missing audio is
+        # derived from the timestamps rather than the count of lost packets.
+        gap = uint32_add(timestamp, -self.next_timestamp)
+        samples = last_frame.samples
+        count = min(gap // samples, PLC_MAX_FRAMES) if gap < 0x80000000 else 0
+        if not count:
+            return []
+
+        graph = Graph()
+        graph.link_nodes(
+            graph.add_abuffer(
+                format=last_frame.format.name,
+                layout=last_frame.layout.name,
+                sample_rate=last_frame.sample_rate,
+                time_base=TIME_BASE,
+            ),
+            graph.add(
+                "afade",
+                f"type=out:start_sample=0:nb_samples={PLC_MAX_FRAMES * samples}",
+            ),
+            graph.add("abuffersink"),
+        ).configure()
+
+        # The plane may be padded beyond the samples.
+        data = bytes(last_frame.planes[0])[
+            : samples * len(last_frame.layout.channels) * last_frame.format.bytes
+        ]
+        frames: list[Frame] = []
+        for i in range(count):
+            frame = AudioFrame(
+                format=last_frame.format.name,
+                layout=last_frame.layout.name,
+                samples=samples,
+            )
+            frame.planes[0].update(data)
+            frame.pts = i * samples
+            frame.sample_rate = last_frame.sample_rate
+            frame.time_base = TIME_BASE
+            graph.push(frame)
+
+            faded = graph.pull()
+            assert isinstance(faded, AudioFrame)
+            faded.pts = timestamp - gap + i * samples
+            faded.time_base = TIME_BASE
+            frames.append(faded)
+        return frames
 
 
 class OpusEncoder(Encoder):
-    def __init__(self) -> None:
+    """
+    :param fec: Whether to send in-band forward error correction data.
+    :param dtx: Whether to stop sending frames during silence.
+    """
+
+    def __init__(self, fec: bool = False, dtx: bool = False) -> None:
         self.codec = CodecContext.create("libopus", "w")
-        self.codec.bit_rate = 96000
+        self.codec.bit_rate = DEFAULT_BITRATE
         self.codec.format = "s16"
         self.codec.layout = "stereo"
-        self.codec.options = {"application": "voip"}
         self.codec.sample_rate = SAMPLE_RATE
         self.codec.time_base = TIME_BASE
+        self.dtx = dtx
+        self.fec = fec
+        self.__silent_frames = 0
+        # The timestamp of the next frame, counting the frames withheld by DTX.
+        self.__timestamp = 0
 
         # Create our own resampler to control the frame size.
         self.resampler = AudioResampler(
@@ -46,8 +143,6 @@ class OpusEncoder(Encoder):
             frame_size=SAMPLES_PER_FRAME,
         )
 
-        self.first_packet_pts: Optional[int] = None
-
     def encode(
         self, frame: Frame, force_keyframe: bool = False
     ) -> tuple[list[bytes], int]:
@@ -56,22 +151,70 @@ class OpusEncoder(Encoder):
         assert frame.layout.name in ["mono", "stereo"]
 
         # Send frame through resampler and encoder.
+        if not self.codec.is_open:
+            self.codec.options = self._options()
         packets = []
+        timestamp = None
         for frame in self.resampler.resample(frame):
-            packets += self.codec.encode(frame)
-
-        # For some reason the pts starts at a negative value,
-        # so make a note of the first pts to cancel it out.
-        if self.first_packet_pts is None and packets:
-            self.first_packet_pts = packets[0].pts
+            # Frames withheld by DTX are not encoded, so that the encoder's
+            # state does not depend on frames the receiver never decodes.
+            if not self._dtx_skip(frame):
+                encoded = self.codec.encode(frame)
+                if encoded and timestamp is None:
+                    timestamp = self.__timestamp
+                packets += encoded
+            self.__timestamp += frame.samples
 
         if packets:
             # Packets were returned.
-            return [bytes(p) for p in packets], packets[0].pts - self.first_packet_pts
+            return [bytes(p) for p in packets], timestamp
         else:
-            # No packets were returned due to buffering.
+            # No packets were returned due to buffering or DTX.
             return [], None
 
+    def configure(
+        self, parameters: RTCRtpEncoderParameters, encoding: RTCRtpEncodingParameters
+    ) -> None:
+        if parameters.dtx is not None:
+            self.dtx = parameters.dtx
+
+        # libopus does not apply other changes once the encoder is open.
+        if not self.codec.is_open:
+            self.codec.bit_rate = clamp_bitrate(
+                parameters.startBitrate or DEFAULT_BITRATE,
+                parameters,
+                encoding,
+                MIN_BITRATE,
+                MAX_BITRATE,
+            )
+            if parameters.fec is not None:
+                self.fec = parameters.fec
+
+    def _dtx_skip(self, frame: AudioFrame) -> bool:
+        """
+        Determine whether `frame` is withheld due to DTX.
+
+        FFmpeg does not expose libopus' own DTX, so silence is detected here.
+        """
+        if not self.dtx:
+            return False
+
+        if compute_audio_level_dbov(frame) < DTX_SILENCE_LEVEL:
+            self.__silent_frames += 1
+        else:
+            self.__silent_frames = 0
+        return (
+            self.__silent_frames > DTX_HANGOVER
+            and self.__silent_frames % DTX_INTERVAL != 0
+        )
+
+    def _options(self) -> dict[str, str]:
+        options = {"application": "voip"}
+        if self.fec:
+            options["fec"] = "1"
+            options["packet_loss"] = str(FEC_PACKET_LOSS)
+        return options
+
     def pack(self, packet: Packet) -> tuple[list[bytes], int]:
         timestamp = convert_timebase(packet.pts, packet.time_base, TIME_BASE)
         return [bytes(packet)], timestamp
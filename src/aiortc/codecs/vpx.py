@@ -1,18 +1,32 @@
+import dataclasses
 import logging
 import multiprocessing
 import random
+from abc import abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
 from struct import pack, unpack_from
-from typing import Optional, Type, TypeVar, cast
+from typing import Optional, Type, TypeVar, Union, cast
 
 import av
-from av import CodecContext, VideoFrame
+from av import VideoFrame
 from av.frame import Frame
 from av.packet import Packet
 from av.video.codeccontext import VideoCodecContext
 
-from ..jitterbuffer import JitterFrame
+from ..jitterbuffer import JitterFrame, PacketDescription
 from ..mediastreams import VIDEO_TIME_BASE, convert_timebase
-from .base import Decoder, Encoder
+from ..rtcrtpparameters import RTCRtpEncoderParameters, RTCRtpEncodingParameters
+from ..rtp import RtpPacket
+from .base import (
+    Encoder,
+    VideoDecoder,
+    bitrate_change_due,
+    clamp_bitrate,
+    codec_parameters_changed,
+    number_of_threads,
+    scale_video_frame,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,18 +37,19 @@ MAX_BITRATE = 1500000  # 1.5 Mbps
 MAX_FRAME_RATE = 30
 PACKET_MAX = 1300
 
-DESCRIPTOR_T = TypeVar("DESCRIPTOR_T", bound="VpxPayloadDescriptor")
+# Temporal layering patterns of FFmpeg's libvpx wrapper, which are the same for
+# VP8 and VP9, as the temporal layer ID, referenced buffers and updated buffers
+# of each picture. Buffer 0 is LAST and buffer 1 is GOLDEN.
+TEMPORAL_PATTERNS: dict[int, list[tuple[int, list[int], list[int]]]] = {
+    1: [(0, [0], [0])],
+    2: [(0, [0], [0]), (1, [0], [])],
+    3: [(0, [0], [0]), (2, [0], []), (1, [0], [1]), (2, [1], [])],
+}
 
+# Cumulative share of the target bitrate allocated to each temporal layer.
+TEMPORAL_BITRATES = {2: [0.6, 1.0], 3: [0.4, 0.6, 1.0]}
 
-def number_of_threads(pixels: int, cpus: int) -> int:
-    if pixels >= 1920 * 1080 and cpus > 8:
-        return 8
-    elif pixels > 1280 * 960 and cpus >= 6:
-        return 3
-    elif pixels > 640 * 480 and cpus >= 3:
-        return 2
-    else:
-        return 1
+DESCRIPTOR_T = TypeVar("DESCRIPTOR_T", bound="VpxPayloadDescriptor")
 
 
 class VpxPayloadDescriptor:
@@ -166,40 +181,365 @@ class VpxPayloadDescriptor:
         return obj, data[pos:]
 
 
-class Vp8Decoder(Decoder):
+@dataclass
+class Vp9ScalabilityStructure:
+    """
+    The scalability structure (SS) of a VP9 payload descriptor.
+    """
+
+    spatial_layers: int = 1
+    "The number of spatial layers."
+
+    resolutions: list[tuple[int, int]] = field(default_factory=list)
+    "The width and height of each spatial layer, if known."
+
+    picture_group: Optional[list[tuple[int, int, list[int]]]] = None
+    """
+    The temporal layer ID, switching up point flag and reference indices of
+    each picture in the group of pictures, if known.
+    """
+
+    def __bytes__(self) -> bytes:
+        octet = (self.spatial_layers - 1) << 5
+        if self.resolutions:
+            octet |= 1 << 4
+        if self.picture_group is not None:
+            octet |= 1 << 3
+
+        data = pack("!B", octet)
+        for width, height in self.resolutions:
+            data += pack("!HH", width, height)
+        if self.picture_group is not None:
+            data += pack("!B", len(self.picture_group))
+            for tid, switching_up_point, p_diff in self.picture_group:
+                data += pack(
+                    "!B", (tid << 5) | (switching_up_point << 4) | (len(p_diff) << 2)
+                )
+                data += bytes(p_diff)
+        return data
+
+    @classmethod
+    def parse(cls, data: bytes, pos: int) -> tuple["Vp9ScalabilityStructure", int]:
+        if len(data) < pos + 1:
+            raise ValueError("VP9 descriptor has truncated scalability structure")
+
+        octet = data[pos]
+        spatial_layers = (octet >> 5) + 1
+        ss_Y = (octet >> 4) & 1
+        ss_G = (octet >> 3) & 1
+        pos += 1
+
+        resolutions = []
+        if ss_Y:
+            if len(data) < pos + 4 * spatial_layers:
+                raise ValueError("VP9 descriptor has truncated resolutions")
+            for i in range(spatial_layers):
+                resolutions.append(unpack_from("!HH", data, pos))
+                pos += 4
+
+        picture_group = None
+        if ss_G:
+            if len(data) < pos + 1:
+                raise ValueError("VP9 descriptor has truncated picture group")
+            picture_group = []
+            count = data[pos]
+            pos += 1
+            for i in range(count):
+                if len(data) < pos + 1:
+                    raise ValueError("VP9 descriptor has truncated picture group")
+                octet = data[pos]
+                references = (octet >> 2) & 3
+                pos += 1
+                if len(data) < pos + references:
+                    raise ValueError("VP9 descriptor has truncated picture group")
+                picture_group.append(
+                    (
+                        (octet >> 5) & 7,
+                        (octet >> 4) & 1,
+                        list(data[pos : pos + references]),
+                    )
+                )
+                pos += references
+
+        return (
+            cls(
+                spatial_layers=spatial_layers,
+                resolutions=resolutions,
+                picture_group=picture_group,
+            ),
+            pos,
+        )
+
+
+class Vp9PayloadDescriptor:
+    """
+    The VP9 payload descriptor, as specified by RFC 9628.
+
+    Layer indices are present if `tid` is set. In flexible mode, `p_diff`
+    lists the picture ID differences of the reference pictures, otherwise
+    `tl0picidx` is present along with the layer indices.
+    """
+
+    def __init__(
+        self,
+        start_of_frame: int,
+        end_of_frame: int,
+        picture_id: Optional[int] = None,
+        inter_picture_predicted: int = 0,
+        flexible_mode: int = 0,
+        not_upper_reference: int = 0,
+        tid: Optional[int] = None,
+        switching_up_point: int = 0,
+        sid: int = 0,
+        inter_layer_dependency: int = 0,
+        tl0picidx: Optional[int] = None,
+        p_diff: Optional[list[int]] = None,
+        scalability_structure: Optional[Vp9ScalabilityStructure] = None,
+    ) -> None:
+        self.start_of_frame = start_of_frame
+        self.end_of_frame = end_of_frame
+        self.picture_id = picture_id
+        self.inter_picture_predicted = inter_picture_predicted
+        self.flexible_mode = flexible_mode
+        self.not_upper_reference = not_upper_reference
+        self.tid = tid
+        self.switching_up_point = switching_up_point
+        self.sid = sid
+        self.inter_layer_dependency = inter_layer_dependency
+        self.tl0picidx = tl0picidx
+        self.p_diff = p_diff or []
+        self.scalability_structure = scalability_structure
+
+    def __bytes__(self) -> bytes:
+        octet = (
+            (self.inter_picture_predicted << 6)
+            | (self.flexible_mode << 4)
+            | (self.start_of_frame << 3)
+            | (self.end_of_frame << 2)
+            | self.not_upper_reference
+        )
+        if self.picture_id is not None:
+            octet |= 1 << 7
+        if self.tid is not None:
+            octet |= 1 << 5
+        if self.scalability_structure is not None:
+            octet |= 1 << 1
+        data = pack("!B", octet)
+
+        if self.picture_id is not None:
+            if self.picture_id < 128:
+                data += pack("!B", self.picture_id)
+            else:
+                data += pack("!H", (1 << 15) | self.picture_id)
+        if self.tid is not None:
+            data += pack(
+                "!B",
+                (self.tid << 5)
+                | (self.switching_up_point << 4)
+                | (self.sid << 1)
+                | self.inter_layer_dependency,
+            )
+            if not self.flexible_mode:
+                data += pack("!B", self.tl0picidx or 0)
+        if self.flexible_mode and self.inter_picture_predicted:
+            for i, p_diff in enumerate(self.p_diff):
+                data += pack("!B", (p_diff << 1) | (i < len(self.p_diff) - 1))
+        if self.scalability_structure is not None:
+            data += bytes(self.scalability_structure)
+
+        return data
+
+    def __repr__(self) -> str:
+        return (
+            f"Vp9PayloadDescriptor(B={self.start_of_frame}, E={self.end_of_frame}, "
+            f"pic_id={self.picture_id}, tid={self.tid}, sid={self.sid})"
+        )
+
+    @classmethod
+    def parse(cls, data: bytes) -> tuple["Vp9PayloadDescriptor", bytes]:
+        if len(data) < 1:
+            raise ValueError("VP9 descriptor is too short")
+
+        # first byte
+        octet = data[0]
+        has_I = (octet >> 7) & 1
+        has_L = (octet >> 5) & 1
+        has_V = (octet >> 1) & 1
+        obj = cls(
+            start_of_frame=(octet >> 3) & 1,
+            end_of_frame=(octet >> 2) & 1,
+            inter_picture_predicted=(octet >> 6) & 1,
+            flexible_mode=(octet >> 4) & 1,
+            not_upper_reference=octet & 1,
+        )
+        pos = 1
+
+        # picture id
+        if has_I:
+            if len(data) < pos + 1:
+                raise ValueError("VP9 descriptor has truncated PictureID")
+
+            if data[pos] & 0x80:
+                if len(data) < pos + 2:
+                    raise ValueError("VP9 descriptor has truncated long PictureID")
+
+                obj.picture_id = unpack_from("!H", data, pos)[0] & 0x7FFF
+                pos += 2
+            else:
+                obj.picture_id = data[pos]
+                pos += 1
+
+        # layer indices
+        if has_L:
+            length = 1 if obj.flexible_mode else 2
+            if len(data) < pos + length:
+                raise ValueError("VP9 descriptor has truncated layer indices")
+
+            octet = data[pos]
+            obj.tid = octet >> 5
+            obj.switching_up_point = (octet >> 4) & 1
+            obj.sid = (octet >> 1) & 7
+            obj.inter_layer_dependency = octet & 1
+            if not obj.flexible_mode:
+                obj.tl0picidx = data[pos + 1]
+            pos += length
+
+        # reference indices
+        if obj.flexible_mode and obj.inter_picture_predicted:
+            while True:
+                if len(obj.p_diff) == 3:
+                    raise ValueError("VP9 descriptor has too many reference indices")
+                if len(data) < pos + 1:
+                    raise ValueError("VP9 descriptor has truncated reference indices")
+
+                octet = data[pos]
+                obj.p_diff.append(octet >> 1)
+                pos += 1
+                if not octet & 1:
+                    break
+
+        # scalability structure
+        if has_V:
+            obj.scalability_structure, pos = Vp9ScalabilityStructure.parse(data, pos)
+
+        return obj, data[pos:]
+
+
+class Vp8Decoder(VideoDecoder):
     def __init__(self) -> None:
-        self.codec = CodecContext.create("libvpx", "r")
+        super().__init__("libvpx")
 
     def decode(self, encoded_frame: JitterFrame) -> list[Frame]:
         try:
             packet = Packet(encoded_frame.data)
             packet.pts = encoded_frame.timestamp
             packet.time_base = VIDEO_TIME_BASE
-            return cast(list[Frame], self.codec.decode(packet))
+            return self._decode_packet(packet, encoded_frame.keyframe)
         except av.FFmpegError as e:
             logger.warning("Vp8Decoder() failed to decode, skipping package: " + str(e))
             return []
 
 
-class Vp8Encoder(Encoder):
+class VpxEncoder(Encoder):
+    """
+    Base class for encoders using libvpx.
+    """
+
+    name = "VPX"
+
     def __init__(self) -> None:
         self.codec: Optional[VideoCodecContext] = None
+        self.parameters = RTCRtpEncoderParameters()
+        self.encoding = RTCRtpEncodingParameters()
         self.picture_id = random.randint(0, (1 << 15) - 1)
+        self.__codec_time = 0.0
+        self.__pattern_index = 0
+        self.__scalability_mode = "L1T1"
         self.__target_bitrate = DEFAULT_BITRATE
 
-    def encode(
-        self, frame: Frame, force_keyframe: bool = False
-    ) -> tuple[list[bytes], int]:
+    @property
+    def scalability_mode(self) -> str:
+        """
+        The scalability mode, as defined by the W3C "Scalable Video Coding"
+        specification: `"L1T1"`, `"L1T2"` or `"L1T3"`.
+
+        Spatial layers are not supported by FFmpeg's libvpx wrapper.
+        """
+        return self.__scalability_mode
+
+    @scalability_mode.setter
+    def scalability_mode(self, mode: str) -> None:
+        if mode not in ("L1T1", "L1T2", "L1T3"):
+            raise ValueError(f"Unsupported {self.name} scalability mode `{mode}`")
+        if mode != self.__scalability_mode:
+            self.__scalability_mode = mode
+            self.codec = None
+
+    @property
+    def _temporal_layers(self) -> int:
+        return int(self.__scalability_mode[3])
+
+    @property
+    def target_bitrate(self) -> int:
+        """
+        Target bitrate in bits per second.
+        """
+        return self.__target_bitrate
+
+    @target_bitrate.setter
+    def target_bitrate(self, bitrate: int) -> None:
+        bitrate = clamp_bitrate(
+            bitrate, self.parameters, self.encoding, MIN_BITRATE, MAX_BITRATE
+        )
+        self.__target_bitrate = bitrate
+
+    def configure(
+        self, parameters: RTCRtpEncoderParameters, encoding: RTCRtpEncodingParameters
+    ) -> None:
+        previous = self.parameters
+        previous_encoding = self.encoding
+        self.parameters = dataclasses.replace(parameters)
+        self.encoding = dataclasses.replace(encoding)
+        if (
+            parameters.startBitrate is not None
+            and parameters.startBitrate != previous.startBitrate
+        ):
+            # a new start bitrate is applied immediately
+            self.target_bitrate = parameters.startBitrate
+            self.codec = None
+        else:
+            # keep the current bitrate within the new limits
+            self.target_bitrate = self.target_bitrate
+        if codec_parameters_changed(previous, parameters, previous_encoding, encoding):
+            self.codec = None
+        self.scalability_mode = parameters.scalabilityMode or "L1T1"
+
+    @abstractmethod
+    def _create_codec(self, frame: VideoFrame) -> VideoCodecContext:
+        pass  # pragma: no cover
+
+    def _prepare_frame(
+        self, frame: Frame, force_keyframe: bool
+    ) -> tuple[VideoFrame, VideoCodecContext]:
+        """
+        Convert the frame to the encoder's format and (re)create the encoder
+        if needed.
+        """
         assert isinstance(frame, VideoFrame)
         if frame.format.name != "yuv420p":
             frame = frame.reformat(format="yuv420p")
+        frame = scale_video_frame(frame, self.encoding.scaleResolutionDownBy)
 
+        frame_time = float(frame.pts * frame.time_base)
         if self.codec and (
             frame.width != self.codec.width
             or frame.height != self.codec.height
-            # We only adjust bitrate if it changes by over 10%.
-            or abs(self.target_bitrate - self.codec.bit_rate) / self.codec.bit_rate
-            > 0.1
+            or bitrate_change_due(
+                self.target_bitrate,
+                self.codec.bit_rate,
+                frame_time - self.__codec_time,
+                force_keyframe,
+            )
         ):
             self.codec = None
 
@@ -208,68 +548,175 @@ class Vp8Encoder(Encoder):
             frame.pict_type = av.video.frame.PictureType.I
 
         if self.codec is None:
-            self.codec = av.CodecContext.create("libvpx", "w")
-            self.codec.width = frame.width
-            self.codec.height = frame.height
-            self.codec.bit_rate = self.target_bitrate
-            self.codec.pix_fmt = "yuv420p"
-            self.codec.gop_size = 3000  # kf_max_dist
-            self.codec.qmin = 2  # rc_min_quantizer
-            self.codec.qmax = 56  # rc_max_quantizer
-            self.codec.options = {
-                # We want rc_buf_sz = 1000 and FFmpeg sets:
-                #   rc_buf_sz =  bufsize * 1000 / bit_rate
-                "bufsize": str(self.__target_bitrate),
-                "cpu-used": "-6",
-                "deadline": "realtime",
-                "lag-in-frames": "0",
-                # Setting minrate = maxrate = bit_rate triggers CBR.
-                "minrate": str(self.target_bitrate),
-                "maxrate": str(self.target_bitrate),
-                "noise-sensitivity": "4",
-                "overshoot-pct": "15",
-                "partitions": "0",  # VP8_ONE_TOKENPARTITION
-                "static-thresh": "1",
-                "undershoot-pct": "100",
-            }
-            self.codec.thread_count = number_of_threads(
+            self.__codec_time = frame_time
+            self.__pattern_index = 0
+            self.codec = self._create_codec(frame)
+
+        return frame, self.codec
+
+    def _next_layer(self) -> tuple[int, list[int], list[int]]:
+        """
+        Return the temporal layer ID, referenced buffers and updated buffers
+        of the next picture in the layering pattern.
+        """
+        pattern = TEMPORAL_PATTERNS[self._temporal_layers]
+        layer = pattern[self.__pattern_index % len(pattern)]
+        self.__pattern_index += 1
+        return layer
+
+    def _configure_codec(self, codec: VideoCodecContext, frame: VideoFrame) -> None:
+        """
+        Apply the settings shared by VP8 and VP9, including those set by the
+        encoder parameters.
+        """
+        codec.width = frame.width
+        codec.height = frame.height
+        codec.bit_rate = self.target_bitrate
+        codec.pix_fmt = "yuv420p"
+        codec.gop_size = self.parameters.keyFrameInterval or 3000  # kf_max_dist
+        codec.qmin = 2  # rc_min_quantizer
+        codec.qmax = 56  # rc_max_quantizer
+        if self.parameters.threadCount is not None:
+            codec.thread_count = self.parameters.threadCount
+        else:
+            codec.thread_count = number_of_threads(
                 frame.width * frame.height, multiprocessing.cpu_count()
             )
 
-        data_to_send = b""
-        for package in self.codec.encode(frame):
-            data_to_send += bytes(package)
+    def _vpx_options(self) -> dict[str, str]:
+        """
+        Return the libvpx options shared by VP8 and VP9.
+        """
+        return {
+            # We want rc_buf_sz = 1000 and FFmpeg sets:
+            #   rc_buf_sz =  bufsize * 1000 / bit_rate
+            "bufsize": str(self.target_bitrate),
+            "deadline": "realtime",
+            "lag-in-frames": "0",
+            # Setting minrate = maxrate = bit_rate triggers CBR.
+            "minrate": str(self.target_bitrate),
+            "maxrate": str(self.target_bitrate),
+            "noise-sensitivity": "4",
+            "overshoot-pct": "15",
+            "static-thresh": "1",
+            "undershoot-pct": "100",
+        }
+
+    def _temporal_options(self) -> dict[str, str]:
+        """
+        Return the libvpx options producing the temporal layers of the
+        scalability mode.
+        """
+        layers = self._temporal_layers
+        if layers == 1:
+            return {}
+
+        pattern = TEMPORAL_PATTERNS[layers]
+        bitrates = [
+            str(int(self.target_bitrate * ratio / 1000))
+            for ratio in TEMPORAL_BITRATES[layers]
+        ]
+        decimators = [
+            str(len(pattern) // sum(1 for p in pattern if p[0] <= tid))
+            for tid in range(layers)
+        ]
+        return {
+            "ts-parameters": ":".join(
+                [
+                    f"ts_number_layers={layers}",
+                    "ts_target_bitrate=" + ",".join(bitrates),
+                    "ts_rate_decimator=" + ",".join(decimators),
+                    f"ts_periodicity={len(pattern)}",
+                    "ts_layer_id=" + ",".join(str(p[0]) for p in pattern),
+                    f"ts_layering_mode={layers}",
+                ]
+            ),
+            # Probability contexts must not carry over from dropped layers.
+            "error-resilient": "default",
+        }
+
+
+class Vp8Encoder(VpxEncoder):
+    name = "VP8"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.__buffers = [0, 0]
+        self.keyidx = random.randint(0, (1 << 5) - 1)
+        self.tl0picidx = random.randint(0, (1 << 8) - 1)
 
-        # Packetize.
-        payloads = self._packetize(data_to_send, self.picture_id)
+    def encode(
+        self, frame: Frame, force_keyframe: bool = False
+    ) -> tuple[list[bytes], int]:
+        frame, codec = self._prepare_frame(frame, force_keyframe)
+
+        # Packetize views of the encoder output, which is copied once into the
+        # payloads.
+        packages = codec.encode(frame)
+        data_to_send: Union[bytes, memoryview]
+        if len(packages) == 1:
+            data_to_send = memoryview(packages[0])
+        else:
+            data_to_send = b"".join(packages)
+        descr = self._describe(
+            any(package.is_keyframe for package in packages), *self._next_layer()
+        )
+        payloads = self._packetize(data_to_send, descr)
         timestamp = convert_timebase(frame.pts, frame.time_base, VIDEO_TIME_BASE)
-        self.picture_id = (self.picture_id + 1) % (1 << 15)
         return payloads, timestamp
 
     def pack(self, packet: Packet) -> tuple[list[bytes], int]:
-        payloads = self._packetize(bytes(packet), self.picture_id)
+        payloads = self._packetize(
+            memoryview(packet),
+            self._describe(packet.is_keyframe, *TEMPORAL_PATTERNS[1][0]),
+        )
         timestamp = convert_timebase(packet.pts, packet.time_base, VIDEO_TIME_BASE)
-        self.picture_id = (self.picture_id + 1) % (1 << 15)
         return payloads, timestamp
 
-    @property
-    def target_bitrate(self) -> int:
+    def _create_codec(self, frame: VideoFrame) -> VideoCodecContext:
+        codec = av.CodecContext.create("libvpx", "w")
+        self._configure_codec(codec, frame)
+        codec.options = {
+            **self._vpx_options(),
+            **self._temporal_options(),
+            "cpu-used": self.parameters.preset or "-6",
+            "partitions": "0",  # VP8_ONE_TOKENPARTITION
+        }
+        return codec
+
+    def _describe(
+        self, keyframe: bool, tid: int, references: list[int], updates: list[int]
+    ) -> VpxPayloadDescriptor:
         """
-        Target bitrate in bits per second.
+        Build the payload descriptor of the next picture and track which
+        temporal layer each reference buffer holds.
         """
-        return self.__target_bitrate
+        descr = VpxPayloadDescriptor(
+            partition_start=1, partition_id=0, picture_id=self.picture_id
+        )
+        self.picture_id = (self.picture_id + 1) % (1 << 15)
 
-    @target_bitrate.setter
-    def target_bitrate(self, bitrate: int) -> None:
-        bitrate = max(MIN_BITRATE, min(bitrate, MAX_BITRATE))
-        self.__target_bitrate = bitrate
+        if keyframe:
+            self.__buffers = [tid for buffer in self.__buffers]
+            self.keyidx = (self.keyidx + 1) % (1 << 5)
+        if self._temporal_layers > 1:
+            if tid == 0:
+                self.tl0picidx = (self.tl0picidx + 1) % (1 << 8)
+            # the layer sync bit tells whether the picture only depends on
+            # the base layer, so that a forwarder can switch up to its layer
+            layer_sync = keyframe or all(self.__buffers[i] == 0 for i in references)
+            descr.tl0picidx = self.tl0picidx
+            descr.tid = (tid, int(layer_sync))
+            descr.keyidx = self.keyidx
+        for i in updates:
+            self.__buffers[i] = tid
+        return descr
 
     @classmethod
-    def _packetize(cls, buffer: bytes, picture_id: int) -> list[bytes]:
+    def _packetize(
+        cls, buffer: Union[bytes, memoryview], descr: VpxPayloadDescriptor
+    ) -> list[bytes]:
         payloads = []
-        descr = VpxPayloadDescriptor(
-            partition_start=1, partition_id=0, picture_id=picture_id
-        )
         length = len(buffer)
         pos = 0
         while pos < length:
@@ -281,6 +728,249 @@ class Vp8Encoder(Encoder):
         return payloads
 
 
+class SkippedNumbers:
+    """
+    Keep track of the numbers skipped in a wrapping sequence, in order to
+    renumber the remaining values without gaps.
+
+    Values arriving out of order are renumbered correctly as long as fewer
+    than `history` values were skipped since.
+    """
+
+    def __init__(self, bits: int, history: int = 128) -> None:
+        self.__count = 0
+        self.__modulo = 1 << bits
+        self.__recent: deque[int] = deque(maxlen=history)
+
+    def skip(self, value: int) -> None:
+        if value not in self.__recent:
+            self.__count += 1
+            self.__recent.append(value)
+
+    def renumber(self, value: int) -> int:
+        # values skipped after this one do not shift it
+        half = self.__modulo >> 1
+        later = sum(1 for v in self.__recent if 0 < (v - value) % self.__modulo < half)
+        return (value - self.__count + later) % self.__modulo
+
+
+class Vp8TemporalLayerFilter:
+    """
+    Drop the upper temporal layers of a VP8 stream without re-encoding it, as
+    a selective forwarding unit does for constrained subscribers.
+
+    The sequence numbers and picture IDs of the packets which are kept are
+    rewritten so that the dropped pictures do not look like losses. Raising
+    the maximum temporal layer takes effect on the next picture marked as a
+    layer sync point, lowering it on the next picture.
+
+    :param max_temporal_layer: The highest temporal layer to keep.
+    """
+
+    def __init__(self, max_temporal_layer: int) -> None:
+        self.max_temporal_layer = max_temporal_layer
+        self.__layer = max_temporal_layer
+        self.__skipped_pictures = SkippedNumbers(bits=15)
+        self.__skipped_sequence_numbers = SkippedNumbers(bits=16)
+
+    def filter(self, packet: RtpPacket) -> Optional[RtpPacket]:
+        """
+        Return the packet to forward, or `None` if it must be dropped.
+
+        :param packet: A VP8 :class:`RtpPacket`.
+        """
+        descr, data = VpxPayloadDescriptor.parse(packet.payload)
+
+        # streams without temporal layers are forwarded as-is
+        if descr.tid is None:
+            return packet
+
+        # switch layers at the start of a picture
+        tid, layer_sync = descr.tid
+        if descr.partition_start and descr.partition_id == 0:
+            if self.max_temporal_layer < self.__layer:
+                self.__layer = self.max_temporal_layer
+            elif self.__layer < tid <= self.max_temporal_layer and layer_sync:
+                self.__layer = tid
+
+        if tid > self.__layer:
+            if descr.picture_id is not None:
+                self.__skipped_pictures.skip(descr.picture_id)
+            self.__skipped_sequence_numbers.skip(packet.sequence_number)
+            return None
+
+        if descr.picture_id is not None:
+            descr.picture_id = self.__skipped_pictures.renumber(descr.picture_id)
+        forwarded = RtpPacket(
+            payload_type=packet.payload_type,
+            marker=packet.marker,
+            sequence_number=self.__skipped_sequence_numbers.renumber(
+                packet.sequence_number
+            ),
+            timestamp=packet.timestamp,
+            ssrc=packet.ssrc,
+            payload=bytes(descr) + data,
+        )
+        forwarded.csrc = packet.csrc
+        forwarded.extensions = packet.extensions
+        return forwarded
+
+
+class Vp9Decoder(VideoDecoder):
+    def __init__(self) -> None:
+        super().__init__("vp9")
+
+    def decode(self, encoded_frame: JitterFrame) -> list[Frame]:
+        try:
+            packet = Packet(encoded_frame.data)
+            packet.pts = encoded_frame.timestamp
+            packet.time_base = VIDEO_TIME_BASE
+            return self._decode_packet(packet, encoded_frame.keyframe)
+        except av.FFmpegError as e:
+            logger.warning("Vp9Decoder() failed to decode, skipping package: " + str(e))
+            return []
+
+
+class Vp9Encoder(VpxEncoder):
+    name = "VP9"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.__buffers = [(0, 0), (0, 0)]
+
+    def encode(
+        self, frame: Frame, force_keyframe: bool = False
+    ) -> tuple[list[bytes], int]:
+        frame, codec = self._prepare_frame(frame, force_keyframe)
+
+        payloads = []
+        layer = self._next_layer()
+        for package in codec.encode(frame):
+            payloads += self._packetize(
+                memoryview(package), self._describe(package.is_keyframe, *layer)
+            )
+
+        timestamp = convert_timebase(frame.pts, frame.time_base, VIDEO_TIME_BASE)
+        return payloads, timestamp
+
+    def pack(self, packet: Packet) -> tuple[list[bytes], int]:
+        payloads = self._packetize(
+            memoryview(packet),
+            self._describe(packet.is_keyframe, *TEMPORAL_PATTERNS[1][0]),
+        )
+        timestamp = convert_timebase(packet.pts, packet.time_base, VIDEO_TIME_BASE)
+        return payloads, timestamp
+
+    def _create_codec(self, frame: VideoFrame) -> VideoCodecContext:
+        codec = cast(VideoCodecContext, av.CodecContext.create("libvpx-vp9", "w"))
+        self._configure_codec(codec, frame)
+        codec.options = {
+            **self._vpx_options(),
+            **self._temporal_options(),
+            "cpu-used": self.parameters.preset or "8",
+            "row-mt": "1",
+        }
+        return codec
+
+    def _describe(
+        self, keyframe: bool, tid: int, references: list[int], updates: list[int]
+    ) -> Vp9PayloadDescriptor:
+        """
+        Build the payload descriptor of the next picture and track which
+        picture each reference buffer holds.
+        """
+        picture_id = self.picture_id
+        self.picture_id = (self.picture_id + 1) % (1 << 15)
+
+        descr = Vp9PayloadDescriptor(
+            start_of_frame=1,
+            end_of_frame=0,
+            picture_id=picture_id,
+            inter_picture_predicted=int(not keyframe),
+        )
+        if keyframe:
+            self.__buffers = [(picture_id, tid) for buffer in self.__buffers]
+            descr.scalability_structure = Vp9ScalabilityStructure(
+                resolutions=[(self.codec.width, self.codec.height)]
+                if self.codec is not None
+                else []
+            )
+        if self._temporal_layers > 1:
+            descr.flexible_mode = 1
+            descr.tid = tid
+            if keyframe:
+                descr.switching_up_point = 1
+            else:
+                descr.p_diff = sorted(
+                    {
+                        (picture_id - self.__buffers[i][0]) % (1 << 15)
+                        for i in references
+                    }
+                )
+                descr.switching_up_point = int(
+                    all(self.__buffers[i][1] < tid for i in references)
+                )
+        for i in updates:
+            self.__buffers[i] = (picture_id, tid)
+        return descr
+
+    @classmethod
+    def _packetize(
+        cls, buffer: Union[bytes, memoryview], descr: Vp9PayloadDescriptor
+    ) -> list[bytes]:
+        payloads = []
+        length = len(buffer)
+        pos = 0
+        while pos < length:
+            descr_bytes = bytes(descr)
+            size = min(length - pos, PACKET_MAX - len(descr_bytes))
+            if pos + size == length:
+                descr.end_of_frame = 1
+                descr_bytes = bytes(descr)
+            payloads.append(descr_bytes + buffer[pos : pos + size])
+            descr.start_of_frame = 0
+            descr.scalability_structure = None
+            pos += size
+        return payloads
+
+
 def vp8_depayload(payload: bytes) -> bytes:
     descriptor, data = VpxPayloadDescriptor.parse(payload)
     return data
+
+
+def vp8_describe(payload: bytes) -> PacketDescription:
+    descriptor, data = VpxPayloadDescriptor.parse(payload)
+    frame_start = bool(descriptor.partition_start and descriptor.partition_id == 0)
+    return PacketDescription(
+        frame_start=frame_start,
+        # the P bit of the VP8 payload header is clear for keyframes
+        keyframe=frame_start and len(data) > 0 and not data[0] & 1,
+        temporal_layer=descriptor.tid[0] if descriptor.tid else None,
+        layer_sync=bool(descriptor.tid and descriptor.tid[1]),
+        tl0picidx=descriptor.tl0picidx,
+    )
+
+
+def vp9_available() -> bool:
+    """
+    Whether FFmpeg can both decode and encode VP9.
+    """
+    return "vp9" in av.codecs_available and "libvpx-vp9" in av.codecs_available
+
+
+def vp9_depayload(payload: bytes) -> bytes:
+    descriptor, data = Vp9PayloadDescriptor.parse(payload)
+    return data
+
+
+def vp9_describe(payload: bytes) -> PacketDescription:
+    descriptor, data = Vp9PayloadDescriptor.parse(payload)
+    frame_start = bool(descriptor.start_of_frame and descriptor.sid == 0)
+    return PacketDescription(
+        frame_start=frame_start,
+        keyframe=frame_start and not descriptor.inter_picture_predicted,
+        temporal_layer=descriptor.tid,
+        layer_sync=bool(descriptor.switching_up_point),
+        tl0picidx=descriptor.tl0picidx,
+    )
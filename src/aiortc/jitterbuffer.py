@@ -1,33 +1,118 @@
+from dataclasses import dataclass
 from typing import Optional
 
 from .rtp import RtpPacket
-from .utils import uint16_add
+from .utils import uint16_add, uint16_gt
 
 MAX_MISORDER = 100
 
+# The highest temporal layer ID which payload descriptors can carry.
+MAX_TEMPORAL_LAYER = 3
+
+
+@dataclass
+class PacketDescription:
+    """
+    What the payload descriptor of a video packet tells about its frame, which
+    lets the jitter buffer work out which frames can still be decoded after a
+    loss.
+    """
+
+    frame_start: bool = False
+    "Whether the packet is the first packet of a frame."
+    keyframe: bool = False
+    "Whether the packet is the first packet of a keyframe."
+    temporal_layer: Optional[int] = None
+    "The temporal layer ID of the frame, if known."
+    layer_sync: bool = False
+    "Whether the frame only depends on frames of the base temporal layer."
+    tl0picidx: Optional[int] = None
+    "The index of the last frame of the base temporal layer, if known."
+
 
 class JitterFrame:
-    def __init__(self, data: bytes, timestamp: int) -> None:
+    def __init__(
+        self, data: bytes, timestamp: int, lost: int = 0, keyframe: bool = False
+    ) -> None:
         self.data = data
         self.timestamp = timestamp
+        # The number of packets missing between the previous frame and this one.
+        self.lost = lost
+        # Whether the frame is known to be a keyframe.
+        self.keyframe = keyframe
+        # The time at which the first packet of the frame arrived, if known.
+        self.arrival_time_ms: Optional[int] = None
 
 
 class JitterBuffer:
+    """
+    Reorder RTP packets and reassemble them into frames.
+
+    Video packets can be annotated with a :class:`PacketDescription` as their
+    `_description` attribute. After a loss, frames which depend on a missing
+    frame are then dropped instead of being decoded, until a keyframe or a
+    temporal layer sync point arrives.
+
+    For video, the buffer also counts the frames it drops and the time frames
+    spend waiting in it, for statistics.
+    """
+
     def __init__(
         self, capacity: int, prefetch: int = 0, is_video: bool = False
     ) -> None:
         assert capacity & (capacity - 1) == 0, "capacity must be a power of 2"
         self._capacity = capacity
+        self._last_sequence_number: Optional[int] = None
+        self._max_sequence_number: Optional[int] = None
+        self._arrival_times = [0 for i in range(capacity)]
+        self._now: Optional[int] = None
         self._origin: Optional[int] = None
         self._packets: list[Optional[RtpPacket]] = [None for i in range(capacity)]
+        self._packet_count = 0
         self._prefetch = prefetch
         self._is_video = is_video
 
+        # The time in milliseconds to wait for a missing video packet before
+        # skipping the incomplete frame, or `None` to wait until overflow.
+        self.nack_deadline: Optional[int] = None
+
+        # video loss recovery
+        self._broken_layer: Optional[int] = None
+        self._last_description: Optional[PacketDescription] = None
+        self._pli_needed = False
+        self._stall_time: Optional[int] = None
+
+        # video statistics
+        self.delay_total = 0.0
+        self.emitted_count = 0
+        self.frames_dropped = 0
+
     @property
     def capacity(self) -> int:
         return self._capacity
 
-    def add(self, packet: RtpPacket) -> tuple[bool, Optional[JitterFrame]]:
+    @property
+    def origin(self) -> Optional[int]:
+        """
+        The sequence number of the oldest packet which is still awaited.
+        """
+        return self._origin
+
+    @property
+    def prefetch(self) -> int:
+        """
+        The number of complete frames held back before a frame is returned.
+        """
+        return self._prefetch
+
+    @prefetch.setter
+    def prefetch(self, prefetch: int) -> None:
+        assert 0 <= prefetch < self._capacity, "prefetch must be below capacity"
+        self._prefetch = prefetch
+
+    def add(
+        self, packet: RtpPacket, arrival_time_ms: Optional[int] = None
+    ) -> tuple[bool, Optional[JitterFrame]]:
         pli_flag = False
         if self._origin is None:
             self._origin = packet.sequence_number
@@ -40,10 +125,13 @@ class JitterBuffer:
         if misorder < delta:
             if misorder >= MAX_MISORDER:
                 self.remove(self.capacity)
+                self._last_sequence_number = None
+                self._max_sequence_number = None
                 self._origin = packet.sequence_number
                 delta = misorder = 0
                 if self._is_video:
                     pli_flag = True
+                    self.__mark_lost(0)
             else:
                 return pli_flag, None
 
@@ -54,13 +142,58 @@ class JitterBuffer:
                 self._origin = packet.sequence_number
             if self._is_video:
                 pli_flag = True
+                self.__mark_lost(0)
 
         pos = packet.sequence_number % self._capacity
+        if self._packets[pos] is None:
+            self._packet_count += 1
         self._packets[pos] = packet
+        if arrival_time_ms is not None:
+            self._arrival_times[pos] = arrival_time_ms
+            self._now = arrival_time_ms
+        if self._max_sequence_number is None or uint16_gt(
+            packet.sequence_number, self._max_sequence_number
+        ):
+            self._max_sequence_number = packet.sequence_number
+
+        frame = self._remove_frame(packet.sequence_number)
+
+        # skip an incomplete video frame once its missing packets are overdue
+        if (
+            self._is_video
+            and arrival_time_ms is not None
+            and self.nack_deadline is not None
+        ):
+            if frame is not None or not self.__is_stalled():
+                self._stall_time = None
+            elif self._stall_time is None:
+                self._stall_time = arrival_time_ms
+            elif arrival_time_ms - self._stall_time >= self.nack_deadline:
+                self._stall_time = None
+                frame = self.__skip_incomplete_frame() or self._remove_frame(
+                    packet.sequence_number
+                )
+
+        if self._pli_needed:
+            pli_flag = True
+            self._pli_needed = False
 
-        return pli_flag, self._remove_frame(packet.sequence_number)
+        return pli_flag, frame
+
+    def pop(self) -> Optional[JitterFrame]:
+        """
+        Return the next complete frame if more than enough frames are
+        prefetched, for instance after lowering :attr:`prefetch`. For video,
+        return the next complete frame if several completed at once.
+        """
+        if self._origin is None:
+            return None
+        return self._remove_frame(self._origin)
 
     def _remove_frame(self, sequence_number: int) -> Optional[JitterFrame]:
+        if self._is_video:
+            return self._remove_video_frame()
+
         frame = None
         frames = 0
         packets: list[RtpPacket] = []
@@ -80,7 +213,13 @@ class JitterBuffer:
                     frame = JitterFrame(
                         data=b"".join([x._data for x in packets]),  # type: ignore
                         timestamp=timestamp,
+                        lost=self._count_lost(packets[0].sequence_number),
                     )
+                    if self._now is not None:
+                        frame.arrival_time_ms = self._arrival_times[
+                            packets[0].sequence_number % self._capacity
+                        ]
+                    self._last_sequence_number = packets[-1].sequence_number
                     remove = count
 
                 # check we have prefetched enough
@@ -97,11 +236,185 @@ class JitterBuffer:
 
         return None
 
+    def _remove_video_frame(self) -> Optional[JitterFrame]:
+        """
+        Return the next complete video frame, dropping the frames which cannot
+        be decoded.
+        """
+        while True:
+            packets = self.__complete_frame_packets()
+            if packets is None:
+                return None
+
+            frame = self.__assemble_video_frame(packets)
+            if frame is not None:
+                return frame
+
+    def __assemble_video_frame(self, packets: list[RtpPacket]) -> Optional[JitterFrame]:
+        """
+        Remove the packets of the frame at the origin, and return the frame
+        unless it cannot be decoded.
+        """
+        lost = self._count_lost(packets[0].sequence_number)
+        self._last_sequence_number = packets[-1].sequence_number
+        self.remove(len(packets))
+        if not self.__is_decodable(packets[0], lost):
+            self.frames_dropped += 1
+            return None
+        description: Optional[PacketDescription] = getattr(
+            packets[0], "_description", None
+        )
+        frame = JitterFrame(
+            data=b"".join([x._data for x in packets]),  # type: ignore
+            timestamp=packets[0].timestamp,
+            lost=lost,
+            keyframe=description is not None and description.keyframe,
+        )
+        if self._now is not None:
+            arrival_time_ms = self._arrival_times[
+                packets[0].sequence_number % self._capacity
+            ]
+            frame.arrival_time_ms = arrival_time_ms
+            self.delay_total += (self._now - arrival_time_ms) / 1000
+            self.emitted_count += 1
+        return frame
+
+    def __complete_frame_packets(self) -> Optional[list[RtpPacket]]:
+        """
+        Return the packets of the frame at the origin if the first packet of the
+        next frame has arrived, meaning the frame is complete.
+        """
+        packets: list[RtpPacket] = []
+        for count in range(self.capacity):
+            packet = self._packets[(self._origin + count) % self._capacity]
+            if packet is None:
+                return None
+            if packets and packet.timestamp != packets[0].timestamp:
+                return packets
+            packets.append(packet)
+        return None
+
+    def __is_decodable(self, packet: RtpPacket, lost: int) -> bool:
+        """
+        Check whether the frame starting with `packet` can be decoded, given
+        the frames which were lost.
+        """
+        description: Optional[PacketDescription] = getattr(packet, "_description", None)
+        if description is None:
+            return True
+
+        last_description = self._last_description
+        self._last_description = description
+        if description.keyframe:
+            self._broken_layer = None
+            return True
+
+        if lost:
+            if not description.frame_start:
+                # the start of the frame may be missing
+                self.__mark_lost(description.temporal_layer or 0)
+                return False
+
+            # if no base layer frame is missing, only upper layers are broken
+            if (
+                last_description is not None
+                and last_description.tl0picidx is not None
+                and description.tl0picidx is not None
+                and description.temporal_layer is not None
+                and description.tl0picidx
+                == (last_description.tl0picidx + (description.temporal_layer == 0))
+                % 256
+            ):
+                self.__mark_lost(1)
+            else:
+                self.__mark_lost(0)
+
+        broken = self._broken_layer
+        tid = description.temporal_layer
+        if broken is None or (tid is not None and tid < broken):
+            return True
+        if broken > 0 and tid is not None and description.layer_sync:
+            # a sync point repairs its own layer
+            if tid == broken:
+                self._broken_layer = broken + 1 if broken < MAX_TEMPORAL_LAYER else None
+            return True
+
+        if broken == 0:
+            self._pli_needed = True
+        return False
+
+    def __is_stalled(self) -> bool:
+        """
+        Check whether a packet is missing before the latest packet.
+
+        All the buffered packets lie between the origin and the latest packet,
+        so one is missing if there are fewer packets than sequence numbers.
+        """
+        if uint16_gt(self._origin, self._max_sequence_number):
+            return False
+        span = uint16_add(self._max_sequence_number, 1 - self._origin)
+        return self._packet_count < span
+
+    def __mark_lost(self, layer: int) -> None:
+        """
+        Record that a frame of the given temporal layer was lost, along with
+        the frames which depend on it.
+        """
+        if self._broken_layer is None or layer < self._broken_layer:
+            self._broken_layer = layer
+        if layer == 0:
+            self._pli_needed = True
+
+    def __skip_incomplete_frame(self) -> Optional[JitterFrame]:
+        """
+        Give up on the missing packets after the frame at the origin. If its
+        last packet has the marker bit the frame is complete and is returned,
+        otherwise it is dropped.
+        """
+        packets: list[RtpPacket] = []
+        for count in range(self.capacity):
+            packet = self._packets[(self._origin + count) % self._capacity]
+            if packet is None:
+                break
+            packets.append(packet)
+
+        frame = None
+        if packets and packets[-1].marker:
+            frame = self.__assemble_video_frame(packets)
+        elif packets:
+            self._last_sequence_number = packets[-1].sequence_number
+            self.remove(len(packets))
+            self.frames_dropped += 1
+            description: Optional[PacketDescription] = getattr(
+                packets[0], "_description", None
+            )
+            if description is not None:
+                self._last_description = description
+                self.__mark_lost(description.temporal_layer or 0)
+
+        while self._packets[self._origin % self._capacity] is None and uint16_gt(
+            self._max_sequence_number, self._origin
+        ):
+            self.remove(1)
+        return frame
+
+    def _count_lost(self, sequence_number: int) -> int:
+        """
+        Count the packets skipped between the last frame which was returned
+        and the frame starting at `sequence_number`.
+        """
+        if self._last_sequence_number is None:
+            return 0
+        lost = uint16_add(sequence_number, -self._last_sequence_number - 1)
+        return lost if lost < MAX_MISORDER else 0
+
     def remove(self, count: int) -> None:
         assert count <= self._capacity
         for i in range(count):
             pos = self._origin % self._capacity
-            self._packets[pos] = None
+            if self._packets[pos] is not None:
+                self._packet_count -= 1
+                self._packets[pos] = None
             self._origin = uint16_add(self._origin, 1)
 
     def smart_remove(self, count: int) -> bool:
@@ -116,7 +429,10 @@ class JitterBuffer:
             if packet is not None:
                 if i >= count and timestamp != packet.timestamp:
                     break
+                if timestamp != packet.timestamp and self._is_video:
+                    self.frames_dropped += 1
                 timestamp = packet.timestamp
+                self._packet_count -= 1
             self._packets[pos] = None
             self._origin = uint16_add(self._origin, 1)
             if i == self._capacity - 1:
@@ -1,6 +1,9 @@
 import enum
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from .rtcsctptransport import SctpCongestionControl
 
 
 @dataclass
@@ -52,6 +55,49 @@ class RTCBundlePolicy(enum.Enum):
     """
 
 
+@dataclass
+class RTCSctpConfiguration:
+    """
+    The :class:`RTCSctpConfiguration` dictionary provides tuning options for
+    an :class:`RTCSctpTransport`.
+    """
+
+    congestionControl: Union[
+        str, type["SctpCongestionControl"], "SctpCongestionControl"
+    ] = "reno"
+    """
+    The congestion control algorithm, either `"reno"` as described in
+    RFC 4960, `"cubic"` as described in RFC 9438, or a custom
+    :class:`SctpCongestionControl`.
+
+    A subclass is instantiated for each transport, whereas an instance is
+    used as-is and must therefore not be shared between transports.
+    """
+
+    initialCongestionWindow: int = 3 * 1200
+    "The initial congestion window in bytes."
+
+    maxBurst: int = 4
+    "The maximum number of DATA chunks sent in a single burst."
+
+    receiveBufferSize: int = 1024 * 1024
+    """
+    The maximum number of bytes of received data which are buffered by the
+    association, including partially reassembled messages and messages held
+    by paused data channels. The advertised receive window shrinks as this
+    buffer fills up.
+    """
+
+    rtoInitial: float = 3.0
+    "The initial retransmission timeout in seconds."
+
+    rtoMax: float = 60.0
+    "The maximum retransmission timeout in seconds."
+
+    rtoMin: float = 1.0
+    "The minimum retransmission timeout in seconds."
+
+
 @dataclass
 class RTCConfiguration:
     """
@@ -67,3 +113,12 @@ class RTCConfiguration:
 
     alwaysNegotiateDataChannels: bool = False
     "Whether to always negotiate data channels in the SDP."
+
+    sctp: Optional[RTCSctpConfiguration] = None
+    "The :class:`RTCSctpConfiguration` to use for data channels."
+
+    synchronizePlayout: bool = False
+    """
+    Whether to hold back the frames of a received track which is ahead of the
+    other tracks of its media stream, so that they can be played out in sync.
+    """
@@ -1,6 +1,8 @@
+import asyncio
 import logging
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Deque, Optional, Union
 
 from pyee.asyncio import AsyncIOEventEmitter
 
@@ -44,6 +46,69 @@ class RTCDataChannelParameters:
     """
 
 
+class RTCDataChannelMessageStream:
+    """
+    The :class:`RTCDataChannelMessageStream` is an asynchronous iterator over
+    the fragments of a binary message, which is delivered when
+    :attr:`RTCDataChannel.binaryType` is `"stream"`.
+
+    Fragments which have not been consumed yet count against the receive
+    buffer of the :class:`RTCSctpTransport`, so the remote peer only sends
+    as fast as the fragments are consumed.
+    """
+
+    def __init__(self, transport: "RTCSctpTransport") -> None:
+        self.__aborted = False
+        self.__ended = False
+        self.__fragments: Deque[memoryview] = deque()
+        self.__transport = transport
+        self.__waiter: Optional[asyncio.Future[None]] = None
+
+    def __aiter__(self) -> "RTCDataChannelMessageStream":
+        return self
+
+    async def __anext__(self) -> memoryview:
+        """
+        Receive the next fragment of the message.
+
+        If the data channel is closed before the message is complete,
+        :class:`ConnectionError` is raised.
+        """
+        while not self.__fragments:
+            if self.__ended:
+                raise StopAsyncIteration
+            elif self.__aborted:
+                raise ConnectionError("Data channel closed during message")
+
+            self.__waiter = asyncio.get_event_loop().create_future()
+            await self.__waiter
+
+        fragment = self.__fragments.popleft()
+        self.__transport._data_channel_release(len(fragment))
+        return fragment
+
+    def _abort(self) -> None:
+        self.__aborted = True
+        while self.__fragments:
+            self.__transport._data_channel_release(len(self.__fragments.popleft()))
+        self.__wake()
+
+    def _addFragment(self, fragment: Union[bytes, memoryview]) -> None:
+        self.__fragments.append(memoryview(fragment))
+        self.__transport._data_channel_hold(len(fragment))
+        self.__wake()
+
+    def _end(self) -> None:
+        self.__ended = True
+        self.__wake()
+
+    def __wake(self) -> None:
+        if self.__waiter is not None:
+            if not self.__waiter.done():
+                self.__waiter.set_result(None)
+            self.__waiter = None
+
+
 class RTCDataChannel(AsyncIOEventEmitter):
     """
     The :class:`RTCDataChannel` interface represents a network channel which
@@ -60,11 +125,17 @@ class RTCDataChannel(AsyncIOEventEmitter):
         send_open: bool = True,
     ) -> None:
         super().__init__()
+        self.__binaryType = "bytes"
         self.__bufferedAmount = 0
         self.__bufferedAmountLowThreshold = 0
         self.__id = parameters.id
+        self.__messageStream: Optional[RTCDataChannelMessageStream] = None
         self.__parameters = parameters
+        self.__paused = False
         self.__readyState = "connecting"
+        self.__receiveQueue: Deque[
+            tuple[Union[bytes, memoryview, str, RTCDataChannelMessageStream], int]
+        ] = deque()
         self.__transport = transport
         self.__send_open = send_open
 
@@ -82,6 +153,37 @@ class RTCDataChannel(AsyncIOEventEmitter):
         else:
             self.__transport._data_channel_add_negotiated(self)
 
+    @property
+    def binaryType(self) -> str:
+        """
+        The type of object used to deliver binary messages, either `"bytes"`
+        (the default), `"memoryview"` or `"stream"`.
+
+        Using `"memoryview"` avoids copying messages which fit in a single
+        SCTP chunk.
+
+        Using `"stream"` delivers each binary message as an
+        :class:`RTCDataChannelMessageStream` as soon as its first fragment is
+        received, allowing arbitrarily large messages to be received in
+        constant memory. This is only supported for ordered and reliable
+        data channels.
+        """
+        return self.__binaryType
+
+    @binaryType.setter
+    def binaryType(self, value: str) -> None:
+        if value not in ("bytes", "memoryview", "stream"):
+            raise ValueError("binaryType must be 'bytes', 'memoryview' or 'stream'")
+        if value == "stream" and (
+            not self.ordered
+            or self.maxPacketLifeTime is not None
+            or self.maxRetransmits is not None
+        ):
+            raise ValueError(
+                "binaryType 'stream' requires an ordered and reliable data channel"
+            )
+        self.__binaryType = value
+
     @property
     def bufferedAmount(self) -> int:
         """
@@ -149,6 +251,13 @@ class RTCDataChannel(AsyncIOEventEmitter):
         """
         return self.__parameters.maxRetransmits
 
+    @property
+    def paused(self) -> bool:
+        """
+        Whether the delivery of received messages is paused.
+        """
+        return self.__paused
+
     @property
     def protocol(self) -> str:
         """
@@ -176,15 +285,45 @@ class RTCDataChannel(AsyncIOEventEmitter):
         """
         self.transport._data_channel_close(self)
 
-    def send(self, data: Union[bytes, str]) -> None:
+    def pause(self) -> None:
+        """
+        Pause the delivery of received messages.
+
+        While paused, received messages are held and count against the receive
+        buffer of the :class:`RTCSctpTransport`. Once that buffer is full, the
+        remote peer stops sending.
+        """
+        self.__paused = True
+
+    def resume(self) -> None:
+        """
+        Resume the delivery of received messages.
+
+        Any messages received while paused are emitted first.
+        """
+        self.__paused = False
+        while self.__receiveQueue and not self.__paused:
+            message, size = self.__receiveQueue.popleft()
+            self.transport._data_channel_release(size)
+            self.emit("message", message)
+
+    def send(self, data: Union[bytes, bytearray, memoryview, str]) -> None:
         """
         Send `data` across the data channel to the remote peer.
+
+        Besides `str` and `bytes`, any object supporting the buffer protocol
+        such as `bytearray` or `memoryview` is accepted. Such buffers are not
+        copied, so they must not be modified until they have been sent, that
+        is until :attr:`bufferedAmount` has decreased accordingly.
         """
         if self.readyState != "open":
             raise InvalidStateError
 
         if not isinstance(data, (str, bytes)):
-            raise ValueError(f"Cannot send unsupported data type: {type(data)}")
+            try:
+                data = memoryview(data).cast("B")
+            except TypeError:
+                raise ValueError(f"Cannot send unsupported data type: {type(data)}")
 
         self.transport._data_channel_send(self, data)
 
@@ -197,6 +336,31 @@ class RTCDataChannel(AsyncIOEventEmitter):
         if crosses_threshold:
             self.emit("bufferedamountlow")
 
+    def _deliverFragment(
+        self, fragment: Union[bytes, memoryview], first: bool, last: bool
+    ) -> None:
+        if first:
+            self.__messageStream = RTCDataChannelMessageStream(self.transport)
+            self._deliverMessage(self.__messageStream, 0)
+
+        if self.__messageStream is not None:
+            if fragment:
+                self.__messageStream._addFragment(fragment)
+            if last:
+                self.__messageStream._end()
+                self.__messageStream = None
+
+    def _deliverMessage(
+        self,
+        message: Union[bytes, memoryview, str, RTCDataChannelMessageStream],
+        size: int,
+    ) -> None:
+        if self.__paused or self.__receiveQueue:
+            self.__receiveQueue.append((message, size))
+            self.transport._data_channel_hold(size)
+        else:
+            self.emit("message", message)
+
     def _setId(self, id: int) -> None:
         self.__id = id
 
@@ -208,6 +372,18 @@ class RTCDataChannel(AsyncIOEventEmitter):
             if state == "open":
                 self.emit("open")
             elif state == "closed":
+                # abort any message which is being received
+                if self.__messageStream is not None:
+                    self.__messageStream._abort()
+                    self.__messageStream = None
+
+                # release any messages which were never delivered
+                while self.__receiveQueue:
+                    message, size = self.__receiveQueue.popleft()
+                    if isinstance(message, RTCDataChannelMessageStream):
+                        message._abort()
+                    self.transport._data_channel_release(size)
+
                 self.emit("close")
 
                 # no more events will be emitted, so remove all event listeners
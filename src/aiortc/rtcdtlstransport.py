@@ -4,6 +4,7 @@ import datetime
 import enum
 import logging
 import os
+import time
 import traceback
 from dataclasses import dataclass, field
 from typing import Optional, Protocol, Type, TypeVar, Union
@@ -253,6 +254,11 @@ class RtpRouter:
         self.mid_table: dict[str, RtpReceiver] = {}
         self.ssrc_table: dict[int, RtpReceiver] = {}
         self.payload_type_table: dict[int, set[RtpReceiver]] = {}
+        self.rid_table: dict[str, set[RtpReceiver]] = {}
+
+        # RTP stream IDs learned for each SSRC
+        self.ssrc_rid_table: dict[int, str] = {}
+        self.ssrc_repaired_rid_table: dict[int, str] = {}
 
     def register_receiver(
         self,
@@ -260,6 +266,7 @@ class RtpRouter:
         ssrcs: list[int],
         payload_types: list[int],
         mid: Optional[str] = None,
+        rids: Optional[list[str]] = None,
     ) -> None:
         self.receivers.add(receiver)
         if mid is not None:
@@ -270,6 +277,10 @@ class RtpRouter:
             if payload_type not in self.payload_type_table:
                 self.payload_type_table[payload_type] = set()
             self.payload_type_table[payload_type].add(receiver)
+        for rid in rids or []:
+            if rid not in self.rid_table:
+                self.rid_table[rid] = set()
+            self.rid_table[rid].add(receiver)
 
     def register_sender(self, sender: RtpSender, ssrc: int) -> None:
         self.senders[ssrc] = sender
@@ -306,6 +317,8 @@ class RtpRouter:
         return recipients
 
     def route_rtp(self, packet: RtpPacket) -> Optional[RtpReceiver]:
+        self.__learn_rtp_stream_id(packet)
+
         ssrc_receiver = self.ssrc_table.get(packet.ssrc)
         pt_receivers = self.payload_type_table.get(packet.payload_type, set())
 
@@ -313,6 +326,13 @@ class RtpRouter:
         if ssrc_receiver is not None and ssrc_receiver in pt_receivers:
             return ssrc_receiver
 
+        # the SSRC is unknown but the MID or RTP stream ID match, update the SSRC table
+        if ssrc_receiver is None:
+            receiver = self.__route_by_stream_id(packet)
+            if receiver is not None and receiver in pt_receivers:
+                self.ssrc_table[packet.ssrc] = receiver
+                return receiver
+
         # the SSRC is unknown but the payload type matches, update the SSRC table
         if ssrc_receiver is None and len(pt_receivers) == 1:
             pt_receiver = list(pt_receivers)[0]
@@ -328,6 +348,8 @@ class RtpRouter:
         self.__discard(self.ssrc_table, receiver)
         for pt, receivers in self.payload_type_table.items():
             receivers.discard(receiver)
+        for rid, receivers in self.rid_table.items():
+            receivers.discard(receiver)
 
     def unregister_sender(self, sender: RtpSender) -> None:
         self.__discard(self.senders, sender)
@@ -337,6 +359,32 @@ class RtpRouter:
             if v == value:
                 d.pop(k)
 
+    def __learn_rtp_stream_id(self, packet: RtpPacket) -> None:
+        """
+        Remember the RTP stream ID of each SSRC, and restore it on packets
+        which omit it, as senders stop sending it once the SSRC is known.
+        """
+        extensions = packet.extensions
+        ssrc = packet.ssrc
+        if extensions.rtp_stream_id is not None:
+            self.ssrc_rid_table[ssrc] = extensions.rtp_stream_id
+        elif extensions.repaired_rtp_stream_id is not None:
+            self.ssrc_repaired_rid_table[ssrc] = extensions.repaired_rtp_stream_id
+        else:
+            extensions.rtp_stream_id = self.ssrc_rid_table.get(ssrc)
+            extensions.repaired_rtp_stream_id = self.ssrc_repaired_rid_table.get(ssrc)
+
+    def __route_by_stream_id(self, packet: RtpPacket) -> Optional[RtpReceiver]:
+        extensions = packet.extensions
+        if extensions.mid is not None and extensions.mid in self.mid_table:
+            return self.mid_table[extensions.mid]
+
+        rid = extensions.rtp_stream_id or extensions.repaired_rtp_stream_id
+        rid_receivers = self.rid_table.get(rid, set()) if rid is not None else set()
+        if len(rid_receivers) == 1:
+            return list(rid_receivers)[0]
+        return None
+
 
 class RTCDtlsTransport(AsyncIOEventEmitter):
     """
@@ -358,8 +406,12 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self.encrypted = False
         self._data_receiver: Optional[DataReceiver] = None
         self._role = "auto"
+        # The round-trip time measured by the RTP senders, in seconds.
+        self._rtt: Optional[float] = None
         self._rtp_header_extensions_map = rtp.HeaderExtensionsMap()
         self._rtp_router = RtpRouter()
+        # The number of RTP receivers which time the stages of their pipeline.
+        self._stage_timing = 0
         self._state = State.NEW
         self._stats_id = "transport_" + str(id(self))
         self._task: Optional[asyncio.Future[None]] = None
@@ -609,12 +661,27 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
             for recipient in self._rtp_router.route_rtcp(packet):
                 await recipient._handle_rtcp_packet(packet)
 
-    async def _handle_rtp_data(self, data: bytes, arrival_time_ms: int) -> None:
+    async def _handle_rtp_data(
+        self, data: bytes, arrival_time_ms: int, received: Optional[float] = None
+    ) -> None:
+        """
+        Parse and route a decrypted RTP packet.
+
+        If the time at which the packet was `received` is given, the packet is
+        stamped with the times at which it was received, decrypted and parsed.
+        """
+        unprotected = time.perf_counter() if received is not None else 0.0
         try:
             packet = RtpPacket.parse(data, self._rtp_header_extensions_map)
         except ValueError as exc:
             self.__log_debug("x RTP parsing failed: %s", exc)
             return
+        if received is not None:
+            packet._stage_times = (  # type: ignore
+                received,
+                unprotected,
+                time.perf_counter(),
+            )
 
         # route RTP packet
         receiver = self._rtp_router.route_rtp(packet)
@@ -666,8 +733,11 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
                     data = self._rx_srtp.unprotect_rtcp(data)
                     await self._handle_rtcp_data(data)
                 else:
+                    received = time.perf_counter() if self._stage_timing else None
                     data = self._rx_srtp.unprotect(data)
-                    await self._handle_rtp_data(data, arrival_time_ms=arrival_time_ms)
+                    await self._handle_rtp_data(
+                        data, arrival_time_ms=arrival_time_ms, received=received
+                    )
             except pylibsrtp.Error as exc:
                 self.__log_debug("x SRTP unprotect failed: %s", exc)
 
@@ -679,8 +749,12 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self, receiver: RtpReceiver, parameters: RTCRtpReceiveParameters
     ) -> None:
         ssrcs = set()
+        rids = []
         for encoding in parameters.encodings:
-            ssrcs.add(encoding.ssrc)
+            if encoding.ssrc is not None:
+                ssrcs.add(encoding.ssrc)
+            if encoding.rid is not None:
+                rids.append(encoding.rid)
 
         self._rtp_header_extensions_map.configure(parameters)
         self._rtp_router.register_receiver(
@@ -688,13 +762,20 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
             ssrcs=list(ssrcs),
             payload_types=[codec.payloadType for codec in parameters.codecs],
             mid=parameters.muxId,
+            rids=rids,
         )
 
     def _register_rtp_sender(
         self, sender: RtpSender, parameters: RTCRtpSendParameters
     ) -> None:
+        ssrcs = {sender._ssrc}
+        for encoding in parameters.encodings:
+            if encoding.ssrc is not None:
+                ssrcs.add(encoding.ssrc)
+
         self._rtp_header_extensions_map.configure(parameters)
-        self._rtp_router.register_sender(sender, ssrc=sender._ssrc)
+        for ssrc in ssrcs:
+            self._rtp_router.register_sender(sender, ssrc=ssrc)
 
     async def _send_data(self, data: bytes) -> None:
         if self._state != State.CONNECTED:
@@ -7,7 +7,7 @@ from typing import Optional, Union
 from pyee.asyncio import AsyncIOEventEmitter
 
 from . import clock, rtp, sdp
-from .codecs import CODECS, HEADER_EXTENSIONS, is_rtx
+from .codecs import CODECS, HEADER_EXTENSIONS, is_red, is_rtx, red_payload_types
 from .events import RTCTrackEvent
 from .exceptions import (
     InternalError,
@@ -29,13 +29,14 @@ from .rtcrtpparameters import (
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
     RTCRtpDecodingParameters,
+    RTCRtpEncodingParameters,
     RTCRtpHeaderExtensionParameters,
     RTCRtpParameters,
     RTCRtpReceiveParameters,
     RTCRtpRtxParameters,
     RTCRtpSendParameters,
 )
-from .rtcrtpreceiver import RemoteStreamTrack, RTCRtpReceiver
+from .rtcrtpreceiver import MediaSynchronizer, RemoteStreamTrack, RTCRtpReceiver
 from .rtcrtpsender import RTCRtpSender
 from .rtcrtptransceiver import RTCRtpTransceiver
 from .rtcsctptransport import RTCSctpCapabilities, RTCSctpTransport
@@ -61,9 +62,9 @@ def filter_preferred_codecs(
     filtered = []
     for pref in filter(lambda x: not is_rtx(x), preferred):
         for codec in codecs:
-            if (
-                codec.mimeType.lower() == pref.mimeType.lower()
-                and codec.parameters == pref.parameters
+            # the parameters of RED refer to negotiated payload types
+            if codec.mimeType.lower() == pref.mimeType.lower() and (
+                is_red(codec) or codec.parameters == pref.parameters
             ):
                 filtered.append(codec)
 
@@ -95,6 +96,14 @@ def find_common_codecs(
                     common.append(copy.deepcopy(c))
             continue
 
+        # for RED, check we support it, the codecs it carries are checked below
+        if is_red(c):
+            for codec in local_codecs:
+                if is_red(codec) and codec.clockRate == c.clockRate:
+                    common.append(copy.deepcopy(c))
+                    break
+            continue
+
         # handle other codecs
         for codec in local_codecs:
             if is_codec_compatible(codec, c):
@@ -107,7 +116,41 @@ def find_common_codecs(
                 common.append(codec)
                 common_base[codec.payloadType] = codec
                 break
-    return common
+
+    # for RED, check we accepted the codecs it carries
+    return [
+        c
+        for c in common
+        if not is_red(c)
+        or (
+            red_payload_types(c)
+            and all(pt in common_base for pt in red_payload_types(c))
+        )
+    ]
+
+
+def find_send_codecs(
+    codecs: list[RTCRtpCodecParameters], remote_codecs: list[RTCRtpCodecParameters]
+) -> list[RTCRtpCodecParameters]:
+    """
+    Apply the remote party's receive preferences to the negotiated codecs.
+
+    For Opus, `useinbandfec` and `usedtx` are set by the receiver to ask the
+    sender to use in-band FEC and DTX.
+    """
+    remote = {c.payloadType: c for c in remote_codecs}
+    send_codecs = []
+    for codec in codecs:
+        remote_codec = remote.get(codec.payloadType)
+        if codec.mimeType.lower() == "audio/opus" and remote_codec is not None:
+            codec = copy.deepcopy(codec)
+            for name in ("usedtx", "useinbandfec"):
+                if name in remote_codec.parameters:
+                    codec.parameters[name] = remote_codec.parameters[name]
+                else:
+                    codec.parameters.pop(name, None)
+        send_codecs.append(codec)
+    return send_codecs
 
 
 def find_common_header_extensions(
@@ -122,6 +165,17 @@ def find_common_header_extensions(
     return common
 
 
+def find_simulcast_rids(media: sdp.MediaDescription, direction: str) -> list[str]:
+    """
+    Return the rids of the simulcast streams which the remote party sends
+    or receives, depending on `direction`.
+    """
+    if media.simulcast is None:
+        return []
+    streams = getattr(media.simulcast, direction)
+    return [rid.lstrip("~") for rids in streams for rid in rids]
+
+
 def is_codec_compatible(a: RTCRtpCodecParameters, b: RTCRtpCodecParameters) -> bool:
     if a.mimeType.lower() != b.mimeType.lower() or a.clockRate != b.clockRate:
         return False
@@ -143,6 +197,16 @@ def is_codec_compatible(a: RTCRtpCodecParameters, b: RTCRtpCodecParameters) -> b
             return packetization(a) == packetization(b) and profile(a) == profile(b)
         except ValueError:
             return False
+    elif a.mimeType.lower() == "video/vp9":
+        # the absence of a profile-id parameter means profile 0
+        return str(a.parameters.get("profile-id", "0")) == str(
+            b.parameters.get("profile-id", "0")
+        )
+    elif a.mimeType.lower() == "video/av1":
+        # the absence of a profile parameter means profile 0
+        return str(a.parameters.get("profile", "0")) == str(
+            b.parameters.get("profile", "0")
+        )
 
     return True
 
@@ -237,19 +301,45 @@ def create_media_description_for_transceiver(
     media.rtcp_host = DISCARD_HOST
     media.rtcp_port = DISCARD_PORT
     media.rtcp_mux = True
-    media.ssrc = [sdp.SsrcDescription(ssrc=transceiver.sender._ssrc, cname=cname)]
 
-    # if RTX is enabled, add corresponding SSRC
-    if next(filter(is_rtx, media.rtp.codecs), None):
-        media.ssrc.append(
-            sdp.SsrcDescription(ssrc=transceiver.sender._rtx_ssrc, cname=cname)
+    # simulcast streams are identified by their rid
+    send_encodings = []
+    if direction in ["sendonly", "sendrecv"]:
+        send_encodings = [
+            encoding
+            for encoding in transceiver.sender.getParameters().encodings
+            if encoding.rid is not None
+        ]
+    recv_rids = []
+    if direction in ["recvonly", "sendrecv"]:
+        recv_rids = transceiver._remote_rids
+    if send_encodings or recv_rids:
+        media.rid = [
+            sdp.RidDescription(id=encoding.rid, direction="send")
+            for encoding in send_encodings
+        ] + [sdp.RidDescription(id=rid, direction="recv") for rid in recv_rids]
+        media.simulcast = sdp.SimulcastDescription(
+            send=[
+                [encoding.rid if encoding.active else "~" + encoding.rid]
+                for encoding in send_encodings
+            ],
+            recv=[[rid] for rid in recv_rids],
         )
-        media.ssrc_group = [
-            sdp.GroupDescription(
-                semantic="FID",
-                items=[transceiver.sender._ssrc, transceiver.sender._rtx_ssrc],
+
+    if not send_encodings:
+        media.ssrc = [sdp.SsrcDescription(ssrc=transceiver.sender._ssrc, cname=cname)]
+
+        # if RTX is enabled, add corresponding SSRC
+        if next(filter(is_rtx, media.rtp.codecs), None):
+            media.ssrc.append(
+                sdp.SsrcDescription(ssrc=transceiver.sender._rtx_ssrc, cname=cname)
             )
-        ]
+            media.ssrc_group = [
+                sdp.GroupDescription(
+                    semantic="FID",
+                    items=[transceiver.sender._ssrc, transceiver.sender._rtx_ssrc],
+                )
+            ]
 
     add_transport_description(media, transceiver.receiver.transport)
 
@@ -312,6 +402,7 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         self.__sctpRemotePort: Optional[int] = None
         self.__sctpRemoteCaps: Optional[RTCSctpCapabilities] = None
         self.__stream_id = str(uuid.uuid4())
+        self.__synchronizers: dict[str, MediaSynchronizer] = {}
         self.__transceivers: list[RTCRtpTransceiver] = []
 
         self.__closeTask: Optional[asyncio.Task] = None
@@ -481,10 +572,20 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         return transceiver.sender
 
     def addTransceiver(
-        self, trackOrKind: Union[str, MediaStreamTrack], direction: str = "sendrecv"
+        self,
+        trackOrKind: Union[str, MediaStreamTrack],
+        direction: str = "sendrecv",
+        sendEncodings: Optional[list[RTCRtpEncodingParameters]] = None,
     ) -> RTCRtpTransceiver:
         """
         Add a new :class:`RTCRtpTransceiver`.
+
+        :param trackOrKind: Either a :class:`MediaStreamTrack` instance or a
+                            media kind (`'audio'` or `'video'`).
+        :param direction: The transceiver's direction.
+        :param sendEncodings: A list of :class:`RTCRtpEncodingParameters`. Pass
+                              several encodings, each with its own `rid`, to
+                              send a video track as simulcast.
         """
         self.__assertNotClosed()
 
@@ -507,7 +608,10 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             self.__assertTrackHasNoSender(track)
 
         return self.__createTransceiver(
-            direction=direction, kind=kind, sender_track=track
+            direction=direction,
+            kind=kind,
+            sender_track=track,
+            send_encodings=sendEncodings,
         )
 
     async def close(self) -> None:
@@ -933,6 +1037,18 @@ class RTCPeerConnection(AsyncIOEventEmitter):
                     HEADER_EXTENSIONS[media.kind], media.rtp.headerExtensions
                 )
 
+                # negotiate simulcast, receiving requires the rid header extension
+                transceiver.sender._negotiate_simulcast(
+                    find_simulcast_rids(media, "recv")
+                )
+                if media.kind == "video" and any(
+                    x.uri == "urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+                    for x in transceiver._headerExtensions
+                ):
+                    transceiver._remote_rids = find_simulcast_rids(media, "send")
+                else:
+                    transceiver._remote_rids = []
+
                 # configure direction
                 direction = reverse_direction(media.direction)
                 if description.type in ["answer", "pranswer"]:
@@ -948,6 +1064,15 @@ class RTCPeerConnection(AsyncIOEventEmitter):
                     transceiver.receiver._track = RemoteStreamTrack(
                         kind=media.kind, id=description.webrtc_track_id(media)
                     )
+                    stream_id = description.webrtc_stream_id(media)
+                    if stream_id is not None:
+                        if stream_id not in self.__synchronizers:
+                            self.__synchronizers[stream_id] = MediaSynchronizer(
+                                delay_playout=self.__configuration.synchronizePlayout
+                            )
+                        transceiver.receiver._set_synchronizer(
+                            self.__synchronizers[stream_id]
+                        )
                     trackEvents.append(
                         RTCTrackEvent(
                             receiver=transceiver.receiver,
@@ -1162,7 +1287,9 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             dtlsTransport = self.__transceivers[0].receiver.transport
         else:
             dtlsTransport = self.__createDtlsTransport()
-        self.__sctp = RTCSctpTransport(dtlsTransport)
+        self.__sctp = RTCSctpTransport(
+            dtlsTransport, configuration=self.__configuration.sctp
+        )
         self.__sctp._bundled = bundled
         self.__sctp.mid = None
 
@@ -1171,7 +1298,11 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             self.emit("datachannel", channel)
 
     def __createTransceiver(
-        self, direction: str, kind: str, sender_track: Optional[MediaStreamTrack] = None
+        self,
+        direction: str,
+        kind: str,
+        sender_track: Optional[MediaStreamTrack] = None,
+        send_encodings: Optional[list[RTCRtpEncodingParameters]] = None,
     ) -> RTCRtpTransceiver:
         dtlsTransport = None
         bundled = False
@@ -1196,7 +1327,9 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         transceiver = RTCRtpTransceiver(
             direction=direction,
             kind=kind,
-            sender=RTCRtpSender(sender_track or kind, dtlsTransport),
+            sender=RTCRtpSender(
+                sender_track or kind, dtlsTransport, sendEncodings=send_encodings
+            ),
             receiver=RTCRtpReceiver(kind, dtlsTransport),
         )
         transceiver.receiver._set_rtcp_ssrc(transceiver.sender._ssrc)
@@ -1217,10 +1350,17 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         return self.__pendingLocalDescription or self.__currentLocalDescription
 
     def __localRtp(self, transceiver: RTCRtpTransceiver) -> RTCRtpSendParameters:
+        codecs = transceiver._codecs
+        remote_description = self.__remoteDescription()
+        if remote_description is not None:
+            media = remote_description.media[transceiver._get_mline_index()]
+            codecs = find_send_codecs(codecs, media.rtp.codecs)
+
         rtp = RTCRtpSendParameters(
-            codecs=transceiver._codecs,
+            codecs=codecs,
             headerExtensions=transceiver._headerExtensions,
             muxId=transceiver.mid,
+            encodings=transceiver.sender.getParameters().encodings,
         )
         rtp.rtcp.cname = self.__cname
         rtp.rtcp.ssrc = transceiver.sender._ssrc
@@ -1242,7 +1382,11 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             muxId=media.rtp.muxId,
             rtcp=media.rtp.rtcp,
         )
-        if len(media.ssrc):
+        if transceiver._remote_rids:
+            receiveParameters.encodings = [
+                RTCRtpDecodingParameters(rid=rid) for rid in transceiver._remote_rids
+            ]
+        elif len(media.ssrc):
             encodings: dict[int, RTCRtpDecodingParameters] = {}
             for codec in transceiver._codecs:
                 if is_rtx(codec):
@@ -63,17 +63,122 @@ class RTCRtpRtxParameters:
 
 @dataclass
 class RTCRtpCodingParameters:
-    ssrc: int
-    payloadType: int
+    ssrc: Optional[int] = None
+    "The Synchronization Source identifier of the RTP stream."
+    payloadType: Optional[int] = None
+    "The payload type used by the RTP stream, if any."
     rtx: Optional[RTCRtpRtxParameters] = None
+    "The retransmission parameters of the RTP stream, if any."
+    rid: Optional[str] = None
+    "The RTP stream identifier, used to tell simulcast layers apart."
 
 
 class RTCRtpDecodingParameters(RTCRtpCodingParameters):
     pass
 
 
+@dataclass
 class RTCRtpEncodingParameters(RTCRtpCodingParameters):
-    pass
+    """
+    The :class:`RTCRtpEncodingParameters` dictionary describes one RTP stream
+    sent by an :class:`RTCRtpSender`.
+
+    Passing several encodings, each with its own :attr:`rid`, when adding a
+    video transceiver enables simulcast: the same track is sent at several
+    resolutions, each with its own encoder and SSRC.
+    """
+
+    active: bool = True
+    "Whether the RTP stream is being sent."
+    scaleResolutionDownBy: Optional[float] = None
+    "The factor by which to scale down video frames for this RTP stream."
+    maxBitrate: Optional[int] = None
+    "The highest bitrate used for this RTP stream, in bits per second."
+    maxFramerate: Optional[float] = None
+    """
+    The maximum number of video frames per second for this RTP stream, further
+    frames are dropped.
+    """
+
+
+@dataclass
+class RTCRtpEncoderParameters:
+    """
+    The :class:`RTCRtpEncoderParameters` dictionary controls how an
+    :class:`RTCRtpSender` encodes media.
+
+    Parameters which are left as `None` use the codec's defaults. Parameters
+    which a codec does not support are ignored. The bitrate, frame rate and
+    resolution limits of each RTP stream are set on its
+    :class:`RTCRtpEncodingParameters`.
+    """
+
+    minBitrate: Optional[int] = None
+    """
+    The lowest bitrate the encoder may be asked to use, in bits per second.
+    It is capped by the `maxBitrate` of each :class:`RTCRtpEncodingParameters`.
+    """
+    startBitrate: Optional[int] = None
+    "The initial bitrate, in bits per second."
+    keyFrameInterval: Optional[int] = None
+    "The maximum number of video frames between keyframes."
+    preset: Optional[str] = None
+    """
+    The codec-specific speed setting: the libx264 preset (e.g. `'veryfast'`),
+    the libvpx and libaom `cpu-used` value or the SVT-AV1 preset.
+    """
+    threadCount: Optional[int] = None
+    "The number of threads used by the video encoder."
+    scalabilityMode: Optional[str] = None
+    """
+    The temporal layers to encode (VP8 and VP9 only): `'L1T1'`, `'L1T2'` or
+    `'L1T3'`. Upper layers can be dropped to lower the frame rate without
+    re-encoding.
+    """
+    dtx: Optional[bool] = None
+    """
+    Whether to stop sending audio during silence (Opus only). By default this
+    follows the remote party's `usedtx` preference.
+    """
+    fec: Optional[bool] = None
+    """
+    Whether to send in-band forward error correction data (Opus only). By
+    default this follows the remote party's `useinbandfec` preference.
+    """
+
+
+@dataclass
+class RTCRtpDecoderParameters:
+    """
+    The :class:`RTCRtpDecoderParameters` dictionary controls how an
+    :class:`RTCRtpReceiver` decodes video.
+    """
+
+    threadCount: Optional[int] = None
+    """
+    The number of threads used by the video decoder. By default this is chosen
+    from the resolution of the video.
+    """
+    lowDelay: bool = True
+    """
+    Whether to favour latency over throughput. When `False`, the decoder also
+    decodes several frames in parallel, which delays each frame by one frame
+    per extra thread.
+    """
+    format: Optional[str] = None
+    """
+    The pixel format of the decoded video frames, for instance `bgr24`. By
+    default frames are delivered in the decoder's own format.
+    """
+    width: Optional[int] = None
+    "The width of the decoded video frames, by default that of the video."
+    height: Optional[int] = None
+    "The height of the decoded video frames, by default that of the video."
+    ndarray: bool = False
+    """
+    Whether to also convert the decoded video frames to NumPy arrays, which
+    are available as the `opaque` attribute of each frame.
+    """
 
 
 @dataclass
@@ -167,4 +272,10 @@ class RTCRtpReceiveParameters(RTCRtpParameters):
 
 @dataclass
 class RTCRtpSendParameters(RTCRtpParameters):
+    """
+    The :class:`RTCRtpSendParameters` dictionary describes the configuration of
+    an :class:`RTCRtpSender`.
+    """
+
     encodings: list[RTCRtpEncodingParameters] = field(default_factory=list)
+    "A list of :class:`RTCRtpEncodingParameters`, one per RTP stream."
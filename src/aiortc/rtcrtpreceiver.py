@@ -1,26 +1,42 @@
+import array
 import asyncio
+import dataclasses
 import datetime
+import fractions
+import importlib.util
 import logging
+import math
 import queue
 import random
 import threading
 import time
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 from typing import Optional
 
+from av import AudioFrame, VideoFormat
 from av.frame import Frame
 
 from . import clock
-from .codecs import depayload, get_capabilities, get_decoder, is_rtx
+from .codecs import (
+    assemble,
+    depayload,
+    describe,
+    get_capabilities,
+    get_decoder,
+    is_red,
+    is_rtx,
+)
+from .codecs.vpx import Vp8TemporalLayerFilter
 from .exceptions import InvalidStateError
-from .jitterbuffer import JitterBuffer
+from .jitterbuffer import JitterBuffer, JitterFrame
 from .mediastreams import MediaStreamError, MediaStreamTrack
 from .rate import RemoteBitrateEstimator
 from .rtcdtlstransport import RTCDtlsTransport
 from .rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecParameters,
+    RTCRtpDecoderParameters,
     RTCRtpReceiveParameters,
 )
 from .rtp import (
@@ -38,6 +54,7 @@ from .rtp import (
     RtpPacket,
     clamp_packets_lost,
     pack_remb_fci,
+    unwrap_red,
     unwrap_rtx,
 )
 from .stats import (
@@ -45,16 +62,79 @@ from .stats import (
     RTCRemoteOutboundRtpStreamStats,
     RTCStatsReport,
 )
+from .timing import StageTimer, remove_stage_timing_stats
 from .utils import uint16_add, uint16_gt
 
 logger = logging.getLogger(__name__)
 
+# The audio playout delay covers this many times the inter-arrival jitter.
+PLAYOUT_JITTER_FACTOR = 3
+
+# The range of the audio playout delay, in frames.
+PLAYOUT_MIN_FRAMES = 1
+PLAYOUT_MAX_FRAMES = 8
+
+# The fraction of a frame which is added or removed when time-stretching.
+PLAYOUT_STRETCH = 0.25
+
+# The round-trip time assumed until the RTP senders have measured it, in seconds.
+DEFAULT_RTT = 0.1
+
+# An incomplete video frame is skipped once its missing packets have been
+# awaited for this many round-trip times, but never less than the minimum.
+NACK_DEADLINE_RTTS = 2
+NACK_DEADLINE_MIN_MS = 50
+
+# The smoothing factor applied to the lag of synchronized tracks.
+SYNC_LAG_SMOOTHING = 1 / 16
+
+# The longest a frame is held back to play it out in sync, in seconds.
+SYNC_MAX_DELAY = 1.0
+
+# A missing packet is requested again after a round-trip time, at most this
+# many times.
+NACK_MAX_RETRIES = 10
+
+# The interval at which the requests for missing packets are repeated, in seconds.
+NACK_INTERVAL = 0.02
+
+# Picture loss indications are not repeated before the keyframe they request
+# can have arrived, nor more often than this.
+PLI_MIN_INTERVAL_MS = 500
+
+# The stages of the receiving pipeline which are timed when enabled.
+RECEIVER_STAGES = (
+    "srtp",
+    "parse",
+    "depacketize",
+    "jitterBuffer",
+    "decoderQueue",
+    "decode",
+    "trackQueue",
+)
+
+
+class DecoderStatistics:
+    """
+    Counters which the decoder thread maintains for the receiver's statistics.
+    """
+
+    def __init__(self) -> None:
+        self.frames_decoded = 0
+        self.key_frames_decoded = 0
+        self.total_decode_time = 0.0
+
 
 def decoder_worker(
-    loop: asyncio.AbstractEventLoop, input_q: queue.Queue, output_q: asyncio.Queue
+    loop: asyncio.AbstractEventLoop,
+    input_q: queue.Queue,
+    output_q: asyncio.Queue,
+    stats: DecoderStatistics,
 ) -> None:
     codec_name = None
     decoder = None
+    decoder_parameters = None
+    pts_offset = 0
 
     while True:
         task = input_q.get()
@@ -62,24 +142,122 @@ def decoder_worker(
             # inform the track that is has ended
             asyncio.run_coroutine_threadsafe(output_q.put(None), loop)
             break
-        codec, encoded_frame = task
+        codec, encoded_frame, stretch, parameters, timer = task
+        if timer is not None:
+            timer.measure("decoderQueue", encoded_frame)
 
         if codec.name != codec_name:
             decoder = get_decoder(codec)
             codec_name = codec.name
+            decoder_parameters = None
+        if parameters is not decoder_parameters:
+            decoder.configure(parameters)
+            decoder_parameters = parameters
+
+        start = time.perf_counter()
+        frames = decoder.decode(encoded_frame)
+        decode_time = time.perf_counter() - start
+        stats.total_decode_time += decode_time
+        if timer is not None:
+            timer.add("decode", decode_time)
+        stats.frames_decoded += len(frames)
+        if encoded_frame.keyframe and frames:
+            stats.key_frames_decoded += 1
+
+        for i, frame in enumerate(frames):
+            # shift timestamps by the duration added or removed so far
+            if pts_offset and frame.pts is not None:
+                frame.pts += pts_offset
+
+            if stretch and i == len(frames) - 1 and isinstance(frame, AudioFrame):
+                stretched = stretch_audio_frame(frame, stretch)
+                if frame.time_base is not None:
+                    pts_offset += int(
+                        fractions.Fraction(
+                            stretched.samples - frame.samples, frame.sample_rate
+                        )
+                        / frame.time_base
+                    )
+                frame = stretched
 
-        for frame in decoder.decode(encoded_frame):
             # pass the decoded frame to the track
+            if timer is not None:
+                timer.mark(frame)
             asyncio.run_coroutine_threadsafe(output_q.put(frame), loop)
 
     if decoder is not None:
         del decoder
 
 
+def stretch_audio_frame(frame: AudioFrame, stretch: float) -> AudioFrame:
+    """
+    Time-stretch an audio frame without changing its pitch.
+
+    A segment in the middle of the frame is repeated to expand it, or skipped
+    to accelerate it, with a crossfade to avoid clicks.
+
+    :param stretch: The fraction of the frame's duration to add if positive,
+                    or to remove if negative.
+    """
+    channels = len(frame.layout.channels)
+    samples = frame.samples
+    length = int(abs(stretch) * samples)
+    if frame.format.name != "s16" or length == 0 or 2 * length > samples:
+        return frame
+
+    # The plane may be padded beyond the samples.
+    source = array.array("h", bytes(frame.planes[0]))[: samples * channels]
+    # Crossfade from the segment at `fade_out` into the one at `fade_in`: an
+    # earlier segment repeats audio, a later one skips audio.
+    middle = (samples - 2 * length) // 2
+    if stretch > 0:
+        fade_out, fade_in = middle + length, middle
+    else:
+        fade_out, fade_in = middle, middle + length
+
+    data = source[: fade_out * channels]
+    for i in range(length * channels):
+        weight = (i // channels + 1) / (length + 1)
+        data.append(
+            round(
+                source[fade_out * channels + i] * (1 - weight)
+                + source[fade_in * channels + i] * weight
+            )
+        )
+    data += source[(fade_in + length) * channels :]
+
+    stretched = AudioFrame(
+        format="s16", layout=frame.layout.name, samples=len(data) // channels
+    )
+    stretched.planes[0].update(data.tobytes())
+    stretched.pts = frame.pts
+    stretched.sample_rate = frame.sample_rate
+    stretched.time_base = frame.time_base
+    return stretched
+
+
 class NackGenerator:
-    def __init__(self) -> None:
+    """
+    Track missing packets and schedule the NACKs requesting them.
+
+    A missing packet is requested as soon as the gap is detected, then again
+    each time a round-trip time has elapsed without it arriving, up to
+    `max_retries` times.
+    """
+
+    def __init__(self, max_retries: int = NACK_MAX_RETRIES) -> None:
+        self.max_retries = max_retries
         self.max_seq: Optional[int] = None
-        self.missing: set[int] = set()
+
+        # the lowest sequence number which may still be tracked
+        self.__min_seq: Optional[int] = None
+        # the number of NACKs sent and the time of the last one, per missing
+        # packet, in sequence order as gaps are only ever added after max_seq
+        self.__missing: dict[int, tuple[int, int]] = {}
+
+    @property
+    def missing(self) -> set[int]:
+        return set(self.__missing)
 
     def add(self, packet: RtpPacket) -> bool:
         """
@@ -89,24 +267,61 @@ class NackGenerator:
 
         if self.max_seq is None:
             self.max_seq = packet.sequence_number
+            self.__min_seq = packet.sequence_number
             return missed
 
-        # mark missing packets
+        # mark missing packets, only the most recent ones can be tracked
         if uint16_gt(packet.sequence_number, self.max_seq):
             seq = uint16_add(self.max_seq, 1)
+            if uint16_gt(packet.sequence_number, uint16_add(seq, RTP_HISTORY_SIZE)):
+                seq = uint16_add(packet.sequence_number, -RTP_HISTORY_SIZE)
             while uint16_gt(packet.sequence_number, seq):
-                self.missing.add(seq)
+                self.__missing[seq] = (0, 0)
                 missed = True
                 seq = uint16_add(seq, 1)
             self.max_seq = packet.sequence_number
         else:
-            self.missing.discard(packet.sequence_number)
+            self.__missing.pop(packet.sequence_number, None)
 
         # limit number of tracked packets
         self.truncate()
 
         return missed
 
+    def expire(self, sequence_number: int) -> None:
+        """
+        Stop tracking the missing packets before `sequence_number`, for
+        instance because the jitter buffer no longer awaits them.
+        """
+        if self.__min_seq is None or not uint16_gt(sequence_number, self.__min_seq):
+            return
+
+        # the oldest missing packets come first
+        while self.__missing:
+            seq = next(iter(self.__missing))
+            if not uint16_gt(sequence_number, seq):
+                break
+            del self.__missing[seq]
+        self.__min_seq = sequence_number
+
+    def get_nack(self, now_ms: int, rtt_ms: int) -> list[int]:
+        """
+        Return the missing packets which should be requested now: those which
+        were never requested, and those whose last request is at least one
+        round-trip time old. Packets requested `max_retries` times are given
+        up on.
+        """
+        lost = []
+        for seq, (count, sent_ms) in list(self.__missing.items()):
+            if count and now_ms - sent_ms < rtt_ms:
+                continue
+            if count >= self.max_retries:
+                del self.__missing[seq]
+                continue
+            self.__missing[seq] = (count + 1, now_ms)
+            lost.append(seq)
+        return lost
+
     def truncate(self) -> None:
         """
         Limit the number of missing packets we track.
@@ -114,10 +329,7 @@ class NackGenerator:
         Otherwise, the size of RTCP FB messages grows indefinitely.
         """
         if self.max_seq is not None:
-            min_seq = uint16_add(self.max_seq, -RTP_HISTORY_SIZE)
-            for seq in list(self.missing):
-                if uint16_gt(min_seq, seq):
-                    self.missing.discard(seq)
+            self.expire(uint16_add(self.max_seq, -RTP_HISTORY_SIZE))
 
 
 class StreamStatistics:
@@ -188,6 +400,182 @@ class StreamStatistics:
         return clamp_packets_lost(self.packets_expected - self.packets_received)
 
 
+class PlayoutDelay:
+    """
+    Adapt the audio playout delay, which is the number of frames prefetched by
+    the jitter buffer, to the inter-arrival jitter.
+
+    Rather than stalling or skipping audio when the delay changes, decoded
+    frames are time-stretched a little at a time. The jitter buffer only
+    gains or releases a frame once a whole frame's worth of audio has been
+    added or removed.
+    """
+
+    def __init__(self, jitter_buffer: JitterBuffer) -> None:
+        self.jitter_buffer = jitter_buffer
+        self._frame_duration: Optional[float] = None
+        self._last_timestamp: Optional[int] = None
+        self._stretched = 0.0
+        self._target_frames = float(jitter_buffer.prefetch)
+
+        # cumulative statistics
+        self.delay_total = 0.0
+        self.emitted_count = 0
+        self.target_delay_total = 0.0
+
+    @property
+    def delay(self) -> float:
+        """
+        The current playout delay, in seconds.
+        """
+        return self.__to_seconds(self.jitter_buffer.prefetch + self._stretched)
+
+    @property
+    def target_delay(self) -> float:
+        """
+        The playout delay the jitter buffer converges to, in seconds.
+        """
+        return self.__to_seconds(self._target_frames)
+
+    def update(self, frame: JitterFrame, jitter: int, clockrate: int) -> float:
+        """
+        Account for a frame leaving the jitter buffer.
+
+        :param jitter: The inter-arrival jitter, in RTP timestamp units.
+        :param clockrate: The RTP clock rate of the frame's codec.
+        :return: The fraction of the frame's duration to add if positive, or to
+                 remove if negative, when decoding it.
+        """
+        # learn the frame duration, ignoring gaps due to DTX
+        if self._last_timestamp is not None:
+            delta = (frame.timestamp - self._last_timestamp) & 0xFFFFFFFF
+            if 0 < delta < 0x80000000:
+                duration = delta / (frame.lost + 1) / clockrate
+                if self._frame_duration is None or duration < self._frame_duration:
+                    self._frame_duration = duration
+        self._last_timestamp = frame.timestamp
+        if self._frame_duration is None:
+            return 0.0
+
+        self._target_frames = min(
+            max(
+                PLAYOUT_JITTER_FACTOR * jitter / clockrate / self._frame_duration + 1,
+                PLAYOUT_MIN_FRAMES,
+            ),
+            PLAYOUT_MAX_FRAMES,
+        )
+
+        # Converge towards the target a whole frame at a time. Only remove a
+        # frame if the delay stays above the target, so it does not oscillate.
+        current = self.jitter_buffer.prefetch + self._stretched
+        stretch = 0.0
+        if math.floor(current) < self._target_frames:
+            stretch = PLAYOUT_STRETCH
+        elif math.ceil(current) - 1 >= self._target_frames:
+            stretch = -PLAYOUT_STRETCH
+        self._stretched += stretch
+        if self._stretched >= 1:
+            self.jitter_buffer.prefetch += 1
+            self._stretched -= 1
+        elif self._stretched <= -1:
+            self.jitter_buffer.prefetch -= 1
+            self._stretched += 1
+
+        self.delay_total += self.delay
+        self.emitted_count += 1
+        self.target_delay_total += self.target_delay
+        return stretch
+
+    def __to_seconds(self, frames: float) -> float:
+        if self._frame_duration is None:
+            return 0.0
+        return frames * self._frame_duration
+
+
+class KeyframeSampler:
+    """
+    Select the video keyframes to decode, at most `frame_rate` per second if
+    it is set, and tell when a keyframe should be requested to keep up that
+    rate.
+    """
+
+    def __init__(self, frame_rate: Optional[float] = None) -> None:
+        self.frame_rate = frame_rate
+        self._next_time: Optional[int] = None
+
+    def accept(self, frame: JitterFrame, now_ms: int) -> bool:
+        """
+        Check whether the frame received at `now_ms` should be decoded.
+        """
+        if not frame.keyframe or (
+            self._next_time is not None and now_ms < self._next_time
+        ):
+            return False
+        if self.frame_rate:
+            self._next_time = now_ms + int(1000 / self.frame_rate)
+        return True
+
+    def keyframe_needed(self, now_ms: int) -> bool:
+        """
+        Check whether a keyframe is due and should be requested.
+        """
+        return bool(self.frame_rate) and (
+            self._next_time is None or now_ms >= self._next_time
+        )
+
+
+class MediaSynchronizer:
+    """
+    Synchronize the tracks of a remote media stream, for instance to keep its
+    audio and video in lip sync.
+
+    The RTCP sender reports of each track give the sender's NTP time at which
+    its RTP timestamps start. The decoded frames of all the tracks are stamped
+    relative to the earliest of these times, so their presentation times can
+    be compared. If `delay_playout` is set, frames of the tracks which are
+    ahead are held back until the other tracks catch up.
+    """
+
+    def __init__(self, delay_playout: bool = False) -> None:
+        self.delay_playout = delay_playout
+        self.origin: Optional[float] = None
+        "The NTP time at which the presentation time is zero, in seconds."
+
+        # how late each track's frames are received, compared to their
+        # presentation time, in seconds
+        self._lags: dict[MediaStreamTrack, Optional[float]] = {}
+
+    def add_track(self, track: MediaStreamTrack) -> None:
+        """
+        Add a track of the media stream.
+        """
+        self._lags[track] = None
+
+    def playout_delay(
+        self, track: MediaStreamTrack, presentation_time: float, now: float
+    ) -> float:
+        """
+        Return how long to hold back a frame of `track` received at `now`, so
+        that it is played out in sync with the other tracks.
+        """
+        lag = now - presentation_time
+        previous = self._lags.get(track)
+        if previous is not None:
+            lag = previous + (lag - previous) * SYNC_LAG_SMOOTHING
+        self._lags[track] = lag
+
+        if not self.delay_playout or None in self._lags.values():
+            return 0.0
+        return min(max(self._lags.values()) - lag, SYNC_MAX_DELAY)
+
+    def synchronize(self, ntp_origin: float) -> None:
+        """
+        Record the NTP time at which the timestamps of a track start.
+        """
+        if self.origin is None or ntp_origin < self.origin:
+            self.origin = ntp_origin
+
+
 class RemoteStreamTrack(MediaStreamTrack):
     def __init__(self, kind: str, id: Optional[str] = None) -> None:
         super().__init__()
@@ -196,6 +584,12 @@ class RemoteStreamTrack(MediaStreamTrack):
             self._id = id
         self._queue: asyncio.Queue = asyncio.Queue()
 
+        # set once the track's timestamps are synchronized
+        self._synchronizer: Optional[MediaSynchronizer] = None
+
+        # set while the receiver times the stages of its pipeline
+        self._stage_timer: Optional[StageTimer] = None
+
     async def recv(self) -> Frame:
         """
         Receive the next frame.
@@ -207,6 +601,24 @@ class RemoteStreamTrack(MediaStreamTrack):
         if frame is None:
             self.stop()
             raise MediaStreamError
+        if self._stage_timer is not None:
+            self._stage_timer.measure("trackQueue", frame)
+
+        # wait for the other tracks of the media stream
+        if (
+            self._synchronizer is not None
+            and frame.pts is not None
+            and frame.time_base is not None
+        ):
+            delay = self._synchronizer.playout_delay(
+                self,
+                presentation_time=frame.pts
+                * frame.time_base.numerator
+                / frame.time_base.denominator,
+                now=time.monotonic(),
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
         return frame
 
 
@@ -215,6 +627,11 @@ class TimestampMapper:
         self._last: Optional[int] = None
         self._origin: Optional[int] = None
 
+        # lip synchronization
+        self._clockrate = 0
+        self._ntp_origin: Optional[float] = None
+        self.synchronizer: Optional[MediaSynchronizer] = None
+
     def map(self, timestamp: int) -> int:
         if self._origin is None:
             # first timestamp
@@ -224,8 +641,30 @@ class TimestampMapper:
             self._origin -= 1 << 32
 
         self._last = timestamp
+        if self._ntp_origin is not None and self.synchronizer is not None:
+            # shift onto the presentation time shared with the other tracks
+            return (
+                timestamp
+                - self._origin
+                + round((self._ntp_origin - self.synchronizer.origin) * self._clockrate)
+            )
         return timestamp - self._origin
 
+    def synchronize(self, ntp_time: float, rtp_timestamp: int, clockrate: int) -> bool:
+        """
+        Map the timestamps onto the sender's NTP clock using the timestamps of
+        an RTCP sender report. Return `True` if the mapping is known.
+        """
+        if self._last is None or self._origin is None or self.synchronizer is None:
+            return False
+
+        # the RTP timestamp relative to the first one
+        delta = (rtp_timestamp - self._last + (1 << 31)) % (1 << 32) - (1 << 31)
+        self._clockrate = clockrate
+        self._ntp_origin = ntp_time - (self._last + delta - self._origin) / clockrate
+        self.synchronizer.synchronize(self._ntp_origin)
+        return True
+
 
 @dataclass
 class RTCRtpContributingSource:
@@ -253,6 +692,23 @@ class RTCRtpSynchronizationSource:
     "The SSRC identifier associated with this source."
 
 
+@dataclass
+class RTCEncodedFrame:
+    """
+    The :class:`RTCEncodedFrame` dictionary contains a frame received by an
+    :class:`RTCRtpReceiver`, before decoding.
+    """
+
+    codec: RTCRtpCodecParameters
+    "The codec the frame is encoded with."
+    data: bytes
+    "The encoded frame, in the codec's bitstream format."
+    keyframe: bool
+    "Whether the frame can be decoded without the previous frames."
+    timestamp: int
+    "The RTP timestamp of the frame."
+
+
 class RTCRtpReceiver:
     """
     The :class:`RTCRtpReceiver` interface manages the reception and decoding
@@ -269,30 +725,54 @@ class RTCRtpReceiver:
         self._enabled = True
         self.__active_ssrc: dict[int, datetime.datetime] = {}
         self.__codecs: dict[int, RTCRtpCodecParameters] = {}
+        self.__decoded_clockrate = 0
+        self.__decoded_ssrc: Optional[int] = None
+        self.__decoder_parameters = RTCRtpDecoderParameters()
         self.__decoder_queue: queue.Queue = queue.Queue()
+        self.__decoder_stats = DecoderStatistics()
         self.__decoder_thread: Optional[threading.Thread] = None
+        self.__encoded_frames: Optional[asyncio.Queue] = None
+        self.__frames_skipped = 0
+        self.__keyframe_sampler: Optional[KeyframeSampler] = None
         self.__kind = kind
         if kind == "audio":
             self.__jitter_buffer = JitterBuffer(capacity=16, prefetch=4)
             self.__nack_generator = None
+            self.__playout_delay: Optional[PlayoutDelay] = PlayoutDelay(
+                self.__jitter_buffer
+            )
             self.__remote_bitrate_estimator = None
         else:
             self.__jitter_buffer = JitterBuffer(capacity=128, is_video=True)
             self.__nack_generator = NackGenerator()
+            self.__playout_delay = None
             self.__remote_bitrate_estimator = RemoteBitrateEstimator()
+        self.__pli_time: Optional[int] = None
+        # the sequence number and timestamp of the latest redundant audio packet
+        self.__red_previous: Optional[tuple[int, int]] = None
         self._track: Optional[RemoteStreamTrack] = None
         self.__rtcp_exited = asyncio.Event()
         self.__rtcp_started = asyncio.Event()
         self.__rtcp_task: Optional[asyncio.Future[None]] = None
+        self.__nack_ssrc: Optional[int] = None
+        self.__nack_task: Optional[asyncio.Future[None]] = None
+        self.__rid_ssrc: dict[str, int] = {}
         self.__rtx_ssrc: dict[int, int] = {}
+        self.__simulcast_rid: Optional[str] = None
+        self.__simulcast_rids: list[str] = []
+        self.__simulcast_ssrc: Optional[int] = None
+        self.__stage_timer: Optional[StageTimer] = None
         self.__started = False
         self.__stats = RTCStatsReport()
+        self.__temporal_layer_filter: Optional[Vp8TemporalLayerFilter] = None
         self.__timestamp_mapper = TimestampMapper()
         self.__transport = transport
 
         # RTCP
         self.__lsr: dict[int, int] = {}
         self.__lsr_time: dict[int, float] = {}
+        self.__nack_count = 0
+        self.__pli_count = 0
         self.__remote_streams: dict[int, StreamStatistics] = {}
         self.__rtcp_ssrc: Optional[int] = None
 
@@ -328,6 +808,32 @@ class RTCRtpReceiver:
         """
         return get_capabilities(kind)
 
+    def encodedFrames(self) -> AsyncIterator[RTCEncodedFrame]:
+        """
+        Receive the frames as :class:`RTCEncodedFrame` instead of decoding
+        them, for instance to record or forward them.
+
+        This must be called before the receiver starts, for instance when
+        the :class:`RTCPeerConnection` emits the `track` event. The decoder
+        is then never started and the receiver's track ends without any
+        frames.
+
+        The iteration ends when the receiver stops.
+        """
+        if self.__started:
+            raise InvalidStateError("RTCRtpReceiver has already started")
+        if self.__encoded_frames is None:
+            self.__encoded_frames = asyncio.Queue()
+        return self.__iterate_encoded_frames(self.__encoded_frames)
+
+    def getDecoderParameters(self) -> RTCRtpDecoderParameters:
+        """
+        Returns the parameters of the receiver's decoder.
+
+        :rtype: :class:`RTCRtpDecoderParameters`
+        """
+        return dataclasses.replace(self.__decoder_parameters)
+
     async def getStats(self) -> RTCStatsReport:
         """
         Returns statistics about the RTP receiver.
@@ -335,23 +841,42 @@ class RTCRtpReceiver:
         :rtype: :class:`RTCStatsReport`
         """
         for ssrc, stream in self.__remote_streams.items():
-            self.__stats.add(
-                RTCInboundRtpStreamStats(
-                    # RTCStats
-                    timestamp=clock.current_datetime(),
-                    type="inbound-rtp",
-                    id="inbound-rtp_" + str(id(self)),
-                    # RTCStreamStats
-                    ssrc=ssrc,
-                    kind=self.__kind,
-                    transportId=self.transport._stats_id,
-                    # RTCReceivedRtpStreamStats
-                    packetsReceived=stream.packets_received,
-                    packetsLost=stream.packets_lost,
-                    jitter=stream.jitter,
-                    # RTPInboundRtpStreamStats
-                )
+            stats = RTCInboundRtpStreamStats(
+                # RTCStats
+                timestamp=clock.current_datetime(),
+                type="inbound-rtp",
+                id="inbound-rtp_" + str(id(self)),
+                # RTCStreamStats
+                ssrc=ssrc,
+                kind=self.__kind,
+                transportId=self.transport._stats_id,
+                # RTCReceivedRtpStreamStats
+                packetsReceived=stream.packets_received,
+                packetsLost=stream.packets_lost,
+                jitter=stream.jitter,
+                # RTPInboundRtpStreamStats
             )
+            if self.__playout_delay is not None:
+                stats.jitterBufferDelay = self.__playout_delay.delay_total
+                stats.jitterBufferTargetDelay = self.__playout_delay.target_delay_total
+                stats.jitterBufferEmittedCount = self.__playout_delay.emitted_count
+            else:
+                decoder_stats = self.__decoder_stats
+                stats.framesDecoded = decoder_stats.frames_decoded
+                stats.keyFramesDecoded = decoder_stats.key_frames_decoded
+                stats.framesDropped = (
+                    self.__jitter_buffer.frames_dropped + self.__frames_skipped
+                )
+                stats.totalDecodeTime = decoder_stats.total_decode_time
+                stats.jitterBufferDelay = self.__jitter_buffer.delay_total
+                stats.jitterBufferEmittedCount = self.__jitter_buffer.emitted_count
+                stats.nackCount = self.__nack_count
+                # FIR is never sent, keyframes are requested using PLI.
+                stats.pliCount = self.__pli_count
+            self.__stats.add(stats)
+        if self.__stage_timer is not None:
+            for stage_stats in self.__stage_timer.get_stats(str(id(self))):
+                self.__stats.add(stage_stats)
         self.__stats.update(self.transport._get_stats())
 
         return self.__stats
@@ -380,25 +905,136 @@ class RTCRtpReceiver:
             for codec in parameters.codecs:
                 self.__codecs[codec.payloadType] = codec
             for encoding in parameters.encodings:
-                if encoding.rtx:
+                if encoding.rtx and encoding.ssrc is not None:
                     self.__rtx_ssrc[encoding.rtx.ssrc] = encoding.ssrc
+                if encoding.rid is not None:
+                    self.__simulcast_rids.append(encoding.rid)
+            if self.__simulcast_rid not in self.__simulcast_rids:
+                self.__simulcast_rid = (
+                    self.__simulcast_rids[0] if self.__simulcast_rids else None
+                )
 
-            # start decoder thread
-            self.__decoder_thread = threading.Thread(
-                target=decoder_worker,
-                name=self.__kind + "-decoder",
-                args=(
-                    asyncio.get_event_loop(),
-                    self.__decoder_queue,
-                    self._track._queue,
-                ),
-            )
-            self.__decoder_thread.start()
+            # start decoder thread, unless encoded frames are requested
+            if self.__encoded_frames is None:
+                self.__decoder_thread = threading.Thread(
+                    target=decoder_worker,
+                    name=self.__kind + "-decoder",
+                    args=(
+                        asyncio.get_event_loop(),
+                        self.__decoder_queue,
+                        self._track._queue,
+                        self.__decoder_stats,
+                    ),
+                )
+                self.__decoder_thread.start()
 
             self.__transport._register_rtp_receiver(self, parameters)
             self.__rtcp_task = asyncio.ensure_future(self._run_rtcp())
+            if self.__nack_generator is not None:
+                self.__nack_task = asyncio.ensure_future(self._run_nack())
             self.__started = True
 
+    def setDecoderParameters(self, parameters: RTCRtpDecoderParameters) -> None:
+        """
+        Update the parameters of the receiver's decoder.
+
+        Video frames are converted to the requested format and size in the
+        decoder's thread, which keeps this work off the event loop. The
+        threading changes from the next keyframe.
+
+        :param parameters: The :class:`RTCRtpDecoderParameters` for the decoder,
+                           as returned by :meth:`getDecoderParameters`.
+        """
+        if parameters.threadCount is not None and parameters.threadCount < 1:
+            raise ValueError("threadCount must be at least 1")
+        for size in (parameters.width, parameters.height):
+            if size is not None and size < 1:
+                raise ValueError("width and height must be at least 1")
+        if parameters.format is not None:
+            try:
+                VideoFormat(parameters.format)
+            except ValueError:
+                raise ValueError(f"Unsupported pixel format `{parameters.format}`")
+        if parameters.ndarray and importlib.util.find_spec("numpy") is None:
+            raise ValueError("NumPy is required to deliver frames as arrays")
+        self.__decoder_parameters = dataclasses.replace(parameters)
+
+    def setKeyframeDecoding(
+        self, enabled: bool, frameRate: Optional[float] = None
+    ) -> None:
+        """
+        Decode only the keyframes of a video stream, for instance to sample a
+        few frames per second for analysis while decoding as little as
+        possible.
+
+        Interframes are dropped before decoding. If `frameRate` is set, at
+        most that many keyframes per second are decoded, and keyframes are
+        requested from the sender with picture loss indications when they
+        are not sent often enough.
+
+        :param enabled: Whether to decode only keyframes.
+        :param frameRate: The number of frames per second to deliver, or `None`
+                          to decode the keyframes the sender chooses to send.
+        """
+        if enabled and self.__kind == "video":
+            self.__keyframe_sampler = KeyframeSampler(frameRate)
+        else:
+            self.__keyframe_sampler = None
+
+    def setStageTiming(self, enabled: bool) -> None:
+        """
+        Time how long packets and frames spend in each stage of the receiver's
+        pipeline, from SRTP decryption to the track.
+
+        The times are aggregated into histograms which :meth:`getStats`
+        reports as :class:`RTCStageTimingStats`. Stage timing is disabled by
+        default, and then costs nothing.
+
+        :param enabled: Whether to time the stages of the pipeline.
+        """
+        if enabled and self.__stage_timer is None:
+            self.__stage_timer = StageTimer(RECEIVER_STAGES)
+            self.__transport._stage_timing += 1
+        elif not enabled and self.__stage_timer is not None:
+            self.__stage_timer = None
+            self.__transport._stage_timing -= 1
+            remove_stage_timing_stats(self.__stats)
+        if self._track is not None:
+            self._track._stage_timer = self.__stage_timer
+
+    def setMaxTemporalLayer(self, layer: Optional[int]) -> None:
+        """
+        Set the highest temporal layer to decode, to lower the frame rate of a
+        video stream sent with temporal layers (VP8 only).
+
+        Upper layers are dropped before decoding, without any request to the
+        sender.
+
+        :param layer: The highest temporal layer ID to decode, or `None` to
+                      decode all layers.
+        """
+        if layer is None:
+            self.__temporal_layer_filter = None
+        elif self.__temporal_layer_filter is None:
+            self.__temporal_layer_filter = Vp8TemporalLayerFilter(layer)
+        else:
+            self.__temporal_layer_filter.max_temporal_layer = layer
+
+    def setSimulcastLayer(self, rid: str) -> None:
+        """
+        Select the simulcast layer to decode, when the remote party sends
+        simulcast video.
+
+        By default the first layer offered by the remote party is decoded. The
+        other layers are received but dropped before decoding. Switching
+        layers requests a keyframe from the sender.
+
+        :param rid: The RTP stream ID of the layer to decode.
+        """
+        if self.__started and rid not in self.__simulcast_rids:
+            raise ValueError(f"Unknown simulcast layer `{rid}`")
+        self.__simulcast_rid = rid
+
     def setTransport(self, transport: RTCDtlsTransport) -> None:
         self.__transport = transport
 
@@ -415,6 +1051,11 @@ class RTCRtpReceiver:
             self.__rtcp_task.cancel()
             await self.__rtcp_exited.wait()
 
+            # shutdown NACK task
+            if self.__nack_task is not None:
+                self.__nack_task.cancel()
+                await asyncio.gather(self.__nack_task, return_exceptions=True)
+
     def _handle_disconnect(self) -> None:
         self.__stop_decoder()
 
@@ -445,6 +1086,18 @@ class RTCRtpReceiver:
                 (packet.sender_info.ntp_timestamp) >> 16
             ) & 0xFFFFFFFF
             self.__lsr_time[packet.ssrc] = time.time()
+
+            # synchronize the track with the other tracks of its media stream
+            if (
+                packet.ssrc == self.__decoded_ssrc
+                and self.__timestamp_mapper.synchronize(
+                    ntp_time=packet.sender_info.ntp_timestamp / (1 << 32),
+                    rtp_timestamp=packet.sender_info.rtp_timestamp,
+                    clockrate=self.__decoded_clockrate,
+                )
+                and self._track is not None
+            ):
+                self._track._synchronizer = self.__timestamp_mapper.synchronizer
         elif isinstance(packet, RtcpByePacket):
             self.__stop_decoder()
 
@@ -458,6 +1111,15 @@ class RTCRtpReceiver:
         if not self._enabled:
             return
 
+        # time the decryption and parsing done by the transport
+        timer = self.__stage_timer
+        stage_times = None
+        if timer is not None:
+            stage_times = getattr(packet, "_stage_times", None)
+            if stage_times is not None:
+                timer.add("srtp", stage_times[1] - stage_times[0])
+                timer.add("parse", stage_times[2] - stage_times[1])
+
         # feed bitrate estimator
         if self.__remote_bitrate_estimator is not None:
             if packet.extensions.abs_send_time is not None:
@@ -493,9 +1155,17 @@ class RTCRtpReceiver:
             self.__remote_streams[packet.ssrc] = StreamStatistics(codec.clockRate)
         self.__remote_streams[packet.ssrc].add(packet)
 
+        # learn which SSRC carries each simulcast layer
+        if packet.extensions.rtp_stream_id is not None:
+            self.__rid_ssrc[packet.extensions.rtp_stream_id] = packet.ssrc
+
         # unwrap retransmission packet
         if is_rtx(codec):
             original_ssrc = self.__rtx_ssrc.get(packet.ssrc)
+            if original_ssrc is None and packet.extensions.repaired_rtp_stream_id:
+                original_ssrc = self.__rid_ssrc.get(
+                    packet.extensions.repaired_rtp_stream_id
+                )
             if original_ssrc is None:
                 self.__log_debug("x RTX packet from unknown SSRC %d", packet.ssrc)
                 return
@@ -511,34 +1181,186 @@ class RTCRtpReceiver:
             packet = unwrap_rtx(packet, payload_type=apt, ssrc=original_ssrc)
             codec = self.__codecs[apt]
 
-        # send NACKs for any missing any packets
-        if self.__nack_generator is not None and self.__nack_generator.add(packet):
-            await self._send_rtcp_nack(
-                packet.ssrc, sorted(self.__nack_generator.missing)
-            )
+        # when receiving simulcast, only decode the selected layer
+        if self.__simulcast_rids:
+            ssrc = self.__rid_ssrc.get(self.__simulcast_rid)
+            if packet.ssrc != ssrc:
+                return
+            if ssrc != self.__simulcast_ssrc:
+                await self.__switch_simulcast_layer(ssrc)
+
+        # send NACKs for the packets found missing, _run_nack repeats them
+        rtt = self.__transport._rtt or DEFAULT_RTT
+        if self.__nack_generator is not None:
+            self.__nack_ssrc = packet.ssrc
+            missed = self.__nack_generator.add(packet)
+            # the temporal layer filter renumbers the packets it lets through
+            if (
+                self.__temporal_layer_filter is None
+                and self.__jitter_buffer.origin is not None
+            ):
+                self.__nack_generator.expire(self.__jitter_buffer.origin)
+            if missed:
+                lost = self.__nack_generator.get_nack(
+                    now_ms=arrival_time_ms, rtt_ms=int(rtt * 1000)
+                )
+                if lost:
+                    await self._send_rtcp_nack(packet.ssrc, lost)
+
+        # drop the temporal layers which are not decoded
+        if (
+            self.__temporal_layer_filter is not None
+            and codec.mimeType.lower() == "video/vp8"
+        ):
+            try:
+                filtered = self.__temporal_layer_filter.filter(packet)
+            except ValueError as exc:
+                self.__log_debug("x RTP payload parsing failed: %s", exc)
+                return
+            if filtered is None:
+                return
+            packet = filtered
+
+        # unwrap redundant audio, recovering any lost packets it carries
+        if is_red(codec):
+            try:
+                packets = unwrap_red(packet, self.__red_previous)
+            except ValueError as exc:
+                self.__log_debug("x RED payload parsing failed: %s", exc)
+                return
+            if self.__red_previous is None or uint16_gt(
+                packet.sequence_number, self.__red_previous[0]
+            ):
+                self.__red_previous = (packet.sequence_number, packet.timestamp)
+        else:
+            packets = [packet]
+
+        for packet in packets:
+            codec = self.__codecs.get(packet.payload_type)
+            if codec is None or is_red(codec):
+                continue
+
+            # parse codec-specific information
+            try:
+                if packet.payload:
+                    packet._data = depayload(codec, packet.payload)  # type: ignore
+                    if self.__kind == "video":
+                        packet._description = describe(  # type: ignore
+                            codec, packet.payload
+                        )
+                else:
+                    packet._data = b""  # type: ignore
+            except ValueError as exc:
+                self.__log_debug("x RTP payload parsing failed: %s", exc)
+                continue
+
+            # wait for retransmissions for a few round-trip times at most
+            if self.__kind == "video":
+                self.__jitter_buffer.nack_deadline = max(
+                    NACK_DEADLINE_MIN_MS, int(NACK_DEADLINE_RTTS * rtt * 1000)
+                )
 
-        # parse codec-specific information
-        try:
-            if packet.payload:
-                packet._data = depayload(codec, packet.payload)  # type: ignore
-            else:
-                packet._data = b""  # type: ignore
-        except ValueError as exc:
-            self.__log_debug("x RTP payload parsing failed: %s", exc)
-            return
+            # try to re-assemble encoded frame
+            pli_flag, encoded_frame = self.__jitter_buffer.add(
+                packet, arrival_time_ms=arrival_time_ms
+            )
+            if timer is not None and stage_times is not None:
+                timer.add("depacketize", time.perf_counter() - stage_times[2])
+            # when decoding only keyframes, only request them when one is due
+            if self.__keyframe_sampler is not None:
+                pli_flag = self.__keyframe_sampler.keyframe_needed(arrival_time_ms)
+
+            # check if the PLI should be sent
+            if pli_flag and (
+                self.__pli_time is None
+                or arrival_time_ms - self.__pli_time
+                >= max(PLI_MIN_INTERVAL_MS, int(rtt * 1000))
+            ):
+                self.__pli_time = arrival_time_ms
+                await self._send_rtcp_pli(packet.ssrc)
 
-        # try to re-assemble encoded frame
-        pli_flag, encoded_frame = self.__jitter_buffer.add(packet)
-        # check if the PLI should be sent
-        if pli_flag:
-            await self._send_rtcp_pli(packet.ssrc)
+            # if we have a complete encoded frame, decode it
+            while encoded_frame is not None and (
+                self.__decoder_thread or self.__encoded_frames is not None
+            ):
+                if timer is not None and encoded_frame.arrival_time_ms is not None:
+                    timer.add(
+                        "jitterBuffer",
+                        (arrival_time_ms - encoded_frame.arrival_time_ms) / 1000,
+                    )
+                if self.__keyframe_sampler is None or self.__keyframe_sampler.accept(
+                    encoded_frame, arrival_time_ms
+                ):
+                    self.__deliver_frame(codec, packet.ssrc, encoded_frame)
+                else:
+                    self.__frames_skipped += 1
+
+                # release a frame if the playout delay was lowered, or a video
+                # frame which was waiting for a skipped frame
+                encoded_frame = self.__jitter_buffer.pop()
+
+    def __deliver_frame(
+        self, codec: RTCRtpCodecParameters, ssrc: int, encoded_frame: JitterFrame
+    ) -> None:
+        """
+        Pass a complete encoded frame to the decoder, or to the consumer of
+        encoded frames.
+        """
+        # adapt the audio playout delay
+        stretch = 0.0
+        if self.__playout_delay is not None:
+            stretch = self.__playout_delay.update(
+                encoded_frame,
+                jitter=self.__remote_streams[ssrc].jitter,
+                clockrate=codec.clockRate,
+            )
 
-        # if we have a complete encoded frame, decode it
-        if encoded_frame is not None and self.__decoder_thread:
+        if self.__encoded_frames is not None:
+            # deliver the frame without decoding it
+            self.__encoded_frames.put_nowait(
+                RTCEncodedFrame(
+                    codec=codec,
+                    data=assemble(codec, encoded_frame.data),
+                    keyframe=encoded_frame.keyframe or self.__kind == "audio",
+                    timestamp=encoded_frame.timestamp,
+                )
+            )
+        else:
+            self.__decoded_clockrate = codec.clockRate
+            self.__decoded_ssrc = ssrc
             encoded_frame.timestamp = self.__timestamp_mapper.map(
                 encoded_frame.timestamp
             )
-            self.__decoder_queue.put((codec, encoded_frame))
+            if self.__stage_timer is not None:
+                self.__stage_timer.mark(encoded_frame)
+            self.__decoder_queue.put(
+                (
+                    codec,
+                    encoded_frame,
+                    stretch,
+                    self.__decoder_parameters,
+                    self.__stage_timer,
+                )
+            )
+
+    async def __switch_simulcast_layer(self, ssrc: int) -> None:
+        """
+        Start decoding a different simulcast layer, from its next keyframe.
+        """
+        self.__log_debug("- decoding simulcast layer %s", self.__simulcast_rid)
+        previous_ssrc = self.__simulcast_ssrc
+        self.__simulcast_ssrc = ssrc
+
+        # the layers have their own sequence numbers
+        self.__jitter_buffer = JitterBuffer(capacity=128, is_video=True)
+        self.__nack_generator = NackGenerator()
+        if self.__temporal_layer_filter is not None:
+            self.__temporal_layer_filter = Vp8TemporalLayerFilter(
+                self.__temporal_layer_filter.max_temporal_layer
+            )
+
+        if previous_ssrc is not None:
+            await self._send_rtcp_pli(ssrc)
 
     async def _run_rtcp(self) -> None:
         self.__log_debug("- RTCP started")
@@ -583,6 +1405,25 @@ class RTCRtpReceiver:
         self.__log_debug("- RTCP finished")
         self.__rtcp_exited.set()
 
+    async def _run_nack(self) -> None:
+        """
+        Request the missing packets again once a round-trip time has elapsed,
+        even if no more packets arrive.
+        """
+        try:
+            while True:
+                await asyncio.sleep(NACK_INTERVAL)
+                if self.__nack_generator is None or self.__nack_ssrc is None:
+                    continue
+                rtt = self.__transport._rtt or DEFAULT_RTT
+                lost = self.__nack_generator.get_nack(
+                    now_ms=clock.current_ms(), rtt_ms=int(rtt * 1000)
+                )
+                if lost:
+                    await self._send_rtcp_nack(self.__nack_ssrc, lost)
+        except asyncio.CancelledError:
+            pass
+
     async def _send_rtcp(self, packet: AnyRtcpPacket) -> None:
         self.__log_debug("> %s", packet)
         try:
@@ -600,6 +1441,7 @@ class RTCRtpReceiver:
             )
             packet.lost = lost
             await self._send_rtcp(packet)
+            self.__nack_count += 1
 
     async def _send_rtcp_pli(self, media_ssrc: int) -> None:
         """
@@ -610,15 +1452,40 @@ class RTCRtpReceiver:
                 fmt=RTCP_PSFB_PLI, ssrc=self.__rtcp_ssrc, media_ssrc=media_ssrc
             )
             await self._send_rtcp(packet)
+            self.__pli_count += 1
 
     def _set_rtcp_ssrc(self, ssrc: int) -> None:
         self.__rtcp_ssrc = ssrc
 
+    def _set_synchronizer(self, synchronizer: MediaSynchronizer) -> None:
+        """
+        Synchronize the track with the other tracks of its media stream.
+        """
+        assert self._track is not None, "the track must be created first"
+        synchronizer.add_track(self._track)
+        self.__timestamp_mapper.synchronizer = synchronizer
+
     def __stop_decoder(self) -> None:
         """
         Stop the decoder thread, which will in turn stop the track.
+
+        If encoded frames were requested, end them and stop the track.
         """
         if self.__decoder_thread:
             self.__decoder_queue.put(None)
             self.__decoder_thread.join()
             self.__decoder_thread = None
+        elif self.__encoded_frames is not None:
+            self.__encoded_frames.put_nowait(None)
+            self.__encoded_frames = None
+            if self._track is not None:
+                self._track._queue.put_nowait(None)
+
+    async def __iterate_encoded_frames(
+        self, encoded_frames: asyncio.Queue
+    ) -> AsyncIterator[RTCEncodedFrame]:
+        while True:
+            frame = await encoded_frames.get()
+            if frame is None:
+                return
+            yield frame
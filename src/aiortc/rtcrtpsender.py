@@ -1,27 +1,42 @@
 import asyncio
+import dataclasses
 import logging
 import random
+import re
 import time
 import traceback
 import uuid
+from collections import deque
 from collections.abc import Callable
 from typing import Optional, Union
 
-from av import AudioFrame
+from av import AudioFrame, VideoFrame
 from av.frame import Frame
 
 from . import clock, rtp
-from .codecs import get_capabilities, get_encoder, is_rtx
-from .codecs.base import Encoder
+from .codecs import (
+    describe,
+    get_capabilities,
+    get_encoder,
+    is_red,
+    is_rtx,
+    red_payload_types,
+)
+from .codecs.base import Encoder, scale_video_frames
 from .exceptions import InvalidStateError
 from .mediastreams import MediaStreamError, MediaStreamTrack
 from .rtcdtlstransport import RTCDtlsTransport
 from .rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
+    RTCRtpRtxParameters,
     RTCRtpSendParameters,
 )
 from .rtp import (
+    RED_MAX_BLOCK_LENGTH,
+    RED_MAX_TIMESTAMP_OFFSET,
     RTCP_PSFB_APP,
     RTCP_PSFB_FIR,
     RTCP_PSFB_PLI,
@@ -37,6 +52,7 @@ from .rtp import (
     RtcpSourceInfo,
     RtcpSrPacket,
     RtpPacket,
+    pack_red,
     unpack_remb_fci,
     wrap_rtx,
 )
@@ -45,12 +61,19 @@ from .stats import (
     RTCRemoteInboundRtpStreamStats,
     RTCStatsReport,
 )
+from .timing import StageTimer, remove_stage_timing_stats
 from .utils import random16, random32, uint16_add, uint32_add
 
 logger = logging.getLogger(__name__)
 
 RTT_ALPHA = 0.85
 
+# The number of previous audio frames attached to each RED packet.
+RED_DISTANCE = 2
+
+# The stages of the sending pipeline which are timed when enabled.
+SENDER_STAGES = ("trackRecv", "encode", "packetize", "send")
+
 
 def random_sequence_number() -> int:
     """
@@ -65,6 +88,74 @@ def random_sequence_number() -> int:
     return random16() % 32768
 
 
+def check_encodings(kind: str, encodings: list[RTCRtpEncodingParameters]) -> None:
+    """
+    Check the encodings requested for an :class:`RTCRtpSender`.
+    """
+    if len(encodings) > 1:
+        if kind != "video":
+            raise ValueError("Simulcast is only supported for video")
+        rids = [encoding.rid for encoding in encodings]
+        for rid in rids:
+            if rid is None or not re.fullmatch(r"[A-Za-z0-9_-]+", rid):
+                raise ValueError(f"Invalid rid `{rid}`")
+        if len(set(rids)) != len(rids):
+            raise ValueError("Encoding rids must be unique")
+    for encoding in encodings:
+        if (
+            encoding.scaleResolutionDownBy is not None
+            and encoding.scaleResolutionDownBy < 1
+        ):
+            raise ValueError("scaleResolutionDownBy must be at least 1")
+        if encoding.maxFramerate is not None and encoding.maxFramerate <= 0:
+            raise ValueError("maxFramerate must be greater than 0")
+
+
+class OutboundRtpStream:
+    """
+    The state of one RTP stream sent by an :class:`RTCRtpSender`, that is one
+    simulcast layer.
+    """
+
+    def __init__(self, encoding: RTCRtpEncodingParameters) -> None:
+        self.encoding = encoding
+        self.ssrc = encoding.ssrc if encoding.ssrc is not None else random32()
+        self.rtx_ssrc = encoding.rtx.ssrc if encoding.rtx else random32()
+
+        self.encoder: Optional[Encoder] = None
+        self.encoder_parameters_changed = False
+        self.target_bitrate: Optional[int] = None
+        self.force_keyframe = False
+        self.next_frame_time: Optional[float] = None
+        self.rtp_history: dict[int, RtpPacket] = {}
+        self.rtx_sequence_number = random_sequence_number()
+        self.sequence_number = random_sequence_number()
+
+        # stats
+        self.lsr: Optional[int] = None
+        self.lsr_time: Optional[float] = None
+        self.ntp_timestamp = 0
+        self.rtp_timestamp = 0
+        self.octet_count = 0
+        self.packet_count = 0
+        self.rtt: Optional[float] = None
+        self.frames_encoded = 0
+        self.key_frames_encoded = 0
+        self.total_encode_time = 0.0
+        self.nack_count = 0
+        self.pli_count = 0
+        self.fir_count = 0
+        self.retransmitted_packets_sent = 0
+        self.retransmitted_bytes_sent = 0
+
+    def get_encoding(self) -> RTCRtpEncodingParameters:
+        return dataclasses.replace(
+            self.encoding,
+            ssrc=self.ssrc,
+            rtx=RTCRtpRtxParameters(ssrc=self.rtx_ssrc),
+        )
+
+
 class RTCEncodedFrame:
     def __init__(self, payloads: list[bytes], timestamp: int, audio_level: int):
         self.payloads = payloads
@@ -81,10 +172,17 @@ class RTCRtpSender:
     :param trackOrKind: Either a :class:`MediaStreamTrack` instance or a
                          media kind (`'audio'` or `'video'`).
     :param transport: An :class:`RTCDtlsTransport`.
+    :param sendEncodings: A list of :class:`RTCRtpEncodingParameters` describing
+                          the RTP streams to send. Passing several encodings,
+                          each with its own `rid`, sends the video track as
+                          simulcast.
     """
 
     def __init__(
-        self, trackOrKind: Union[MediaStreamTrack, str], transport: RTCDtlsTransport
+        self,
+        trackOrKind: Union[MediaStreamTrack, str],
+        transport: RTCDtlsTransport,
+        sendEncodings: Optional[list[RTCRtpEncodingParameters]] = None,
     ) -> None:
         if transport.state == "closed":
             raise InvalidStateError
@@ -95,39 +193,36 @@ class RTCRtpSender:
         else:
             self.__kind = trackOrKind
             self.replaceTrack(None)
+
+        if sendEncodings:
+            check_encodings(self.__kind, sendEncodings)
+            encodings = [dataclasses.replace(e) for e in sendEncodings]
+        else:
+            encodings = [RTCRtpEncodingParameters()]
+        self.__streams = [OutboundRtpStream(encoding) for encoding in encodings]
+
         self.__cname: Optional[str] = None
-        self._ssrc = random32()
-        self._rtx_ssrc = random32()
         # FIXME: how should this be initialised?
         self._stream_id = str(uuid.uuid4())
         self._enabled = True
-        self.__encoder: Optional[Encoder] = None
-        self.__force_keyframe = False
+        self.__encoder_parameters = RTCRtpEncoderParameters()
         self.__loop = asyncio.get_event_loop()
         self.__mid: Optional[str] = None
+        self.__parameters = RTCRtpSendParameters()
+        self.__red_payload_type: Optional[int] = None
         self.__rtp_exited = asyncio.Event()
         self.__rtp_header_extensions_map = rtp.HeaderExtensionsMap()
         self.__rtp_started = asyncio.Event()
         self.__rtp_task: Optional[asyncio.Future[None]] = None
-        self.__rtp_history: dict[int, RtpPacket] = {}
         self.__rtcp_exited = asyncio.Event()
         self.__rtcp_started = asyncio.Event()
         self.__rtcp_task: Optional[asyncio.Future[None]] = None
         self.__rtx_payload_type: Optional[int] = None
-        self.__rtx_sequence_number = random_sequence_number()
+        self.__stage_timer: Optional[StageTimer] = None
         self.__started = False
         self.__stats = RTCStatsReport()
         self.__transport = transport
 
-        # stats
-        self.__lsr: Optional[int] = None
-        self.__lsr_time: Optional[float] = None
-        self.__ntp_timestamp = 0
-        self.__rtp_timestamp = 0
-        self.__octet_count = 0
-        self.__packet_count = 0
-        self.__rtt: Optional[float] = None
-
         # logging
         self.__log_debug: Callable[..., None] = lambda *args: None
         if logger.isEnabledFor(logging.DEBUG):
@@ -154,6 +249,22 @@ class RTCRtpSender:
         """
         return self.__transport
 
+    @property
+    def _ssrc(self) -> int:
+        return self.__streams[0].ssrc
+
+    @_ssrc.setter
+    def _ssrc(self, ssrc: int) -> None:
+        self.__streams[0].ssrc = ssrc
+
+    @property
+    def _rtx_ssrc(self) -> int:
+        return self.__streams[0].rtx_ssrc
+
+    @_rtx_ssrc.setter
+    def _rtx_ssrc(self, ssrc: int) -> None:
+        self.__streams[0].rtx_ssrc = ssrc
+
     @classmethod
     def getCapabilities(self, kind: str) -> RTCRtpCapabilities:
         """
@@ -170,27 +281,107 @@ class RTCRtpSender:
 
         :rtype: :class:`RTCStatsReport`
         """
-        self.__stats.add(
-            RTCOutboundRtpStreamStats(
+        for stream in self.__streams:
+            stats = RTCOutboundRtpStreamStats(
                 # RTCStats
                 timestamp=clock.current_datetime(),
                 type="outbound-rtp",
-                id="outbound-rtp_" + str(id(self)),
+                id=self.__stats_id("outbound-rtp", stream),
                 # RTCStreamStats
-                ssrc=self._ssrc,
+                ssrc=stream.ssrc,
                 kind=self.__kind,
                 transportId=self.transport._stats_id,
                 # RTCSentRtpStreamStats
-                packetsSent=self.__packet_count,
-                bytesSent=self.__octet_count,
+                packetsSent=stream.packet_count,
+                bytesSent=stream.octet_count,
                 # RTCOutboundRtpStreamStats
                 trackId=str(id(self.track)),
+                rid=stream.encoding.rid,
+                retransmittedPacketsSent=stream.retransmitted_packets_sent,
+                retransmittedBytesSent=stream.retransmitted_bytes_sent,
+                nackCount=stream.nack_count,
+                targetBitrate=stream.target_bitrate,
             )
-        )
+            if self.__kind == "video":
+                stats.pliCount = stream.pli_count
+                stats.firCount = stream.fir_count
+                stats.framesEncoded = stream.frames_encoded
+                stats.keyFramesEncoded = stream.key_frames_encoded
+                stats.totalEncodeTime = stream.total_encode_time
+            self.__stats.add(stats)
+        if self.__stage_timer is not None:
+            for stage_stats in self.__stage_timer.get_stats(str(id(self))):
+                self.__stats.add(stage_stats)
         self.__stats.update(self.transport._get_stats())
 
         return self.__stats
 
+    def getEncoderParameters(self) -> RTCRtpEncoderParameters:
+        """
+        Returns the parameters controlling how media is encoded.
+
+        :rtype: :class:`RTCRtpEncoderParameters`
+        """
+        return dataclasses.replace(self.__encoder_parameters)
+
+    def setEncoderParameters(self, parameters: RTCRtpEncoderParameters) -> None:
+        """
+        Set the parameters controlling how media is encoded.
+
+        The parameters are applied from the next frame. Changes which the
+        encoder cannot apply while running restart it, starting with a
+        keyframe. The parameters apply to every RTP stream, whose bitrate,
+        frame rate and resolution limits are set using :meth:`setParameters`.
+
+        :param parameters: The :class:`RTCRtpEncoderParameters` for the sender.
+        """
+        if parameters.scalabilityMode not in (None, "L1T1", "L1T2", "L1T3"):
+            raise ValueError(
+                f"Unsupported scalabilityMode `{parameters.scalabilityMode}`"
+            )
+
+        for stream in self.__streams:
+            stream.encoder_parameters_changed = True
+        self.__encoder_parameters = dataclasses.replace(parameters)
+
+    def getParameters(self) -> RTCRtpSendParameters:
+        """
+        Returns the parameters of the RTP streams sent by the sender.
+
+        :rtype: :class:`RTCRtpSendParameters`
+        """
+        return dataclasses.replace(
+            self.__parameters,
+            encodings=[stream.get_encoding() for stream in self.__streams],
+        )
+
+    def setParameters(self, parameters: RTCRtpSendParameters) -> None:
+        """
+        Update the RTP streams sent by the sender.
+
+        The `active`, `maxBitrate`, `maxFramerate` and `scaleResolutionDownBy`
+        attributes of each encoding can be changed, which allows simulcast
+        layers to be paused and resumed. A resumed layer starts with a
+        keyframe.
+
+        :param parameters: The :class:`RTCRtpSendParameters` for the sender,
+                           as returned by :meth:`getParameters`.
+        """
+        if [encoding.rid for encoding in parameters.encodings] != [
+            stream.encoding.rid for stream in self.__streams
+        ]:
+            raise ValueError("The number of encodings and their rids cannot change")
+        check_encodings(self.__kind, parameters.encodings)
+
+        for stream, encoding in zip(self.__streams, parameters.encodings):
+            if not encoding.active:
+                # Release the encoder, a new one starts with a keyframe.
+                stream.encoder = None
+            if encoding.maxFramerate != stream.encoding.maxFramerate:
+                stream.next_frame_time = None
+            stream.encoding = dataclasses.replace(encoding)
+            stream.encoder_parameters_changed = True
+
     def replaceTrack(self, track: Optional[MediaStreamTrack]) -> None:
         self.__track = track
         if track is not None:
@@ -198,6 +389,23 @@ class RTCRtpSender:
         else:
             self._track_id = str(uuid.uuid4())
 
+    def setStageTiming(self, enabled: bool) -> None:
+        """
+        Time how long frames and packets spend in each stage of the sender's
+        pipeline, from the track to SRTP encryption and sending.
+
+        The times are aggregated into histograms which :meth:`getStats`
+        reports as :class:`RTCStageTimingStats`. Stage timing is disabled by
+        default, and then costs nothing.
+
+        :param enabled: Whether to time the stages of the pipeline.
+        """
+        if not enabled:
+            self.__stage_timer = None
+            remove_stage_timing_stats(self.__stats)
+        elif self.__stage_timer is None:
+            self.__stage_timer = StageTimer(SENDER_STAGES)
+
     def setTransport(self, transport: RTCDtlsTransport) -> None:
         self.__transport = transport
 
@@ -210,21 +418,35 @@ class RTCRtpSender:
         if not self.__started:
             self.__cname = parameters.rtcp.cname
             self.__mid = parameters.muxId
+            self.__parameters = parameters
+            if parameters.encodings:
+                check_encodings(self.__kind, parameters.encodings)
+                self.__streams = [
+                    OutboundRtpStream(dataclasses.replace(encoding))
+                    for encoding in parameters.encodings
+                ]
 
             # make note of the RTP header extension IDs
             self.__transport._register_rtp_sender(self, parameters)
             self.__rtp_header_extensions_map.configure(parameters)
 
+            # when sending redundant audio, encode using the codec it carries
+            codec = parameters.codecs[0]
+            if is_red(codec):
+                payload_types = red_payload_types(codec)
+                for primary in parameters.codecs:
+                    if payload_types and primary.payloadType == payload_types[0]:
+                        self.__red_payload_type = codec.payloadType
+                        codec = primary
+                        break
+
             # make note of RTX payload type
-            for codec in parameters.codecs:
-                if (
-                    is_rtx(codec)
-                    and codec.parameters["apt"] == parameters.codecs[0].payloadType
-                ):
-                    self.__rtx_payload_type = codec.payloadType
+            for rtx in parameters.codecs:
+                if is_rtx(rtx) and rtx.parameters["apt"] == codec.payloadType:
+                    self.__rtx_payload_type = rtx.payloadType
                     break
 
-            self.__rtp_task = asyncio.ensure_future(self._run_rtp(parameters.codecs[0]))
+            self.__rtp_task = asyncio.ensure_future(self._run_rtp(codec))
             self.__rtcp_task = asyncio.ensure_future(self._run_rtcp())
             self.__started = True
 
@@ -243,122 +465,300 @@ class RTCRtpSender:
 
     async def _handle_rtcp_packet(self, packet: AnyRtcpPacket) -> None:
         if isinstance(packet, (RtcpRrPacket, RtcpSrPacket)):
-            for report in filter(lambda x: x.ssrc == self._ssrc, packet.reports):
+            for report in packet.reports:
+                stream = self.__find_stream(report.ssrc)
+                if stream is None:
+                    continue
+
                 # estimate round-trip time
-                if self.__lsr == report.lsr and report.dlsr:
-                    rtt = time.time() - self.__lsr_time - (report.dlsr / 65536)
-                    if self.__rtt is None:
-                        self.__rtt = rtt
+                if stream.lsr == report.lsr and report.dlsr:
+                    rtt = time.time() - stream.lsr_time - (report.dlsr / 65536)
+                    if stream.rtt is None:
+                        stream.rtt = rtt
                     else:
-                        self.__rtt = RTT_ALPHA * self.__rtt + (1 - RTT_ALPHA) * rtt
+                        stream.rtt = RTT_ALPHA * stream.rtt + (1 - RTT_ALPHA) * rtt
+
+                    # share the round-trip time with the receivers
+                    self.transport._rtt = stream.rtt
 
                 self.__stats.add(
                     RTCRemoteInboundRtpStreamStats(
                         # RTCStats
                         timestamp=clock.current_datetime(),
                         type="remote-inbound-rtp",
-                        id="remote-inbound-rtp_" + str(id(self)),
+                        id=self.__stats_id("remote-inbound-rtp", stream),
                         # RTCStreamStats
                         ssrc=packet.ssrc,
                         kind=self.__kind,
                         transportId=self.transport._stats_id,
                         # RTCReceivedRtpStreamStats
-                        packetsReceived=self.__packet_count - report.packets_lost,
+                        packetsReceived=stream.packet_count - report.packets_lost,
                         packetsLost=report.packets_lost,
                         jitter=report.jitter,
                         # RTCRemoteInboundRtpStreamStats
-                        roundTripTime=self.__rtt,
+                        roundTripTime=stream.rtt,
                         fractionLost=report.fraction_lost,
                     )
                 )
         elif isinstance(packet, RtcpRtpfbPacket) and packet.fmt == RTCP_RTPFB_NACK:
+            stream = self.__find_stream(packet.media_ssrc)
+            if stream is not None:
+                stream.nack_count += 1
             for seq in packet.lost:
-                await self._retransmit(seq)
+                await self._retransmit(seq, packet.media_ssrc)
         elif isinstance(packet, RtcpPsfbPacket) and packet.fmt in (
             RTCP_PSFB_FIR,  # Full Instantaneous Resolution
             RTCP_PSFB_PLI,  # Picture Loss Indication
         ):
-            self._send_keyframe()
+            stream = self.__find_stream(packet.media_ssrc)
+            if stream is not None and packet.fmt == RTCP_PSFB_FIR:
+                stream.fir_count += 1
+            elif stream is not None:
+                stream.pli_count += 1
+            self._send_keyframe(packet.media_ssrc)
         elif isinstance(packet, RtcpPsfbPacket) and packet.fmt == RTCP_PSFB_APP:
             try:
                 bitrate, ssrcs = unpack_remb_fci(packet.fci)
-                if self._ssrc in ssrcs:
+                if any(stream.ssrc in ssrcs for stream in self.__streams):
                     self.__log_debug(
                         "- receiver estimated maximum bitrate %d bps", bitrate
                     )
-                    if self.__encoder and hasattr(self.__encoder, "target_bitrate"):
-                        self.__encoder.target_bitrate = bitrate
+                    self.__allocate_bitrate(bitrate)
             except ValueError:
                 pass
 
-    async def _next_encoded_frame(
+    def _negotiate_simulcast(self, rids: list[str]) -> None:
+        """
+        Keep only the simulcast layers which the remote party accepted.
+
+        If the remote party accepted none of them, fall back to sending the
+        first layer as a plain RTP stream.
+        """
+        if not any(stream.encoding.rid for stream in self.__streams):
+            return
+
+        streams = [stream for stream in self.__streams if stream.encoding.rid in rids]
+        if not streams:
+            self.__log_debug("- simulcast not accepted, sending a single stream")
+            streams = self.__streams[:1]
+            streams[0].encoding = dataclasses.replace(streams[0].encoding, rid=None)
+        self.__streams = streams
+
+    async def _next_encoded_frames(
         self, codec: RTCRtpCodecParameters
-    ) -> Optional[RTCEncodedFrame]:
+    ) -> list[tuple[OutboundRtpStream, RTCEncodedFrame]]:
         # Get [Frame|Packet].
+        timer = self.__stage_timer
+        start = time.perf_counter() if timer is not None else 0.0
         data = await self.__track.recv()
+        if timer is not None:
+            timer.add("trackRecv", time.perf_counter() - start)
 
         # If the sender is disabled, drop the frame instead of encoding it.
         # We still want to read from the track in order to avoid frames
         # accumulating in memory.
         if not self._enabled:
-            return None
+            return []
 
         audio_level = None
-
-        if self.__encoder is None:
-            self.__encoder = get_encoder(codec)
+        streams = [stream for stream in self.__streams if stream.encoding.active]
 
         if isinstance(data, Frame):
-            # Encode the frame.
             if isinstance(data, AudioFrame):
                 audio_level = rtp.compute_audio_level_dbov(data)
+            else:
+                streams = [
+                    stream
+                    for stream in streams
+                    if not self.__frame_rate_exceeded(stream, data)
+                ]
+            encoders = [self.__prepare_encoder(stream, codec) for stream in streams]
+
+            # When sending simulcast, convert and scale the frame once per
+            # resolution, rather than once per encoder.
+            frames = [data] * len(streams)
+            if len(self.__streams) > 1 and isinstance(data, VideoFrame) and streams:
+                factors = [stream.encoding.scaleResolutionDownBy for stream in streams]
+                scaled = await self.__loop.run_in_executor(
+                    None, scale_video_frames, data, factors
+                )
+                frames = [scaled[factor] for factor in factors]
 
-            force_keyframe = self.__force_keyframe
-            self.__force_keyframe = False
-            payloads, timestamp = await self.__loop.run_in_executor(
-                None, self.__encoder.encode, data, force_keyframe
+            # Encode the frame for each stream concurrently.
+            results = await asyncio.gather(
+                *[
+                    self.__encode(stream, encoder, frame, codec)
+                    for stream, encoder, frame in zip(streams, encoders, frames)
+                ]
             )
         else:
-            # Pack the pre-encoded data.
-            payloads, timestamp = self.__encoder.pack(data)
+            # Pack the pre-encoded data, which can only be sent on one stream.
+            streams = streams[:1]
+            results = [
+                self.__prepare_encoder(stream, codec).pack(data) for stream in streams
+            ]
 
-        # If the encoder did not return any payloads, return `None`.
+        # If an encoder did not return any payloads, skip its stream.
         # This may be due to a delay caused by resampling.
-        if not payloads:
-            return None
+        return [
+            (stream, RTCEncodedFrame(payloads, timestamp, audio_level))
+            for stream, (payloads, timestamp) in zip(streams, results)
+            if payloads
+        ]
+
+    async def __encode(
+        self,
+        stream: OutboundRtpStream,
+        encoder: Encoder,
+        frame: Frame,
+        codec: RTCRtpCodecParameters,
+    ) -> tuple[list[bytes], int]:
+        force_keyframe = stream.force_keyframe
+        stream.force_keyframe = False
+        is_video = isinstance(frame, VideoFrame)
+        timer = self.__stage_timer
+        if not is_video and timer is None:
+            return await self.__loop.run_in_executor(
+                None, encoder.encode, frame, force_keyframe
+            )
 
-        return RTCEncodedFrame(payloads, timestamp, audio_level)
+        def encode() -> tuple[list[bytes], int]:
+            # time the encoder in its own thread, excluding any executor queueing
+            start = time.perf_counter()
+            result = encoder.encode(frame, force_keyframe)
+            encode_time = time.perf_counter() - start
+            if is_video:
+                stream.total_encode_time += encode_time
+            if timer is not None:
+                timer.add("encode", encode_time)
+            return result
+
+        payloads, timestamp = await self.__loop.run_in_executor(None, encode)
+        if payloads and is_video:
+            stream.frames_encoded += 1
+            description = describe(codec, payloads[0])
+            if description is not None and description.keyframe:
+                stream.key_frames_encoded += 1
+        return payloads, timestamp
+
+    def __allocate_bitrate(self, bitrate: int) -> None:
+        """
+        Share the estimated bitrate between the active streams, in proportion
+        to the number of pixels they encode.
+        """
+        weights = {}
+        for stream in self.__streams:
+            if hasattr(stream.encoder, "target_bitrate"):
+                factor = stream.encoding.scaleResolutionDownBy
+                weights[(stream, stream.encoder)] = 1 / (factor or 1) ** 2
+        for (stream, encoder), weight in weights.items():
+            encoder.target_bitrate = int(bitrate * weight / sum(weights.values()))
+            stream.target_bitrate = encoder.target_bitrate
+
+    def __find_stream(self, ssrc: int) -> Optional[OutboundRtpStream]:
+        for stream in self.__streams:
+            if stream.ssrc == ssrc:
+                return stream
+        return None
+
+    def __frame_rate_exceeded(self, stream: OutboundRtpStream, frame: Frame) -> bool:
+        """
+        Determine whether a video frame must be dropped to respect the
+        maximum frame rate of a stream.
+        """
+        max_framerate = stream.encoding.maxFramerate
+        if max_framerate is None or frame.pts is None:
+            return False
+
+        # Frames slightly ahead of schedule are kept, to allow for jitter.
+        frame_time = float(frame.pts * frame.time_base)
+        interval = 1 / max_framerate
+        if (
+            stream.next_frame_time is not None
+            and frame_time + interval / 10 < stream.next_frame_time
+        ):
+            return True
 
-    async def _retransmit(self, sequence_number: int) -> None:
+        # Schedule the next frame on a regular grid, unless we fell behind it.
+        if stream.next_frame_time is None:
+            stream.next_frame_time = frame_time + interval
+        else:
+            stream.next_frame_time = max(
+                stream.next_frame_time + interval, frame_time + interval / 2
+            )
+        return False
+
+    def __prepare_encoder(
+        self, stream: OutboundRtpStream, codec: RTCRtpCodecParameters
+    ) -> Encoder:
+        if stream.encoder is None:
+            stream.encoder = get_encoder(codec)
+            stream.encoder_parameters_changed = True
+        if stream.encoder_parameters_changed:
+            encoding = stream.encoding
+            if len(self.__streams) > 1:
+                # The frames are scaled by the sender, see _next_encoded_frames.
+                encoding = dataclasses.replace(encoding, scaleResolutionDownBy=None)
+            stream.encoder.configure(self.__encoder_parameters, encoding)
+            stream.encoder_parameters_changed = False
+            stream.target_bitrate = getattr(stream.encoder, "target_bitrate", None)
+        return stream.encoder
+
+    def __stats_id(self, prefix: str, stream: OutboundRtpStream) -> str:
+        stats_id = prefix + "_" + str(id(self))
+        if stream.encoding.rid is not None:
+            stats_id += "_" + stream.encoding.rid
+        return stats_id
+
+    async def _retransmit(
+        self, sequence_number: int, ssrc: Optional[int] = None
+    ) -> None:
         """
         Retransmit an RTP packet which was reported as lost.
         """
-        packet = self.__rtp_history.get(sequence_number % RTP_HISTORY_SIZE)
+        stream = self.__streams[0] if ssrc is None else self.__find_stream(ssrc)
+        if stream is None:
+            return
+
+        packet = stream.rtp_history.get(sequence_number % RTP_HISTORY_SIZE)
         if packet and packet.sequence_number == sequence_number:
             if self.__rtx_payload_type is not None:
                 packet = wrap_rtx(
                     packet,
                     payload_type=self.__rtx_payload_type,
-                    sequence_number=self.__rtx_sequence_number,
-                    ssrc=self._rtx_ssrc,
+                    sequence_number=stream.rtx_sequence_number,
+                    ssrc=stream.rtx_ssrc,
                 )
-                self.__rtx_sequence_number = uint16_add(self.__rtx_sequence_number, 1)
+                if packet.extensions.rtp_stream_id is not None:
+                    packet.extensions = dataclasses.replace(
+                        packet.extensions,
+                        repaired_rtp_stream_id=packet.extensions.rtp_stream_id,
+                        rtp_stream_id=None,
+                    )
+                stream.rtx_sequence_number = uint16_add(stream.rtx_sequence_number, 1)
 
             self.__log_debug("> %s", packet)
             packet_bytes = packet.serialize(self.__rtp_header_extensions_map)
             await self.transport._send_rtp(packet_bytes)
+            stream.retransmitted_packets_sent += 1
+            stream.retransmitted_bytes_sent += len(packet.payload)
 
-    def _send_keyframe(self) -> None:
+    def _send_keyframe(self, ssrc: Optional[int] = None) -> None:
         """
         Request the next frame to be a keyframe.
+
+        If `ssrc` does not designate one of the streams, all the streams
+        send a keyframe.
         """
-        self.__force_keyframe = True
+        streams = [stream for stream in self.__streams if stream.ssrc == ssrc]
+        for stream in streams or self.__streams:
+            stream.force_keyframe = True
 
     async def _run_rtp(self, codec: RTCRtpCodecParameters) -> None:
         self.__log_debug("- RTP started")
         self.__rtp_started.set()
 
-        sequence_number = random_sequence_number()
+        red_history: deque[tuple[int, bytes]] = deque(maxlen=RED_DISTANCE)
         timestamp_origin = random32()
         try:
             while True:
@@ -366,45 +766,16 @@ class RTCRtpSender:
                     await asyncio.sleep(0.02)
                     continue
 
-                # Fetch the next encoded frame. This can be `None` if the sender
-                # is disabled, in which case we just continue the loop.
-                enc_frame = await self._next_encoded_frame(codec)
-                if enc_frame is None:
-                    continue
-
-                timestamp = uint32_add(timestamp_origin, enc_frame.timestamp)
-
-                for i, payload in enumerate(enc_frame.payloads):
-                    packet = RtpPacket(
-                        payload_type=codec.payloadType,
-                        sequence_number=sequence_number,
-                        timestamp=timestamp,
+                # Fetch the next encoded frame for each stream. This can be empty
+                # if the sender is disabled, in which case we just continue the loop.
+                for stream, enc_frame in await self._next_encoded_frames(codec):
+                    await self.__send_encoded_frame(
+                        stream,
+                        enc_frame,
+                        codec=codec,
+                        timestamp=uint32_add(timestamp_origin, enc_frame.timestamp),
+                        red_history=red_history,
                     )
-                    packet.ssrc = self._ssrc
-                    packet.payload = payload
-                    packet.marker = (i == len(enc_frame.payloads) - 1) and 1 or 0
-
-                    # set header extensions
-                    packet.extensions.abs_send_time = (
-                        clock.current_ntp_time() >> 14
-                    ) & 0x00FFFFFF
-                    packet.extensions.mid = self.__mid
-                    if enc_frame.audio_level is not None:
-                        packet.extensions.audio_level = (False, -enc_frame.audio_level)
-
-                    # send packet
-                    self.__log_debug("> %s", packet)
-                    self.__rtp_history[packet.sequence_number % RTP_HISTORY_SIZE] = (
-                        packet
-                    )
-                    packet_bytes = packet.serialize(self.__rtp_header_extensions_map)
-                    await self.transport._send_rtp(packet_bytes)
-
-                    self.__ntp_timestamp = clock.current_ntp_time()
-                    self.__rtp_timestamp = packet.timestamp
-                    self.__octet_count += len(payload)
-                    self.__packet_count += 1
-                    sequence_number = uint16_add(sequence_number, 1)
         except (asyncio.CancelledError, ConnectionError, MediaStreamError):
             pass
         except Exception:
@@ -417,12 +788,74 @@ class RTCRtpSender:
             self.__track.stop()
             self.__track = None
 
-        # release encoder
-        self.__encoder = None
+        # release encoders
+        for stream in self.__streams:
+            stream.encoder = None
 
         self.__log_debug("- RTP finished")
         self.__rtp_exited.set()
 
+    async def __send_encoded_frame(
+        self,
+        stream: OutboundRtpStream,
+        enc_frame: RTCEncodedFrame,
+        codec: RTCRtpCodecParameters,
+        timestamp: int,
+        red_history: deque[tuple[int, bytes]],
+    ) -> None:
+        timer = self.__stage_timer
+        for i, payload in enumerate(enc_frame.payloads):
+            start = time.perf_counter() if timer is not None else 0.0
+            packet = RtpPacket(
+                payload_type=codec.payloadType,
+                sequence_number=stream.sequence_number,
+                timestamp=timestamp,
+            )
+            packet.ssrc = stream.ssrc
+            packet.payload = payload
+            packet.marker = (i == len(enc_frame.payloads) - 1) and 1 or 0
+
+            # set header extensions
+            packet.extensions.abs_send_time = (
+                clock.current_ntp_time() >> 14
+            ) & 0x00FFFFFF
+            packet.extensions.mid = self.__mid
+            packet.extensions.rtp_stream_id = stream.encoding.rid
+            if enc_frame.audio_level is not None:
+                packet.extensions.audio_level = (False, -enc_frame.audio_level)
+
+            # attach the previous payloads as redundant audio
+            if self.__red_payload_type is not None:
+                blocks = [(codec.payloadType, 0, payload)]
+                for red_timestamp, red_payload in reversed(red_history):
+                    offset = uint32_add(timestamp, -red_timestamp)
+                    if (
+                        offset > RED_MAX_TIMESTAMP_OFFSET
+                        or len(red_payload) > RED_MAX_BLOCK_LENGTH
+                    ):
+                        break
+                    blocks.insert(0, (codec.payloadType, offset, red_payload))
+                red_history.append((timestamp, payload))
+                packet.payload_type = self.__red_payload_type
+                packet.payload = pack_red(blocks)
+
+            # send packet
+            self.__log_debug("> %s", packet)
+            stream.rtp_history[packet.sequence_number % RTP_HISTORY_SIZE] = packet
+            packet_bytes = packet.serialize(self.__rtp_header_extensions_map)
+            if timer is not None:
+                packetized = time.perf_counter()
+                timer.add("packetize", packetized - start)
+            await self.transport._send_rtp(packet_bytes)
+            if timer is not None:
+                timer.add("send", time.perf_counter() - packetized)
+
+            stream.ntp_timestamp = clock.current_ntp_time()
+            stream.rtp_timestamp = packet.timestamp
+            stream.octet_count += len(packet.payload)
+            stream.packet_count += 1
+            stream.sequence_number = uint16_add(stream.sequence_number, 1)
+
     async def _run_rtcp(self) -> None:
         self.__log_debug("- RTCP started")
         self.__rtcp_started.set()
@@ -434,19 +867,21 @@ class RTCRtpSender:
                 await asyncio.sleep(0.5 + random.random())
 
                 # RTCP SR
-                packets: list[AnyRtcpPacket] = [
-                    RtcpSrPacket(
-                        ssrc=self._ssrc,
-                        sender_info=RtcpSenderInfo(
-                            ntp_timestamp=self.__ntp_timestamp,
-                            rtp_timestamp=self.__rtp_timestamp,
-                            packet_count=self.__packet_count & 0xFFFFFFFF,
-                            octet_count=self.__octet_count & 0xFFFFFFFF,
-                        ),
+                packets: list[AnyRtcpPacket] = []
+                for stream in self.__streams:
+                    packets.append(
+                        RtcpSrPacket(
+                            ssrc=stream.ssrc,
+                            sender_info=RtcpSenderInfo(
+                                ntp_timestamp=stream.ntp_timestamp,
+                                rtp_timestamp=stream.rtp_timestamp,
+                                packet_count=stream.packet_count & 0xFFFFFFFF,
+                                octet_count=stream.octet_count & 0xFFFFFFFF,
+                            ),
+                        )
                     )
-                ]
-                self.__lsr = ((self.__ntp_timestamp) >> 16) & 0xFFFFFFFF
-                self.__lsr_time = time.time()
+                    stream.lsr = ((stream.ntp_timestamp) >> 16) & 0xFFFFFFFF
+                    stream.lsr_time = time.time()
 
                 # RTCP SDES
                 if self.__cname is not None:
@@ -454,9 +889,10 @@ class RTCRtpSender:
                         RtcpSdesPacket(
                             chunks=[
                                 RtcpSourceInfo(
-                                    ssrc=self._ssrc,
+                                    ssrc=stream.ssrc,
                                     items=[(1, self.__cname.encode("utf8"))],
                                 )
+                                for stream in self.__streams
                             ]
                         )
                     )
@@ -466,7 +902,7 @@ class RTCRtpSender:
             pass
 
         # RTCP BYE
-        packet = RtcpByePacket(sources=[self._ssrc])
+        packet = RtcpByePacket(sources=[stream.ssrc for stream in self.__streams])
         await self._send_rtcp([packet])
 
         self.__log_debug("- RTCP finished")
@@ -44,6 +44,7 @@ class RTCRtpTransceiver:
         self._bundled = False
         self._codecs: list[RTCRtpCodecParameters] = []
         self._headerExtensions: list[RTCRtpHeaderExtensionParameters] = []
+        self._remote_rids: list[str] = []
 
     @property
     def currentDirection(self) -> Optional[str]:
@@ -5,16 +5,19 @@ import logging
 import math
 import os
 import time
+from abc import ABCMeta, abstractmethod
 from collections import deque
 from collections.abc import Callable, Iterator
 from dataclasses import dataclass, field
 from struct import pack, unpack_from
 from typing import Deque, Optional, Union, cast
 
+from google_crc32c import extend as crc32c_extend
 from google_crc32c import value as crc32c
 from pyee.asyncio import AsyncIOEventEmitter
 
 from .exceptions import InvalidStateError
+from .rtcconfiguration import RTCSctpConfiguration
 from .rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
 from .rtcdtlstransport import RTCDtlsTransport
 from .utils import random32, uint16_add, uint16_gt, uint32_gt, uint32_gte
@@ -42,13 +45,9 @@ SCTP_DATA_FIRST_FRAG = 0x02
 SCTP_DATA_UNORDERED = 0x04
 
 SCTP_MAX_ASSOCIATION_RETRANS = 10
-SCTP_MAX_BURST = 4
 SCTP_MAX_INIT_RETRANS = 8
 SCTP_RTO_ALPHA = 1 / 8
 SCTP_RTO_BETA = 1 / 4
-SCTP_RTO_INITIAL = 3.0
-SCTP_RTO_MIN = 1
-SCTP_RTO_MAX = 60
 SCTP_TSN_MODULO = 2**32
 
 RECONFIG_MAX_STREAMS = 135
@@ -78,7 +77,7 @@ WEBRTC_BINARY = 53
 WEBRTC_STRING_EMPTY = 56
 WEBRTC_BINARY_EMPTY = 57
 
-DataChannelQueue = Deque[tuple[RTCDataChannel, int, bytes]]
+DataChannelQueue = Deque[tuple[RTCDataChannel, int, Union[bytes, memoryview]]]
 
 
 def chunk_type(chunk: "Chunk") -> str:
@@ -127,14 +126,23 @@ class Chunk:
         self.body = body
 
     def __bytes__(self) -> bytes:
-        body = self.body
-        data = pack("!BBH", self.type, self.flags, len(body) + 4) + body
-        data += b"\x00" * padl(len(body))
-        return data
+        return b"".join(self._pieces())
 
     def __repr__(self) -> str:
         return f"{chunk_type(self)}(flags={self.flags})"
 
+    def _pieces(self) -> list[bytes]:
+        """
+        Return the serialized chunk as a list of pieces, to avoid intermediate
+        copies when building packets.
+        """
+        body = self.body
+        return [
+            pack("!BBH", self.type, self.flags, len(body) + 4),
+            body,
+            b"\x00" * padl(len(body)),
+        ]
+
 
 class BaseParamsChunk(Chunk):
     def __init__(self, flags: int = 0, body: Optional[bytes] = None) -> None:
@@ -174,8 +182,11 @@ class DataChunk(Chunk):
     _sent_count: int
     _sent_time: Optional[float]
 
-    def __init__(self, flags: int = 0, body: Optional[bytes] = None) -> None:
+    def __init__(
+        self, flags: int = 0, body: Optional[Union[bytes, memoryview]] = None
+    ) -> None:
         self.flags = flags
+        self.user_data: Union[bytes, memoryview]
         if body:
             (self.tsn, self.stream_id, self.stream_seq, self.protocol) = unpack_from(
                 "!LHHL", body
@@ -188,9 +199,9 @@ class DataChunk(Chunk):
             self.protocol = 0
             self.user_data = b""
 
-    def __bytes__(self) -> bytes:
+    def _pieces(self) -> list[bytes]:
         length = 16 + len(self.user_data)
-        data = (
+        pieces = [
             pack(
                 "!BBHLHHL",
                 self.type,
@@ -200,12 +211,12 @@ class DataChunk(Chunk):
                 self.stream_id,
                 self.stream_seq,
                 self.protocol,
-            )
-            + self.user_data
-        )
+            ),
+            bytes(self.user_data),
+        ]
         if length % 4:
-            data += b"\x00" * padl(length)
-        return data
+            pieces.append(b"\x00" * padl(length))
+        return pieces
 
     def __repr__(self) -> str:
         return (
@@ -328,7 +339,7 @@ class SackChunk(Chunk):
             self.cumulative_tsn = 0
             self.advertised_rwnd = 0
 
-    def __bytes__(self) -> bytes:
+    def _pieces(self) -> list[bytes]:
         length = 16 + 4 * (len(self.gaps) + len(self.duplicates))
         data = pack(
             "!BBHLLHH",
@@ -344,7 +355,7 @@ class SackChunk(Chunk):
             data += pack("!HH", *gap)
         for tsn in self.duplicates:
             data += pack("!L", tsn)
-        return data
+        return [data]
 
     def __repr__(self) -> str:
         return (
@@ -402,6 +413,12 @@ CHUNK_TYPES = dict((cls.type, cls) for cls in CHUNK_CLASSES)
 
 
 def parse_packet(data: bytes) -> tuple[int, int, int, list[Chunk]]:
+    """
+    Parse an SCTP packet.
+
+    The user data of DATA chunks is returned as views into `data`, so that
+    it is not copied.
+    """
     length = len(data)
 
     # Check the packet is long enough to accomodate the common header
@@ -415,9 +432,10 @@ def parse_packet(data: bytes) -> tuple[int, int, int, list[Chunk]]:
 
     # Verify the checksum matches.
     checksum = unpack_from("<L", data, 8)[0]
-    if checksum != crc32c(data[0:8] + b"\x00\x00\x00\x00" + data[12:]):
+    if checksum != crc32c_extend(crc32c(data[0:8] + b"\x00\x00\x00\x00"), data[12:]):
         raise ValueError("SCTP packet has invalid checksum")
 
+    view = memoryview(data)
     chunks: list[Chunk] = []
     pos = SCTP_COMMON_HEADER_LENGTH
     while pos <= length - SCTP_CHUNK_HEADER_LENGTH:
@@ -430,9 +448,16 @@ def parse_packet(data: bytes) -> tuple[int, int, int, list[Chunk]]:
             raise ValueError(
                 f"SCTP chunk has an invalid length of {chunk_length} bytes"
             )
-        chunk_body = data[pos + SCTP_CHUNK_HEADER_LENGTH : pos + chunk_length]
         chunk_cls = CHUNK_TYPES.get(chunk_type)
-        if chunk_cls:
+        if chunk_cls is DataChunk:
+            chunks.append(
+                DataChunk(
+                    flags=chunk_flags,
+                    body=view[pos + SCTP_CHUNK_HEADER_LENGTH : pos + chunk_length],
+                )
+            )
+        elif chunk_cls:
+            chunk_body = data[pos + SCTP_CHUNK_HEADER_LENGTH : pos + chunk_length]
             chunks.append(chunk_cls(flags=chunk_flags, body=chunk_body))
         pos += chunk_length + padl(chunk_length)
     return source_port, destination_port, verification_tag, chunks
@@ -442,9 +467,11 @@ def serialize_packet(
     source_port: int, destination_port: int, verification_tag: int, chunk: Chunk
 ) -> bytes:
     header = pack("!HHL", source_port, destination_port, verification_tag)
-    data = bytes(chunk)
-    checksum = crc32c(header + b"\x00\x00\x00\x00" + data)
-    return header + pack("<L", checksum) + data
+    pieces = chunk._pieces()
+    checksum = crc32c(header + b"\x00\x00\x00\x00")
+    for piece in pieces:
+        checksum = crc32c_extend(checksum, piece)
+    return b"".join([header, pack("<L", checksum)] + pieces)
 
 
 # RFC 6525
@@ -526,6 +553,7 @@ class InboundStream:
     def __init__(self) -> None:
         self.reassembly: list[DataChunk] = []
         self.sequence_number = 0
+        self.streaming_tsn: Optional[int] = None
 
     def add_chunk(self, chunk: DataChunk) -> None:
         if not self.reassembly or uint32_gt(chunk.tsn, self.reassembly[-1].tsn):
@@ -541,7 +569,22 @@ class InboundStream:
                 self.reassembly.insert(i, chunk)
                 break
 
-    def pop_messages(self) -> Iterator[tuple[int, int, bytes]]:
+    def continues_message(self, chunk: DataChunk) -> bool:
+        """
+        Whether the chunk belongs to the next ordered message, which is
+        already being reassembled.
+        """
+        return (
+            not (chunk.flags & SCTP_DATA_UNORDERED)
+            and chunk.stream_seq == self.sequence_number
+            and any(
+                not (rchunk.flags & SCTP_DATA_UNORDERED)
+                and rchunk.stream_seq == chunk.stream_seq
+                for rchunk in self.reassembly
+            )
+        )
+
+    def pop_messages(self) -> Iterator[tuple[int, int, Union[bytes, memoryview]]]:
         pos = 0
         start_pos = None
         while pos < len(self.reassembly):
@@ -567,20 +610,61 @@ class InboundStream:
                     continue
 
             if chunk.flags & SCTP_DATA_LAST_FRAG:
-                user_data = b"".join(
-                    [c.user_data for c in self.reassembly[start_pos : pos + 1]]
-                )
+                user_data: Union[bytes, memoryview]
+                if start_pos == pos:
+                    # single fragment, avoid copying
+                    user_data = chunk.user_data
+                else:
+                    user_data = b"".join(
+                        [c.user_data for c in self.reassembly[start_pos : pos + 1]]
+                    )
                 self.reassembly = (
                     self.reassembly[:start_pos] + self.reassembly[pos + 1 :]
                 )
                 if ordered and chunk.stream_seq == self.sequence_number:
                     self.sequence_number = uint16_add(self.sequence_number, 1)
                 pos = start_pos
+                start_pos = None
                 yield (chunk.stream_id, chunk.protocol, user_data)
             else:
                 pos += 1
+                expected_tsn = tsn_plus_one(expected_tsn)
 
-            expected_tsn = tsn_plus_one(expected_tsn)
+    def pop_fragments(
+        self, protocol: int
+    ) -> Iterator[tuple[int, int, Union[bytes, memoryview], int]]:
+        """
+        Pop the fragments of ordered messages with the given protocol as soon
+        as they are in sequence, along with their flags.
+
+        Messages with another protocol are popped once they are complete.
+        """
+        while self.reassembly:
+            chunk = self.reassembly[0]
+            if self.streaming_tsn is None:
+                if (
+                    chunk.flags & SCTP_DATA_UNORDERED
+                    or not (chunk.flags & SCTP_DATA_FIRST_FRAG)
+                    or chunk.stream_seq != self.sequence_number
+                ):
+                    break
+                elif chunk.protocol != protocol:
+                    # deliver the complete message, if available
+                    message = next(self.pop_messages(), None)
+                    if message is None:
+                        break
+                    yield (*message, SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG)
+                    continue
+            elif chunk.tsn != self.streaming_tsn:
+                break
+
+            self.reassembly.pop(0)
+            if chunk.flags & SCTP_DATA_LAST_FRAG:
+                self.sequence_number = uint16_add(self.sequence_number, 1)
+                self.streaming_tsn = None
+            else:
+                self.streaming_tsn = tsn_plus_one(chunk.tsn)
+            yield (chunk.stream_id, chunk.protocol, chunk.user_data, chunk.flags)
 
     def prune_chunks(self, tsn: int) -> int:
         """
@@ -599,6 +683,144 @@ class InboundStream:
         return size
 
 
+class SctpCongestionControl(metaclass=ABCMeta):
+    """
+    Base class for SCTP congestion control algorithms.
+
+    The congestion window `cwnd` and the slow start threshold `ssthresh` are
+    expressed in bytes.
+    """
+
+    def __init__(self, mtu: int, initial_cwnd: int) -> None:
+        self.cwnd = initial_cwnd
+        self.mtu = mtu
+        # arbitrarily high until the peer's receive window is known
+        self.ssthresh = 0xFFFFFFFF
+
+    @abstractmethod
+    def on_ack(self, acked_bytes: int, now: float) -> None:
+        """
+        Handle newly acknowledged data while the congestion window is fully
+        utilized.
+        """
+
+    @abstractmethod
+    def on_loss(self, now: float) -> None:
+        """
+        Handle loss detected by a fast retransmit.
+        """
+
+    @abstractmethod
+    def on_timeout(self, now: float) -> None:
+        """
+        Handle the expiry of the retransmission timer.
+        """
+
+
+class RenoCongestionControl(SctpCongestionControl):
+    """
+    The congestion control algorithm described in RFC 4960 section 7.2.
+    """
+
+    def __init__(self, mtu: int, initial_cwnd: int) -> None:
+        super().__init__(mtu=mtu, initial_cwnd=initial_cwnd)
+        self.partial_bytes_acked = 0
+
+    def on_ack(self, acked_bytes: int, now: float) -> None:
+        if self.cwnd <= self.ssthresh:
+            # slow start
+            self.cwnd += min(acked_bytes, self.mtu)
+        else:
+            # congestion avoidance
+            self.partial_bytes_acked += acked_bytes
+            if self.partial_bytes_acked >= self.cwnd:
+                self.partial_bytes_acked -= self.cwnd
+                self.cwnd += self.mtu
+
+    def on_loss(self, now: float) -> None:
+        self.ssthresh = max(self.cwnd // 2, 4 * self.mtu)
+        self.cwnd = self.ssthresh
+        self.partial_bytes_acked = 0
+
+    def on_timeout(self, now: float) -> None:
+        self.ssthresh = max(self.cwnd // 2, 4 * self.mtu)
+        self.cwnd = self.mtu
+        self.partial_bytes_acked = 0
+
+
+class CubicCongestionControl(SctpCongestionControl):
+    """
+    The CUBIC congestion control algorithm described in RFC 9438.
+
+    The window grows as a cubic function of the time elapsed since the last
+    congestion event, which recovers the previous window much faster than
+    Reno on paths with a large bandwidth-delay product.
+    """
+
+    BETA = 0.7
+    C = 0.4
+
+    def __init__(self, mtu: int, initial_cwnd: int) -> None:
+        super().__init__(mtu=mtu, initial_cwnd=initial_cwnd)
+        self.epoch_start: Optional[float] = None
+        self.k = 0.0
+        self.w_est = 0.0
+        self.w_max = 0.0
+
+    def on_ack(self, acked_bytes: int, now: float) -> None:
+        if self.cwnd < self.ssthresh:
+            # slow start
+            self.cwnd += min(acked_bytes, self.mtu)
+            return
+
+        if self.epoch_start is None:
+            self.epoch_start = now
+            self.w_est = self.cwnd
+            if self.cwnd < self.w_max:
+                self.k = ((self.w_max - self.cwnd) / self.mtu / self.C) ** (1 / 3)
+            else:
+                self.k = 0.0
+                self.w_max = self.cwnd
+
+        # cubic window
+        t = now - self.epoch_start
+        target = self.w_max + self.C * ((t - self.k) ** 3) * self.mtu
+        target = min(max(target, self.cwnd), 1.5 * self.cwnd)
+
+        # Reno-friendly window
+        self.w_est += (
+            3 * (1 - self.BETA) / (1 + self.BETA) * self.mtu * acked_bytes / self.cwnd
+        )
+
+        if self.w_est > target:
+            self.cwnd = max(self.cwnd, int(self.w_est))
+        else:
+            self.cwnd += int((target - self.cwnd) * acked_bytes / self.cwnd)
+
+    def on_loss(self, now: float) -> None:
+        self._reduce()
+        self.cwnd = self.ssthresh
+
+    def on_timeout(self, now: float) -> None:
+        self._reduce()
+        self.cwnd = self.mtu
+
+    def _reduce(self) -> None:
+        # fast convergence
+        if self.cwnd < self.w_max:
+            self.w_max = self.cwnd * (1 + self.BETA) / 2
+        else:
+            self.w_max = self.cwnd
+        self.epoch_start = None
+        self.ssthresh = max(int(self.cwnd * self.BETA), 4 * self.mtu)
+
+
+CONGESTION_CONTROLS: dict[str, type[SctpCongestionControl]] = {
+    "cubic": CubicCongestionControl,
+    "reno": RenoCongestionControl,
+}
+
+
 @dataclass
 class RTCSctpCapabilities:
     """
@@ -620,12 +842,44 @@ class RTCSctpTransport(AsyncIOEventEmitter):
     Stream Control Transmission Protocol (SCTP) transport.
 
     :param transport: An :class:`RTCDtlsTransport`.
+    :param port: The local SCTP port number.
+    :param configuration: An optional :class:`RTCSctpConfiguration`.
     """
 
-    def __init__(self, transport: RTCDtlsTransport, port: int = 5000) -> None:
+    def __init__(
+        self,
+        transport: RTCDtlsTransport,
+        port: int = 5000,
+        configuration: Optional[RTCSctpConfiguration] = None,
+    ) -> None:
         if transport.state == "closed":
             raise InvalidStateError
 
+        if configuration is None:
+            configuration = RTCSctpConfiguration()
+        congestion_control = configuration.congestionControl
+        if isinstance(congestion_control, str):
+            if congestion_control not in CONGESTION_CONTROLS:
+                raise ValueError(
+                    f"Unknown congestion control algorithm '{congestion_control}'"
+                )
+            congestion_control = CONGESTION_CONTROLS[congestion_control]
+        if isinstance(congestion_control, type):
+            if not issubclass(congestion_control, SctpCongestionControl):
+                raise ValueError(
+                    "Congestion control algorithm must be a subclass of "
+                    "SctpCongestionControl"
+                )
+            congestion_control = congestion_control(
+                mtu=USERDATA_MAX_LENGTH,
+                initial_cwnd=configuration.initialCongestionWindow,
+            )
+        elif not isinstance(congestion_control, SctpCongestionControl):
+            raise ValueError(
+                "Congestion control algorithm must be a name, a subclass or an "
+                "instance of SctpCongestionControl"
+            )
+
         super().__init__()
         self._association_state = self.State.CLOSED
         self.__log_debug: Callable[..., None] = lambda *args: None
@@ -646,17 +900,19 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._remote_verification_tag = 0
 
         # inbound
-        self._advertised_rwnd = 1024 * 1024
         self._inbound_streams: dict[int, InboundStream] = {}
         self._inbound_streams_count = 0
         self._inbound_streams_max = MAX_STREAMS
         self._last_received_tsn: Optional[int] = None
+        self._receive_buffer_size = configuration.receiveBufferSize
+        self._receive_buffered = 0
+        self._sack_advertised_rwnd = self._receive_buffer_size
         self._sack_duplicates: list[int] = []
         self._sack_misordered: set[int] = set()
         self._sack_needed = False
 
         # outbound
-        self._cwnd = 3 * USERDATA_MAX_LENGTH
+        self._congestion_control = congestion_control
         self._fast_recovery_exit = None
         self._fast_recovery_transmit = False
         self._forward_tsn_chunk: Optional[ForwardTsnChunk] = None
@@ -666,8 +922,9 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._advanced_peer_ack_tsn = tsn_minus_one(self._local_tsn)
         self._outbound_queue: Deque[DataChunk] = deque()
         self._outbound_stream_seq: dict[int, int] = {}
+        self._max_burst = configuration.maxBurst
         self._outbound_streams_count = MAX_STREAMS
-        self._partial_bytes_acked = 0
+        self._peer_rwnd = 0
         self._sent_queue: Deque[DataChunk] = deque()
 
         # reconfiguration
@@ -681,7 +938,9 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._rttvar: Optional[float] = None
 
         # timers
-        self._rto = SCTP_RTO_INITIAL
+        self._rto = configuration.rtoInitial
+        self._rto_max = configuration.rtoMax
+        self._rto_min = configuration.rtoMin
         self._t1_chunk: Optional[Chunk] = None
         self._t1_failures = 0
         self._t1_handle: Optional[asyncio.TimerHandle] = None
@@ -797,7 +1056,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         """
         chunk = InitChunk()
         chunk.initiate_tag = self._local_verification_tag
-        chunk.advertised_rwnd = self._advertised_rwnd
+        chunk.advertised_rwnd = self._get_advertised_rwnd()
         chunk.outbound_streams = self._outbound_streams_count
         chunk.inbound_streams = self._inbound_streams_max
         chunk.initial_tsn = self._local_tsn
@@ -814,6 +1073,12 @@ class RTCSctpTransport(AsyncIOEventEmitter):
     def _flight_size_increase(self, chunk: DataChunk) -> None:
         self._flight_size += chunk._book_size
 
+    def _get_advertised_rwnd(self) -> int:
+        """
+        Get the receive window to advertise, based on the buffered data.
+        """
+        return max(0, self._receive_buffer_size - self._receive_buffered)
+
     def _get_extensions(self, params: list[tuple[int, bytes]]) -> None:
         """
         Gets what extensions are supported by the remote party.
@@ -844,6 +1109,13 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             self._inbound_streams[stream_id] = InboundStream()
         return self._inbound_streams[stream_id]
 
+    def _get_highest_received_tsn(self) -> int:
+        highest_tsn = self._last_received_tsn
+        for tsn in self._sack_misordered:
+            if uint32_gt(tsn, highest_tsn):
+                highest_tsn = tsn
+        return highest_tsn
+
     def _get_timestamp(self) -> int:
         return int(time.time())
 
@@ -937,7 +1209,9 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._sack_misordered = set(filter(is_obsolete, self._sack_misordered))
         return False
 
-    async def _receive(self, stream_id: int, pp_id: int, data: bytes) -> None:
+    async def _receive(
+        self, stream_id: int, pp_id: int, data: Union[bytes, memoryview]
+    ) -> None:
         """
         Receive data stream -> ULP.
         """
@@ -990,7 +1264,8 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             self._last_received_tsn = tsn_minus_one(chunk.initial_tsn)
             self._reconfig_response_seq = tsn_minus_one(chunk.initial_tsn)
             self._remote_verification_tag = chunk.initiate_tag
-            self._ssthresh = chunk.advertised_rwnd
+            self._peer_rwnd = chunk.advertised_rwnd
+            self._congestion_control.ssthresh = chunk.advertised_rwnd
             self._get_extensions(chunk.params)
 
             self.__log_debug(
@@ -1007,7 +1282,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
             init_ack = InitAckChunk()
             init_ack.initiate_tag = self._local_verification_tag
-            init_ack.advertised_rwnd = self._advertised_rwnd
+            init_ack.advertised_rwnd = self._get_advertised_rwnd()
             init_ack.outbound_streams = self._outbound_streams_count
             init_ack.inbound_streams = self._inbound_streams_max
             init_ack.initial_tsn = self._local_tsn
@@ -1052,7 +1327,8 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             self._last_received_tsn = tsn_minus_one(chunk.initial_tsn)
             self._reconfig_response_seq = tsn_minus_one(chunk.initial_tsn)
             self._remote_verification_tag = chunk.initiate_tag
-            self._ssthresh = chunk.advertised_rwnd
+            self._peer_rwnd = chunk.advertised_rwnd
+            self._congestion_control.ssthresh = chunk.advertised_rwnd
             self._get_extensions(chunk.params)
 
             self.__log_debug(
@@ -1099,19 +1375,42 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         """
         self._sack_needed = True
 
+        # find stream
+        inbound_stream = self._get_inbound_stream(chunk.stream_id)
+
+        # if the receive buffer is full, drop new data (RFC 4960 section 6.2),
+        # unless it is needed to complete the message being reassembled
+        if (
+            self._receive_buffered >= self._receive_buffer_size
+            and uint32_gt(chunk.tsn, self._get_highest_received_tsn())
+            and not inbound_stream.continues_message(chunk)
+        ):
+            self.__log_debug("x Receive buffer is full, dropping TSN %d", chunk.tsn)
+            return
+
         # mark as received
         if self._mark_received(chunk.tsn):
             return
 
-        # find stream
-        inbound_stream = self._get_inbound_stream(chunk.stream_id)
-
         # defragment data
         inbound_stream.add_chunk(chunk)
-        self._advertised_rwnd -= len(chunk.user_data)
-        for message in inbound_stream.pop_messages():
-            self._advertised_rwnd += len(message[2])
-            await self._receive(*message)
+        self._receive_buffered += len(chunk.user_data)
+        channel = self._data_channels.get(chunk.stream_id)
+        if inbound_stream.streaming_tsn is not None or (
+            channel is not None and channel.binaryType == "stream"
+        ):
+            for stream_id, pp_id, user_data, flags in inbound_stream.pop_fragments(
+                WEBRTC_BINARY
+            ):
+                self._receive_buffered -= len(user_data)
+                if pp_id == WEBRTC_BINARY:
+                    self._data_channel_receive_fragment(stream_id, user_data, flags)
+                else:
+                    await self._receive(stream_id, pp_id, user_data)
+        else:
+            for message in inbound_stream.pop_messages():
+                self._receive_buffered -= len(message[2])
+                await self._receive(*message)
 
     async def _receive_forward_tsn_chunk(self, chunk: ForwardTsnChunk) -> None:
         """
@@ -1146,12 +1445,12 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             # advance sequence number and perform delivery
             inbound_stream.sequence_number = uint16_add(stream_seq, 1)
             for message in inbound_stream.pop_messages():
-                self._advertised_rwnd += len(message[2])
+                self._receive_buffered -= len(message[2])
                 await self._receive(*message)
 
         # prune obsolete chunks
         for stream_id, inbound_stream in self._inbound_streams.items():
-            self._advertised_rwnd += inbound_stream.prune_chunks(
+            self._receive_buffered -= inbound_stream.prune_chunks(
                 self._last_received_tsn
             )
 
@@ -1164,7 +1463,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         received_time = time.time()
         self._last_sacked_tsn = chunk.cumulative_tsn
-        cwnd_fully_utilized = self._flight_size >= self._cwnd
+        cwnd_fully_utilized = self._flight_size >= self._congestion_control.cwnd
         done = 0
         done_bytes = 0
 
@@ -1218,22 +1517,15 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
                         loss = True
 
+        # update the peer's receive window
+        self._peer_rwnd = max(0, chunk.advertised_rwnd - self._flight_size)
+
         # adjust congestion window
         if self._fast_recovery_exit is None:
             if done and cwnd_fully_utilized:
-                if self._cwnd <= self._ssthresh:
-                    # slow start
-                    self._cwnd += min(done_bytes, USERDATA_MAX_LENGTH)
-                else:
-                    # congestion avoidance
-                    self._partial_bytes_acked += done_bytes
-                    if self._partial_bytes_acked >= self._cwnd:
-                        self._partial_bytes_acked -= self._cwnd
-                        self._cwnd += USERDATA_MAX_LENGTH
+                self._congestion_control.on_ack(done_bytes, received_time)
             if loss:
-                self._ssthresh = max(self._cwnd // 2, 4 * USERDATA_MAX_LENGTH)
-                self._cwnd = self._ssthresh
-                self._partial_bytes_acked = 0
+                self._congestion_control.on_loss(received_time)
                 self._fast_recovery_exit = self._sent_queue[-1].tsn
                 self._fast_recovery_transmit = True
         elif uint32_gte(chunk.cumulative_tsn, self._fast_recovery_exit):
@@ -1264,7 +1556,11 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         if isinstance(param, StreamResetOutgoingParam):
             # mark closed inbound streams
             for stream_id in param.streams:
-                self._inbound_streams.pop(stream_id, None)
+                inbound_stream = self._inbound_streams.pop(stream_id, None)
+                if inbound_stream is not None:
+                    self._receive_buffered -= sum(
+                        len(chunk.user_data) for chunk in inbound_stream.reassembly
+                    )
 
                 # close data channel
                 channel = self._data_channels.get(stream_id)
@@ -1306,14 +1602,18 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self,
         stream_id: int,
         pp_id: int,
-        user_data: bytes,
+        user_data: Union[bytes, memoryview],
         expiry: Optional[float] = None,
         max_retransmits: Optional[int] = None,
         ordered: bool = True,
     ) -> None:
         """
         Send data ULP -> stream.
+
+        Fragments are views into `user_data`, so it is not copied until the
+        packets are serialized.
         """
+        user_data = memoryview(user_data)
         if ordered:
             stream_seq = self._outbound_stream_seq.get(stream_id, 0)
         else:
@@ -1404,12 +1704,13 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         sack = SackChunk()
         sack.cumulative_tsn = self._last_received_tsn
-        sack.advertised_rwnd = max(0, self._advertised_rwnd)
+        sack.advertised_rwnd = self._get_advertised_rwnd()
         sack.duplicates = self._sack_duplicates[:]
         sack.gaps = [tuple(x) for x in gaps]
 
         await self._send_chunk(sack)
 
+        self._sack_advertised_rwnd = sack.advertised_rwnd
         self._sack_duplicates.clear()
         self._sack_needed = False
 
@@ -1508,10 +1809,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         # adjust congestion window
         self._fast_recovery_exit = None
         self._flight_size = 0
-        self._partial_bytes_acked = 0
-
-        self._ssthresh = max(self._cwnd // 2, 4 * USERDATA_MAX_LENGTH)
-        self._cwnd = USERDATA_MAX_LENGTH
+        self._congestion_control.on_timeout(time.time())
 
         asyncio.ensure_future(self._transmit())
 
@@ -1548,10 +1846,10 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         # limit burst size
         if self._fast_recovery_exit is not None:
-            burst_size = 2 * USERDATA_MAX_LENGTH
+            burst_size = max(1, self._max_burst // 2) * USERDATA_MAX_LENGTH
         else:
-            burst_size = 4 * USERDATA_MAX_LENGTH
-        cwnd = min(self._flight_size + burst_size, self._cwnd)
+            burst_size = self._max_burst * USERDATA_MAX_LENGTH
+        cwnd = min(self._flight_size + burst_size, self._congestion_control.cwnd)
 
         # retransmit
         retransmit_earliest = True
@@ -1574,9 +1872,16 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             retransmit_earliest = False
 
         while self._outbound_queue and self._flight_size < cwnd:
-            chunk = self._outbound_queue.popleft()
+            # respect the peer's receive window, but always allow one chunk
+            # to be in flight to probe a closed window
+            chunk = self._outbound_queue[0]
+            if self._flight_size and chunk._book_size > self._peer_rwnd:
+                break
+
+            self._outbound_queue.popleft()
             self._sent_queue.append(chunk)
             self._flight_size_increase(chunk)
+            self._peer_rwnd = max(0, self._peer_rwnd - chunk._book_size)
 
             # update counters
             chunk._sent_count += 1
@@ -1639,7 +1944,9 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                 self._srtt - R
             )
             self._srtt = (1 - SCTP_RTO_ALPHA) * self._srtt + SCTP_RTO_ALPHA * R
-        self._rto = max(SCTP_RTO_MIN, min(self._srtt + 4 * self._rttvar, SCTP_RTO_MAX))
+        self._rto = max(
+            self._rto_min, min(self._srtt + 4 * self._rttvar, self._rto_max)
+        )
 
     def _data_channel_close(self, channel: RTCDataChannel) -> None:
         """
@@ -1666,6 +1973,28 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                     self._data_channels.pop(channel.id)
                 channel._setReadyState("closed")
 
+    def _data_channel_hold(self, size: int) -> None:
+        """
+        Account for a received message which has not been consumed yet.
+        """
+        self._receive_buffered += size
+
+    def _data_channel_release(self, size: int) -> None:
+        """
+        Account for a received message which has been consumed.
+
+        If this reopens a receive window which was nearly closed, the new
+        window is advertised immediately so that the peer resumes sending.
+        """
+        self._receive_buffered -= size
+        if (
+            self._association_state == self.State.ESTABLISHED
+            and self._sack_advertised_rwnd < self._receive_buffer_size // 2
+            and self._get_advertised_rwnd() >= self._receive_buffer_size // 2
+        ):
+            self._sack_advertised_rwnd = self._get_advertised_rwnd()
+            asyncio.ensure_future(self._send_sack())
+
     def _data_channel_closed(self, stream_id: int) -> None:
         channel = self._data_channels.pop(stream_id)
         channel._setReadyState("closed")
@@ -1757,9 +2086,10 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         asyncio.ensure_future(self._data_channel_flush())
 
     async def _data_channel_receive(
-        self, stream_id: int, pp_id: int, data: bytes
+        self, stream_id: int, pp_id: int, data: Union[bytes, memoryview]
     ) -> None:
         if pp_id == WEBRTC_DCEP and len(data):
+            data = bytes(data)
             msg_type = data[0]
             if msg_type == DATA_CHANNEL_OPEN and len(data) >= 12:
                 # we should not receive an open for an existing channel
@@ -1812,26 +2142,50 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                 channel = self._data_channels[stream_id]
                 channel._setReadyState("open")
         elif pp_id == WEBRTC_STRING and stream_id in self._data_channels:
-            # emit message
-            self._data_channels[stream_id].emit("message", data.decode("utf8"))
+            # deliver message
+            self._data_channels[stream_id]._deliverMessage(str(data, "utf8"), len(data))
         elif pp_id == WEBRTC_STRING_EMPTY and stream_id in self._data_channels:
-            # emit message
-            self._data_channels[stream_id].emit("message", "")
+            # deliver message
+            self._data_channels[stream_id]._deliverMessage("", len(data))
         elif pp_id == WEBRTC_BINARY and stream_id in self._data_channels:
-            # emit message
-            self._data_channels[stream_id].emit("message", data)
+            # deliver message
+            channel = self._data_channels[stream_id]
+            if channel.binaryType == "stream":
+                channel._deliverFragment(data, first=True, last=True)
+            elif channel.binaryType == "memoryview":
+                channel._deliverMessage(memoryview(data), len(data))
+            else:
+                channel._deliverMessage(bytes(data), len(data))
         elif pp_id == WEBRTC_BINARY_EMPTY and stream_id in self._data_channels:
-            # emit message
-            self._data_channels[stream_id].emit("message", b"")
+            # deliver message
+            channel = self._data_channels[stream_id]
+            if channel.binaryType == "stream":
+                channel._deliverFragment(b"", first=True, last=True)
+            elif channel.binaryType == "memoryview":
+                channel._deliverMessage(memoryview(b""), len(data))
+            else:
+                channel._deliverMessage(b"", len(data))
+
+    def _data_channel_receive_fragment(
+        self, stream_id: int, data: Union[bytes, memoryview], flags: int
+    ) -> None:
+        channel = self._data_channels.get(stream_id)
+        if channel is not None:
+            channel._deliverFragment(
+                data,
+                first=bool(flags & SCTP_DATA_FIRST_FRAG),
+                last=bool(flags & SCTP_DATA_LAST_FRAG),
+            )
 
     def _data_channel_send(
-        self, channel: RTCDataChannel, data: Union[bytes, str]
+        self, channel: RTCDataChannel, data: Union[bytes, memoryview, str]
     ) -> None:
+        user_data: Union[bytes, memoryview]
         if data == "":
             pp_id, user_data = WEBRTC_STRING_EMPTY, b"\x00"
         elif isinstance(data, str):
             pp_id, user_data = WEBRTC_STRING, data.encode("utf8")
-        elif data == b"":
+        elif not len(data):
             pp_id, user_data = WEBRTC_BINARY_EMPTY, b"\x00"
         else:
             pp_id, user_data = WEBRTC_BINARY, data
@@ -8,6 +8,7 @@ from typing import Any, Optional, Union
 from av import AudioFrame
 
 from .rtcrtpparameters import RTCRtpParameters
+from .utils import uint16_add, uint32_add
 
 # used for NACK and retransmission
 RTP_HISTORY_SIZE = 128
@@ -17,6 +18,9 @@ FORBIDDEN_PAYLOAD_TYPES = range(72, 77)
 DYNAMIC_PAYLOAD_TYPES = range(96, 128)
 
 RTP_HEADER_LENGTH = 12
+RED_HEADER_LENGTH = 4
+RED_MAX_BLOCK_LENGTH = 1023
+RED_MAX_TIMESTAMP_OFFSET = 16383
 RTCP_HEADER_LENGTH = 4
 
 PACKETS_LOST_MIN = -(1 << 23)
@@ -754,6 +758,121 @@ class RtpPacket:
         return data
 
 
+def pack_red(blocks: list[tuple[int, int, bytes]]) -> bytes:
+    """
+    Pack redundant audio data as described by RFC 2198.
+
+    Each block is a `(payload_type, timestamp_offset, data)` tuple, the
+    redundant blocks come first and the primary block last.
+    """
+    headers = []
+    for payload_type, timestamp_offset, data in blocks[:-1]:
+        headers.append(
+            pack(
+                "!BHB",
+                0x80 | payload_type,
+                (timestamp_offset << 2) | (len(data) >> 8),
+                len(data) & 0xFF,
+            )
+        )
+    headers.append(bytes([blocks[-1][0]]))
+    return b"".join(headers + [data for _, _, data in blocks])
+
+
+def unpack_red(payload: bytes) -> list[tuple[int, int, bytes]]:
+    """
+    Unpack redundant audio data as described by RFC 2198.
+    """
+    headers: list[tuple[int, int, Optional[int]]] = []
+    pos = 0
+    while True:
+        if len(payload) <= pos:
+            raise ValueError("RED header is truncated")
+        if not payload[pos] & 0x80:
+            headers.append((payload[pos] & 0x7F, 0, None))
+            pos += 1
+            break
+        if len(payload) < pos + RED_HEADER_LENGTH:
+            raise ValueError("RED header is truncated")
+        payload_type, offset_length, length_low = unpack_from("!BHB", payload, pos)
+        headers.append(
+            (
+                payload_type & 0x7F,
+                offset_length >> 2,
+                ((offset_length & 3) << 8) | length_low,
+            )
+        )
+        pos += RED_HEADER_LENGTH
+
+    blocks = []
+    for payload_type, timestamp_offset, length in headers:
+        if length is None:
+            length = len(payload) - pos
+        elif len(payload) < pos + length:
+            raise ValueError("RED data is truncated")
+        blocks.append((payload_type, timestamp_offset, payload[pos : pos + length]))
+        pos += length
+    return blocks
+
+
+def unwrap_red(
+    red: RtpPacket, previous: Optional[tuple[int, int]] = None
+) -> list[RtpPacket]:
+    """
+    Recover the packets carried by a redundant audio packet, oldest first.
+
+    `previous` is the sequence number and timestamp of the latest packet
+    received before `red`. A redundant block is only recovered if it fills a
+    gap since that packet which its timestamp locates: either the gap holds as
+    many packets as there are blocks, or its packets are evenly spaced.
+    """
+    blocks = unpack_red(red.payload)
+    sequence_numbers: dict[int, int] = {}
+    if previous is not None:
+        previous_sequence_number, previous_timestamp = previous
+        missing = uint16_add(red.sequence_number, -previous_sequence_number) - 1
+        span = uint32_add(red.timestamp, -previous_timestamp)
+
+        # the blocks sent after the previous packet, by timestamp offset
+        offsets = [offset for _, offset, _ in blocks[:-1] if 0 < offset < span]
+        if 0 < missing < 0x8000 and offsets:
+            if len(offsets) == missing:
+                for i, offset in enumerate(offsets):
+                    sequence_numbers[offset] = uint16_add(
+                        previous_sequence_number, i + 1
+                    )
+            elif span % (missing + 1) == 0:
+                step = span // (missing + 1)
+                for offset in offsets:
+                    position, remainder = divmod(span - offset, step)
+                    if not remainder:
+                        sequence_numbers[offset] = uint16_add(
+                            previous_sequence_number, position
+                        )
+
+    packets = []
+    for i, (payload_type, timestamp_offset, data) in enumerate(blocks):
+        if i == len(blocks) - 1:
+            sequence_number = red.sequence_number
+        elif timestamp_offset in sequence_numbers:
+            sequence_number = sequence_numbers[timestamp_offset]
+        else:
+            continue
+        packet = RtpPacket(
+            payload_type=payload_type,
+            sequence_number=sequence_number,
+            timestamp=uint32_add(red.timestamp, -timestamp_offset),
+            ssrc=red.ssrc,
+            payload=data,
+        )
+        packet.csrc = red.csrc
+        if i == len(blocks) - 1:
+            packet.marker = red.marker
+            packet.extensions = red.extensions
+        packets.append(packet)
+    return packets
+
+
 def unwrap_rtx(rtx: RtpPacket, payload_type: int, ssrc: int) -> RtpPacket:
     """
     Recover initial packet from a retransmission packet.
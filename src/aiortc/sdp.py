@@ -1,7 +1,7 @@
 import enum
 import ipaddress
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Optional, Union
 
 from . import rtp
@@ -28,6 +28,7 @@ FMTP_INT_PARAMETERS = [
     "maxplaybackrate",
     "minptime",
     "stereo",
+    "usedtx",
     "useinbandfec",
 ]
 
@@ -233,6 +234,60 @@ def parse_group(
         dest.append(GroupDescription(semantic=bits[0], items=list(map(type, bits[1:]))))
 
 
+@dataclass
+class RidDescription:
+    id: str
+    direction: str
+    restrictions: Optional[str] = None
+
+    def __str__(self) -> str:
+        s = f"{self.id} {self.direction}"
+        if self.restrictions:
+            s += f" {self.restrictions}"
+        return s
+
+
+def parse_rid(value: str) -> RidDescription:
+    bits = value.split(" ", 2)
+    return RidDescription(
+        id=bits[0],
+        direction=bits[1],
+        restrictions=bits[2] if len(bits) > 2 else None,
+    )
+
+
+@dataclass
+class SimulcastDescription:
+    """
+    The simulcast streams, each given as a list of alternative rids. A rid
+    starting with `~` designates a paused stream.
+    """
+
+    send: list[list[str]] = field(default_factory=list)
+    recv: list[list[str]] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        parts = []
+        for direction in ("send", "recv"):
+            streams = getattr(self, direction)
+            if streams:
+                parts.append(
+                    direction + " " + ";".join(",".join(rids) for rids in streams)
+                )
+        return " ".join(parts)
+
+
+def parse_simulcast(value: str) -> SimulcastDescription:
+    simulcast = SimulcastDescription()
+    bits = value.split()
+    for direction, streams in zip(bits[::2], bits[1::2]):
+        if direction in ("send", "recv"):
+            getattr(simulcast, direction).extend(
+                [rids.split(",") for rids in streams.split(";")]
+            )
+    return simulcast
+
+
 @dataclass
 class SsrcDescription:
     ssrc: int
@@ -264,6 +319,10 @@ class MediaDescription:
         self.ssrc: list[SsrcDescription] = []
         self.ssrc_group: list[GroupDescription] = []
 
+        # simulcast
+        self.rid: list[RidDescription] = []
+        self.simulcast: Optional[SimulcastDescription] = None
+
         # formats
         self.fmt = fmt
         self.rtp = RTCRtpParameters()
@@ -332,6 +391,11 @@ class MediaDescription:
             if params:
                 lines.append(f"a=fmtp:{codec.payloadType} {params}")
 
+        for rid in self.rid:
+            lines.append(f"a=rid:{rid}")
+        if self.simulcast is not None:
+            lines.append(f"a=simulcast:{self.simulcast}")
+
         for k, v in self.sctpmap.items():
             lines.append(f"a=sctpmap:{k} {v}")
         if self.sctp_port is not None:
@@ -384,8 +448,10 @@ class SessionDescription:
         ice_password = None
         ice_usernameFragment = None
 
-        def find_codec(pt: int) -> RTCRtpCodecParameters:
-            return next(filter(lambda x: x.payloadType == pt, current_media.rtp.codecs))
+        def find_codec(pt: int) -> Optional[RTCRtpCodecParameters]:
+            return next(
+                filter(lambda x: x.payloadType == pt, current_media.rtp.codecs), None
+            )
 
         session_lines, media_groups = grouplines(sdp)
 
@@ -496,6 +562,8 @@ class SessionDescription:
                             current_media.rtcp_host = ipaddress_from_sdp(bits[1])
                     elif attr == "rtcp-mux":
                         current_media.rtcp_mux = True
+                    elif attr == "rid":
+                        current_media.rid.append(parse_rid(value))
                     elif attr == "setup":
                         current_media.dtls.role = DTLS_SETUP_ROLE[value]
                     elif attr in DIRECTIONS:
@@ -522,6 +590,8 @@ class SessionDescription:
                         getattr(current_media, attr)[int(format_id)] = format_desc
                     elif attr == "sctp-port":
                         current_media.sctp_port = int(value)
+                    elif attr == "simulcast":
+                        current_media.simulcast = parse_simulcast(value)
                     elif attr == "ssrc-group":
                         parse_group(current_media.ssrc_group, value, type=int)
                     elif attr == "ssrc":
@@ -549,7 +619,9 @@ class SessionDescription:
                     if attr == "fmtp":
                         format_id, format_desc = value.split(" ", 1)
                         codec = find_codec(int(format_id))
-                        codec.parameters = parameters_from_sdp(format_desc)
+                        # ignore parameters for a format without an rtpmap
+                        if codec is not None:
+                            codec.parameters = parameters_from_sdp(format_desc)
                     elif attr == "rtcp-fb":
                         bits = value.split(" ", 2)
                         for codec in current_media.rtp.codecs:
@@ -563,7 +635,13 @@ class SessionDescription:
 
         return session
 
+    def webrtc_stream_id(self, media: MediaDescription) -> Optional[str]:
+        return self.__webrtc_msid(media, 0)
+
     def webrtc_track_id(self, media: MediaDescription) -> Optional[str]:
+        return self.__webrtc_msid(media, 1)
+
+    def __webrtc_msid(self, media: MediaDescription, index: int) -> Optional[str]:
         assert media in self.media
         if media.msid is not None and " " in media.msid:
             bits = media.msid.split()
@@ -571,7 +649,7 @@ class SessionDescription:
                 if group.semantic == "WMS" and (
                     bits[0] in group.items or "*" in group.items
                 ):
-                    return bits[1]
+                    return bits[index]
         return None
 
     def __str__(self) -> str:
@@ -44,7 +44,40 @@ class RTCInboundRtpStreamStats(RTCReceivedRtpStreamStats):
     metrics for the incoming RTP media stream.
     """
 
-    pass
+    jitterBufferDelay: Optional[float] = None
+    """
+    The sum of the playout delays of the frames emitted by the jitter buffer,
+    in seconds. Dividing its increase by that of
+    :attr:`jitterBufferEmittedCount` gives the current delay. For video, a
+    frame's delay runs from the arrival of its first packet.
+    """
+    jitterBufferTargetDelay: Optional[float] = None
+    """
+    The sum of the target playout delays of the audio frames emitted by the
+    jitter buffer, in seconds.
+    """
+    jitterBufferEmittedCount: Optional[int] = None
+    "The number of frames emitted by the jitter buffer."
+    framesDecoded: Optional[int] = None
+    "The number of video frames decoded."
+    keyFramesDecoded: Optional[int] = None
+    "The number of video keyframes decoded."
+    framesDropped: Optional[int] = None
+    """
+    The number of video frames dropped before decoding, because they could
+    not be decoded after a loss or were not selected for decoding.
+    """
+    totalDecodeTime: Optional[float] = None
+    """
+    The total time spent decoding video frames, in seconds. Dividing it by
+    :attr:`framesDecoded` gives the average decode time.
+    """
+    nackCount: Optional[int] = None
+    "The number of NACK packets sent to request retransmissions."
+    pliCount: Optional[int] = None
+    "The number of Picture Loss Indication packets sent."
+    firCount: Optional[int] = None
+    "The number of Full Intra Request packets sent."
 
 
 @dataclass
@@ -66,6 +99,29 @@ class RTCOutboundRtpStreamStats(RTCSentRtpStreamStats):
     """
 
     trackId: str
+    rid: Optional[str] = None
+    "The RTP stream identifier of the simulcast layer, if any."
+    retransmittedPacketsSent: int = 0
+    "The number of packets retransmitted in response to NACKs."
+    retransmittedBytesSent: int = 0
+    "The number of payload bytes retransmitted in response to NACKs."
+    nackCount: int = 0
+    "The number of NACK packets received."
+    pliCount: Optional[int] = None
+    "The number of Picture Loss Indication packets received."
+    firCount: Optional[int] = None
+    "The number of Full Intra Request packets received."
+    framesEncoded: Optional[int] = None
+    "The number of video frames encoded."
+    keyFramesEncoded: Optional[int] = None
+    "The number of video keyframes encoded."
+    totalEncodeTime: Optional[float] = None
+    """
+    The total time spent encoding video frames, in seconds. Dividing it by
+    :attr:`framesEncoded` gives the average encode time.
+    """
+    targetBitrate: Optional[int] = None
+    "The bitrate the encoder currently aims for, in bits per second."
 
 
 @dataclass
@@ -78,6 +134,31 @@ class RTCRemoteOutboundRtpStreamStats(RTCSentRtpStreamStats):
     remoteTimestamp: Optional[datetime.datetime] = None
 
 
+@dataclass
+class RTCStageTimingStats(RTCStats):
+    """
+    The :class:`RTCStageTimingStats` dictionary reports how long media spent
+    in one stage of the pipeline of an :class:`RTCRtpReceiver` or an
+    :class:`RTCRtpSender`, once stage timing is enabled.
+    """
+
+    stage: str
+    "The name of the stage, for instance `decode`."
+    count: int
+    "The number of frames or packets timed in this stage."
+    totalTime: float
+    "The total time spent in this stage, in seconds."
+    maxTime: float
+    "The longest time spent in this stage, in seconds."
+    histogram: list[int]
+    """
+    The number of frames or packets by time spent in this stage. The first
+    bucket counts times below 125 microseconds, each following bucket times
+    below twice the limit of the previous one, and the last bucket all the
+    longer times.
+    """
+
+
 @dataclass
 class RTCTransportStats(RTCStats):
     packetsSent: int
@@ -107,6 +188,7 @@ class RTCStatsReport(dict):
     - :class:`RTCOutboundRtpStreamStats`
     - :class:`RTCRemoteInboundRtpStreamStats`
     - :class:`RTCRemoteOutboundRtpStreamStats`
+    - :class:`RTCStageTimingStats`
     - :class:`RTCTransportStats`
     """
 
@@ -0,0 +1,86 @@
+import math
+import time
+from collections.abc import Sequence
+
+from . import clock
+from .stats import RTCStageTimingStats, RTCStatsReport
+
+# The upper limit of the first bucket of the histograms, in seconds.
+HISTOGRAM_BASE = 0.000125
+
+# The number of buckets of the histograms, each twice as wide as the last.
+HISTOGRAM_BUCKETS = 16
+
+
+class StageTimer:
+    """
+    Aggregate the time which frames and packets spend in each stage of a
+    media pipeline into histograms.
+
+    A timer only exists while stage timing is enabled, so the pipeline does
+    no timing work otherwise. The decoder thread updates the timer too, which
+    only involves updating counters and dictionary entries.
+    """
+
+    def __init__(self, stages: Sequence[str]) -> None:
+        self.stages = stages
+        self.__counts = dict.fromkeys(stages, 0)
+        self.__histograms = {stage: [0] * HISTOGRAM_BUCKETS for stage in stages}
+        self.__marks: dict[int, float] = {}
+        self.__max_times = dict.fromkeys(stages, 0.0)
+        self.__total_times = dict.fromkeys(stages, 0.0)
+
+    def add(self, stage: str, duration: float) -> None:
+        """
+        Record that a frame or packet spent `duration` seconds in `stage`.
+        """
+        bucket = 0
+        if duration >= HISTOGRAM_BASE:
+            # the exponent is the number of doublings of the first limit needed
+            exponent = math.frexp(duration / HISTOGRAM_BASE)[1]
+            bucket = min(exponent, HISTOGRAM_BUCKETS - 1)
+        self.__histograms[stage][bucket] += 1
+        self.__counts[stage] += 1
+        self.__total_times[stage] += duration
+        if duration > self.__max_times[stage]:
+            self.__max_times[stage] = duration
+
+    def mark(self, item: object) -> None:
+        """
+        Record that `item` enters a stage which is timed by :meth:`measure`.
+        """
+        self.__marks[id(item)] = time.perf_counter()
+
+    def measure(self, stage: str, item: object) -> None:
+        """
+        Record the time `item` spent in `stage` since it was marked.
+        """
+        start = self.__marks.pop(id(item), None)
+        if start is not None:
+            self.add(stage, time.perf_counter() - start)
+
+    def get_stats(self, stats_id: str) -> list[RTCStageTimingStats]:
+        timestamp = clock.current_datetime()
+        return [
+            RTCStageTimingStats(
+                # RTCStats
+                timestamp=timestamp,
+                type="stage-timing",
+                id="stage-timing_" + stats_id + "_" + stage,
+                # RTCStageTimingStats
+                stage=stage,
+                count=self.__counts[stage],
+                totalTime=self.__total_times[stage],
+                maxTime=self.__max_times[stage],
+                histogram=list(self.__histograms[stage]),
+            )
+            for stage in self.stages
+        ]
+
+
+def remove_stage_timing_stats(report: RTCStatsReport) -> None:
+    """
+    Remove the stage timing statistics from `report`, once timing is disabled.
+    """
+    for stats_id in [k for k, v in report.items() if v.type == "stage-timing"]:
+        del report[stats_id]
@@ -0,0 +1,281 @@
+import io
+import os
+from contextlib import redirect_stderr
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from aiortc.codecs import depayload, get_decoder, get_encoder
+from aiortc.codecs.av1 import (
+    Av1Decoder,
+    Av1Encoder,
+    Av1PayloadDescriptor,
+    av1_assemble,
+    av1_describe,
+    leb128_decode,
+    leb128_encode,
+    split_obus,
+)
+from aiortc.jitterbuffer import JitterFrame
+from aiortc.rtcrtpparameters import (
+    RTCRtpCodecParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
+)
+
+from .codecs import CodecTestCase
+
+AV1_CODEC = RTCRtpCodecParameters(
+    mimeType="video/AV1", clockRate=90000, payloadType=105
+)
+
+# A temporal delimiter, a sequence header and a frame, with size fields.
+TEMPORAL_UNIT = (
+    b"\x12\x00"
+    + b"\x0a\x03\x00\x00\x00"
+    + b"\x32\x04\x01\x02\x03\x04"
+    + b"\x7a\x01\x00"  # padding
+)
+
+
+class Av1PayloadDescriptorTest(TestCase):
+    def test_leb128(self) -> None:
+        for value, data in [
+            (0, b"\x00"),
+            (127, b"\x7f"),
+            (128, b"\x80\x01"),
+            (1300, b"\x94\x0a"),
+            (2**21, b"\x80\x80\x80\x01"),
+        ]:
+            self.assertEqual(leb128_encode(value), data)
+            self.assertEqual(leb128_decode(data, 0), (value, len(data)))
+
+        with self.assertRaises(ValueError) as cm:
+            leb128_decode(b"\x80", 0)
+        self.assertEqual(str(cm.exception), "LEB128 value is truncated")
+
+        with self.assertRaises(ValueError) as cm:
+            leb128_decode(b"\x80" * 8, 0)
+        self.assertEqual(str(cm.exception), "LEB128 value is too long")
+
+    def test_parse_empty(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            Av1PayloadDescriptor.parse(b"")
+        self.assertEqual(str(cm.exception), "AV1 descriptor is too short")
+
+    def test_parse_obu_count(self) -> None:
+        descr, elements = Av1PayloadDescriptor.parse(b"\x28\x02\x0a\x00\x30\x01\x02")
+        self.assertEqual(descr.continuation, 0)
+        self.assertEqual(descr.fragmented, 0)
+        self.assertEqual(descr.obu_count, 2)
+        self.assertEqual(descr.new_sequence, 1)
+        self.assertEqual(bytes(descr), b"\x28")
+        self.assertEqual(repr(descr), "Av1PayloadDescriptor(Z=0, Y=0, W=2, N=1)")
+        self.assertEqual(elements, [b"\x0a\x00", b"\x30\x01\x02"])
+
+    def test_parse_length_fields(self) -> None:
+        descr, elements = Av1PayloadDescriptor.parse(b"\xc0\x01\x01\x02\x30\x01")
+        self.assertEqual(descr.continuation, 1)
+        self.assertEqual(descr.fragmented, 1)
+        self.assertEqual(descr.obu_count, 0)
+        self.assertEqual(descr.new_sequence, 0)
+        self.assertEqual(elements, [b"\x01", b"\x30\x01"])
+
+    def test_parse_truncated(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            Av1PayloadDescriptor.parse(b"\x00\x03\x30\x01")
+        self.assertEqual(str(cm.exception), "AV1 descriptor has truncated OBU element")
+
+        with self.assertRaises(ValueError) as cm:
+            Av1PayloadDescriptor.parse(b"\x30\x01\x30")
+        self.assertEqual(
+            str(cm.exception), "AV1 descriptor has wrong OBU element count"
+        )
+
+    def test_describe(self) -> None:
+        # first packet of a coded video sequence
+        descr = av1_describe(b"\x28\x02\x0a\x00\x30\x01\x02")
+        self.assertTrue(descr.keyframe)
+
+        # any other packet
+        descr = av1_describe(b"\xc0\x01\x01\x02\x30\x01")
+        self.assertFalse(descr.keyframe)
+
+    def test_split_obus(self) -> None:
+        self.assertEqual(
+            list(split_obus(TEMPORAL_UNIT)),
+            [b"\x08\x00\x00\x00", b"\x30\x01\x02\x03\x04"],
+        )
+
+        # the last OBU may omit its size field
+        self.assertEqual(list(split_obus(b"\x30\x01\x02")), [b"\x30\x01\x02"])
+
+        with self.assertRaises(ValueError) as cm:
+            list(split_obus(b"\x32\x04\x01"))
+        self.assertEqual(str(cm.exception), "OBU is truncated")
+
+    def test_assemble(self) -> None:
+        # a sequence header and the start of a frame, then the rest of the frame
+        data = depayload(AV1_CODEC, b"\x68\x04\x08\x00\x00\x00\x30\x01") + depayload(
+            AV1_CODEC, b"\x90\x02\x03\x04"
+        )
+        self.assertEqual(
+            av1_assemble(data),
+            b"\x12\x00\x0a\x03\x00\x00\x00\x32\x04\x01\x02\x03\x04",
+        )
+
+        # the start of the fragmented OBU was lost
+        data = depayload(AV1_CODEC, b"\x90\x02\x03\x04")
+        self.assertEqual(av1_assemble(data), b"\x12\x00")
+
+
+class Av1Test(CodecTestCase):
+    def test_decoder(self) -> None:
+        decoder = get_decoder(AV1_CODEC)
+        self.assertIsInstance(decoder, Av1Decoder)
+
+        # decode junk
+        with redirect_stderr(io.StringIO()):
+            frames = decoder.decode(JitterFrame(data=b"123", timestamp=0))
+        self.assertEqual(frames, [])
+
+    def test_decoder_unavailable(self) -> None:
+        with patch("av.codecs_available", set()):
+            with self.assertRaises(ValueError) as cm:
+                Av1Decoder()
+        self.assertEqual(str(cm.exception), "No AV1 decoder is available in FFmpeg")
+
+    def test_encoder(self) -> None:
+        encoder = get_encoder(AV1_CODEC)
+        self.assertIsInstance(encoder, Av1Encoder)
+
+        frame = self.create_video_frame(width=640, height=480, pts=0)
+        payloads, timestamp = encoder.encode(frame)
+        self.assertEqual(len(payloads), 1)
+        descr, elements = Av1PayloadDescriptor.parse(payloads[0])
+        self.assertEqual(descr.new_sequence, 1)
+        self.assertEqual(len(elements), 2)
+        self.assertEqual(timestamp, 0)
+
+        frame = self.create_video_frame(width=640, height=480, pts=3000)
+        payloads, timestamp = encoder.encode(frame)
+        self.assertEqual(len(payloads), 1)
+        descr, elements = Av1PayloadDescriptor.parse(payloads[0])
+        self.assertEqual(descr.new_sequence, 0)
+        self.assertAlmostEqual(timestamp, 3000, delta=1)
+
+    @skipUnless(hasattr(os, "sched_getscheduler"), "requires scheduling policies")
+    def test_encoder_unavailable(self) -> None:
+        with patch("av.codecs_available", set()):
+            with self.assertRaises(ValueError) as cm:
+                Av1Encoder()
+        self.assertEqual(str(cm.exception), "No AV1 encoder is available in FFmpeg")
+
+    def test_encoder_scheduling_policy(self) -> None:
+        policy = os.sched_getscheduler(0)
+
+        encoder = get_encoder(AV1_CODEC)
+        frame = self.create_video_frame(width=320, height=240, pts=0)
+        encoder.encode(frame)
+        self.assertEqual(os.sched_getscheduler(0), policy)
+
+    def test_encoder_keyframe(self) -> None:
+        encoder = get_encoder(AV1_CODEC)
+        self.assertIsInstance(encoder, Av1Encoder)
+
+        new_sequence = []
+        for i, frame in enumerate(self.create_video_frames(320, 240, count=4)):
+            payloads, timestamp = encoder.encode(frame, force_keyframe=(i == 2))
+            new_sequence.append(Av1PayloadDescriptor.parse(payloads[0])[0].new_sequence)
+        self.assertEqual(new_sequence, [1, 0, 1, 0])
+
+    def test_encoder_target_bitrate(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(AV1_CODEC), Av1Encoder)
+        self.assertEqual(encoder.target_bitrate, 500000)
+
+        encoder.target_bitrate = 100000
+        self.assertEqual(encoder.target_bitrate, 150000)
+        encoder.target_bitrate = 600000
+        self.assertEqual(encoder.target_bitrate, 600000)
+
+        # the bitrate is only changed every 5s
+        frames = self.create_video_frames(320, 240, count=151)
+        for frame in frames[:150]:
+            encoder.encode(frame)
+            encoder.target_bitrate = 1000000
+            self.assertEqual(encoder.codec.bit_rate, 600000)
+        encoder.encode(frames[150])
+        self.assertEqual(encoder.codec.bit_rate, 1000000)
+
+        # a requested keyframe applies the current bitrate
+        encoder.target_bitrate = 400000
+        frame = self.create_video_frame(width=320, height=240, pts=456000)
+        payloads, timestamp = encoder.encode(frame, force_keyframe=True)
+        self.assertEqual(encoder.codec.bit_rate, 400000)
+
+    def test_encoder_configure(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(AV1_CODEC), Av1Encoder)
+        encoder.configure(
+            RTCRtpEncoderParameters(
+                startBitrate=300000, keyFrameInterval=60, preset="12"
+            ),
+            RTCRtpEncodingParameters(maxFramerate=15, scaleResolutionDownBy=2),
+        )
+
+        frame = self.create_video_frame(width=640, height=480, pts=0)
+        payloads, timestamp = encoder.encode(frame)
+        self.assertEqual(Av1PayloadDescriptor.parse(payloads[0])[0].new_sequence, 1)
+        assert encoder.codec is not None
+        self.assertEqual(encoder.codec.width, 320)
+        self.assertEqual(encoder.codec.height, 240)
+        self.assertEqual(encoder.codec.bit_rate, 300000)
+        self.assertEqual(encoder.codec.framerate, 15)
+        self.assertEqual(encoder.codec.gop_size, 60)
+
+    def test_packetize_large(self) -> None:
+        # a sequence header, a large frame and a small frame
+        data = (
+            b"\x0a\x03\x00\x00\x00"
+            + b"\x32"
+            + leb128_encode(3000)
+            + bytes(range(250)) * 12
+            + b"\x32\x01\x00"
+        )
+        payloads = Av1Encoder._packetize(data)
+        self.assertEqual([len(p) for p in payloads], [1298, 1298, 417])
+
+        descriptors = [Av1PayloadDescriptor.parse(p)[0] for p in payloads]
+        self.assertEqual(
+            [repr(d) for d in descriptors],
+            [
+                "Av1PayloadDescriptor(Z=0, Y=1, W=2, N=1)",
+                "Av1PayloadDescriptor(Z=1, Y=1, W=1, N=0)",
+                "Av1PayloadDescriptor(Z=1, Y=0, W=2, N=0)",
+            ],
+        )
+
+        # reassemble
+        assembled = av1_assemble(b"".join(depayload(AV1_CODEC, p) for p in payloads))
+        self.assertEqual(assembled, b"\x12\x00" + data)
+
+        self.assertTrue(all(len(p) <= 1300 for p in payloads))
+
+    def test_encoder_pack(self) -> None:
+        encoder = get_encoder(AV1_CODEC)
+        self.assertIsInstance(encoder, Av1Encoder)
+
+        packet = self.create_packet(payload=TEMPORAL_UNIT, pts=1)
+        payloads, timestamp = encoder.pack(packet)
+        self.assertEqual(payloads, [b"\x28\x04\x08\x00\x00\x00\x30\x01\x02\x03\x04"])
+        self.assertEqual(timestamp, 90)
+
+    def test_roundtrip_1280_720(self) -> None:
+        self.roundtrip_video(AV1_CODEC, 1280, 720)
+
+    def test_roundtrip_960_540(self) -> None:
+        self.roundtrip_video(AV1_CODEC, 960, 540)
+
+    def test_roundtrip_640_480(self) -> None:
+        self.roundtrip_video(AV1_CODEC, 640, 480)
+
+    def test_roundtrip_320_240(self) -> None:
+        self.roundtrip_video(AV1_CODEC, 320, 240)
@@ -1,6 +1,7 @@
 from unittest import TestCase
+from unittest.mock import patch
 
-from aiortc.codecs import get_decoder, get_encoder
+from aiortc.codecs import CODECS, get_decoder, get_encoder, init_codecs
 from aiortc.rtcrtpparameters import RTCRtpCodecParameters
 
 BOGUS_CODEC = RTCRtpCodecParameters(
@@ -16,3 +17,16 @@ class CodecsTest(TestCase):
     def test_get_encoder(self) -> None:
         with self.assertRaises(ValueError):
             get_encoder(BOGUS_CODEC)
+
+    def test_init_codecs_unavailable(self) -> None:
+        video_codecs = CODECS["video"]
+        try:
+            CODECS["video"] = []
+            with patch("av.codecs_available", {"libvpx", "vp8", "vp9"}):
+                init_codecs()
+            self.assertEqual(
+                sorted(set(c.mimeType for c in CODECS["video"])),
+                ["video/H264", "video/VP8", "video/rtx"],
+            )
+        finally:
+            CODECS["video"] = video_codecs
@@ -1,12 +1,22 @@
 import fractions
 import io
 from contextlib import redirect_stderr
+from dataclasses import replace
 from unittest import TestCase
 
 from aiortc.codecs import get_decoder, get_encoder
-from aiortc.codecs.h264 import H264Decoder, H264Encoder, H264PayloadDescriptor
+from aiortc.codecs.h264 import (
+    H264Decoder,
+    H264Encoder,
+    H264PayloadDescriptor,
+    h264_describe,
+)
 from aiortc.jitterbuffer import JitterFrame
-from aiortc.rtcrtpparameters import RTCRtpCodecParameters
+from aiortc.rtcrtpparameters import (
+    RTCRtpCodecParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
+)
 
 from .codecs import CodecTestCase
 from .utils import load
@@ -80,6 +90,26 @@ class H264PayloadDescriptorTest(TestCase):
         self.assertEqual(rest[4:], payload)
         self.assertEqual(len(rest), 564)
 
+    def test_describe(self) -> None:
+        # IDR slice
+        self.assertTrue(h264_describe(b"\x65\x88").keyframe)
+        # non-IDR slice
+        self.assertFalse(h264_describe(b"\x41\x9a").keyframe)
+        # first and second fragments of an IDR slice
+        self.assertTrue(h264_describe(b"\x7c\x85").keyframe)
+        self.assertFalse(h264_describe(b"\x7c\x05").keyframe)
+        # aggregation packet starting with a sequence parameter set
+        self.assertTrue(h264_describe(b"\x18\x00\x02\x67\x42").keyframe)
+
+    def test_describe_truncated(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            h264_describe(b"\x7c")
+        self.assertEqual(str(cm.exception), "NAL unit is too short")
+
+        with self.assertRaises(ValueError) as cm:
+            h264_describe(b"\x18\x00")
+        self.assertEqual(str(cm.exception), "STAP-A length field is truncated")
+
 
 class H264Test(CodecTestCase):
     def test_decoder(self) -> None:
@@ -148,6 +178,75 @@ class H264Test(CodecTestCase):
         self.assertTrue(len(packages[0]) < 1300)
         self.assertEqual(timestamp, 3000)
 
+    def test_encoder_configure(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(H264_CODEC), H264Encoder)
+        frames = self.create_video_frames(640, 480, 4)
+
+        parameters = RTCRtpEncoderParameters(
+            minBitrate=200000,
+            startBitrate=300000,
+            keyFrameInterval=60,
+            preset="ultrafast",
+            threadCount=1,
+        )
+        encoding = RTCRtpEncodingParameters(maxBitrate=800000, scaleResolutionDownBy=2)
+        encoder.configure(parameters, encoding)
+        self.assertEqual(encoder.target_bitrate, 300000)
+        encoder.target_bitrate = 100000
+        self.assertEqual(encoder.target_bitrate, 200000)
+        encoder.target_bitrate = 5000000
+        self.assertEqual(encoder.target_bitrate, 800000)
+
+        encoder.encode(frames[0])
+        assert encoder.codec is not None
+        self.assertEqual(encoder.codec.width, 320)
+        self.assertEqual(encoder.codec.height, 240)
+        self.assertEqual(encoder.codec.gop_size, 60)
+        self.assertEqual(encoder.codec.thread_count, 1)
+
+        # the bitrate limits are applied live
+        codec = encoder.codec
+        encoding = replace(encoding, maxBitrate=600000)
+        encoder.configure(parameters, encoding)
+        self.assertEqual(encoder.target_bitrate, 600000)
+        encoder.encode(frames[1])
+        self.assertIs(encoder.codec, codec)
+        self.assertEqual(encoder.codec.bit_rate, 600000)
+
+        # so is the scale
+        encoding = replace(encoding, scaleResolutionDownBy=1)
+        encoder.configure(parameters, encoding)
+        encoder.encode(frames[2])
+        self.assertEqual(encoder.codec.width, 640)
+        self.assertEqual(encoder.codec.gop_size, 60)
+
+        # other settings restart the encoder
+        codec = encoder.codec
+        encoder.configure(replace(parameters, keyFrameInterval=30), encoding)
+        encoder.encode(frames[3])
+        self.assertIsNot(encoder.codec, codec)
+        self.assertEqual(encoder.codec.gop_size, 30)
+
+    def test_encoder_target_bitrate_sweep(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(H264_CODEC), H264Encoder)
+
+        def is_keyframe(payloads: list[bytes]) -> bool:
+            # an IDR picture is preceded by an SPS, aggregated in a STAP-A
+            return payloads[0][0] & 0x1F == 24 and payloads[0][3] & 0x1F == 7
+
+        # change the bitrate every 500ms for 8s
+        keyframes = []
+        bitrates = [500000, 1000000, 2000000, 3000000]
+        for i, frame in enumerate(self.create_video_frames(320, 240, 240)):
+            encoder.target_bitrate = bitrates[(i // 15) % len(bitrates)]
+            payloads, timestamp = encoder.encode(frame)
+            if is_keyframe(payloads):
+                keyframes.append(i)
+            self.assertEqual(encoder.codec.bit_rate, encoder.target_bitrate)
+
+        # the encoder is never restarted
+        self.assertEqual(keyframes, [0])
+
     def test_roundtrip_1280_720(self) -> None:
         self.roundtrip_video(H264_CODEC, 1280, 720)
 
@@ -202,6 +301,20 @@ class H264Test(CodecTestCase):
         )
         self.assertEqual(packages, [b"\xff\x00\x00\x00\x00\x00"])
 
+    def test_split_bitstream_views(self) -> None:
+        buf = b"\x00\x00\x00\x01\xff\xab\x00\x00\x01" + bytes([0x65] * 2000)
+        packages = list(H264Encoder._split_bitstream(buf))
+        self.assertEqual([type(p) for p in packages], [memoryview, memoryview])
+        self.assertTrue(all(p.obj is buf for p in packages))
+
+        # payloads are bytes
+        payloads = H264Encoder._packetize(packages)
+        self.assertEqual([type(p) for p in payloads], [bytes, bytes, bytes])
+        self.assertEqual(payloads[0], b"\xff\xab")
+        self.assertEqual(payloads[1][0] & 0x1F, 28)
+        self.assertEqual(payloads[2][0] & 0x1F, 28)
+        self.assertEqual(len(payloads[1]) + len(payloads[2]), 2003)
+
     def test_packetize_one_small(self) -> None:
         packages = [bytes([0xFF, 0xFF])]
         packetize_packages = H264Encoder._packetize(packages)
@@ -1,16 +1,35 @@
 from typing import Optional
 from unittest import TestCase
 
-from aiortc.jitterbuffer import JitterBuffer
+from aiortc.jitterbuffer import JitterBuffer, PacketDescription
 from aiortc.rtp import RtpPacket
 
 
+def create_video_packet(
+    sequence_number: int, description: PacketDescription, marker: int = 0
+) -> RtpPacket:
+    """
+    Create a packet carrying a whole video frame.
+    """
+    packet = RtpPacket(
+        marker=marker,
+        sequence_number=sequence_number,
+        timestamp=sequence_number * 3000,
+    )
+    packet._data = b"0000"  # type: ignore
+    packet._description = description  # type: ignore
+    return packet
+
+
 class JitterBufferTest(TestCase):
     def assertPackets(
         self, jbuffer: JitterBuffer, expected: list[Optional[int]]
     ) -> None:
         found = [x.sequence_number if x else None for x in jbuffer._packets]
         self.assertEqual(found, expected)
+        self.assertEqual(
+            jbuffer._packet_count, len([x for x in found if x is not None])
+        )
 
     def test_create(self) -> None:
         jbuffer = JitterBuffer(capacity=2)
@@ -258,6 +277,56 @@ class JitterBufferTest(TestCase):
         self.assertEqual(frame.data, b"0001")
         self.assertEqual(frame.timestamp, 1235)
 
+    def test_remove_audio_frame_prefetch(self) -> None:
+        """
+        Audio jitter buffer, with a changing prefetch.
+        """
+        jbuffer = JitterBuffer(capacity=16, prefetch=2)
+        self.assertIsNone(jbuffer.pop())
+
+        frames = []
+        for sequence_number in range(4):
+            packet = RtpPacket(
+                sequence_number=sequence_number, timestamp=sequence_number * 960
+            )
+            packet._data = b"0000"  # type: ignore
+            pli_flag, frame = jbuffer.add(packet)
+            if frame is not None:
+                frames.append(frame)
+        self.assertEqual([frame.timestamp for frame in frames], [0, 960])
+
+        # enough frames are prefetched
+        self.assertIsNone(jbuffer.pop())
+
+        # lowering the prefetch releases a frame
+        jbuffer.prefetch = 1
+        frame = jbuffer.pop()
+        self.assertIsNotNone(frame)
+        self.assertEqual(frame.timestamp, 1920)
+        self.assertIsNone(jbuffer.pop())
+
+    def test_remove_audio_frame_lost(self) -> None:
+        """
+        Audio jitter buffer, with lost packets.
+        """
+        jbuffer = JitterBuffer(capacity=4, prefetch=1)
+
+        frames = []
+        for sequence_number in [0, 1, 3, 4, 5, 9, 10]:
+            packet = RtpPacket(
+                sequence_number=sequence_number, timestamp=sequence_number * 960
+            )
+            packet._data = b"0000"  # type: ignore
+            pli_flag, frame = jbuffer.add(packet)
+            if frame is not None:
+                frames.append(frame)
+
+        # packets discarded to make room are counted as lost
+        self.assertEqual(
+            [(frame.timestamp, frame.lost) for frame in frames],
+            [(0, 0), (2880, 2), (8640, 5)],
+        )
+
     def test_remove_video_frame(self) -> None:
         """
         Video jitter buffer.
@@ -286,6 +355,90 @@ class JitterBufferTest(TestCase):
         self.assertEqual(frame.data, b"000000010002")
         self.assertEqual(frame.timestamp, 1234)
 
+    def test_remove_video_frame_lost(self) -> None:
+        """
+        Video jitter buffer, waiting for a keyframe after a loss.
+        """
+        jbuffer = JitterBuffer(capacity=128, is_video=True)
+        jbuffer.nack_deadline = 100
+
+        results = []
+        for sequence_number, arrival_time_ms in [
+            (0, 0),
+            (1, 33),
+            (3, 100),
+            (4, 133),
+            (5, 200),
+            (6, 233),
+        ]:
+            pli_flag, frame = jbuffer.add(
+                create_video_packet(
+                    sequence_number,
+                    PacketDescription(
+                        frame_start=True, keyframe=sequence_number in (0, 5)
+                    ),
+                ),
+                arrival_time_ms=arrival_time_ms,
+            )
+            results.append((pli_flag, frame.timestamp if frame else None))
+
+        # the missing packet is awaited until the deadline, then the frames
+        # which depend on it are dropped and a keyframe is requested
+        self.assertEqual(
+            results,
+            [
+                (False, None),
+                (False, 0),
+                (False, None),
+                (False, None),
+                (True, None),
+                (False, 15000),
+            ],
+        )
+
+        # each emitted frame waited for the first packet of the next frame
+        self.assertEqual(jbuffer.frames_dropped, 3)
+        self.assertEqual(jbuffer.emitted_count, 2)
+        self.assertAlmostEqual(jbuffer.delay_total, 0.066)
+
+    def test_remove_video_frame_lost_temporal_layer(self) -> None:
+        """
+        Video jitter buffer, losing a frame of the upper temporal layer.
+        """
+        jbuffer = JitterBuffer(capacity=128, is_video=True)
+        jbuffer.nack_deadline = 100
+
+        frames = []
+        pli_flags = []
+        for sequence_number in [0, 1, 2, 4, 5, 6, 7, 8, 9, 10]:
+            temporal_layer = sequence_number % 2
+            pli_flag, frame = jbuffer.add(
+                create_video_packet(
+                    sequence_number,
+                    PacketDescription(
+                        frame_start=True,
+                        keyframe=sequence_number == 0,
+                        temporal_layer=temporal_layer,
+                        layer_sync=sequence_number in (1, 7),
+                        tl0picidx=sequence_number // 2,
+                    ),
+                    marker=1,
+                ),
+                arrival_time_ms=sequence_number * 50,
+            )
+            pli_flags.append(pli_flag)
+            while frame is not None:
+                frames.append(frame)
+                frame = jbuffer.pop()
+
+        # the base layer is still decoded and the upper layer resumes at its
+        # next sync point, so no keyframe is needed
+        self.assertEqual(
+            [(frame.timestamp // 3000, frame.lost) for frame in frames],
+            [(0, 0), (1, 0), (2, 0), (4, 1), (6, 0), (7, 0), (8, 0), (9, 0)],
+        )
+        self.assertFalse(any(pli_flags))
+
     def test_pli_flag(self) -> None:
         """
         Video jitter buffer.
@@ -1,7 +1,14 @@
+import array
+
 from aiortc.codecs import get_decoder, get_encoder
 from aiortc.codecs.opus import OpusDecoder, OpusEncoder
 from aiortc.jitterbuffer import JitterFrame
-from aiortc.rtcrtpparameters import RTCRtpCodecParameters
+from aiortc.rtcrtpparameters import (
+    RTCRtpCodecParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
+)
+from av import AudioFrame
 
 from .codecs import CodecTestCase
 
@@ -11,6 +18,15 @@ OPUS_CODEC = RTCRtpCodecParameters(
 OPUS_PAYLOAD = b"\xfc\xff\xfe"
 
 
+def create_tone(frame: AudioFrame) -> AudioFrame:
+    """
+    Fill a frame with a loud square wave.
+    """
+    data = array.array("h", [8000, -8000] * frame.samples)
+    frame.planes[0].update(data.tobytes())
+    return frame
+
+
 class OpusTest(CodecTestCase):
     def test_decoder(self) -> None:
         decoder = get_decoder(OPUS_CODEC)
@@ -28,6 +44,106 @@ class OpusTest(CodecTestCase):
             sample_rate=48000,
         )
 
+    def test_decoder_conceal(self) -> None:
+        decoder = self.ensureIsInstance(get_decoder(OPUS_CODEC), OpusDecoder)
+
+        # nothing to conceal before the first frame
+        frames = decoder.decode(JitterFrame(data=OPUS_PAYLOAD, timestamp=960, lost=1))
+        self.assertEqual([f.pts for f in frames], [960])
+
+        # the last frame is repeated and faded out
+        last_frame = self.create_audio_frame(samples=960, pts=960, layout="stereo")
+        last_frame.planes[0].update(array.array("h", [1000] * 1920).tobytes())
+        decoder.last_frame = last_frame
+        frames = decoder.decode(JitterFrame(data=OPUS_PAYLOAD, timestamp=3840, lost=2))
+        self.assertEqual([f.pts for f in frames], [1920, 2880, 3840])
+        for frame, start in zip(frames[:2], [1000, 800]):
+            self.assertAudioFrame(
+                frame,
+                layout="stereo",
+                pts=frame.pts,
+                samples=960,
+                sample_rate=48000,
+                data=None,
+            )
+            plane = self.ensureIsInstance(frame, AudioFrame).planes[0]
+            samples = array.array("h", bytes(plane))
+            self.assertEqual(samples[0], start)
+            self.assertEqual(samples[-1], start - 200)
+
+        # the missing audio is derived from the timestamps, not the number of
+        # lost packets, and long gaps are only partly concealed
+        frames = decoder.decode(JitterFrame(data=OPUS_PAYLOAD, timestamp=12480, lost=1))
+        self.assertEqual([f.pts for f in frames], [4800, 5760, 6720, 7680, 8640, 12480])
+
+    def test_encoder_dtx(self) -> None:
+        encoder = OpusEncoder(dtx=True)
+
+        frames = self.create_audio_frames(layout="stereo", sample_rate=48000, count=42)
+        create_tone(frames[41])
+        sent = []
+        for i, frame in enumerate(frames):
+            payloads, timestamp = encoder.encode(frame)
+            if payloads:
+                sent.append(i)
+                self.assertEqual(timestamp, i * 960)
+
+        # a frame is sent every 400ms of silence
+        self.assertEqual(sent, [0, 1, 2, 3, 4, 19, 39, 41])
+
+    def test_encoder_fmtp(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(OPUS_CODEC), OpusEncoder)
+        self.assertFalse(encoder.dtx)
+        self.assertFalse(encoder.fec)
+        self.assertEqual(encoder._options(), {"application": "voip"})
+
+        codec = RTCRtpCodecParameters(
+            mimeType="audio/opus",
+            clockRate=48000,
+            channels=2,
+            payloadType=100,
+            parameters={"usedtx": 1, "useinbandfec": 1},
+        )
+        encoder = self.ensureIsInstance(get_encoder(codec), OpusEncoder)
+        self.assertTrue(encoder.dtx)
+        self.assertTrue(encoder.fec)
+        self.assertEqual(
+            encoder._options(),
+            {"application": "voip", "fec": "1", "packet_loss": "10"},
+        )
+
+        # the encoder parameters take precedence
+        encoder.configure(
+            RTCRtpEncoderParameters(dtx=False, fec=False), RTCRtpEncodingParameters()
+        )
+        self.assertFalse(encoder.dtx)
+        self.assertFalse(encoder.fec)
+
+    def test_encoder_configure(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(OPUS_CODEC), OpusEncoder)
+        self.assertEqual(encoder.codec.bit_rate, 96000)
+
+        encoder.configure(
+            RTCRtpEncoderParameters(startBitrate=32000), RTCRtpEncodingParameters()
+        )
+        self.assertEqual(encoder.codec.bit_rate, 32000)
+
+        encoder.configure(
+            RTCRtpEncoderParameters(), RTCRtpEncodingParameters(maxBitrate=24000)
+        )
+        self.assertEqual(encoder.codec.bit_rate, 24000)
+
+        # only DTX can be changed once encoding has started
+        frames = self.create_audio_frames(layout="stereo", sample_rate=48000, count=1)
+        encoder.encode(frames[0])
+        encoder.configure(
+            RTCRtpEncoderParameters(startBitrate=64000, dtx=True, fec=True),
+            RTCRtpEncodingParameters(),
+        )
+        self.assertEqual(encoder.codec.bit_rate, 24000)
+        self.assertTrue(encoder.dtx)
+        self.assertFalse(encoder.fec)
+
     def test_encoder_mono_8khz(self) -> None:
         encoder = get_encoder(OPUS_CODEC)
         self.assertIsInstance(encoder, OpusEncoder)
@@ -268,6 +268,37 @@ class RTCDtlsTransportTest(TestCase):
         # receive truncated RTCP
         await session1._handle_rtcp_data(RTCP[0:8])
 
+    @asynctest
+    async def test_rtp_stage_times(self) -> None:
+        transport1, transport2 = dummy_ice_transport_pair()
+
+        certificate1 = RTCCertificate.generateCertificate()
+        session1 = RTCDtlsTransport(transport1, [certificate1])
+        receiver1 = DummyRtpReceiver()
+        session1._register_rtp_receiver(
+            receiver1,
+            RTCRtpReceiveParameters(
+                codecs=[
+                    RTCRtpCodecParameters(
+                        mimeType="audio/PCMU", clockRate=8000, payloadType=0
+                    )
+                ],
+                encodings=[RTCRtpDecodingParameters(ssrc=4028317929, payloadType=0)],
+            ),
+        )
+
+        # packets are only stamped when the time they were received is given
+        await session1._handle_rtp_data(RTP, 0)
+        await session1._handle_rtp_data(RTP, 0, received=1.0)
+        self.assertEqual(len(receiver1.rtp_packets), 2)
+        self.assertFalse(hasattr(receiver1.rtp_packets[0], "_stage_times"))
+
+        received, unprotected, parsed = getattr(
+            receiver1.rtp_packets[1], "_stage_times"
+        )
+        self.assertEqual(received, 1.0)
+        self.assertLessEqual(unprotected, parsed)
+
     @asynctest
     async def test_srtp_unprotect_error(self) -> None:
         transport1, transport2 = dummy_ice_transport_pair()
@@ -600,3 +631,72 @@ class RtpRouterTest(TestCase):
         # unknown SSRC, ambiguous payload type
         self.assertEqual(router.route_rtp(RtpPacket(ssrc=5678, payload_type=96)), None)
         self.assertEqual(router.route_rtp(RtpPacket(ssrc=5678, payload_type=97)), None)
+
+    def test_route_rtp_mid(self) -> None:
+        receiver1 = DummyRtpReceiver()
+        receiver2 = DummyRtpReceiver()
+
+        router = RtpRouter()
+        router.register_receiver(receiver1, ssrcs=[], payload_types=[96], mid="0")
+        router.register_receiver(receiver2, ssrcs=[], payload_types=[96], mid="1")
+
+        # unknown SSRC, ambiguous payload type, known MID
+        packet = RtpPacket(ssrc=1234, payload_type=96)
+        packet.extensions.mid = "1"
+        self.assertEqual(router.route_rtp(packet), receiver2)
+        self.assertEqual(router.ssrc_table[1234], receiver2)
+
+        # the SSRC is now known
+        self.assertEqual(
+            router.route_rtp(RtpPacket(ssrc=1234, payload_type=96)), receiver2
+        )
+
+        # unknown SSRC, unknown MID
+        packet = RtpPacket(ssrc=2345, payload_type=96)
+        packet.extensions.mid = "2"
+        self.assertEqual(router.route_rtp(packet), None)
+
+    def test_route_rtp_rid(self) -> None:
+        receiver1 = DummyRtpReceiver()
+        receiver2 = DummyRtpReceiver()
+
+        router = RtpRouter()
+        router.register_receiver(
+            receiver1, ssrcs=[], payload_types=[96, 97], rids=["h", "l"]
+        )
+        router.register_receiver(
+            receiver2, ssrcs=[], payload_types=[96, 97], rids=["l", "q"]
+        )
+
+        # unknown SSRC, unique RTP stream ID
+        packet = RtpPacket(ssrc=1234, payload_type=96)
+        packet.extensions.rtp_stream_id = "h"
+        self.assertEqual(router.route_rtp(packet), receiver1)
+        self.assertEqual(router.ssrc_table[1234], receiver1)
+
+        # unknown SSRC, unique repaired RTP stream ID
+        packet = RtpPacket(ssrc=2345, payload_type=97)
+        packet.extensions.repaired_rtp_stream_id = "q"
+        self.assertEqual(router.route_rtp(packet), receiver2)
+        self.assertEqual(router.ssrc_table[2345], receiver2)
+
+        # unknown SSRC, ambiguous RTP stream ID
+        packet = RtpPacket(ssrc=3456, payload_type=96)
+        packet.extensions.rtp_stream_id = "l"
+        self.assertEqual(router.route_rtp(packet), None)
+
+        # the RTP stream IDs are restored on packets which omit them
+        packet = RtpPacket(ssrc=1234, payload_type=96)
+        self.assertEqual(router.route_rtp(packet), receiver1)
+        self.assertEqual(packet.extensions.rtp_stream_id, "h")
+        self.assertEqual(packet.extensions.repaired_rtp_stream_id, None)
+
+        packet = RtpPacket(ssrc=2345, payload_type=97)
+        self.assertEqual(router.route_rtp(packet), receiver2)
+        self.assertEqual(packet.extensions.rtp_stream_id, None)
+        self.assertEqual(packet.extensions.repaired_rtp_stream_id, "q")
+
+        # once unregistered, the RTP stream IDs are released
+        router.unregister_receiver(receiver1)
+        self.assertEqual(router.rid_table["h"], set())
+        self.assertEqual(router.rid_table["l"], set([receiver2]))
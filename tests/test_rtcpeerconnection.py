@@ -5,6 +5,7 @@ from typing import Optional, Union
 from unittest import TestCase
 
 import aioice.stun
+import av
 from aiortc import (
     RTCBundlePolicy,
     RTCConfiguration,
@@ -24,12 +25,14 @@ from aiortc.mediastreams import AudioStreamTrack, MediaStreamTrack, VideoStreamT
 from aiortc.rtcpeerconnection import (
     filter_preferred_codecs,
     find_common_codecs,
+    find_send_codecs,
     is_codec_compatible,
 )
 from aiortc.rtcrtpparameters import (
     RTCRtcpFeedback,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpEncodingParameters,
 )
 from aiortc.rtcrtpsender import RTCRtpSender
 from aiortc.sdp import SessionDescription
@@ -268,6 +271,61 @@ class RTCRtpCodecParametersTest(TestCase):
             ],
         )
 
+    def test_find_common_codecs_red(self) -> None:
+        local_codecs = [
+            RTCRtpCodecParameters(
+                mimeType="audio/opus", clockRate=48000, channels=2, payloadType=96
+            ),
+            RTCRtpCodecParameters(
+                mimeType="audio/red",
+                clockRate=48000,
+                channels=2,
+                payloadType=63,
+                parameters={"96/96": None},
+            ),
+        ]
+        remote_codecs = [
+            RTCRtpCodecParameters(
+                mimeType="audio/red",
+                clockRate=48000,
+                channels=2,
+                payloadType=63,
+                parameters={"111/111": None},
+            ),
+            RTCRtpCodecParameters(
+                mimeType="audio/opus", clockRate=48000, channels=2, payloadType=111
+            ),
+            RTCRtpCodecParameters(
+                mimeType="audio/red",
+                clockRate=48000,
+                channels=2,
+                payloadType=62,
+                parameters={"9/9": None},
+            ),
+            RTCRtpCodecParameters(
+                mimeType="audio/G722", clockRate=8000, channels=1, payloadType=9
+            ),
+        ]
+        common = find_common_codecs(local_codecs, remote_codecs)
+        self.assertEqual(
+            common,
+            [
+                RTCRtpCodecParameters(
+                    mimeType="audio/red",
+                    clockRate=48000,
+                    channels=2,
+                    payloadType=63,
+                    parameters={"111/111": None},
+                ),
+                RTCRtpCodecParameters(
+                    mimeType="audio/opus",
+                    clockRate=48000,
+                    channels=2,
+                    payloadType=111,
+                ),
+            ],
+        )
+
     def test_filter_preferred_codecs(self) -> None:
         codecs = [
             RTCRtpCodecParameters(
@@ -376,6 +434,55 @@ class RTCRtpCodecParametersTest(TestCase):
             ],
         )
 
+    def test_find_send_codecs(self) -> None:
+        local_codecs = [
+            RTCRtpCodecParameters(
+                mimeType="audio/opus",
+                clockRate=48000,
+                channels=2,
+                payloadType=111,
+                parameters={"usedtx": 1},
+            ),
+            RTCRtpCodecParameters(
+                mimeType="audio/PCMU", clockRate=8000, channels=1, payloadType=0
+            ),
+        ]
+        remote_codecs = [
+            RTCRtpCodecParameters(
+                mimeType="audio/opus",
+                clockRate=48000,
+                channels=2,
+                payloadType=111,
+                parameters={"minptime": 10, "useinbandfec": 1},
+            ),
+            RTCRtpCodecParameters(
+                mimeType="audio/PCMU",
+                clockRate=8000,
+                channels=1,
+                payloadType=0,
+                parameters={"usedtx": 1},
+            ),
+        ]
+        codecs = find_send_codecs(local_codecs, remote_codecs)
+        self.assertEqual(
+            codecs,
+            [
+                RTCRtpCodecParameters(
+                    mimeType="audio/opus",
+                    clockRate=48000,
+                    channels=2,
+                    payloadType=111,
+                    parameters={"useinbandfec": 1},
+                ),
+                RTCRtpCodecParameters(
+                    mimeType="audio/PCMU", clockRate=8000, channels=1, payloadType=0
+                ),
+            ],
+        )
+
+        # the local codecs are not modified
+        self.assertEqual(local_codecs[0].parameters, {"usedtx": 1})
+
     def test_is_codec_compatible(self) -> None:
         # compatible: identical
         self.assertTrue(
@@ -479,6 +586,53 @@ class RTCRtpCodecParametersTest(TestCase):
             )
         )
 
+        # incompatible: different VP9 profile
+        self.assertFalse(
+            is_codec_compatible(
+                RTCRtpCodecParameters(
+                    mimeType="video/VP9",
+                    clockRate=90000,
+                    payloadType=103,
+                    parameters={"profile-id": "2"},
+                ),
+                RTCRtpCodecParameters(
+                    mimeType="video/VP9",
+                    clockRate=90000,
+                    payloadType=103,
+                ),
+            )
+        )
+
+        # compatible: AV1 without a profile means profile 0
+        self.assertTrue(
+            is_codec_compatible(
+                RTCRtpCodecParameters(
+                    mimeType="video/AV1",
+                    clockRate=90000,
+                    payloadType=105,
+                    parameters={"level-idx": "5", "profile": "0", "tier": "0"},
+                ),
+                RTCRtpCodecParameters(
+                    mimeType="video/AV1", clockRate=90000, payloadType=105
+                ),
+            )
+        )
+
+        # incompatible: different AV1 profile
+        self.assertFalse(
+            is_codec_compatible(
+                RTCRtpCodecParameters(
+                    mimeType="video/AV1",
+                    clockRate=90000,
+                    payloadType=105,
+                    parameters={"profile": "1"},
+                ),
+                RTCRtpCodecParameters(
+                    mimeType="video/AV1", clockRate=90000, payloadType=105
+                ),
+            )
+        )
+
         # incompatible: cannot parse H.264 profile
         self.assertFalse(
             is_codec_compatible(
@@ -898,6 +1052,8 @@ class RTCPeerConnectionTest(TestCase):
         self.assertTrue(
             lf2crlf(
                 """a=rtpmap:96 opus/48000/2
+a=rtpmap:63 red/48000/2
+a=fmtp:63 96/96
 a=rtpmap:9 G722/8000
 a=rtpmap:0 PCMU/8000
 a=rtpmap:8 PCMA/8000
@@ -937,6 +1093,8 @@ a=rtpmap:8 PCMA/8000
         self.assertTrue(
             lf2crlf(
                 """a=rtpmap:96 opus/48000/2
+a=rtpmap:63 red/48000/2
+a=fmtp:63 96/96
 a=rtpmap:9 G722/8000
 a=rtpmap:0 PCMU/8000
 a=rtpmap:8 PCMA/8000
@@ -3062,6 +3220,96 @@ a=rtpmap:0 PCMU/8000
             ["stable", "have-remote-offer", "stable", "closed"],
         )
 
+    @asynctest
+    async def test_connect_video_simulcast(self) -> None:
+        pc1 = RTCPeerConnection()
+        pc2 = RTCPeerConnection()
+
+        # create offer
+        transceiver = pc1.addTransceiver(
+            VideoStreamTrack(),
+            sendEncodings=[
+                RTCRtpEncodingParameters(rid="h", scaleResolutionDownBy=2),
+                RTCRtpEncodingParameters(rid="f"),
+            ],
+        )
+        await pc1.setLocalDescription(await pc1.createOffer())
+
+        # handle offer
+        await pc2.setRemoteDescription(pc1.localDescription)
+        await pc2.setLocalDescription(await pc2.createAnswer())
+        self.assertIn("a=rid:h recv\r\n", pc2.localDescription.sdp)
+        self.assertIn("a=rid:f recv\r\n", pc2.localDescription.sdp)
+        self.assertIn("a=simulcast:recv h;f\r\n", pc2.localDescription.sdp)
+
+        # handle answer
+        await pc1.setRemoteDescription(pc2.localDescription)
+
+        # both streams are sent
+        encodings = transceiver.sender.getParameters().encodings
+        self.assertEqual([encoding.rid for encoding in encodings], ["h", "f"])
+
+        # check outcome
+        await self.assertIceCompleted(pc1, pc2)
+
+        # the first layer is decoded
+        track = pc2.getTransceivers()[0].receiver.track
+        frame = await asyncio.wait_for(track.recv(), timeout=5)
+        assert isinstance(frame, av.VideoFrame)
+        self.assertEqual((frame.width, frame.height), (320, 240))
+
+        # close
+        await pc1.close()
+        await pc2.close()
+        self.assertClosed(pc1)
+        self.assertClosed(pc2)
+
+    @asynctest
+    async def test_connect_video_simulcast_fallback(self) -> None:
+        pc1 = RTCPeerConnection()
+        pc2 = RTCPeerConnection()
+
+        # create offer
+        transceiver = pc1.addTransceiver(
+            VideoStreamTrack(),
+            sendEncodings=[
+                RTCRtpEncodingParameters(rid="h", scaleResolutionDownBy=2),
+                RTCRtpEncodingParameters(rid="f"),
+            ],
+        )
+        await pc1.setLocalDescription(await pc1.createOffer())
+        self.assertIn("a=rid:h send\r\n", pc1.localDescription.sdp)
+        self.assertIn("a=rid:f send\r\n", pc1.localDescription.sdp)
+        self.assertIn("a=simulcast:send h;f\r\n", pc1.localDescription.sdp)
+        self.assertNotIn("a=ssrc:", pc1.localDescription.sdp)
+
+        # handle offer
+        await pc2.setRemoteDescription(pc1.localDescription)
+        await pc2.setLocalDescription(await pc2.createAnswer())
+
+        # handle an answer which does not accept simulcast
+        mangled = RTCSessionDescription(
+            sdp=re.sub(
+                "^a=(rid|simulcast):.*\r\n", "", pc2.localDescription.sdp, flags=re.M
+            ),
+            type=pc2.localDescription.type,
+        )
+        await pc1.setRemoteDescription(mangled)
+
+        # a single stream is sent
+        [encoding] = transceiver.sender.getParameters().encodings
+        self.assertIsNone(encoding.rid)
+        self.assertEqual(encoding.scaleResolutionDownBy, 2)
+
+        # check outcome
+        await self.assertIceCompleted(pc1, pc2)
+
+        # close
+        await pc1.close()
+        await pc2.close()
+        self.assertClosed(pc1)
+        self.assertClosed(pc2)
+
     @asynctest
     async def test_connect_video_codec_preferences_offerer(self) -> None:
         VIDEO_SDP = H264_SDP + VP8_SDP
@@ -3910,6 +4158,30 @@ a=rtpmap:0 PCMU/8000
             dc.bufferedAmountLowThreshold = 4294967296
             self.assertEqual(dc.bufferedAmountLowThreshold, 0)
 
+    @asynctest
+    async def test_datachannel_binarytype(self) -> None:
+        pc = RTCPeerConnection()
+        dc = pc.createDataChannel("chat")
+        self.assertEqual(dc.binaryType, "bytes")
+
+        dc.binaryType = "memoryview"
+        self.assertEqual(dc.binaryType, "memoryview")
+
+        with self.assertRaises(ValueError):
+            dc.binaryType = "blob"
+        self.assertEqual(dc.binaryType, "memoryview")
+
+        dc.binaryType = "stream"
+        self.assertEqual(dc.binaryType, "stream")
+
+        dc = pc.createDataChannel("chat", ordered=False)
+        with self.assertRaises(ValueError) as cm:
+            dc.binaryType = "stream"
+        self.assertEqual(
+            str(cm.exception),
+            "binaryType 'stream' requires an ordered and reliable data channel",
+        )
+
     @asynctest
     async def test_datachannel_send_invalid_state(self) -> None:
         pc = RTCPeerConnection()
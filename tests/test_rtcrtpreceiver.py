@@ -6,25 +6,35 @@ from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 import av
+from aiortc import clock
 from aiortc.codecs import PCMU_CODEC, get_encoder
 from aiortc.exceptions import InvalidStateError
+from aiortc.jitterbuffer import JitterBuffer, JitterFrame
 from aiortc.mediastreams import MediaStreamError
 from aiortc.rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpDecoderParameters,
     RTCRtpDecodingParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
     RTCRtpHeaderExtensionCapability,
     RTCRtpReceiveParameters,
     RTCRtpRtxParameters,
 )
 from aiortc.rtcrtpreceiver import (
+    KeyframeSampler,
+    MediaSynchronizer,
     NackGenerator,
+    PlayoutDelay,
     RemoteStreamTrack,
+    RTCEncodedFrame,
     RTCRtpReceiver,
     RTCRtpSynchronizationSource,
     StreamStatistics,
     TimestampMapper,
+    stretch_audio_frame,
 )
 from aiortc.rtp import RtcpPacket, RtpPacket
 from aiortc.stats import RTCStatsReport
@@ -124,6 +134,52 @@ class NackGeneratorTest(TestCase):
         generator.add(packets[258])
         self.assertEqual(generator.missing, set(range(130, 258)))
 
+    def test_with_loss_expire(self) -> None:
+        generator = NackGenerator()
+        packets = create_rtp_packets(10, 0)
+
+        generator.add(packets[0])
+        generator.add(packets[9])
+        self.assertEqual(generator.missing, set(range(1, 9)))
+
+        # the packets before 5 are no longer awaited
+        generator.expire(5)
+        self.assertEqual(generator.missing, set(range(5, 9)))
+        self.assertEqual(generator.get_nack(now_ms=0, rtt_ms=100), [5, 6, 7, 8])
+
+    def test_with_loss_wraparound(self) -> None:
+        generator = NackGenerator()
+        packets = create_rtp_packets(4, 65534)
+
+        generator.add(packets[0])
+        generator.add(packets[3])
+        self.assertEqual(generator.missing, set([65535, 0]))
+        self.assertEqual(generator.get_nack(now_ms=0, rtt_ms=100), [65535, 0])
+
+        generator.expire(0)
+        self.assertEqual(generator.missing, set([0]))
+
+    def test_get_nack(self) -> None:
+        generator = NackGenerator(max_retries=3)
+
+        # receive packets: 0, <1 missing>, <2 missing>, 3
+        packets = create_rtp_packets(4, 0)
+        generator.add(packets[0])
+        generator.add(packets[3])
+
+        # missing packets are requested at once
+        self.assertEqual(generator.get_nack(now_ms=0, rtt_ms=100), [1, 2])
+        self.assertEqual(generator.get_nack(now_ms=50, rtt_ms=100), [])
+
+        # then again after a round-trip time
+        generator.add(packets[2])
+        self.assertEqual(generator.get_nack(now_ms=100, rtt_ms=100), [1])
+        self.assertEqual(generator.get_nack(now_ms=200, rtt_ms=100), [1])
+
+        # until they are given up on
+        self.assertEqual(generator.get_nack(now_ms=300, rtt_ms=100), [])
+        self.assertEqual(generator.missing, set())
+
 
 class StreamStatisticsTest(TestCase):
     def create_counter(self) -> StreamStatistics:
@@ -227,6 +283,112 @@ class StreamStatisticsTest(TestCase):
         self.assertEqual(counter.jitter, 4)
 
 
+class PlayoutDelayTest(TestCase):
+    def update(self, playout_delay: PlayoutDelay, jitter: int) -> list[float]:
+        return [
+            playout_delay.update(
+                JitterFrame(data=b"", timestamp=i * 960), jitter=jitter, clockrate=48000
+            )
+            for i in range(14)
+        ]
+
+    def test_accelerate(self) -> None:
+        jbuffer = JitterBuffer(capacity=16, prefetch=4)
+        playout_delay = PlayoutDelay(jbuffer)
+        self.assertEqual(playout_delay.delay, 0)
+
+        # without jitter, the delay is lowered to one frame
+        self.assertEqual(
+            self.update(playout_delay, jitter=0), [0.0] + [-0.25] * 12 + [0.0]
+        )
+        self.assertEqual(jbuffer.prefetch, 1)
+        self.assertAlmostEqual(playout_delay.delay, 0.02)
+        self.assertAlmostEqual(playout_delay.target_delay, 0.02)
+        self.assertEqual(playout_delay.emitted_count, 13)
+
+    def test_expand(self) -> None:
+        jbuffer = JitterBuffer(capacity=16, prefetch=4)
+        playout_delay = PlayoutDelay(jbuffer)
+
+        # with 40ms of jitter, the delay is raised to seven frames
+        self.assertEqual(
+            self.update(playout_delay, jitter=1920), [0.0] + [0.25] * 12 + [0.0]
+        )
+        self.assertEqual(jbuffer.prefetch, 7)
+        self.assertAlmostEqual(playout_delay.delay, 0.14)
+        self.assertAlmostEqual(playout_delay.target_delay, 0.14)
+        self.assertEqual(playout_delay.emitted_count, 13)
+
+    def test_hysteresis(self) -> None:
+        jbuffer = JitterBuffer(capacity=16, prefetch=4)
+        playout_delay = PlayoutDelay(jbuffer)
+
+        # the delay stays above the target
+        self.assertEqual(
+            self.update(playout_delay, jitter=400), [0.0] + [-0.25] * 4 + [0.0] * 9
+        )
+        self.assertEqual(jbuffer.prefetch, 3)
+        self.assertAlmostEqual(playout_delay.delay, 0.06)
+        self.assertAlmostEqual(playout_delay.target_delay, 0.045)
+
+    def test_frame_duration(self) -> None:
+        jbuffer = JitterBuffer(capacity=16, prefetch=4)
+        playout_delay = PlayoutDelay(jbuffer)
+
+        # lost frames and gaps due to DTX do not count
+        for timestamp, lost in [(0, 0), (2880, 2), (22080, 0)]:
+            playout_delay.update(
+                JitterFrame(data=b"", timestamp=timestamp, lost=lost),
+                jitter=0,
+                clockrate=48000,
+            )
+        self.assertAlmostEqual(playout_delay.target_delay, 0.02)
+
+
+class StretchAudioFrameTest(CodecTestCase):
+    def create_ramp_frame(self, layout: str) -> av.AudioFrame:
+        frame = self.create_audio_frame(
+            samples=160, pts=320, layout=layout, sample_rate=8000
+        )
+        channels = len(frame.layout.channels)
+        data = bytearray()
+        for i in range(160):
+            data += (i * 100).to_bytes(2, "little", signed=True) * channels
+        frame.planes[0].update(bytes(data))
+        return frame
+
+    def test_accelerate(self) -> None:
+        for layout in ["mono", "stereo"]:
+            frame = self.create_ramp_frame(layout)
+            stretched = stretch_audio_frame(frame, -0.25)
+            self.assertAudioFrame(
+                stretched,
+                layout=layout,
+                pts=320,
+                samples=120,
+                sample_rate=8000,
+                data=bytes(frame.planes[0])[: 40 * 2 * len(frame.layout.channels)],
+            )
+
+    def test_expand(self) -> None:
+        for layout in ["mono", "stereo"]:
+            frame = self.create_ramp_frame(layout)
+            stretched = stretch_audio_frame(frame, 0.25)
+            self.assertAudioFrame(
+                stretched,
+                layout=layout,
+                pts=320,
+                samples=200,
+                sample_rate=8000,
+                data=bytes(frame.planes[0])[: 80 * 2 * len(frame.layout.channels)],
+            )
+
+    def test_unchanged(self) -> None:
+        frame = self.create_ramp_frame("mono")
+        self.assertIs(stretch_audio_frame(frame, 0), frame)
+        self.assertIs(stretch_audio_frame(frame, 0.75), frame)
+
+
 class RTCRtpReceiverTest(CodecTestCase):
     def test_capabilities(self) -> None:
         # audio
@@ -238,6 +400,12 @@ class RTCRtpReceiverTest(CodecTestCase):
                 RTCRtpCodecCapability(
                     mimeType="audio/opus", clockRate=48000, channels=2
                 ),
+                RTCRtpCodecCapability(
+                    mimeType="audio/red",
+                    clockRate=48000,
+                    channels=2,
+                    parameters={"96/96": None},
+                ),
                 RTCRtpCodecCapability(
                     mimeType="audio/G722", clockRate=8000, channels=1
                 ),
@@ -287,6 +455,16 @@ class RTCRtpReceiverTest(CodecTestCase):
                         "profile-level-id": "42e01f",
                     },
                 ),
+                RTCRtpCodecCapability(
+                    mimeType="video/VP9",
+                    clockRate=90000,
+                    parameters={"profile-id": "0"},
+                ),
+                RTCRtpCodecCapability(
+                    mimeType="video/AV1",
+                    clockRate=90000,
+                    parameters={"level-idx": "5", "profile": "0", "tier": "0"},
+                ),
             ],
         )
         self.assertEqual(
@@ -298,6 +476,12 @@ class RTCRtpReceiverTest(CodecTestCase):
                 RTCRtpHeaderExtensionCapability(
                     uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time"
                 ),
+                RTCRtpHeaderExtensionCapability(
+                    uri="urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+                ),
+                RTCRtpHeaderExtensionCapability(
+                    uri="urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id"
+                ),
             ],
         )
 
@@ -360,6 +544,10 @@ class RTCRtpReceiverTest(CodecTestCase):
                 sorted([s.type for s in report.values()]),
                 ["inbound-rtp", "remote-outbound-rtp", "transport"],
             )
+            [inbound] = [s for s in report.values() if s.type == "inbound-rtp"]
+            self.assertGreater(inbound.jitterBufferEmittedCount, 0)
+            self.assertGreater(inbound.jitterBufferDelay, 0)
+            self.assertGreater(inbound.jitterBufferTargetDelay, 0)
 
             # check sources
             sources = receiver.getSynchronizationSources()
@@ -391,6 +579,119 @@ class RTCRtpReceiverTest(CodecTestCase):
             with self.assertRaises(MediaStreamError):
                 await receiver.track.recv()
 
+    @asynctest
+    async def test_decoder_parameters(self) -> None:
+        async with create_receiver("video") as receiver:
+            self.assertEqual(receiver.getDecoderParameters(), RTCRtpDecoderParameters())
+
+            parameters = receiver.getDecoderParameters()
+            parameters.threadCount = 4
+            parameters.lowDelay = False
+            receiver.setDecoderParameters(parameters)
+            self.assertEqual(
+                receiver.getDecoderParameters(),
+                RTCRtpDecoderParameters(threadCount=4, lowDelay=False),
+            )
+
+            with self.assertRaises(ValueError) as cm:
+                receiver.setDecoderParameters(RTCRtpDecoderParameters(threadCount=0))
+            self.assertEqual(str(cm.exception), "threadCount must be at least 1")
+
+            with self.assertRaises(ValueError) as cm:
+                receiver.setDecoderParameters(RTCRtpDecoderParameters(width=0))
+            self.assertEqual(str(cm.exception), "width and height must be at least 1")
+
+            with self.assertRaises(ValueError) as cm:
+                receiver.setDecoderParameters(RTCRtpDecoderParameters(format="bogus"))
+            self.assertEqual(str(cm.exception), "Unsupported pixel format `bogus`")
+
+    @asynctest
+    async def test_rtp_encoded_frames(self) -> None:
+        async with create_receiver("audio") as receiver:
+            receiver._track = RemoteStreamTrack(kind="audio")
+            encoded_frames = receiver.encodedFrames()
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[PCMU_CODEC]))
+
+            # encoded frames cannot be requested once started
+            with self.assertRaises(InvalidStateError):
+                receiver.encodedFrames()
+
+            # receive RTP
+            for i in range(10):
+                packet = RtpPacket.parse(load("rtp.bin"))
+                packet.sequence_number += i
+                packet.timestamp += i * 160
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=i * 20)
+
+            # shutdown
+            await receiver.stop()
+
+            # the frames are not decoded
+            frames = [frame async for frame in encoded_frames]
+            self.assertGreater(len(frames), 0)
+            for i, frame in enumerate(frames):
+                self.assertIsInstance(frame, RTCEncodedFrame)
+                self.assertEqual(frame.codec, PCMU_CODEC)
+                self.assertEqual(frame.data, RtpPacket.parse(load("rtp.bin")).payload)
+                self.assertTrue(frame.keyframe)
+                self.assertEqual(frame.timestamp, frames[0].timestamp + i * 160)
+
+            # the track ends without frames
+            with self.assertRaises(MediaStreamError):
+                await receiver.track.recv()
+
+    @asynctest
+    async def test_rtp_encoded_frames_video(self) -> None:
+        async with create_receiver("video") as receiver:
+            receiver._track = RemoteStreamTrack(kind="video")
+            encoded_frames = receiver.encodedFrames()
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=3)
+            for packet in packets:
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+            await receiver.stop()
+
+            # only the first frame is a keyframe
+            frames = [frame async for frame in encoded_frames]
+            self.assertEqual(
+                [(frame.timestamp, frame.keyframe) for frame in frames],
+                [(packets[0].timestamp, True), (packets[1].timestamp, False)],
+            )
+
+    @asynctest
+    async def test_rtp_keyframe_decoding(self) -> None:
+        pli = []
+
+        async def mock_send_rtcp_pli(media_ssrc: int) -> None:
+            pli.append(media_ssrc)
+
+        async with create_receiver("video") as receiver:
+            receiver._send_rtcp_pli = mock_send_rtcp_pli  # type: ignore
+            receiver._track = RemoteStreamTrack(kind="video")
+            receiver.setKeyframeDecoding(True, frameRate=1)
+            encoded_frames = receiver.encodedFrames()
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            # receive 40 frames at 30fps, only the first one is a keyframe
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=40)
+            for i, packet in enumerate(packets):
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=i * 33)
+            await receiver.stop()
+
+            # keyframes are requested once per second
+            self.assertEqual(pli, [1234, 1234])
+
+            # only the keyframe is delivered
+            frames = [frame async for frame in encoded_frames]
+            self.assertEqual(
+                [(frame.timestamp, frame.keyframe) for frame in frames],
+                [(packets[0].timestamp, True)],
+            )
+
     @asynctest
     async def test_rtp_missing_video_packet(self) -> None:
         nacks = []
@@ -423,6 +724,169 @@ class RTCRtpReceiverTest(CodecTestCase):
             # check PLI was triggered
             self.assertEqual(pli, [1234])
 
+    @asynctest
+    async def test_rtp_missing_video_packet_retry(self) -> None:
+        nacks = []
+
+        async def mock_send_rtcp_nack(media_ssrc: int, lost: list[int]) -> None:
+            nacks.append((media_ssrc, lost))
+
+        async def mock_send_rtcp_pli(media_ssrc: int) -> None:
+            pass
+
+        async with create_receiver("video") as receiver:
+            receiver._send_rtcp_nack = mock_send_rtcp_nack  # type: ignore
+            receiver._send_rtcp_pli = mock_send_rtcp_pli  # type: ignore
+            receiver._track = RemoteStreamTrack(kind="video")
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            # receive RTP with a gap, then nothing more
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=3)
+            now_ms = clock.current_ms()
+            await receiver._handle_rtp_packet(packets[0], arrival_time_ms=now_ms)
+            await receiver._handle_rtp_packet(packets[2], arrival_time_ms=now_ms)
+            self.assertEqual(nacks, [(1234, [1])])
+
+            # the NACK is repeated after a round-trip time
+            await asyncio.sleep(0.25)
+            self.assertEqual(nacks[:3], [(1234, [1])] * 3)
+
+    @asynctest
+    async def test_rtp_lost_video_frame(self) -> None:
+        pli = []
+
+        async def mock_send_rtcp_nack(media_ssrc: int, lost: list[int]) -> None:
+            pass
+
+        async def mock_send_rtcp_pli(media_ssrc: int) -> None:
+            pli.append(media_ssrc)
+
+        async with create_receiver("video") as receiver:
+            receiver._send_rtcp_nack = mock_send_rtcp_nack  # type: ignore
+            receiver._send_rtcp_pli = mock_send_rtcp_pli  # type: ignore
+            receiver._track = RemoteStreamTrack(kind="video")
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            # receive 30 frames at 30fps, the third one is never retransmitted
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=30)
+            for i, packet in enumerate(packets):
+                if i != 2:
+                    await receiver._handle_rtp_packet(packet, arrival_time_ms=i * 33)
+
+            # the missing frame is given up on after the NACK deadline, and
+            # keyframe requests are rate-limited
+            self.assertEqual(pli, [1234, 1234])
+
+            # the frames which depend on the missing frame are not decoded
+            await receiver.stop()
+            decoded = []
+            with self.assertRaises(MediaStreamError):
+                while True:
+                    decoded.append(await receiver.track.recv())
+            self.assertEqual(len(decoded), 2)
+
+    @asynctest
+    async def test_rtp_temporal_layers(self) -> None:
+        nacks = []
+
+        async def mock_send_rtcp_nack(media_ssrc: int, lost: list[int]) -> None:
+            nacks.append((media_ssrc, lost))
+
+        async with create_receiver("video") as receiver:
+            receiver._send_rtcp_nack = mock_send_rtcp_nack  # type: ignore
+            receiver._track = RemoteStreamTrack(kind="video")
+            receiver.setMaxTemporalLayer(0)
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            # receive a stream with two temporal layers
+            encoder = get_encoder(VP8_CODEC)
+            encoder.configure(
+                RTCRtpEncoderParameters(scalabilityMode="L1T2"),
+                RTCRtpEncodingParameters(),
+            )
+            frames = self.create_video_frames(width=320, height=240, count=6)
+            for seq, frame in enumerate(frames):
+                payloads, timestamp = encoder.encode(frame)
+                packet = RtpPacket(
+                    payload_type=VP8_CODEC.payloadType,
+                    marker=1,
+                    sequence_number=seq,
+                    ssrc=1234,
+                    timestamp=timestamp,
+                    payload=payloads[0],
+                )
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+
+            # dropped packets are not lost
+            self.assertEqual(nacks, [])
+
+            # only the base layer is decoded
+            await receiver.stop()
+            decoded = []
+            with self.assertRaises(MediaStreamError):
+                while True:
+                    decoded.append((await receiver.track.recv()).pts)
+            self.assertEqual(decoded, [0, 6000])
+
+    @asynctest
+    async def test_rtp_simulcast(self) -> None:
+        pli = []
+
+        async def mock_send_rtcp_pli(media_ssrc: int) -> None:
+            pli.append(media_ssrc)
+
+        async with create_receiver("video") as receiver:
+            receiver._send_rtcp_pli = mock_send_rtcp_pli  # type: ignore
+            receiver._track = RemoteStreamTrack(kind="video")
+
+            await receiver.receive(
+                RTCRtpReceiveParameters(
+                    codecs=[VP8_CODEC],
+                    encodings=[
+                        RTCRtpDecodingParameters(rid="h"),
+                        RTCRtpDecodingParameters(rid="l"),
+                    ],
+                )
+            )
+
+            # an unknown layer cannot be selected
+            with self.assertRaises(ValueError) as cm:
+                receiver.setSimulcastLayer("q")
+            self.assertEqual(str(cm.exception), "Unknown simulcast layer `q`")
+
+            # generate packets for both layers
+            high_packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=2)
+            for packet in high_packets:
+                packet.extensions.rtp_stream_id = "h"
+            low_packets = create_rtp_video_packets(
+                self, codec=VP8_CODEC, frames=2, seq=100
+            )
+            for packet in low_packets:
+                packet.extensions.rtp_stream_id = "l"
+                packet.ssrc = 2345
+
+            # the first layer is decoded by default
+            for packet in high_packets:
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+            self.assertEqual(pli, [])
+
+            # switching layers requests a keyframe
+            receiver.setSimulcastLayer("l")
+            for packet in low_packets:
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+            self.assertEqual(pli, [2345])
+
+            # one frame of each layer is complete
+            await receiver.stop()
+            decoded = []
+            with self.assertRaises(MediaStreamError):
+                while True:
+                    decoded.append(await receiver.track.recv())
+            self.assertEqual(len(decoded), 2)
+
     @asynctest
     async def test_rtp_empty_video_packet(self) -> None:
         async with create_receiver("video") as receiver:
@@ -445,6 +909,77 @@ class RTCRtpReceiverTest(CodecTestCase):
             packet = RtpPacket(payload_type=100, payload=b"\x80")
             await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
 
+    @asynctest
+    async def test_rtp_video_stats(self) -> None:
+        async with create_receiver("video") as receiver:
+            receiver._track = RemoteStreamTrack(kind="video")
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            # receive 3 frames at 30fps, the last one is not known to be complete
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=3)
+            for i, packet in enumerate(packets):
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=i * 33)
+
+            # request a keyframe
+            receiver._set_rtcp_ssrc(1234)
+            await receiver._send_rtcp_pli(packets[0].ssrc)
+            await receiver.stop()
+
+            # check stats
+            report = await receiver.getStats()
+            [inbound] = [s for s in report.values() if s.type == "inbound-rtp"]
+            self.assertEqual(inbound.framesDecoded, 2)
+            self.assertEqual(inbound.keyFramesDecoded, 1)
+            self.assertEqual(inbound.framesDropped, 0)
+            self.assertGreater(inbound.totalDecodeTime, 0)
+            self.assertAlmostEqual(inbound.jitterBufferDelay, 0.066)
+            self.assertEqual(inbound.jitterBufferEmittedCount, 2)
+            self.assertEqual(inbound.nackCount, 0)
+            self.assertEqual(inbound.pliCount, 1)
+            self.assertIsNone(inbound.firCount)
+
+    @asynctest
+    async def test_rtp_video_stage_timing(self) -> None:
+        async with create_receiver("video") as receiver:
+            receiver._track = RemoteStreamTrack(kind="video")
+            receiver.setStageTiming(True)
+
+            await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=3)
+            for i, packet in enumerate(packets):
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=i * 33)
+            await receiver.stop()
+
+            # read the decoded frames
+            with self.assertRaises(MediaStreamError):
+                while True:
+                    await receiver.track.recv()
+
+            # check stats, the transport did not time its stages
+            report = await receiver.getStats()
+            counts = {
+                s.stage: s.count for s in report.values() if s.type == "stage-timing"
+            }
+            self.assertEqual(
+                counts,
+                {
+                    "srtp": 0,
+                    "parse": 0,
+                    "depacketize": 0,
+                    "jitterBuffer": 2,
+                    "decoderQueue": 2,
+                    "decode": 2,
+                    "trackQueue": 2,
+                },
+            )
+
+            # disable stage timing
+            receiver.setStageTiming(False)
+            report = await receiver.getStats()
+            self.assertNotIn("stage-timing", [s.type for s in report.values()])
+
     @asynctest
     async def test_rtp_unknown_payload_type(self) -> None:
         async with create_receiver("video") as receiver:
@@ -563,6 +1098,69 @@ class RTCRtpReceiverTest(CodecTestCase):
             RTCRtpReceiver("audio", dtlsTransport)  # type: ignore
 
 
+class KeyframeSamplerTest(TestCase):
+    def test_keyframes(self) -> None:
+        sampler = KeyframeSampler()
+        self.assertFalse(sampler.keyframe_needed(0))
+
+        # all the keyframes are accepted, no keyframe is requested
+        keyframe = JitterFrame(data=b"", timestamp=0, keyframe=True)
+        interframe = JitterFrame(data=b"", timestamp=0)
+        self.assertTrue(sampler.accept(keyframe, 0))
+        self.assertFalse(sampler.accept(interframe, 33))
+        self.assertTrue(sampler.accept(keyframe, 66))
+        self.assertFalse(sampler.keyframe_needed(5000))
+
+    def test_frame_rate(self) -> None:
+        sampler = KeyframeSampler(frame_rate=2)
+        keyframe = JitterFrame(data=b"", timestamp=0, keyframe=True)
+
+        # a keyframe is needed at once
+        self.assertTrue(sampler.keyframe_needed(0))
+        self.assertTrue(sampler.accept(keyframe, 0))
+        self.assertFalse(sampler.keyframe_needed(0))
+
+        # the next one is due after 500ms
+        self.assertFalse(sampler.accept(keyframe, 250))
+        self.assertFalse(sampler.keyframe_needed(499))
+        self.assertTrue(sampler.keyframe_needed(500))
+        self.assertTrue(sampler.accept(keyframe, 520))
+
+
+class MediaSynchronizerTest(TestCase):
+    def test_playout_delay(self) -> None:
+        audio = RemoteStreamTrack(kind="audio")
+        video = RemoteStreamTrack(kind="video")
+        synchronizer = MediaSynchronizer(delay_playout=True)
+        synchronizer.add_track(audio)
+        synchronizer.add_track(video)
+
+        # nothing is held back until all the tracks are synchronized
+        self.assertEqual(
+            synchronizer.playout_delay(audio, presentation_time=0.0, now=10.05), 0.0
+        )
+
+        # the audio is received 100ms ahead of the video
+        self.assertAlmostEqual(
+            synchronizer.playout_delay(video, presentation_time=0.0, now=10.15), 0.0
+        )
+        self.assertAlmostEqual(
+            synchronizer.playout_delay(audio, presentation_time=0.02, now=10.07), 0.1
+        )
+
+    def test_playout_delay_disabled(self) -> None:
+        audio = RemoteStreamTrack(kind="audio")
+        video = RemoteStreamTrack(kind="video")
+        synchronizer = MediaSynchronizer()
+        synchronizer.add_track(audio)
+        synchronizer.add_track(video)
+
+        synchronizer.playout_delay(video, presentation_time=0.0, now=10.15)
+        self.assertEqual(
+            synchronizer.playout_delay(audio, presentation_time=0.0, now=10.05), 0.0
+        )
+
+
 class TimestampMapperTest(TestCase):
     def test_simple(self) -> None:
         mapper = TimestampMapper()
@@ -572,6 +1170,50 @@ class TimestampMapperTest(TestCase):
         self.assertEqual(mapper.map(1004), 4)
         self.assertEqual(mapper.map(1010), 10)
 
+    def test_synchronize(self) -> None:
+        synchronizer = MediaSynchronizer()
+        audio = TimestampMapper()
+        audio.synchronizer = synchronizer
+        video = TimestampMapper()
+        video.synchronizer = synchronizer
+
+        # nothing to synchronize before the first frame
+        self.assertFalse(
+            audio.synchronize(ntp_time=100.0, rtp_timestamp=0, clockrate=48000)
+        )
+
+        self.assertEqual(audio.map(48000), 0)
+        self.assertEqual(video.map(90000), 0)
+
+        # the audio starts at 100s
+        self.assertTrue(
+            audio.synchronize(ntp_time=101.0, rtp_timestamp=96000, clockrate=48000)
+        )
+        self.assertEqual(synchronizer.origin, 100.0)
+        self.assertEqual(audio.map(96000), 48000)
+
+        # the video starts half a second later
+        self.assertTrue(
+            video.synchronize(ntp_time=101.5, rtp_timestamp=180000, clockrate=90000)
+        )
+        self.assertEqual(synchronizer.origin, 100.0)
+        self.assertEqual(video.map(180000), 135000)
+        self.assertEqual(audio.map(144000), 96000)
+
+    def test_synchronize_earlier(self) -> None:
+        synchronizer = MediaSynchronizer()
+        synchronizer.synchronize(100.0)
+        video = TimestampMapper()
+        video.synchronizer = synchronizer
+        self.assertEqual(video.map(4294967200), 0)
+
+        # the video started a second before, its RTP timestamp wrapped since
+        self.assertTrue(
+            video.synchronize(ntp_time=100.0, rtp_timestamp=89904, clockrate=90000)
+        )
+        self.assertEqual(synchronizer.origin, 99.0)
+        self.assertEqual(video.map(4294967200), 0)
+
     def test_wrap(self) -> None:
         mapper = TimestampMapper()
         self.assertEqual(mapper.map(4294967293), 0)
@@ -1,17 +1,22 @@
 import asyncio
 from struct import pack
+from typing import cast
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 from aiortc import MediaStreamTrack
 from aiortc.codecs import PCMU_CODEC
+from aiortc.codecs.vpx import Vp8Encoder
 from aiortc.exceptions import InvalidStateError
-from aiortc.mediastreams import AudioStreamTrack, VideoStreamTrack
+from aiortc.mediastreams import VIDEO_TIME_BASE, AudioStreamTrack, VideoStreamTrack
 from aiortc.rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
     RTCRtpHeaderExtensionCapability,
+    RTCRtpHeaderExtensionParameters,
     RTCRtpSendParameters,
 )
 from aiortc.rtcrtpsender import RTCRtpSender
@@ -20,6 +25,7 @@ from aiortc.rtp import (
     RTCP_PSFB_FIR,
     RTCP_PSFB_PLI,
     RTCP_RTPFB_NACK,
+    HeaderExtensionsMap,
     RtcpPsfbPacket,
     RtcpReceiverInfo,
     RtcpRrPacket,
@@ -29,6 +35,7 @@ from aiortc.rtp import (
     pack_remb_fci,
 )
 from aiortc.stats import RTCStatsReport
+from av import VideoFrame
 
 from tests.test_mediastreams import VideoPacketStreamTrack
 
@@ -42,6 +49,12 @@ H264_CODEC = RTCRtpCodecParameters(
     mimeType="video/H264", clockRate=90000, payloadType=98
 )
 
+SIMULCAST_ENCODINGS = [
+    RTCRtpEncodingParameters(rid="q", scaleResolutionDownBy=4),
+    RTCRtpEncodingParameters(rid="h", scaleResolutionDownBy=2),
+    RTCRtpEncodingParameters(rid="f"),
+]
+
 
 class BuggyStreamTrack(MediaStreamTrack):
     kind = "audio"
@@ -50,6 +63,26 @@ class BuggyStreamTrack(MediaStreamTrack):
         raise Exception("I'm a buggy track!")
 
 
+class FastVideoStreamTrack(VideoStreamTrack):
+    """
+    A video track which returns 30 frames per second of media time, without
+    waiting.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.counter = 0
+
+    async def recv(self) -> VideoFrame:
+        frame = VideoFrame(width=320, height=240)
+        for p in frame.planes:
+            p.update(bytes(p.buffer_size))
+        frame.pts = self.counter * 3000
+        frame.time_base = VIDEO_TIME_BASE
+        self.counter += 1
+        return frame
+
+
 class RTCRtpSenderTest(TestCase):
     def test_capabilities(self) -> None:
         # audio
@@ -61,6 +94,12 @@ class RTCRtpSenderTest(TestCase):
                 RTCRtpCodecCapability(
                     mimeType="audio/opus", clockRate=48000, channels=2
                 ),
+                RTCRtpCodecCapability(
+                    mimeType="audio/red",
+                    clockRate=48000,
+                    channels=2,
+                    parameters={"96/96": None},
+                ),
                 RTCRtpCodecCapability(
                     mimeType="audio/G722", clockRate=8000, channels=1
                 ),
@@ -110,6 +149,16 @@ class RTCRtpSenderTest(TestCase):
                         "profile-level-id": "42e01f",
                     },
                 ),
+                RTCRtpCodecCapability(
+                    mimeType="video/VP9",
+                    clockRate=90000,
+                    parameters={"profile-id": "0"},
+                ),
+                RTCRtpCodecCapability(
+                    mimeType="video/AV1",
+                    clockRate=90000,
+                    parameters={"level-idx": "5", "profile": "0", "tier": "0"},
+                ),
             ],
         )
         self.assertEqual(
@@ -121,6 +170,12 @@ class RTCRtpSenderTest(TestCase):
                 RTCRtpHeaderExtensionCapability(
                     uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time"
                 ),
+                RTCRtpHeaderExtensionCapability(
+                    uri="urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+                ),
+                RTCRtpHeaderExtensionCapability(
+                    uri="urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id"
+                ),
             ],
         )
 
@@ -153,6 +208,249 @@ class RTCRtpSenderTest(TestCase):
 
             await local_transport.stop()
 
+    @asynctest
+    async def test_encoder_parameters(self) -> None:
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            sender = RTCRtpSender(FastVideoStreamTrack(), local_transport)
+            self.assertEqual(sender.getEncoderParameters(), RTCRtpEncoderParameters())
+
+            parameters = RTCRtpEncoderParameters(minBitrate=500000, keyFrameInterval=60)
+            sender.setEncoderParameters(parameters)
+            self.assertEqual(sender.getEncoderParameters(), parameters)
+
+            # the limits of the RTP stream are set on its encoding
+            send_parameters = sender.getParameters()
+            send_parameters.encodings[0].maxBitrate = 400000
+            send_parameters.encodings[0].scaleResolutionDownBy = 2
+            sender.setParameters(send_parameters)
+
+            # the parameters are applied to the encoder, and the minimum
+            # bitrate is capped by the maximum bitrate
+            [(stream, _)] = await sender._next_encoded_frames(VP8_CODEC)
+            encoder = cast(Vp8Encoder, stream.encoder)
+            self.assertEqual(encoder.parameters, parameters)
+            self.assertEqual(encoder.encoding.maxBitrate, 400000)
+            self.assertEqual(encoder.target_bitrate, 400000)
+            self.assertEqual(encoder.codec.gop_size, 60)
+            self.assertEqual(encoder.codec.width, 160)
+
+            # the parameters can be modified and set again
+            parameters = sender.getEncoderParameters()
+            parameters.keyFrameInterval = 30
+            self.assertEqual(sender.getEncoderParameters().keyFrameInterval, 60)
+            sender.setEncoderParameters(parameters)
+            parameters.keyFrameInterval = 10
+            [(stream, _)] = await sender._next_encoded_frames(VP8_CODEC)
+            encoder = cast(Vp8Encoder, stream.encoder)
+            self.assertEqual(encoder.parameters.keyFrameInterval, 30)
+            self.assertEqual(encoder.codec.gop_size, 30)
+
+            # invalid parameters
+            with self.assertRaises(ValueError) as cm:
+                sender.setEncoderParameters(
+                    RTCRtpEncoderParameters(scalabilityMode="L2T2")
+                )
+            self.assertEqual(str(cm.exception), "Unsupported scalabilityMode `L2T2`")
+            self.assertEqual(encoder.target_bitrate, 400000)
+
+    @asynctest
+    async def test_max_framerate(self) -> None:
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            sender = RTCRtpSender(
+                FastVideoStreamTrack(),
+                local_transport,
+                [RTCRtpEncodingParameters(maxFramerate=10)],
+            )
+
+            # one frame out of three is sent
+            sent = []
+            for i in range(9):
+                if await sender._next_encoded_frames(VP8_CODEC):
+                    sent.append(i)
+            self.assertEqual(sent, [0, 3, 6])
+
+            # raising the frame rate applies immediately
+            parameters = sender.getParameters()
+            parameters.encodings[0].maxFramerate = 15
+            sender.setParameters(parameters)
+            sent = []
+            for i in range(9, 15):
+                if await sender._next_encoded_frames(VP8_CODEC):
+                    sent.append(i)
+            self.assertEqual(sent, [9, 11, 13])
+
+    @asynctest
+    async def test_simulcast(self) -> None:
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            sender = RTCRtpSender(
+                FastVideoStreamTrack(), local_transport, SIMULCAST_ENCODINGS
+            )
+            parameters = sender.getParameters()
+            self.assertEqual([e.rid for e in parameters.encodings], ["q", "h", "f"])
+            self.assertEqual(len(set(e.ssrc for e in parameters.encodings)), 3)
+            self.assertEqual(sender._ssrc, parameters.encodings[0].ssrc)
+
+            # each layer is encoded at its own resolution
+            frames = await sender._next_encoded_frames(VP8_CODEC)
+            self.assertEqual(
+                [
+                    (s.encoding.rid, cast(Vp8Encoder, s.encoder).codec.width)
+                    for s, _ in frames
+                ],
+                [("q", 80), ("h", 160), ("f", 320)],
+            )
+
+            # pause a layer
+            parameters.encodings[2].active = False
+            sender.setParameters(parameters)
+            frames = await sender._next_encoded_frames(VP8_CODEC)
+            self.assertEqual([s.encoding.rid for s, _ in frames], ["q", "h"])
+
+            # resume it
+            parameters.encodings[2].active = True
+            sender.setParameters(parameters)
+            frames = await sender._next_encoded_frames(VP8_CODEC)
+            self.assertEqual([s.encoding.rid for s, _ in frames], ["q", "h", "f"])
+
+            # the layers cannot be changed
+            parameters.encodings.pop()
+            with self.assertRaises(ValueError) as cm:
+                sender.setParameters(parameters)
+            self.assertEqual(
+                str(cm.exception),
+                "The number of encodings and their rids cannot change",
+            )
+
+    @asynctest
+    async def test_simulcast_invalid(self) -> None:
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            for kind, encodings, message in [
+                (
+                    "audio",
+                    [
+                        RTCRtpEncodingParameters(rid="a"),
+                        RTCRtpEncodingParameters(rid="b"),
+                    ],
+                    "Simulcast is only supported for video",
+                ),
+                (
+                    "video",
+                    [RTCRtpEncodingParameters(rid="a"), RTCRtpEncodingParameters()],
+                    "Invalid rid `None`",
+                ),
+                (
+                    "video",
+                    [
+                        RTCRtpEncodingParameters(rid="a b"),
+                        RTCRtpEncodingParameters(rid="c"),
+                    ],
+                    "Invalid rid `a b`",
+                ),
+                (
+                    "video",
+                    [
+                        RTCRtpEncodingParameters(rid="a"),
+                        RTCRtpEncodingParameters(rid="a"),
+                    ],
+                    "Encoding rids must be unique",
+                ),
+                (
+                    "video",
+                    [RTCRtpEncodingParameters(scaleResolutionDownBy=0.5)],
+                    "scaleResolutionDownBy must be at least 1",
+                ),
+                (
+                    "video",
+                    [RTCRtpEncodingParameters(maxFramerate=0)],
+                    "maxFramerate must be greater than 0",
+                ),
+            ]:
+                with self.assertRaises(ValueError) as cm:
+                    RTCRtpSender(kind, local_transport, encodings)
+                self.assertEqual(str(cm.exception), message)
+
+    @asynctest
+    async def test_simulcast_negotiate(self) -> None:
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            # the remote party accepts some layers
+            sender = RTCRtpSender("video", local_transport, SIMULCAST_ENCODINGS)
+            sender._negotiate_simulcast(["f", "q"])
+            self.assertEqual(
+                [e.rid for e in sender.getParameters().encodings], ["q", "f"]
+            )
+
+            # the remote party does not support simulcast
+            sender = RTCRtpSender("video", local_transport, SIMULCAST_ENCODINGS)
+            ssrc = sender._ssrc
+            sender._negotiate_simulcast([])
+            [encoding] = sender.getParameters().encodings
+            self.assertEqual(encoding.rid, None)
+            self.assertEqual(encoding.scaleResolutionDownBy, 4)
+            self.assertEqual(encoding.ssrc, ssrc)
+
+    @asynctest
+    async def test_send_simulcast(self) -> None:
+        parameters = RTCRtpSendParameters(
+            codecs=[
+                VP8_CODEC,
+                RTCRtpCodecParameters(
+                    mimeType="video/rtx",
+                    clockRate=90000,
+                    payloadType=101,
+                    parameters={"apt": 100},
+                ),
+            ],
+            headerExtensions=[
+                RTCRtpHeaderExtensionParameters(
+                    id=4, uri="urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+                ),
+                RTCRtpHeaderExtensionParameters(
+                    id=5,
+                    uri="urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id",
+                ),
+            ],
+        )
+        extensions_map = HeaderExtensionsMap()
+        extensions_map.configure(parameters)
+        queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
+
+        async def mock_send_rtp(data: bytes) -> None:
+            if not is_rtcp(data):
+                await queue.put(RtpPacket.parse(data, extensions_map))
+
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            local_transport._send_rtp = mock_send_rtp  # type: ignore
+
+            sender = RTCRtpSender(
+                VideoStreamTrack(), local_transport, SIMULCAST_ENCODINGS
+            )
+            await sender.send(parameters)
+
+            # each layer is sent with its own SSRC and rid
+            rids: dict[int, str] = {}
+            while len(rids) < 3:
+                packet = await queue.get()
+                rids[packet.ssrc] = packet.extensions.rtp_stream_id
+            encodings = sender.getParameters().encodings
+            self.assertEqual(rids, {e.ssrc: e.rid for e in encodings})
+
+            # retransmissions carry the rid of the repaired stream
+            await sender._retransmit(packet.sequence_number, packet.ssrc)
+            await asyncio.sleep(0.1)
+            await sender.stop()
+
+            found_rtx = None
+            while not queue.empty():
+                queue_packet = queue.get_nowait()
+                if queue_packet.payload_type == 101:
+                    found_rtx = queue_packet
+                    break
+            self.assertIsNotNone(found_rtx)
+            encoding = next(e for e in encodings if e.ssrc == packet.ssrc)
+            self.assertEqual(found_rtx.ssrc, encoding.rtx.ssrc)
+            self.assertEqual(found_rtx.extensions.rtp_stream_id, None)
+            self.assertEqual(found_rtx.extensions.repaired_rtp_stream_id, encoding.rid)
+
     @asynctest
     async def test_handle_rtcp_nack(self) -> None:
         async with dummy_dtls_transport_pair() as (local_transport, _):
@@ -168,6 +466,12 @@ class RTCRtpSenderTest(TestCase):
             packet.lost.append(7654)
             await sender._handle_rtcp_packet(packet)
 
+            # check stats
+            report = await sender.getStats()
+            outbound_rtp = report["outbound-rtp_" + str(id(sender))]
+            self.assertEqual(outbound_rtp.nackCount, 1)
+            self.assertEqual(outbound_rtp.retransmittedPacketsSent, 0)
+
             # clean shutdown
             await sender.stop()
 
@@ -185,6 +489,12 @@ class RTCRtpSenderTest(TestCase):
             )
             await sender._handle_rtcp_packet(packet)
 
+            # check stats
+            report = await sender.getStats()
+            outbound_rtp = report["outbound-rtp_" + str(id(sender))]
+            self.assertEqual(outbound_rtp.pliCount, 1)
+            self.assertEqual(outbound_rtp.firCount, 0)
+
             # clean shutdown
             await sender.stop()
 
@@ -202,6 +512,12 @@ class RTCRtpSenderTest(TestCase):
             )
             await sender._handle_rtcp_packet(packet)
 
+            # check stats
+            report = await sender.getStats()
+            outbound_rtp = report["outbound-rtp_" + str(id(sender))]
+            self.assertEqual(outbound_rtp.pliCount, 0)
+            self.assertEqual(outbound_rtp.firCount, 1)
+
             # clean shutdown
             await sender.stop()
 
@@ -357,6 +673,54 @@ class RTCRtpSenderTest(TestCase):
             self.assertEqual(found_rtx.payload_type, 100)
             self.assertEqual(found_rtx.ssrc, 1234)
 
+            # check stats
+            report = await sender.getStats()
+            outbound_rtp = report["outbound-rtp_" + str(id(sender))]
+            self.assertEqual(outbound_rtp.retransmittedPacketsSent, 1)
+            self.assertEqual(outbound_rtp.retransmittedBytesSent, len(packet.payload))
+            self.assertGreater(outbound_rtp.framesEncoded, 0)
+            self.assertEqual(outbound_rtp.keyFramesEncoded, 1)
+            self.assertGreater(outbound_rtp.totalEncodeTime, 0)
+            self.assertIsNotNone(outbound_rtp.targetBitrate)
+
+    @asynctest
+    async def test_stage_timing(self) -> None:
+        queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
+
+        async def mock_send_rtp(data: bytes) -> None:
+            if not is_rtcp(data):
+                await queue.put(RtpPacket.parse(data))
+
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            local_transport._send_rtp = mock_send_rtp  # type: ignore
+
+            sender = RTCRtpSender(VideoStreamTrack(), local_transport)
+            sender.setStageTiming(True)
+
+            await sender.send(RTCRtpSendParameters(codecs=[VP8_CODEC]))
+
+            # wait for one packet to be transmitted, then shutdown
+            await queue.get()
+            await sender.stop()
+
+            # check stats
+            report = await sender.getStats()
+            counts = {
+                s.stage: s.count for s in report.values() if s.type == "stage-timing"
+            }
+            self.assertEqual(
+                sorted(counts.keys()), ["encode", "packetize", "send", "trackRecv"]
+            )
+            self.assertGreater(counts["trackRecv"], 0)
+            self.assertGreater(counts["encode"], 0)
+            self.assertGreater(counts["packetize"], 0)
+            self.assertGreater(counts["send"], 0)
+
+            # disabling stage timing removes its stats
+            sender.setStageTiming(False)
+            report = await sender.getStats()
+            self.assertNotIn("stage-timing", [s.type for s in report.values()])
+
     @asynctest
     async def test_retransmit_with_rtx(self) -> None:
         """
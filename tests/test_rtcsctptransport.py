@@ -6,7 +6,12 @@ from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 from aiortc.exceptions import InvalidStateError
-from aiortc.rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
+from aiortc.rtcconfiguration import RTCSctpConfiguration
+from aiortc.rtcdatachannel import (
+    RTCDataChannel,
+    RTCDataChannelMessageStream,
+    RTCDataChannelParameters,
+)
 from aiortc.rtcsctptransport import (
     SCTP_DATA_FIRST_FRAG,
     SCTP_DATA_LAST_FRAG,
@@ -15,6 +20,7 @@ from aiortc.rtcsctptransport import (
     AbortChunk,
     Chunk,
     CookieEchoChunk,
+    CubicCongestionControl,
     DataChunk,
     ErrorChunk,
     ForwardTsnChunk,
@@ -23,9 +29,11 @@ from aiortc.rtcsctptransport import (
     InboundStream,
     InitChunk,
     ReconfigChunk,
+    RenoCongestionControl,
     RTCSctpCapabilities,
     RTCSctpTransport,
     SackChunk,
+    SctpCongestionControl,
     ShutdownAckChunk,
     ShutdownChunk,
     ShutdownCompleteChunk,
@@ -74,6 +82,7 @@ async def client_and_server() -> AsyncGenerator[
 async def client_standalone() -> AsyncGenerator[RTCSctpTransport, None]:
     async with dummy_dtls_transport_pair() as (client_transport, _):
         client = RTCSctpTransport(client_transport)
+        client._peer_rwnd = 131072
         assert client.is_server is False
 
         try:
@@ -196,6 +205,25 @@ class SctpPacketTest(TestCase):
             repr(chunk), "DataChunk(flags=3, tsn=2584679421, stream_id=1, stream_seq=1)"
         )
 
+    def test_serialize_data_memoryview(self) -> None:
+        chunk = DataChunk(flags=SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG)
+        chunk.tsn = 2584679421
+        chunk.stream_id = 1
+        chunk.stream_seq = 1
+        chunk.protocol = 53
+        chunk.user_data = memoryview(b"xxpingxx")[2:6]
+
+        data = serialize_packet(5000, 5000, 1234, chunk)
+        _, _, verification_tag, chunks = parse_packet(data)
+        self.assertEqual(verification_tag, 1234)
+        self.assertEqual(len(chunks), 1)
+
+        parsed = chunks[0]
+        assert isinstance(parsed, DataChunk)
+        self.assertIsInstance(parsed.user_data, memoryview)
+        self.assertEqual(parsed.user_data, b"ping")
+        self.assertEqual(bytes(parsed), bytes(chunk))
+
     def test_parse_data_truncated_chunk_value(self) -> None:
         data = load("sctp_data_truncated.bin")
         with self.assertRaises(ValueError) as cm:
@@ -446,6 +474,21 @@ class SctpStreamTest(TestCase):
         self.assertEqual(stream.reassembly, [chunks[2]])
         self.assertEqual(stream.sequence_number, 2)
 
+    def test_whole_with_tsn_gap(self) -> None:
+        stream = InboundStream()
+        chunks = self.factory.create([b"foo"])
+        self.factory.tsn += 1  # chunk for another stream
+        chunks += self.factory.create([b"bar"])
+
+        # feed both messages
+        stream.add_chunk(chunks[0])
+        stream.add_chunk(chunks[1])
+        self.assertEqual(
+            list(stream.pop_messages()), [(456, 123, b"foo"), (456, 123, b"bar")]
+        )
+        self.assertEqual(stream.reassembly, [])
+        self.assertEqual(stream.sequence_number, 2)
+
     def test_fragments_in_order(self) -> None:
         stream = InboundStream()
         chunks = self.factory.create([b"foo", b"bar", b"baz"])
@@ -607,6 +650,58 @@ class SctpStreamTest(TestCase):
         self.assertEqual(stream.reassembly, [])
         self.assertEqual(stream.sequence_number, 0)
 
+    def test_pop_fragments(self) -> None:
+        stream = InboundStream()
+        chunks = (
+            self.factory.create([b"foo", b"bar", b"baz"])
+            + self.factory.create([b"qux", b"quux"])
+            + self.factory.create([b"corge"])
+        )
+        chunks[3].protocol = 51
+        chunks[4].protocol = 51
+
+        # feed first fragment
+        stream.add_chunk(chunks[0])
+        self.assertEqual(
+            list(stream.pop_fragments(123)),
+            [(456, 123, b"foo", SCTP_DATA_FIRST_FRAG)],
+        )
+        self.assertEqual(stream.reassembly, [])
+        self.assertEqual(stream.sequence_number, 0)
+        self.assertEqual(stream.streaming_tsn, 2)
+
+        # feed third fragment
+        stream.add_chunk(chunks[2])
+        self.assertEqual(list(stream.pop_fragments(123)), [])
+        self.assertEqual(stream.reassembly, [chunks[2]])
+
+        # feed second fragment
+        stream.add_chunk(chunks[1])
+        self.assertEqual(
+            list(stream.pop_fragments(123)),
+            [(456, 123, b"bar", 0), (456, 123, b"baz", SCTP_DATA_LAST_FRAG)],
+        )
+        self.assertEqual(stream.reassembly, [])
+        self.assertEqual(stream.sequence_number, 1)
+        self.assertEqual(stream.streaming_tsn, None)
+
+        # feed message with another protocol, which is delivered whole
+        stream.add_chunk(chunks[3])
+        self.assertEqual(list(stream.pop_fragments(123)), [])
+        self.assertEqual(stream.reassembly, [chunks[3]])
+
+        stream.add_chunk(chunks[5])
+        stream.add_chunk(chunks[4])
+        self.assertEqual(
+            list(stream.pop_fragments(123)),
+            [
+                (456, 51, b"quxquux", SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG),
+                (456, 123, b"corge", SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG),
+            ],
+        )
+        self.assertEqual(stream.reassembly, [])
+        self.assertEqual(stream.sequence_number, 3)
+
     def test_prune_chunks(self) -> None:
         stream = InboundStream()
         factory = ChunkFactory(tsn=100)
@@ -628,6 +723,68 @@ class SctpStreamTest(TestCase):
         self.assertEqual(stream.sequence_number, 2)
 
 
+class SctpCongestionControlTest(TestCase):
+    def test_reno(self) -> None:
+        cc = RenoCongestionControl(mtu=1200, initial_cwnd=3600)
+        cc.ssthresh = 4000
+
+        # slow start
+        cc.on_ack(2400, 0.0)
+        self.assertEqual(cc.cwnd, 4800)
+
+        # congestion avoidance
+        cc.on_ack(2400, 0.1)
+        self.assertEqual(cc.cwnd, 4800)
+        self.assertEqual(cc.partial_bytes_acked, 2400)
+        cc.on_ack(2400, 0.2)
+        self.assertEqual(cc.cwnd, 6000)
+        self.assertEqual(cc.partial_bytes_acked, 0)
+
+        # loss
+        cc.on_loss(0.3)
+        self.assertEqual(cc.cwnd, 4800)
+        self.assertEqual(cc.ssthresh, 4800)
+
+        # timeout
+        cc.on_timeout(0.4)
+        self.assertEqual(cc.cwnd, 1200)
+        self.assertEqual(cc.ssthresh, 4800)
+
+    def test_cubic(self) -> None:
+        cc = CubicCongestionControl(mtu=1200, initial_cwnd=3600)
+        cc.ssthresh = 120000
+
+        # slow start
+        now = 0.0
+        while cc.cwnd < cc.ssthresh:
+            cc.on_ack(cc.cwnd, now)
+            now += 0.01
+        self.assertEqual(cc.cwnd, 120000)
+
+        # loss
+        cc.on_loss(now)
+        self.assertEqual(cc.cwnd, 84000)
+        self.assertEqual(cc.ssthresh, 84000)
+        self.assertEqual(cc.w_max, 120000)
+
+        # the window returns to its previous maximum after K seconds
+        for i in range(100):
+            cc.on_ack(cc.cwnd, now)
+            now += 0.05
+        self.assertEqual(round(cc.k, 2), 4.22)
+        self.assertGreaterEqual(cc.cwnd, 120000)
+
+        # loss with fast convergence
+        cc.w_max = 2 * cc.cwnd
+        cc.on_loss(now)
+        self.assertLess(cc.w_max, 2 * cc.cwnd / 0.7)
+
+        # timeout
+        cc.on_timeout(now)
+        self.assertEqual(cc.cwnd, 1200)
+        self.assertIsNone(cc.epoch_start)
+
+
 class SctpUtilTest(TestCase):
     def test_tsn_minus_one(self) -> None:
         self.assertEqual(tsn_minus_one(0), 4294967295)
@@ -675,6 +832,93 @@ class RTCSctpTransportTest(TestCase):
         with self.assertRaises(InvalidStateError):
             RTCSctpTransport(dtlsTransport)  # type: ignore
 
+    @asynctest
+    async def test_construct_with_configuration(self) -> None:
+        async with dummy_dtls_transport_pair() as (client_transport, _):
+            sctpTransport = RTCSctpTransport(
+                client_transport,
+                configuration=RTCSctpConfiguration(
+                    congestionControl="cubic",
+                    initialCongestionWindow=12000,
+                    rtoInitial=0.5,
+                    rtoMax=2.0,
+                    rtoMin=0.1,
+                ),
+            )
+            self.assertIsInstance(
+                sctpTransport._congestion_control, CubicCongestionControl
+            )
+            self.assertEqual(sctpTransport._congestion_control.cwnd, 12000)
+            self.assertEqual(sctpTransport._rto, 0.5)
+
+            # RTO is bounded by the configuration
+            sctpTransport._update_rto(0.01)
+            self.assertEqual(sctpTransport._rto, 0.1)
+            sctpTransport._update_rto(10.0)
+            self.assertEqual(sctpTransport._rto, 2.0)
+
+    @asynctest
+    async def test_construct_with_invalid_congestion_control(self) -> None:
+        async with dummy_dtls_transport_pair() as (client_transport, _):
+            with self.assertRaises(ValueError) as cm:
+                RTCSctpTransport(
+                    client_transport,
+                    configuration=RTCSctpConfiguration(congestionControl="bogus"),
+                )
+            self.assertEqual(
+                str(cm.exception), "Unknown congestion control algorithm 'bogus'"
+            )
+
+    @asynctest
+    async def test_construct_with_custom_congestion_control(self) -> None:
+        class FixedCongestionControl(SctpCongestionControl):
+            def on_ack(self, acked_bytes: int, now: float) -> None:
+                pass
+
+            def on_loss(self, now: float) -> None:
+                pass
+
+            def on_timeout(self, now: float) -> None:
+                pass
+
+        async with dummy_dtls_transport_pair() as (client_transport, _):
+            # subclass
+            sctpTransport = RTCSctpTransport(
+                client_transport,
+                configuration=RTCSctpConfiguration(
+                    congestionControl=FixedCongestionControl,
+                    initialCongestionWindow=12000,
+                ),
+            )
+            self.assertIsInstance(
+                sctpTransport._congestion_control, FixedCongestionControl
+            )
+            self.assertEqual(sctpTransport._congestion_control.cwnd, 12000)
+
+            # instance
+            congestion_control = FixedCongestionControl(mtu=1200, initial_cwnd=2400)
+            sctpTransport = RTCSctpTransport(
+                client_transport,
+                configuration=RTCSctpConfiguration(
+                    congestionControl=congestion_control
+                ),
+            )
+            self.assertIs(sctpTransport._congestion_control, congestion_control)
+
+            # not a congestion control
+            with self.assertRaises(ValueError) as cm:
+                RTCSctpTransport(
+                    client_transport,
+                    configuration=RTCSctpConfiguration(
+                        congestionControl=int  # type: ignore
+                    ),
+                )
+            self.assertEqual(
+                str(cm.exception),
+                "Congestion control algorithm must be a subclass of "
+                "SctpCongestionControl",
+            )
+
     @asynctest
     async def test_connect_broken_transport(self) -> None:
         """
@@ -1238,6 +1482,222 @@ class RTCSctpTransportTest(TestCase):
             self.assertEqual(client_channels[0].label, "chat")
             self.assertEqual(len(server_channels), 0)
 
+    @asynctest
+    async def test_connect_then_send_buffers(self) -> None:
+        async with client_and_server() as (client, server):
+            server_channels = track_channels(server)
+            server_messages: list[object] = []
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+
+            # create data channel
+            channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 1)
+            self.assertEqual(server_channels[0].binaryType, "bytes")
+            server_channels[0].binaryType = "memoryview"
+            server_channels[0].on("message", server_messages.append)
+
+            # send buffers
+            long_data = bytearray(range(256)) * 20
+            channel.send(bytearray(b"foo"))
+            channel.send(memoryview(b"xxbarxx")[2:5])
+            channel.send(long_data)
+            channel.send(bytearray())
+            self.assertEqual(channel.bufferedAmount, 5127)
+
+            await asyncio.sleep(0.1)
+            self.assertEqual(channel.bufferedAmount, 0)
+            self.assertEqual(len(server_messages), 4)
+            for message in server_messages:
+                self.assertIsInstance(message, memoryview)
+            self.assertEqual(server_messages, [b"foo", b"bar", long_data, b""])
+
+    @asynctest
+    async def test_connect_then_pause_data_channel(self) -> None:
+        async with dummy_dtls_transport_pair() as (client_transport, server_transport):
+            client = RTCSctpTransport(client_transport)
+            server = RTCSctpTransport(
+                server_transport,
+                configuration=RTCSctpConfiguration(receiveBufferSize=16384),
+            )
+            server_channels = track_channels(server)
+            server_messages: list[object] = []
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+            self.assertEqual(client._peer_rwnd, 16384)
+
+            # create data channel
+            channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 1)
+            server_channel = server_channels[0]
+            server_channel.on("message", server_messages.append)
+
+            # pause the receiver
+            server_channel.pause()
+            self.assertTrue(server_channel.paused)
+            for i in range(32):
+                channel.send(b"M" * 1024)
+
+            await asyncio.sleep(0.1)
+            self.assertEqual(server_messages, [])
+            self.assertEqual(server._get_advertised_rwnd(), 0)
+            self.assertEqual(client._peer_rwnd, 0)
+            self.assertGreater(channel.bufferedAmount, 0)
+
+            # resume the receiver
+            server_channel.resume()
+            self.assertFalse(server_channel.paused)
+            for i in range(10):
+                if len(server_messages) == 32:
+                    break
+                await asyncio.sleep(0.5)
+            self.assertEqual(len(server_messages), 32)
+            self.assertEqual(channel.bufferedAmount, 0)
+            self.assertEqual(server._receive_buffered, 0)
+
+            await client.stop()
+            await server.stop()
+
+    @asynctest
+    async def test_connect_then_send_message_larger_than_buffer(self) -> None:
+        async with dummy_dtls_transport_pair() as (client_transport, server_transport):
+            client = RTCSctpTransport(client_transport)
+            server = RTCSctpTransport(
+                server_transport,
+                configuration=RTCSctpConfiguration(receiveBufferSize=16384),
+            )
+            server_channels = track_channels(server)
+            server_messages: list[object] = []
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+
+            # create data channel
+            channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 1)
+            server_channels[0].on("message", server_messages.append)
+
+            # send messages
+            long_data = bytes(range(256)) * 256
+            channel.send(long_data)
+            channel.send(b"foo")
+            for i in range(10):
+                if len(server_messages) == 2:
+                    break
+                await asyncio.sleep(0.5)
+            self.assertEqual(server_messages, [long_data, b"foo"])
+            self.assertEqual(channel.bufferedAmount, 0)
+            self.assertEqual(server._receive_buffered, 0)
+
+            await client.stop()
+            await server.stop()
+
+    @asynctest
+    async def test_connect_then_stream_large_message(self) -> None:
+        async with dummy_dtls_transport_pair() as (client_transport, server_transport):
+            client = RTCSctpTransport(client_transport)
+            server = RTCSctpTransport(
+                server_transport,
+                configuration=RTCSctpConfiguration(receiveBufferSize=16384),
+            )
+            server_channels = track_channels(server)
+            server_messages: list[object] = []
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+
+            # create data channel
+            channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 1)
+            server_channel = server_channels[0]
+            server_channel.binaryType = "stream"
+            server_channel.on("message", server_messages.append)
+
+            # send messages
+            channel.send(bytes(range(256)) * 1024)
+            channel.send("hello")
+            channel.send(b"")
+
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_messages), 1)
+            stream = server_messages[0]
+            assert isinstance(stream, RTCDataChannelMessageStream)
+
+            # consume the message
+            size = 0
+            max_buffered = 0
+            async for fragment in stream:
+                self.assertEqual(fragment[0], size % 256)
+                size += len(fragment)
+                max_buffered = max(max_buffered, server._receive_buffered)
+            self.assertEqual(size, 262144)
+            self.assertLessEqual(max_buffered, 16384 + USERDATA_MAX_LENGTH)
+
+            # the following messages are delivered
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_messages), 3)
+            self.assertEqual(server_messages[1], "hello")
+            stream = server_messages[2]
+            assert isinstance(stream, RTCDataChannelMessageStream)
+            self.assertEqual([fragment async for fragment in stream], [])
+
+            await client.stop()
+            await server.stop()
+
+    @asynctest
+    async def test_connect_then_stream_message_and_close(self) -> None:
+        async with client_and_server() as (client, server):
+            server_channels = track_channels(server)
+            server_messages: list[object] = []
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+
+            # create data channel
+            channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
+            await asyncio.sleep(0.1)
+            server_channels[0].binaryType = "stream"
+            server_channels[0].on("message", server_messages.append)
+
+            # receive the first fragment of a message
+            chunk = DataChunk(flags=SCTP_DATA_FIRST_FRAG)
+            chunk.protocol = 53
+            chunk.stream_id = channel.id
+            chunk.stream_seq = server._get_inbound_stream(channel.id).sequence_number
+            chunk.tsn = tsn_plus_one(server._last_received_tsn)
+            chunk.user_data = b"M" * USERDATA_MAX_LENGTH
+            await server._receive_chunk(chunk)
+            self.assertEqual(server._receive_buffered, USERDATA_MAX_LENGTH)
+            self.assertEqual(len(server_messages), 1)
+            stream = server_messages[0]
+            assert isinstance(stream, RTCDataChannelMessageStream)
+
+            # close the data channel
+            server_channels[0].close()
+            await asyncio.sleep(0.1)
+            self.assertEqual(server_channels[0].readyState, "closed")
+
+            # the incomplete message is discarded
+            self.assertEqual(server._receive_buffered, 0)
+            with self.assertRaises(ConnectionError):
+                await stream.__anext__()
+
     @patch("aiortc.rtcsctptransport.logger.isEnabledFor")
     @asynctest
     async def test_connect_with_logging(self, mock_is_enabled_for: MagicMock) -> None:
@@ -1455,6 +1915,52 @@ class RTCSctpTransportTest(TestCase):
             self.assertEqual(client._sack_misordered, set())
             self.assertEqual(client._last_received_tsn, 1)
 
+    @asynctest
+    async def test_receive_data_buffer_full(self) -> None:
+        async with client_standalone() as client:
+            client._last_received_tsn = 0
+            client._receive_buffer_size = 4
+
+            # receive a fragmented message which fills the buffer
+            chunk = DataChunk(flags=SCTP_DATA_FIRST_FRAG)
+            chunk.user_data = b"foo"
+            chunk.tsn = 2
+            chunk.stream_seq = 1
+            await client._receive_chunk(chunk)
+            self.assertEqual(client._last_received_tsn, 0)
+            self.assertEqual(client._sack_misordered, set([2]))
+            self.assertEqual(client._receive_buffered, 3)
+            self.assertEqual(client._get_advertised_rwnd(), 1)
+
+            chunk = DataChunk(flags=SCTP_DATA_LAST_FRAG)
+            chunk.user_data = b"bar"
+            chunk.tsn = 3
+            chunk.stream_seq = 1
+            await client._receive_chunk(chunk)
+            self.assertEqual(client._sack_misordered, set([2, 3]))
+            self.assertEqual(client._receive_buffered, 6)
+            self.assertEqual(client._get_advertised_rwnd(), 0)
+
+            # new data is dropped
+            chunk = DataChunk(flags=(SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG))
+            chunk.user_data = b"baz"
+            chunk.tsn = 4
+            chunk.stream_seq = 2
+            await client._receive_chunk(chunk)
+            self.assertEqual(client._sack_needed, True)
+            self.assertEqual(client._sack_misordered, set([2, 3]))
+            self.assertEqual(client._receive_buffered, 6)
+
+            # data filling the hole is accepted
+            chunk = DataChunk(flags=(SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG))
+            chunk.user_data = b"qux"
+            chunk.tsn = 1
+            await client._receive_chunk(chunk)
+            self.assertEqual(client._last_received_tsn, 3)
+            self.assertEqual(client._sack_misordered, set())
+            self.assertEqual(client._receive_buffered, 0)
+            self.assertEqual(client._get_advertised_rwnd(), 4)
+
     @asynctest
     async def test_receive_data_out_of_order(self) -> None:
         async with client_standalone() as client:
@@ -1761,16 +2267,16 @@ class RTCSctpTransportTest(TestCase):
             sent_tsns.append(chunk.tsn)
 
         async with client_standalone() as client:
-            client._cwnd = 4800
+            client._congestion_control.cwnd = 4800
             client._last_sacked_tsn = 4294967295
             client._local_tsn = 0
-            client._ssthresh = 4800
+            client._congestion_control.ssthresh = 4800
             client._send_chunk = mock_send_chunk  # type: ignore
 
             # queue 16 chunks, but cwnd only allows 4
             await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 16)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3])
@@ -1781,10 +2287,11 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 1
             await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 6000)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6])
@@ -1793,10 +2300,11 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 3
             await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 6000)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 8])
@@ -1805,10 +2313,11 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 5
             await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 6000)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
@@ -1817,10 +2326,11 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 7
             await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 7200)
+            self.assertEqual(client._congestion_control.cwnd, 7200)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 7200)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13])
@@ -1829,10 +2339,11 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 9
             await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 7200)
+            self.assertEqual(client._congestion_control.cwnd, 7200)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 7200)
             self.assertEqual(
@@ -1852,14 +2363,14 @@ class RTCSctpTransportTest(TestCase):
         async with client_standalone() as client:
             client._last_sacked_tsn = 4294967295
             client._local_tsn = 0
-            client._ssthresh = 131072
+            client._congestion_control.ssthresh = 131072
             client._send_chunk = mock_send_chunk  # type: ignore
 
             # queue 8 chunks, but cwnd only allows 3
             with self.assertTimerRestarted(client):
                 await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 8)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2])
@@ -1868,11 +2379,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 1
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5])
@@ -1881,11 +2393,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK sack comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 3
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -1894,11 +2407,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 5
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 2400)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -1907,11 +2421,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging final chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 7
             with self.assertTimerStopped(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 0)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -1929,14 +2444,14 @@ class RTCSctpTransportTest(TestCase):
         async with client_standalone() as client:
             client._last_sacked_tsn = 4294967295
             client._local_tsn = 0
-            client._ssthresh = 131072
+            client._congestion_control.ssthresh = 131072
             client._send_chunk = mock_send_chunk  # type: ignore
 
             # queue 8 chunks, but cwnd only allows 3
             with self.assertTimerRestarted(client):
                 await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 8)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2])
@@ -1945,12 +2460,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunks 0 and 2
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 0
             sack.gaps = [(2, 2)]  # TSN 1 is missing
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5])
@@ -1959,11 +2475,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunks 1 and 3
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 3
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -1972,11 +2489,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 5
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 2400)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -1985,11 +2503,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging final chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 7
             with self.assertTimerStopped(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 6000)
+            self.assertEqual(client._congestion_control.cwnd, 6000)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 0)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -2007,14 +2526,14 @@ class RTCSctpTransportTest(TestCase):
         async with client_standalone() as client:
             client._last_sacked_tsn = 4294967295
             client._local_tsn = 0
-            client._ssthresh = 131072
+            client._congestion_control.ssthresh = 131072
             client._send_chunk = mock_send_chunk  # type: ignore
 
             # queue 8 chunks, but cwnd only allows 3
             with self.assertTimerRestarted(client):
                 await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 8)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2])
@@ -2023,12 +2542,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunks 0 and 2
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 0
             sack.gaps = [(2, 2)]  # TSN 1 is missing
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5])
@@ -2037,12 +2557,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunks 3 and 4
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 0
             sack.gaps = [(2, 4)]  # TSN 1 is missing
             with self.assertTimerPreserved(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -2051,12 +2572,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging 2 more chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 0
             sack.gaps = [(2, 6)]  # TSN 1 is missing
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, 7)
             self.assertEqual(client._flight_size, 2400)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 1])
@@ -2065,11 +2587,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging final chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 7
             with self.assertTimerStopped(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 0)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 1])
@@ -2087,14 +2610,14 @@ class RTCSctpTransportTest(TestCase):
         async with client_standalone() as client:
             client._last_sacked_tsn = 4294967295
             client._local_tsn = 0
-            client._ssthresh = 131072
+            client._congestion_control.ssthresh = 131072
             client._send_chunk = mock_send_chunk  # type: ignore
 
             # queue 8 chunks, but cwnd only allows 3
             with self.assertTimerRestarted(client):
                 await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 8)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2])
@@ -2103,12 +2626,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunk 2
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 4294967295
             sack.gaps = [(3, 3)]  # TSN 0 and 1 are missing
             with self.assertTimerPreserved(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2, 3])
@@ -2117,12 +2641,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunk 3
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 4294967295
             sack.gaps = [(3, 4)]  # TSN 0 and 1 are missing
             with self.assertTimerPreserved(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4])
@@ -2131,12 +2656,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunk 4
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 4294967295
             sack.gaps = [(3, 5)]  # TSN 0 and 1 are missing
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, 4)
             self.assertEqual(client._flight_size, 2400)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 0, 1])
@@ -2145,11 +2671,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging all chunks up to 4
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 4
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 0, 1, 5, 6, 7])
@@ -2158,11 +2685,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging final chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 7
             with self.assertTimerStopped(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 0)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 0, 1, 5, 6, 7])
@@ -2180,14 +2708,14 @@ class RTCSctpTransportTest(TestCase):
         async with client_standalone() as client:
             client._last_sacked_tsn = 4294967295
             client._local_tsn = 0
-            client._ssthresh = 131072
+            client._congestion_control.ssthresh = 131072
             client._send_chunk = mock_send_chunk  # type: ignore
 
             # queue 8 chunks, but cwnd only allows 3
             with self.assertTimerRestarted(client):
                 await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 8)
 
-            self.assertEqual(client._cwnd, 3600)
+            self.assertEqual(client._congestion_control.cwnd, 3600)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2])
@@ -2196,11 +2724,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunks 0 and 1
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 1
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5])
@@ -2209,12 +2738,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunk 5
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 1
             sack.gaps = [(4, 4)]  # TSN 2, 3 and 4 are missing
             with self.assertTimerPreserved(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6])
@@ -2223,12 +2753,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunk 6
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 1
             sack.gaps = [(4, 5)]  # TSN 2, 3 and 4 are missing
             with self.assertTimerPreserved(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7])
@@ -2240,12 +2771,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging chunk 7
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 1
             sack.gaps = [(4, 6)]  # TSN 2, 3 and 4 are missing
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, 7)
             self.assertEqual(client._flight_size, 4800)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 2, 3])
@@ -2254,12 +2786,13 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in acknowledging all chunks up to 3, and 5, 6, 7
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 3
             sack.gaps = [(2, 4)]  # TSN 4 is missing
             with self.assertTimerRestarted(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, 7)
             self.assertEqual(client._flight_size, 3600)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 2, 3, 4])
@@ -2268,11 +2801,12 @@ class RTCSctpTransportTest(TestCase):
 
             # SACK comes in ackowledging all chunks
             sack = SackChunk()
+            sack.advertised_rwnd = 131072
             sack.cumulative_tsn = 7
             with self.assertTimerStopped(client):
                 await client._receive_chunk(sack)
 
-            self.assertEqual(client._cwnd, 4800)
+            self.assertEqual(client._congestion_control.cwnd, 4800)
             self.assertEqual(client._fast_recovery_exit, None)
             self.assertEqual(client._flight_size, 2400)
             self.assertEqual(sent_tsns, [0, 1, 2, 3, 4, 5, 6, 7, 2, 3, 4])
@@ -17,10 +17,13 @@ from aiortc.rtp import (
     clamp_packets_lost,
     pack_header_extensions,
     pack_packets_lost,
+    pack_red,
     pack_remb_fci,
     unpack_header_extensions,
     unpack_packets_lost,
+    unpack_red,
     unpack_remb_fci,
+    unwrap_red,
     unwrap_rtx,
     wrap_rtx,
 )
@@ -683,6 +686,94 @@ class RtpUtilTest(TestCase):
         self.assertEqual(recovered.extensions, packet.extensions)
         self.assertEqual(recovered.payload, packet.payload)
 
+    def test_red(self) -> None:
+        blocks = [
+            (111, 1920, b"\x01" * 3),
+            (111, 960, b"\x02" * 300),
+            (111, 0, b"\x03"),
+        ]
+        payload = pack_red(blocks)
+        self.assertEqual(payload[:9], b"\xef\x1e\x00\x03\xef\x0f\x01\x2c\x6f")
+        self.assertEqual(len(payload), 9 + 3 + 300 + 1)
+        self.assertEqual(unpack_red(payload), blocks)
+
+        # primary block only
+        self.assertEqual(pack_red([(111, 0, b"\x03")]), b"\x6f\x03")
+        self.assertEqual(unpack_red(b"\x6f\x03"), [(111, 0, b"\x03")])
+
+    def test_red_truncated(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            unpack_red(b"")
+        self.assertEqual(str(cm.exception), "RED header is truncated")
+
+        with self.assertRaises(ValueError) as cm:
+            unpack_red(b"\xef\x1e\x00")
+        self.assertEqual(str(cm.exception), "RED header is truncated")
+
+        with self.assertRaises(ValueError) as cm:
+            unpack_red(b"\xef\x1e\x00\x03\x6f\x01")
+        self.assertEqual(str(cm.exception), "RED data is truncated")
+
+    def test_unwrap_red(self) -> None:
+        red = RtpPacket(
+            payload_type=63,
+            marker=1,
+            sequence_number=1,
+            timestamp=480,
+            ssrc=1234,
+            payload=pack_red([(111, 960, b"\x01"), (111, 0, b"\x02")]),
+        )
+        packets = unwrap_red(red, previous=(65535, 4294965856))
+        self.assertEqual(len(packets), 2)
+
+        self.assertEqual(packets[0].payload_type, 111)
+        self.assertEqual(packets[0].marker, 0)
+        self.assertEqual(packets[0].sequence_number, 0)
+        self.assertEqual(packets[0].timestamp, 4294966816)
+        self.assertEqual(packets[0].ssrc, 1234)
+        self.assertEqual(packets[0].payload, b"\x01")
+
+        self.assertEqual(packets[1].payload_type, 111)
+        self.assertEqual(packets[1].marker, 1)
+        self.assertEqual(packets[1].sequence_number, 1)
+        self.assertEqual(packets[1].timestamp, 480)
+        self.assertEqual(packets[1].ssrc, 1234)
+        self.assertEqual(packets[1].payload, b"\x02")
+
+        # without a previous packet, the redundant blocks cannot be placed
+        packets = unwrap_red(red)
+        self.assertEqual([p.sequence_number for p in packets], [1])
+
+        # the block was already received
+        packets = unwrap_red(red, previous=(0, 4294966816))
+        self.assertEqual([p.sequence_number for p in packets], [1])
+
+    def test_unwrap_red_not_consecutive(self) -> None:
+        # the packets at 1920 and 2880 were too large to be sent again
+        red = RtpPacket(
+            payload_type=63,
+            sequence_number=4,
+            timestamp=3840,
+            ssrc=1234,
+            payload=pack_red([(111, 2880, b"\x01"), (111, 0, b"\x02")]),
+        )
+        packets = unwrap_red(red, previous=(0, 0))
+        self.assertEqual(
+            [(p.sequence_number, p.timestamp) for p in packets],
+            [(1, 960), (4, 3840)],
+        )
+
+        # after a silence the spacing is unknown, and so is the sequence number
+        packets = unwrap_red(red, previous=(1, 0))
+        self.assertEqual([p.sequence_number for p in packets], [4])
+
+        # unless the gap holds as many packets as there are blocks
+        packets = unwrap_red(red, previous=(2, 0))
+        self.assertEqual(
+            [(p.sequence_number, p.timestamp) for p in packets],
+            [(3, 960), (4, 3840)],
+        )
+
     def test_compute_audio_level_dbov(self) -> None:
         num_samples = 960  # 20ms @ 48kHz
         # test a frame of all zeroes (-127 dBov, the minimum value)
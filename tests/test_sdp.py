@@ -12,7 +12,9 @@ from aiortc.sdp import (
     GroupDescription,
     H264Level,
     H264Profile,
+    RidDescription,
     SessionDescription,
+    SimulcastDescription,
     SsrcDescription,
     parse_h264_profile_level_id,
 )
@@ -375,6 +377,9 @@ a=ssrc:882128807 cname:{ed463ac5-dabf-44d4-8b9f-e14318427b2b}
         self.assertEqual(d.media[0].rtcp_host, "192.168.99.58")
         self.assertEqual(d.media[0].rtcp_port, 38612)
         self.assertEqual(d.media[0].rtcp_mux, True)
+        self.assertEqual(
+            d.webrtc_stream_id(d.media[0]), "{dee771c7-671a-451e-b847-f86f8e87c7d8}"
+        )
         self.assertEqual(
             d.webrtc_track_id(d.media[0]), "{12692dea-686c-47ca-b3e9-48f38fc92b78}"
         )
@@ -1115,6 +1120,33 @@ a=rtpmap:0 PCMU/8000
             ),
         )
 
+    def test_audio_fmtp_without_rtpmap(self) -> None:
+        d = SessionDescription.parse(
+            lf2crlf(
+                """v=0
+o=- 863426017819471768 2 IN IP4 127.0.0.1
+s=-
+t=0 0
+m=audio 43580 RTP/AVP 0 63
+c=IN IP4 192.168.99.58
+a=sendrecv
+a=rtpmap:0 PCMU/8000
+a=fmtp:63 0/0
+"""
+            )
+        )
+
+        self.assertEqual(len(d.media), 1)
+        self.assertEqual(d.media[0].fmt, [0, 63])
+        self.assertEqual(
+            d.media[0].rtp.codecs,
+            [
+                RTCRtpCodecParameters(
+                    mimeType="audio/PCMU", clockRate=8000, channels=1, payloadType=0
+                ),
+            ],
+        )
+
     def test_datachannel_firefox(self) -> None:
         d = SessionDescription.parse(
             lf2crlf(
@@ -1496,6 +1528,7 @@ a=ssrc:3305256354 label:420c6f28-439d-4ead-b93c-94e14c0a16b4
         self.assertEqual(d.media[0].rtcp_host, "0.0.0.0")
         self.assertEqual(d.media[0].rtcp_port, 9)
         self.assertEqual(d.media[0].rtcp_mux, True)
+        self.assertEqual(d.webrtc_stream_id(d.media[0]), None)
         self.assertEqual(d.webrtc_track_id(d.media[0]), None)
 
         # ssrc
@@ -1868,6 +1901,95 @@ a=setup:actpass
             ],
         )
 
+    def test_video_simulcast(self) -> None:
+        d = SessionDescription.parse(
+            lf2crlf(
+                """v=0
+o=- 863426017819471768 2 IN IP4 127.0.0.1
+s=-
+t=0 0
+a=group:BUNDLE 0
+a=msid-semantic:WMS *
+m=video 9 UDP/TLS/RTP/SAVPF 96 97
+c=IN IP4 0.0.0.0
+a=sendonly
+a=extmap:1 urn:ietf:params:rtp-hdrext:sdes:mid
+a=extmap:4 urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id
+a=extmap:5 urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id
+a=mid:0
+a=msid:- d27161f3-ab5d-4aff-9dd8-4a24bfbe56d4
+a=rtcp:9 IN IP4 0.0.0.0
+a=rtcp-mux
+a=rtpmap:96 VP8/90000
+a=rtcp-fb:96 nack
+a=rtcp-fb:96 nack pli
+a=rtpmap:97 rtx/90000
+a=fmtp:97 apt=96
+a=rid:q send
+a=rid:h send
+a=rid:f send max-width=1280;max-height=720
+a=simulcast:send q;h;~f
+a=ice-ufrag:1a0e6b24
+a=ice-pwd:c43b0306087bb4de15f70e4405c4dafe
+a=fingerprint:sha-256 AF:9E:29:99:AC:F6:F6:A2:86:A7:2E:A5:83:94:21:7F:F1:39:C5:E3:8F:E4:08:04:D9:D8:70:6D:6C:A2:A1:D5
+a=setup:actpass
+"""
+            )
+        )
+        self.assertEqual(d.media[0].ssrc, [])
+        self.assertEqual(
+            d.media[0].rid,
+            [
+                RidDescription(id="q", direction="send"),
+                RidDescription(id="h", direction="send"),
+                RidDescription(
+                    id="f",
+                    direction="send",
+                    restrictions="max-width=1280;max-height=720",
+                ),
+            ],
+        )
+        self.assertEqual(
+            d.media[0].simulcast,
+            SimulcastDescription(send=[["q"], ["h"], ["~f"]]),
+        )
+
+        self.assertEqual(
+            str(d),
+            lf2crlf(
+                """v=0
+o=- 863426017819471768 2 IN IP4 127.0.0.1
+s=-
+t=0 0
+a=group:BUNDLE 0
+a=msid-semantic:WMS *
+m=video 9 UDP/TLS/RTP/SAVPF 96 97
+c=IN IP4 0.0.0.0
+a=sendonly
+a=extmap:1 urn:ietf:params:rtp-hdrext:sdes:mid
+a=extmap:4 urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id
+a=extmap:5 urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id
+a=mid:0
+a=msid:- d27161f3-ab5d-4aff-9dd8-4a24bfbe56d4
+a=rtcp:9 IN IP4 0.0.0.0
+a=rtcp-mux
+a=rtpmap:96 VP8/90000
+a=rtcp-fb:96 nack
+a=rtcp-fb:96 nack pli
+a=rtpmap:97 rtx/90000
+a=fmtp:97 apt=96
+a=rid:q send
+a=rid:h send
+a=rid:f send max-width=1280;max-height=720
+a=simulcast:send q;h;~f
+a=ice-ufrag:1a0e6b24
+a=ice-pwd:c43b0306087bb4de15f70e4405c4dafe
+a=fingerprint:sha-256 AF:9E:29:99:AC:F6:F6:A2:86:A7:2E:A5:83:94:21:7F:F1:39:C5:E3:8F:E4:08:04:D9:D8:70:6D:6C:A2:A1:D5
+a=setup:actpass
+""",
+            ),
+        )
+
     def test_safari(self) -> None:
         d = SessionDescription.parse(
             lf2crlf(
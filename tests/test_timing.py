@@ -0,0 +1,50 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from aiortc.stats import RTCStageTimingStats
+from aiortc.timing import HISTOGRAM_BUCKETS, StageTimer
+
+
+class StageTimerTest(TestCase):
+    def test_add(self) -> None:
+        timer = StageTimer(["decode", "send"])
+        for duration in [0.0001, 0.000125, 0.0002, 0.00025, 0.001, 60.0]:
+            timer.add("decode", duration)
+
+        decode, send = timer.get_stats("1234")
+        self.assertIsInstance(decode, RTCStageTimingStats)
+        self.assertEqual(decode.id, "stage-timing_1234_decode")
+        self.assertEqual(decode.type, "stage-timing")
+        self.assertEqual(decode.stage, "decode")
+        self.assertEqual(decode.count, 6)
+        self.assertAlmostEqual(decode.totalTime, 60.001675)
+        self.assertEqual(decode.maxTime, 60.0)
+        self.assertEqual(
+            decode.histogram, [1, 2, 1, 0, 1] + [0] * (HISTOGRAM_BUCKETS - 6) + [1]
+        )
+
+        self.assertEqual(send.stage, "send")
+        self.assertEqual(send.count, 0)
+        self.assertEqual(send.totalTime, 0.0)
+        self.assertEqual(send.maxTime, 0.0)
+        self.assertEqual(send.histogram, [0] * HISTOGRAM_BUCKETS)
+
+    @patch("aiortc.timing.time.perf_counter")
+    def test_mark_and_measure(self, mock_perf_counter: MagicMock) -> None:
+        timer = StageTimer(["queue"])
+        item = object()
+
+        # an item which was not marked is not measured
+        timer.measure("queue", item)
+
+        mock_perf_counter.return_value = 10.0
+        timer.mark(item)
+        mock_perf_counter.return_value = 10.5
+        timer.measure("queue", item)
+
+        # an item is only measured once
+        timer.measure("queue", item)
+
+        [queue] = timer.get_stats("1234")
+        self.assertEqual(queue.count, 1)
+        self.assertEqual(queue.totalTime, 0.5)
@@ -3,21 +3,60 @@ import io
 from contextlib import redirect_stderr
 from unittest import TestCase
 
-from aiortc.codecs import get_decoder, get_encoder
+import numpy
+from aiortc.codecs import depayload, get_decoder, get_encoder
 from aiortc.codecs.vpx import (
+    SkippedNumbers,
     Vp8Decoder,
     Vp8Encoder,
+    Vp8TemporalLayerFilter,
+    Vp9Decoder,
+    Vp9Encoder,
+    Vp9PayloadDescriptor,
+    Vp9ScalabilityStructure,
     VpxPayloadDescriptor,
     number_of_threads,
+    vp8_describe,
+    vp9_describe,
 )
 from aiortc.jitterbuffer import JitterFrame
-from aiortc.rtcrtpparameters import RTCRtpCodecParameters
+from aiortc.rtcrtpparameters import (
+    RTCRtpCodecParameters,
+    RTCRtpDecoderParameters,
+    RTCRtpEncoderParameters,
+    RTCRtpEncodingParameters,
+)
+from aiortc.rtp import RtpPacket
+from av import VideoFrame
 
 from .codecs import CodecTestCase
 
 VP8_CODEC = RTCRtpCodecParameters(
     mimeType="video/VP8", clockRate=90000, payloadType=100
 )
+VP9_CODEC = RTCRtpCodecParameters(
+    mimeType="video/VP9", clockRate=90000, payloadType=101
+)
+
+
+def create_layered_packet(
+    sequence_number: int, picture_id: int, tid: int, layer_sync: int = 0
+) -> RtpPacket:
+    descr = VpxPayloadDescriptor(
+        partition_start=1,
+        partition_id=0,
+        picture_id=picture_id,
+        tl0picidx=0,
+        tid=(tid, layer_sync),
+        keyidx=0,
+    )
+    return RtpPacket(
+        payload_type=100,
+        marker=1,
+        sequence_number=sequence_number,
+        timestamp=picture_id * 3000,
+        payload=bytes(descr) + b"\x00",
+    )
 
 
 class VpxPayloadDescriptorTest(TestCase):
@@ -125,6 +164,30 @@ class VpxPayloadDescriptorTest(TestCase):
 
         self.assertEqual(rest, b"")
 
+    def test_describe(self) -> None:
+        # start of a keyframe
+        descr = vp8_describe(b"\x10\x00")
+        self.assertTrue(descr.frame_start)
+        self.assertTrue(descr.keyframe)
+
+        # start of an interframe
+        descr = vp8_describe(b"\x10\x01")
+        self.assertTrue(descr.frame_start)
+        self.assertFalse(descr.keyframe)
+
+        # continuation of a frame
+        descr = vp8_describe(b"\x00\x00")
+        self.assertFalse(descr.frame_start)
+        self.assertFalse(descr.keyframe)
+
+        # temporal layer sync point
+        descr = vp8_describe(b"\x90\x60\x05\x60\x01")
+        self.assertTrue(descr.frame_start)
+        self.assertFalse(descr.keyframe)
+        self.assertEqual(descr.temporal_layer, 1)
+        self.assertTrue(descr.layer_sync)
+        self.assertEqual(descr.tl0picidx, 5)
+
     def test_truncated(self) -> None:
         with self.assertRaises(ValueError) as cm:
             VpxPayloadDescriptor.parse(b"")
@@ -159,6 +222,127 @@ class VpxPayloadDescriptorTest(TestCase):
         self.assertEqual(str(cm.exception), "VPX descriptor has truncated T/K")
 
 
+class Vp9PayloadDescriptorTest(TestCase):
+    def test_minimal(self) -> None:
+        descr, rest = Vp9PayloadDescriptor.parse(b"\x0c")
+        self.assertEqual(descr.start_of_frame, 1)
+        self.assertEqual(descr.end_of_frame, 1)
+        self.assertEqual(descr.picture_id, None)
+        self.assertEqual(descr.inter_picture_predicted, 0)
+        self.assertEqual(descr.tid, None)
+        self.assertEqual(descr.p_diff, [])
+        self.assertEqual(descr.scalability_structure, None)
+        self.assertEqual(bytes(descr), b"\x0c")
+        self.assertEqual(
+            repr(descr),
+            "Vp9PayloadDescriptor(B=1, E=1, pic_id=None, tid=None, sid=0)",
+        )
+
+        self.assertEqual(rest, b"")
+
+    def test_flexible_keyframe(self) -> None:
+        data = b"\xba\x92\x67\x10\x10\x02\x80\x01\xe0"
+        descr, rest = Vp9PayloadDescriptor.parse(data + b"\x82")
+        self.assertEqual(descr.start_of_frame, 1)
+        self.assertEqual(descr.end_of_frame, 0)
+        self.assertEqual(descr.picture_id, 4711)
+        self.assertEqual(descr.inter_picture_predicted, 0)
+        self.assertEqual(descr.flexible_mode, 1)
+        self.assertEqual(descr.tid, 0)
+        self.assertEqual(descr.switching_up_point, 1)
+        self.assertEqual(descr.sid, 0)
+        self.assertEqual(descr.inter_layer_dependency, 0)
+        self.assertEqual(descr.tl0picidx, None)
+        self.assertEqual(descr.p_diff, [])
+        self.assertEqual(
+            descr.scalability_structure,
+            Vp9ScalabilityStructure(
+                spatial_layers=1, resolutions=[(640, 480)], picture_group=None
+            ),
+        )
+        self.assertEqual(bytes(descr), data)
+
+        self.assertEqual(rest, b"\x82")
+
+    def test_describe(self) -> None:
+        # keyframe
+        descr = vp9_describe(b"\xba\x92\x67\x10\x10\x02\x80\x01\xe0\x82")
+        self.assertTrue(descr.frame_start)
+        self.assertTrue(descr.keyframe)
+        self.assertEqual(descr.temporal_layer, 0)
+        self.assertTrue(descr.layer_sync)
+
+        # interframe
+        descr = vp9_describe(b"\x4c")
+        self.assertTrue(descr.frame_start)
+        self.assertFalse(descr.keyframe)
+
+    def test_flexible_reference_indices(self) -> None:
+        data = b"\xfc\x05\x50\x03\x04"
+        descr, rest = Vp9PayloadDescriptor.parse(data)
+        self.assertEqual(descr.start_of_frame, 1)
+        self.assertEqual(descr.end_of_frame, 1)
+        self.assertEqual(descr.picture_id, 5)
+        self.assertEqual(descr.inter_picture_predicted, 1)
+        self.assertEqual(descr.flexible_mode, 1)
+        self.assertEqual(descr.tid, 2)
+        self.assertEqual(descr.switching_up_point, 1)
+        self.assertEqual(descr.p_diff, [1, 2])
+        self.assertEqual(bytes(descr), data)
+
+        self.assertEqual(rest, b"")
+
+    def test_non_flexible_layer_indices(self) -> None:
+        data = b"\x6c\x23\x81"
+        descr, rest = Vp9PayloadDescriptor.parse(data)
+        self.assertEqual(descr.inter_picture_predicted, 1)
+        self.assertEqual(descr.flexible_mode, 0)
+        self.assertEqual(descr.tid, 1)
+        self.assertEqual(descr.switching_up_point, 0)
+        self.assertEqual(descr.sid, 1)
+        self.assertEqual(descr.inter_layer_dependency, 1)
+        self.assertEqual(descr.tl0picidx, 129)
+        self.assertEqual(descr.p_diff, [])
+        self.assertEqual(bytes(descr), data)
+
+        self.assertEqual(rest, b"")
+
+    def test_scalability_structure_picture_group(self) -> None:
+        data = b"\x0a\x38\x01\x40\x00\xb4\x02\x80\x01\x68\x02\x04\x02\x34\x01"
+        descr, rest = Vp9PayloadDescriptor.parse(data)
+        self.assertEqual(
+            descr.scalability_structure,
+            Vp9ScalabilityStructure(
+                spatial_layers=2,
+                resolutions=[(320, 180), (640, 360)],
+                picture_group=[(0, 0, [2]), (1, 1, [1])],
+            ),
+        )
+        self.assertEqual(bytes(descr), data)
+
+        self.assertEqual(rest, b"")
+
+    def test_truncated(self) -> None:
+        for data, message in [
+            (b"", "VP9 descriptor is too short"),
+            (b"\x80", "VP9 descriptor has truncated PictureID"),
+            (b"\x80\x80", "VP9 descriptor has truncated long PictureID"),
+            (b"\x20\x00", "VP9 descriptor has truncated layer indices"),
+            (b"\x30", "VP9 descriptor has truncated layer indices"),
+            (b"\x50", "VP9 descriptor has truncated reference indices"),
+            (b"\x50\x03", "VP9 descriptor has truncated reference indices"),
+            (b"\x50\x03\x03\x03\x03", "VP9 descriptor has too many reference indices"),
+            (b"\x02", "VP9 descriptor has truncated scalability structure"),
+            (b"\x02\x10\x02\x80", "VP9 descriptor has truncated resolutions"),
+            (b"\x02\x08", "VP9 descriptor has truncated picture group"),
+            (b"\x02\x08\x01", "VP9 descriptor has truncated picture group"),
+            (b"\x02\x08\x01\x04", "VP9 descriptor has truncated picture group"),
+        ]:
+            with self.assertRaises(ValueError) as cm:
+                Vp9PayloadDescriptor.parse(data)
+            self.assertEqual(str(cm.exception), message)
+
+
 class Vp8Test(CodecTestCase):
     def test_decoder(self) -> None:
         decoder = get_decoder(VP8_CODEC)
@@ -169,6 +353,40 @@ class Vp8Test(CodecTestCase):
             frames = decoder.decode(JitterFrame(data=b"123", timestamp=0))
         self.assertEqual(frames, [])
 
+    def test_decoder_parameters(self) -> None:
+        encoder = get_encoder(VP8_CODEC)
+        decoder = self.ensureIsInstance(get_decoder(VP8_CODEC), Vp8Decoder)
+        decoder.configure(RTCRtpDecoderParameters(threadCount=2))
+
+        frame = self.create_video_frame(width=640, height=480, pts=0)
+        payloads, timestamp = encoder.encode(frame)
+        data = b"".join(depayload(VP8_CODEC, payload) for payload in payloads)
+        frames = decoder.decode(
+            JitterFrame(data=data, timestamp=timestamp, keyframe=True)
+        )
+        self.assertEqual(len(frames), 1)
+        assert decoder.codec is not None
+        self.assertEqual(decoder.codec.thread_count, 2)
+
+    def test_decoder_parameters_convert(self) -> None:
+        encoder = get_encoder(VP8_CODEC)
+        decoder = self.ensureIsInstance(get_decoder(VP8_CODEC), Vp8Decoder)
+        decoder.configure(
+            RTCRtpDecoderParameters(format="bgr24", width=320, height=240, ndarray=True)
+        )
+
+        frame = self.create_video_frame(width=640, height=480, pts=0)
+        payloads, timestamp = encoder.encode(frame)
+        data = b"".join(depayload(VP8_CODEC, payload) for payload in payloads)
+        frames = decoder.decode(JitterFrame(data=data, timestamp=timestamp))
+        self.assertEqual(len(frames), 1)
+        frame = self.ensureIsInstance(frames[0], VideoFrame)
+        self.assertEqual(frame.format.name, "bgr24")
+        self.assertEqual((frame.width, frame.height), (320, 240))
+        self.assertEqual(frame.pts, timestamp)
+        array = self.ensureIsInstance(frame.opaque, numpy.ndarray)
+        self.assertEqual(array.shape, (240, 320, 3))
+
     def test_encoder(self) -> None:
         encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
 
@@ -247,6 +465,144 @@ class Vp8Test(CodecTestCase):
         self.assertTrue(len(payloads[0]) < 1300)
         self.assertAlmostEqual(timestamp, 3000, delta=1)
 
+    def test_encoder_target_bitrate_sweep(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+
+        def is_keyframe(payloads: list[bytes]) -> bool:
+            descr, data = VpxPayloadDescriptor.parse(payloads[0])
+            return descr.partition_start == 1 and not (data[0] & 0x01)
+
+        # change the bitrate every 500ms for 10s
+        keyframes = []
+        bitrates = [400000, 600000, 800000, 1200000]
+        for i, frame in enumerate(self.create_video_frames(320, 240, 300)):
+            encoder.target_bitrate = bitrates[(i // 15) % len(bitrates)]
+            payloads, timestamp = encoder.encode(frame)
+            if is_keyframe(payloads):
+                keyframes.append(i)
+
+        # the bitrate is only changed every 5s
+        self.assertEqual(keyframes, [0, 150])
+
+        # a requested keyframe applies the current bitrate
+        encoder.target_bitrate = 400000
+        frame = self.create_video_frame(width=320, height=240, pts=900000)
+        payloads, timestamp = encoder.encode(frame, force_keyframe=True)
+        self.assertTrue(is_keyframe(payloads))
+        self.assertEqual(encoder.codec.bit_rate, 400000)
+
+    def test_encoder_configure(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+        frames = self.create_video_frames(640, 480, 3)
+
+        encoder.configure(
+            RTCRtpEncoderParameters(
+                minBitrate=100000,
+                startBitrate=2000000,
+                keyFrameInterval=90,
+                preset="-8",
+                threadCount=2,
+            ),
+            RTCRtpEncodingParameters(maxBitrate=2500000, scaleResolutionDownBy=2),
+        )
+        self.assertEqual(encoder.target_bitrate, 2000000)
+        encoder.target_bitrate = 50000
+        self.assertEqual(encoder.target_bitrate, 100000)
+
+        encoder.encode(frames[0])
+        assert encoder.codec is not None
+        self.assertEqual(encoder.codec.width, 320)
+        self.assertEqual(encoder.codec.height, 240)
+        self.assertEqual(encoder.codec.bit_rate, 100000)
+        self.assertEqual(encoder.codec.gop_size, 90)
+        self.assertEqual(encoder.codec.thread_count, 2)
+        self.assertEqual(encoder._create_codec(frames[0]).options["cpu-used"], "-8")
+
+        # a new start bitrate restarts the encoder
+        codec = encoder.codec
+        encoder.configure(
+            RTCRtpEncoderParameters(startBitrate=800000), RTCRtpEncodingParameters()
+        )
+        encoder.encode(frames[1])
+        self.assertIsNot(encoder.codec, codec)
+        self.assertEqual(encoder.codec.bit_rate, 800000)
+        self.assertEqual(encoder.codec.width, 640)
+        self.assertEqual(encoder.codec.gop_size, 3000)
+
+        # unchanged parameters leave the encoder running
+        codec = encoder.codec
+        encoder.configure(
+            RTCRtpEncoderParameters(startBitrate=800000), RTCRtpEncodingParameters()
+        )
+        encoder.encode(frames[2])
+        self.assertIs(encoder.codec, codec)
+
+    def test_encoder_configure_scalability_mode(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+        frame = self.create_video_frame(width=320, height=240, pts=0)
+        self.assertNotIn("ts-parameters", encoder._create_codec(frame).options)
+
+        encoder.configure(
+            RTCRtpEncoderParameters(scalabilityMode="L1T2"), RTCRtpEncodingParameters()
+        )
+        self.assertEqual(encoder.scalability_mode, "L1T2")
+        options = encoder._create_codec(frame).options
+        self.assertEqual(
+            options["ts-parameters"],
+            "ts_number_layers=2:ts_target_bitrate=300,500:ts_rate_decimator=2,1:"
+            "ts_periodicity=2:ts_layer_id=0,1:ts_layering_mode=2",
+        )
+        self.assertEqual(options["error-resilient"], "default")
+
+        # leaving the mode unset goes back to a single layer
+        encoder.configure(RTCRtpEncoderParameters(), RTCRtpEncodingParameters())
+        self.assertEqual(encoder.scalability_mode, "L1T1")
+
+    def test_encoder_temporal_layers(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+        encoder.scalability_mode = "L1T3"
+        encoder.picture_id = 0
+        encoder.keyidx = 0
+        encoder.tl0picidx = 0
+
+        layers = []
+        for frame in self.create_video_frames(width=320, height=240, count=9):
+            payloads, timestamp = encoder.encode(frame)
+            descr, data = VpxPayloadDescriptor.parse(payloads[0])
+            layers.append((descr.picture_id, descr.tid, descr.tl0picidx, descr.keyidx))
+        self.assertEqual(
+            layers,
+            [
+                (0, (0, 1), 1, 1),
+                (1, (2, 1), 1, 1),
+                (2, (1, 1), 1, 1),
+                (3, (2, 0), 1, 1),
+                (4, (0, 1), 2, 1),
+                (5, (2, 1), 2, 1),
+                (6, (1, 1), 2, 1),
+                (7, (2, 0), 2, 1),
+                (8, (0, 1), 3, 1),
+            ],
+        )
+
+        # the pictures of the base layer can be decoded on their own
+        decoder = get_decoder(VP8_CODEC)
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+        encoder.scalability_mode = "L1T2"
+        for i, frame in enumerate(self.create_video_frames(320, 240, count=10)):
+            payloads, timestamp = encoder.encode(frame)
+            descr, data = VpxPayloadDescriptor.parse(payloads[0])
+            self.assertEqual(descr.tid, (i % 2, 1))
+            if descr.tid[0] == 0:
+                frames = decoder.decode(JitterFrame(data=data, timestamp=timestamp))
+                self.assertEqual(len(frames), 1)
+
+    def test_encoder_invalid_scalability_mode(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+        with self.assertRaises(ValueError) as cm:
+            encoder.scalability_mode = "L2T2"
+        self.assertEqual(str(cm.exception), "Unsupported VP8 scalability mode `L2T2`")
+
     def test_number_of_threads(self) -> None:
         self.assertEqual(number_of_threads(1920 * 1080, 16), 8)
         self.assertEqual(number_of_threads(1920 * 1080, 8), 3)
@@ -267,3 +623,173 @@ class Vp8Test(CodecTestCase):
 
     def test_roundtrip_320_240(self) -> None:
         self.roundtrip_video(VP8_CODEC, 320, 240)
+
+
+class Vp8TemporalLayerFilterTest(TestCase):
+    def test_filter(self) -> None:
+        layer_filter = Vp8TemporalLayerFilter(max_temporal_layer=0)
+
+        forwarded = []
+        for i in range(6):
+            packet = layer_filter.filter(
+                create_layered_packet(
+                    sequence_number=(65533 + i) % 65536,
+                    picture_id=(32765 + i) % 32768,
+                    tid=i % 2,
+                )
+            )
+            if packet is not None:
+                descr, data = VpxPayloadDescriptor.parse(packet.payload)
+                forwarded.append((packet.sequence_number, descr.picture_id))
+        self.assertEqual(forwarded, [(65533, 32765), (65534, 32766), (65535, 32767)])
+
+        # raising the layer waits for a layer sync picture
+        layer_filter.max_temporal_layer = 1
+        self.assertIsNone(
+            layer_filter.filter(create_layered_packet(3, picture_id=3, tid=1))
+        )
+        packet = layer_filter.filter(
+            create_layered_packet(4, picture_id=4, tid=1, layer_sync=1)
+        )
+        assert packet is not None
+        descr, data = VpxPayloadDescriptor.parse(packet.payload)
+        self.assertEqual((packet.sequence_number, descr.picture_id), (0, 0))
+        self.assertEqual(descr.tid, (1, 1))
+        self.assertEqual(data, b"\x00")
+
+        # lowering the layer is immediate
+        layer_filter.max_temporal_layer = 0
+        self.assertIsNone(
+            layer_filter.filter(create_layered_packet(5, picture_id=5, tid=1))
+        )
+
+    def test_filter_no_layers(self) -> None:
+        layer_filter = Vp8TemporalLayerFilter(max_temporal_layer=0)
+        packet = RtpPacket(payload_type=100, payload=b"\x90\x80\x00\x00")
+        self.assertIs(layer_filter.filter(packet), packet)
+
+    def test_skipped_numbers(self) -> None:
+        numbers = SkippedNumbers(bits=16)
+        self.assertEqual(numbers.renumber(65534), 65534)
+        numbers.skip(65535)
+        numbers.skip(65535)
+        self.assertEqual(numbers.renumber(0), 65535)
+        self.assertEqual(numbers.renumber(1), 0)
+
+        # late values are not shifted by the numbers skipped after them
+        self.assertEqual(numbers.renumber(65534), 65534)
+
+
+class Vp9Test(CodecTestCase):
+    def test_decoder(self) -> None:
+        decoder = get_decoder(VP9_CODEC)
+        self.assertIsInstance(decoder, Vp9Decoder)
+
+        # decode junk
+        with redirect_stderr(io.StringIO()):
+            frames = decoder.decode(JitterFrame(data=b"123", timestamp=0))
+        self.assertEqual(frames, [])
+
+    def test_encoder(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP9_CODEC), Vp9Encoder)
+        encoder.picture_id = 0
+
+        # keyframe carries the scalability structure
+        frame = self.create_video_frame(width=640, height=480, pts=0)
+        payloads, timestamp = encoder.encode(frame)
+        self.assertEqual(len(payloads), 1)
+        descr, data = Vp9PayloadDescriptor.parse(payloads[0])
+        self.assertEqual(descr.picture_id, 0)
+        self.assertEqual(descr.inter_picture_predicted, 0)
+        self.assertEqual(descr.tid, None)
+        self.assertEqual(
+            descr.scalability_structure,
+            Vp9ScalabilityStructure(resolutions=[(640, 480)]),
+        )
+        self.assertEqual(timestamp, 0)
+
+        # delta frame
+        frame = self.create_video_frame(width=640, height=480, pts=3000)
+        payloads, timestamp = encoder.encode(frame)
+        self.assertEqual(len(payloads), 1)
+        descr, data = Vp9PayloadDescriptor.parse(payloads[0])
+        self.assertEqual(descr.picture_id, 1)
+        self.assertEqual(descr.inter_picture_predicted, 1)
+        self.assertEqual(descr.scalability_structure, None)
+        self.assertAlmostEqual(timestamp, 3000, delta=1)
+
+    def test_encoder_large(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP9_CODEC), Vp9Encoder)
+
+        frame = self.create_video_frame(width=2560, height=1920, pts=0)
+        payloads, timestamp = encoder.encode(frame)
+        self.assertGreater(len(payloads), 1)
+        descriptors = [Vp9PayloadDescriptor.parse(p)[0] for p in payloads]
+        self.assertEqual(
+            [(d.start_of_frame, d.end_of_frame) for d in descriptors],
+            [(1, 0)] + [(0, 0)] * (len(payloads) - 2) + [(0, 1)],
+        )
+        self.assertTrue(all(len(p) <= 1300 for p in payloads))
+
+    def test_encoder_pack(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP9_CODEC), Vp9Encoder)
+        encoder.picture_id = 0
+
+        packet = self.create_packet(payload=b"\x00", pts=1)
+        payloads, timestamp = encoder.pack(packet)
+        self.assertEqual(payloads, [b"\xcc\x00\x00"])
+        self.assertEqual(timestamp, 90)
+
+    def test_encoder_temporal_layers(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP9_CODEC), Vp9Encoder)
+        self.assertEqual(encoder.scalability_mode, "L1T1")
+        encoder.scalability_mode = "L1T3"
+        encoder.picture_id = 0
+
+        layers = []
+        for frame in self.create_video_frames(width=320, height=240, count=9):
+            payloads, timestamp = encoder.encode(frame)
+            descr, data = Vp9PayloadDescriptor.parse(payloads[0])
+            self.assertEqual(descr.flexible_mode, 1)
+            layers.append((descr.tid, descr.switching_up_point, descr.p_diff))
+        self.assertEqual(
+            layers,
+            [
+                (0, 1, []),
+                (2, 1, [1]),
+                (1, 1, [2]),
+                (2, 1, [1]),
+                (0, 0, [4]),
+                (2, 1, [1]),
+                (1, 1, [2]),
+                (2, 1, [1]),
+                (0, 0, [4]),
+            ],
+        )
+
+        # the pictures of the base layer can be decoded on their own
+        decoder = get_decoder(VP9_CODEC)
+        encoder = self.ensureIsInstance(get_encoder(VP9_CODEC), Vp9Encoder)
+        encoder.scalability_mode = "L1T2"
+        for i, frame in enumerate(self.create_video_frames(320, 240, count=10)):
+            payloads, timestamp = encoder.encode(frame)
+            descr, data = Vp9PayloadDescriptor.parse(payloads[0])
+            self.assertEqual(descr.tid, i % 2)
+            if descr.tid == 0:
+                frames = decoder.decode(JitterFrame(data=data, timestamp=timestamp))
+                self.assertEqual(len(frames), 1)
+
+    def test_encoder_invalid_scalability_mode(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP9_CODEC), Vp9Encoder)
+        with self.assertRaises(ValueError) as cm:
+            encoder.scalability_mode = "L2T2"
+        self.assertEqual(str(cm.exception), "Unsupported VP9 scalability mode `L2T2`")
+
+    def test_roundtrip_1280_720(self) -> None:
+        self.roundtrip_video(VP9_CODEC, 1280, 720)
+
+    def test_roundtrip_640_480(self) -> None:
+        self.roundtrip_video(VP9_CODEC, 640, 480)
+
+    def test_roundtrip_320_240(self) -> None:
+        self.roundtrip_video(VP9_CODEC, 320, 240)